@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+import json
 import os
+import random
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol
+from typing import Any, Optional, Protocol
 
 import anyio
 
-from .llm import ClaudeConfig, write_llm_call_record
+from .code_tools import CODE_SERVER, code_tool_server, uses_code_tools
+from .completion import INTERRUPT_TIMEOUT_S, CompletionWatcher
+from .llm import CallStream, ClaudeConfig, write_llm_call_record
+from .telemetry import CallTelemetry, TelemetryRecorder
+from .trace import ToolTracer, trace_path
 
 
 class AgentProtocol(Protocol):
@@ -22,8 +30,297 @@ class AgentProtocol(Protocol):
     ) -> None:
         """Run an agent call and write outputs."""
 
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        """Run an agent call on the caller's event loop and write outputs."""
+
+
+class TransientAgentError(RuntimeError):
+    """A failed agent call that is worth retrying (rate limit, overload, dropped connection)."""
+
+
+RETRYABLE_MESSAGE_ERRORS = {"rate_limit", "server_error"}
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_TEXT = (
+    "rate limit",
+    "rate_limit",
+    "overloaded",
+    "timeout",
+    "timed out",
+    "connection reset",
+    "connection closed",
+    "temporarily unavailable",
+    "529",
+    "503",
+    "502",
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Classify an agent failure as transient (retry) or permanent (fail fast)."""
+    if isinstance(exc, TransientAgentError):
+        return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        from claude_agent_sdk import CLIConnectionError, ProcessError
+    except ModuleNotFoundError:  # pragma: no cover - runtime dependency
+        return False
+    if isinstance(exc, CLIConnectionError):
+        return True
+    if isinstance(exc, ProcessError):
+        text = f"{exc} {getattr(exc, 'stderr', '') or ''}".lower()
+        return any(marker in text for marker in RETRYABLE_TEXT)
+    return False
+
+
+def raise_for_retryable(telemetry: CallTelemetry) -> None:
+    """Turn an API-level failure reported inside the message stream into an exception."""
+    if telemetry.error in RETRYABLE_MESSAGE_ERRORS:
+        raise TransientAgentError(f"Agent call failed: {telemetry.error}")
+    if telemetry.is_error and telemetry.api_error_status in RETRYABLE_STATUS:
+        raise TransientAgentError(
+            f"Agent call failed with API status {telemetry.api_error_status}"
+        )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay_s: float = 2.0
+    max_delay_s: float = 60.0
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+        ceiling = min(self.max_delay_s, self.base_delay_s * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+async def acall_agent(
+    agent: AgentProtocol,
+    prompt: str,
+    output_path: Path,
+    cwd: Path,
+    config: ClaudeConfig,
+    metadata: dict[str, object],
+) -> Optional[CallTelemetry]:
+    """Await ``agent.arun``, or run a sync-only agent in a worker thread."""
+    arun = getattr(agent, "arun", None)
+    if arun is None:
+        await anyio.to_thread.run_sync(
+            agent.run, prompt, output_path, cwd, config, metadata
+        )
+        return None
+    return await arun(prompt, output_path, cwd, config, metadata)
+
+
+def stream_message(stream: CallStream, message: object) -> None:
+    """Append one SDK message to the output text and event log."""
+    from claude_agent_sdk import (
+        AssistantMessage,
+        ResultMessage,
+        TextBlock,
+        ToolResultBlock,
+        ToolUseBlock,
+        UserMessage,
+    )
+
+    if isinstance(message, AssistantMessage):
+        for block in message.content:
+            if isinstance(block, TextBlock):
+                stream.write_text(block.text)
+                stream.write_event("assistant_text", text=block.text)
+            elif isinstance(block, ToolUseBlock):
+                stream.write_event("tool_use", id=block.id, name=block.name, input=block.input)
+    elif isinstance(message, UserMessage) and isinstance(message.content, list):
+        for block in message.content:
+            if isinstance(block, ToolResultBlock):
+                content = block.content
+                if not isinstance(content, str):
+                    content = json.dumps(content, default=str)
+                stream.write_event(
+                    "tool_result",
+                    tool_use_id=block.tool_use_id,
+                    is_error=bool(block.is_error),
+                    content=content or "",
+                )
+    elif isinstance(message, ResultMessage):
+        stream.write_event(
+            "result",
+            subtype=message.subtype,
+            is_error=message.is_error,
+            num_turns=message.num_turns,
+            duration_ms=message.duration_ms,
+        )
+
+
+def build_options_kwargs(config: ClaudeConfig, cwd: Path) -> dict[str, object]:
+    options_kwargs: dict[str, object] = {
+        "allowed_tools": config.allowed_tools,
+        "permission_mode": "bypassPermissions",
+        "max_turns": config.max_turns,
+        "cwd": str(cwd),
+    }
+    if config.model:
+        options_kwargs["model"] = config.model
+    return options_kwargs
+
+
+def build_options(config: ClaudeConfig, cwd: Path) -> Any:
+    """ClaudeAgentOptions for a call, with the in-process code tools when allowed.
+
+    ``build_options_kwargs`` stays JSON-serializable for call records; the
+    MCP server instance is only added here.
+    """
+    from claude_agent_sdk import ClaudeAgentOptions
+
+    options_kwargs = build_options_kwargs(config, cwd)
+    if uses_code_tools(config.allowed_tools):
+        options_kwargs["mcp_servers"] = {CODE_SERVER: code_tool_server(cwd)}
+    return ClaudeAgentOptions(**options_kwargs)
+
+
+def require_credentials() -> None:
+    if not (os.getenv("ANTHROPIC_API_KEY") or os.getenv("ANTHROPIC_AUTH_TOKEN")):
+        raise RuntimeError(
+            "Missing API credentials. Set ANTHROPIC_API_KEY (or ANTHROPIC_AUTH_TOKEN) "
+            "in your environment before running."
+        )
+
+
+async def aclose_agent(agent: Optional[object]) -> None:
+    """Close long-lived resources held anywhere in a chain of wrapped agents."""
+    while agent is not None:
+        aclose = getattr(agent, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        agent = getattr(agent, "inner", None)
+
+
+CLEAR_TIMEOUT_S = 60.0
+
+
+async def connect_client(config: ClaudeConfig, cwd: Path) -> Any:
+    """Start a long-lived ClaudeSDKClient (one agent process) for ``cwd``."""
+    try:
+        from claude_agent_sdk import ClaudeSDKClient
+    except ModuleNotFoundError as exc:  # pragma: no cover - runtime dependency
+        raise RuntimeError(
+            "claude_agent_sdk is not installed. Install it with: uv pip install claude-agent-sdk"
+        ) from exc
+    client = ClaudeSDKClient(options=build_options(config, cwd))
+    await client.connect()
+    return client
+
+
+async def clear_client(client: Any, timeout: float = CLEAR_TIMEOUT_S) -> bool:
+    """Send ``/clear`` and consume its result; False if the CLI did not confirm.
+
+    The command's own result message must be consumed here, otherwise it
+    would end the next ``receive_response`` early.
+    """
+    from claude_agent_sdk import ResultMessage
+
+    with anyio.move_on_after(timeout):
+        await client.query("/clear")
+        async for message in client.receive_messages():
+            if isinstance(message, ResultMessage):
+                return True
+    return False
+
+
+def is_tool_result(message: object) -> bool:
+    from claude_agent_sdk import ToolResultBlock, UserMessage
+
+    return isinstance(message, UserMessage) and isinstance(message.content, list) and any(
+        isinstance(block, ToolResultBlock) for block in message.content
+    )
+
+
+async def stream_client_call(
+    client: Any,
+    prompt: str,
+    output_path: Path,
+    config: ClaudeConfig,
+    metadata: dict[str, object],
+    early_stop: bool = False,
+    max_turns: Optional[int] = None,
+) -> CallTelemetry:
+    """Run one prompt on a connected client, streaming output, events and trace.
+
+    With ``early_stop`` the output CSV is checked after every tool result and
+    the session is interrupted once it is complete and stable; the messages up
+    to the interrupted call's result are still recorded. ``max_turns`` caps
+    this call's turns on a client connected with a larger cap (shared
+    sessions): the call is interrupted once it used them and ends as an error.
+    """
+    recorder = TelemetryRecorder(model=config.model)
+    watcher = CompletionWatcher.for_call(metadata) if early_stop else None
+    capped = False
+    with CallStream(output_path) as stream, ToolTracer(
+        trace_path(output_path), metadata
+    ) as tracer, anyio.CancelScope() as scope:
+        await client.query(prompt)
+        async for message in client.receive_response():
+            stream_message(stream, message)
+            recorder.observe(message)
+            tracer.observe(message)
+            if (
+                watcher is not None
+                and not recorder.telemetry.early_stopped
+                and is_tool_result(message)
+                and watcher.check()
+            ):
+                print(
+                    f"[early-stop] phase {metadata.get('phase')}: {watcher.output_csv.name} "
+                    f"complete after {len(recorder.telemetry.turn_wall_times_s)} turns; "
+                    "ending session"
+                )
+                stream.write_event("early_stop", output_csv=str(watcher.output_csv))
+                recorder.telemetry.early_stopped = True
+                scope.deadline = anyio.current_time() + INTERRUPT_TIMEOUT_S
+                await client.interrupt()
+            elif (
+                max_turns is not None
+                and not capped
+                and not recorder.telemetry.early_stopped
+                and is_tool_result(message)
+                and len(recorder.telemetry.turn_wall_times_s) >= max_turns
+            ):
+                print(
+                    f"[session] phase {metadata.get('phase')}: used its {max_turns} turns; "
+                    "interrupting"
+                )
+                stream.write_event("max_turns", max_turns=max_turns)
+                capped = True
+                scope.deadline = anyio.current_time() + INTERRUPT_TIMEOUT_S
+                await client.interrupt()
+    telemetry = recorder.finish()
+    if telemetry.early_stopped:
+        # The interrupt ends the call with an error result; a missing result
+        # leaves the client in an unknown state.
+        telemetry.is_error = scope.cancelled_caught
+    elif capped:
+        telemetry.is_error = True
+    return telemetry
+
 
 class ClaudeAgent:
+    """Agent that runs each call as a one-off ``query``.
+
+    With ``early_stop`` each call runs on its own client instead, so the
+    session can be interrupted once the output CSV is complete.
+    """
+
+    def __init__(self, early_stop: bool = False) -> None:
+        self.early_stop = early_stop
+
     def run(
         self,
         prompt: str,
@@ -32,37 +329,26 @@ class ClaudeAgent:
         config: ClaudeConfig,
         metadata: dict[str, object],
     ) -> None:
-        anyio.run(self._run_async, prompt, output_path, cwd, config)
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
 
-    async def _run_async(
+    async def arun(
         self,
         prompt: str,
         output_path: Path,
         cwd: Path,
         config: ClaudeConfig,
-    ) -> None:
-        options_kwargs: dict[str, object] = {
-            "allowed_tools": config.allowed_tools,
-            "permission_mode": "bypassPermissions",
-            "max_turns": config.max_turns,
-            "cwd": str(cwd),
-        }
-        if config.model:
-            options_kwargs["model"] = config.model
-
-        if not (os.getenv("ANTHROPIC_API_KEY") or os.getenv("ANTHROPIC_AUTH_TOKEN")):
-            raise RuntimeError(
-                "Missing API credentials. Set ANTHROPIC_API_KEY (or ANTHROPIC_AUTH_TOKEN) "
-                "in your environment before running."
-            )
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        options_kwargs = build_options_kwargs(config, cwd)
+        require_credentials()
         try:
-            from claude_agent_sdk import AssistantMessage, ClaudeAgentOptions, TextBlock, query
+            from claude_agent_sdk import query
         except ModuleNotFoundError as exc:  # pragma: no cover - runtime dependency
             raise RuntimeError(
                 "claude_agent_sdk is not installed. Install it with: uv pip install claude-agent-sdk"
             ) from exc
 
-        options = ClaudeAgentOptions(**options_kwargs)
+        options = build_options(config, cwd)
         if config.record_calls:
             write_llm_call_record(
                 output_path=output_path,
@@ -72,11 +358,384 @@ class ClaudeAgent:
                 used_fake=False,
             )
 
-        text_chunks: list[str] = []
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        text_chunks.append(block.text)
+        if self.early_stop:
+            client = await connect_client(config, cwd)
+            try:
+                telemetry = await stream_client_call(
+                    client, prompt, output_path, config, metadata, early_stop=True
+                )
+            finally:
+                with anyio.CancelScope(shield=True):
+                    await client.disconnect()
+        else:
+            recorder = TelemetryRecorder(model=config.model)
+            with CallStream(output_path) as stream, ToolTracer(
+                trace_path(output_path), metadata
+            ) as tracer:
+                async for message in query(prompt=prompt, options=options):
+                    stream_message(stream, message)
+                    recorder.observe(message)
+                    tracer.observe(message)
+            telemetry = recorder.finish()
+
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=prompt,
+                options_kwargs=options_kwargs,
+                config=config,
+                used_fake=False,
+                extra={"telemetry": telemetry.to_dict()},
+            )
+        raise_for_retryable(telemetry)
+        return telemetry
+
+
+class RetryingAgent:
+    """Agent wrapper that retries transient failures with jittered exponential backoff."""
+
+    def __init__(self, inner: AgentProtocol, policy: Optional[RetryPolicy] = None) -> None:
+        self.inner = inner
+        self.policy = policy or RetryPolicy()
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        # A failed attempt may have half-edited a seeded CSV; each retry starts
+        # from the file as it was before the first attempt.
+        output_csv = Path(str(metadata["output_csv"])) if metadata.get("output_csv") else None
+        seed = output_csv.read_bytes() if output_csv and output_csv.exists() else None
+        attempt = 1
+        while True:
+            try:
+                return await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+            except Exception as exc:
+                if attempt >= self.policy.max_attempts or not is_transient_error(exc):
+                    raise
+                delay = self.policy.delay(attempt)
+                print(
+                    f"[retry] phase {metadata.get('phase')} attempt {attempt} failed "
+                    f"({exc}); retrying in {delay:.1f}s"
+                )
+                attempt += 1
+                await anyio.sleep(delay)
+                if output_csv is not None:
+                    if seed is not None:
+                        output_csv.write_bytes(seed)
+                    else:
+                        output_csv.unlink(missing_ok=True)
+
+
+def worker_pid(client: Any) -> Optional[int]:
+    process = getattr(getattr(client, "_transport", None), "_process", None)
+    return getattr(process, "pid", None)
+
+
+def worker_alive(client: Any) -> bool:
+    process = getattr(getattr(client, "_transport", None), "_process", None)
+    if process is None:
+        # Unknown transport: trust it until a call fails.
+        return True
+    return getattr(process, "returncode", None) is None
+
+
+def process_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident memory of ``pid`` in MB (Linux /proc only; None elsewhere)."""
+    if pid is None:
+        return None
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return None
+
+
+PoolKey = tuple[str, Optional[str], int, tuple[str, ...]]
+
+
+@dataclass
+class PoolWorker:
+    key: PoolKey
+    client: Any
+    calls: int = 0
+    baseline_rss_mb: Optional[float] = None
+    started: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PoolStats:
+    spawned: int = 0
+    recycled: int = 0
+    unhealthy: int = 0
+    evicted: int = 0
+    calls: int = 0
+
+
+class AgentPool:
+    """Pool of pre-spawned agent worker processes, one set per (cwd, options).
+
+    The first call for a key spawns ``size`` workers concurrently; afterwards
+    at most ``size`` calls per key run at once and each reuses an idle worker.
+    A worker is health-checked before it is handed out, its conversation is
+    cleared when it is returned, and it is recycled after ``max_calls`` calls
+    or once its memory grew by more than ``max_rss_growth_mb``. At most
+    ``max_workers`` workers (default ``2 * size``) are alive across all keys:
+    a key that needs one more evicts the least recently used idle worker of
+    another key, or waits for one to be returned.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_calls: int = 25,
+        max_rss_growth_mb: Optional[float] = 1024.0,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"pool size must be >= 1: {size}")
+        max_workers = max_workers or 2 * size
+        if max_workers < size:
+            raise ValueError(f"pool max_workers must be >= size ({size}): {max_workers}")
+        self.size = size
+        self.max_calls = max_calls
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.max_workers = max_workers
+        self.stats = PoolStats()
+        self._idle: dict[PoolKey, list[PoolWorker]] = {}
+        self._slots: dict[PoolKey, anyio.Semaphore] = {}
+        self._warming: dict[PoolKey, anyio.Event] = {}
+        # One token per live worker, across all keys.
+        self._capacity = anyio.Semaphore(max_workers)
+        self._lock = anyio.Lock()
+
+    @staticmethod
+    def key_for(config: ClaudeConfig, cwd: Path) -> PoolKey:
+        return (str(cwd.resolve()), config.model, config.max_turns, tuple(config.allowed_tools))
+
+    @property
+    def live(self) -> int:
+        return self.max_workers - self._capacity.value
+
+    def _evictable(self, key: PoolKey) -> Optional[PoolWorker]:
+        """Take the least recently used idle worker of another key out of the pool."""
+        candidates = [
+            worker for other, idle in self._idle.items() if other != key for worker in idle
+        ]
+        if not candidates:
+            return None
+        victim = min(candidates, key=lambda worker: worker.last_used)
+        self._idle[victim.key].remove(victim)
+        return victim
+
+    async def _reserve(self, key: PoolKey, wait: bool = True) -> bool:
+        """Take a live-worker token for ``key``.
+
+        With ``wait`` (a call needs a worker now) idle workers of other keys
+        are evicted to make room, else this waits for one to be retired.
+        Without it (warming) only free capacity is used.
+        """
+        while True:
+            try:
+                self._capacity.acquire_nowait()
+                return True
+            except anyio.WouldBlock:
+                if not wait:
+                    return False
+            victim = self._evictable(key)
+            if victim is not None:
+                self.stats.evicted += 1
+                await self._retire(victim)
+                continue
+            await self._capacity.acquire()
+            return True
+
+    async def _spawn(self, key: PoolKey, config: ClaudeConfig, cwd: Path) -> PoolWorker:
+        """Start a worker; the caller holds its capacity token."""
+        try:
+            client = await connect_client(config, cwd)
+        except BaseException:
+            self._capacity.release()
+            raise
+        self.stats.spawned += 1
+        return PoolWorker(
+            key=key, client=client, baseline_rss_mb=process_rss_mb(worker_pid(client))
+        )
+
+    async def warm(self, config: ClaudeConfig, cwd: Path) -> None:
+        """Spawn workers for ``(cwd, config)`` until ``size`` are idle (capacity permitting)."""
+        key = self.key_for(config, cwd)
+        idle = self._idle.setdefault(key, [])
+        missing = self.size - len(idle)
+        if missing <= 0:
+            return
+
+        async def spawn_one() -> None:
+            idle.append(await self._spawn(key, config, cwd))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(missing):
+                if not await self._reserve(key, wait=False):
+                    break
+                tg.start_soon(spawn_one)
+
+    async def acquire(self, config: ClaudeConfig, cwd: Path) -> PoolWorker:
+        key = self.key_for(config, cwd)
+        async with self._lock:
+            slots = self._slots.setdefault(key, anyio.Semaphore(self.size))
+            warming = self._warming.get(key)
+            first = warming is None
+            if first:
+                warming = self._warming[key] = anyio.Event()
+        # Spawning takes seconds: warm outside the lock so other keys are not held up.
+        if first:
+            try:
+                await self.warm(config, cwd)
+            finally:
+                warming.set()
+        else:
+            await warming.wait()
+        await slots.acquire()
+        try:
+            idle = self._idle.setdefault(key, [])
+            while idle:
+                worker = idle.pop()
+                if worker_alive(worker.client):
+                    return worker
+                self.stats.unhealthy += 1
+                await self._retire(worker)
+            await self._reserve(key)
+            return await self._spawn(key, config, cwd)
+        except BaseException:
+            slots.release()
+            raise
+
+    async def release(self, worker: PoolWorker, healthy: bool = True) -> None:
+        """Return a worker after a call, clearing or recycling it."""
+        worker.calls += 1
+        worker.last_used = time.monotonic()
+        self.stats.calls += 1
+        try:
+            if healthy and not self._worn_out(worker) and await clear_client(worker.client):
+                self._idle.setdefault(worker.key, []).append(worker)
+            else:
+                self.stats.recycled += 1
+                await self._retire(worker)
+        finally:
+            self._slots[worker.key].release()
+
+    def _worn_out(self, worker: PoolWorker) -> bool:
+        if not worker_alive(worker.client):
+            return True
+        if self.max_calls and worker.calls >= self.max_calls:
+            return True
+        if self.max_rss_growth_mb is not None and worker.baseline_rss_mb is not None:
+            rss = process_rss_mb(worker_pid(worker.client))
+            if rss is not None and rss - worker.baseline_rss_mb > self.max_rss_growth_mb:
+                return True
+        return False
+
+    async def _retire(self, worker: PoolWorker) -> None:
+        with anyio.CancelScope(shield=True):
+            try:
+                await worker.client.disconnect()
+            except Exception:
+                pass
+            finally:
+                self._capacity.release()
+
+    async def aclose(self) -> None:
+        for workers in self._idle.values():
+            for worker in workers:
+                await self._retire(worker)
+        self._idle.clear()
+        self._warming.clear()
+
+
+class PooledAgent:
+    """Agent that runs each call on a warm worker from an AgentPool."""
+
+    def __init__(self, pool: AgentPool, early_stop: bool = False) -> None:
+        self.pool = pool
+        self.early_stop = early_stop
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        async def main() -> None:
+            try:
+                await self.arun(prompt, output_path, cwd, config, metadata)
+            finally:
+                await self.aclose()
+
+        anyio.run(main)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        options_kwargs = build_options_kwargs(config, cwd)
+        require_credentials()
+        worker = await self.pool.acquire(config, cwd)
+        healthy = False
+        try:
+            if config.record_calls:
+                write_llm_call_record(
+                    output_path=output_path,
+                    prompt=prompt,
+                    options_kwargs=options_kwargs,
+                    config=config,
+                    used_fake=False,
+                )
+            telemetry = await stream_client_call(
+                worker.client, prompt, output_path, config, metadata, self.early_stop
+            )
+            healthy = not telemetry.is_error
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.pool.release(worker, healthy)
+
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=prompt,
+                options_kwargs=options_kwargs,
+                config=config,
+                used_fake=False,
+                extra={
+                    "telemetry": telemetry.to_dict(),
+                    "pool_worker": {"pid": worker_pid(worker.client), "calls": worker.calls},
+                },
+            )
+        raise_for_retryable(telemetry)
+        return telemetry
 
-        output_path.write_text("".join(text_chunks), encoding="utf-8")
+    async def aclose(self) -> None:
+        await self.pool.aclose()
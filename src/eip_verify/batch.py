@@ -0,0 +1,505 @@
+"""Batch submission of tool-free phase calls (``llm_mode=batch``)."""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Protocol
+
+import anyio
+
+from .agents import AgentProtocol, TransientAgentError, acall_agent, is_transient_error
+from .circuit import CircuitOpenError, SharedCircuitBreaker
+from .context_pack import estimate_tokens
+from .llm import CallStream, ClaudeConfig, write_llm_call_record
+from .ratelimit import SharedRateLimiter
+from .telemetry import USAGE_KEYS, CallTelemetry
+from .utils import ensure_dir, timestamp
+
+
+# Phases whose JSON-mode prompts can carry everything the model needs.
+DEFAULT_BATCH_PHASES = ("0A", "1B", "2B")
+# Phases that read repo code: batched only when the prompt inlines it (context_budget).
+REPO_CONTEXT_PHASES = {"1B", "2B"}
+DEFAULT_BATCH_MODEL = "claude-sonnet-4-5"
+DEFAULT_BATCH_MAX_TOKENS = 16000
+DEFAULT_BATCH_WINDOW_S = 5.0
+DEFAULT_BATCH_POLL_S = 60.0
+DEFAULT_BATCH_MAX_REQUESTS = 10000
+RETRYABLE_RESULTS = {"errored", "expired"}
+# Standard USD prices per million input / output tokens, by model family (first match
+# wins). Unknown models are priced as the most expensive family, so budgets err high.
+MODEL_PRICES_PER_MTOK = (
+    ("opus-4-5", (5.0, 25.0)),
+    ("opus", (15.0, 75.0)),
+    ("sonnet", (3.0, 15.0)),
+    ("haiku-4-5", (1.0, 5.0)),
+    ("haiku", (0.8, 4.0)),
+)
+BATCH_DISCOUNT = 0.5
+CACHE_WRITE_FACTOR = 1.25
+CACHE_READ_FACTOR = 0.1
+
+
+def batch_cost_usd(model: str, usage: dict[str, int]) -> float:
+    """What a batched call costs: the model's token prices at the batch discount.
+
+    The Batches API reports usage but no cost, so this is what budgets charge.
+    """
+    input_price, output_price = next(
+        (prices for family, prices in MODEL_PRICES_PER_MTOK if family in model.lower()),
+        max((prices for _, prices in MODEL_PRICES_PER_MTOK), key=lambda prices: prices[1]),
+    )
+    cost = (
+        usage.get("input_tokens", 0) * input_price
+        + usage.get("cache_creation_input_tokens", 0) * input_price * CACHE_WRITE_FACTOR
+        + usage.get("cache_read_input_tokens", 0) * input_price * CACHE_READ_FACTOR
+        + usage.get("output_tokens", 0) * output_price
+    )
+    return round(cost * BATCH_DISCOUNT / 1_000_000, 6)
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """One prompt in a batch. ``metadata`` never leaves the process."""
+
+    custom_id: str
+    prompt: str
+    model: str
+    max_tokens: int = DEFAULT_BATCH_MAX_TOKENS
+    metadata: dict[str, object] = field(default_factory=dict)
+
+    def to_api(self) -> dict[str, object]:
+        return {
+            "custom_id": self.custom_id,
+            "params": {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "messages": [{"role": "user", "content": self.prompt}],
+            },
+        }
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    custom_id: str
+    kind: str
+    text: str = ""
+    model: Optional[str] = None
+    usage: dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, entry: dict[str, Any]) -> "BatchResult":
+        """Parse one line of a batch results file (the Message Batches API shape)."""
+        result = entry.get("result") or {}
+        kind = str(result.get("type") or "errored")
+        message = result.get("message") or {}
+        text = "".join(
+            str(block.get("text") or "")
+            for block in message.get("content") or []
+            if block.get("type") == "text"
+        )
+        usage = message.get("usage") or {}
+        error = result.get("error")
+        return cls(
+            custom_id=str(entry.get("custom_id")),
+            kind=kind,
+            text=text,
+            model=message.get("model"),
+            usage={key: int(usage.get(key) or 0) for key in USAGE_KEYS},
+            error=json.dumps(error, default=str) if error else None,
+        )
+
+
+class BatchTransport(Protocol):
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        """Start a batch job and return its id."""
+
+    async def status(self, batch_id: str) -> str:
+        """Processing status of the job: ``in_progress``, ``canceling`` or ``ended``."""
+
+    async def results(self, batch_id: str) -> list[BatchResult]:
+        """Results of an ended job."""
+
+
+class AnthropicBatchTransport:
+    """Message Batches API transport (needs the ``anthropic`` package)."""
+
+    def __init__(self, client: Any = None) -> None:
+        self._client = client
+
+    def client(self) -> Any:
+        if self._client is None:
+            try:
+                from anthropic import AsyncAnthropic
+            except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "anthropic is not installed. Install it with: uv pip install anthropic"
+                ) from exc
+            self._client = AsyncAnthropic()
+        return self._client
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch = await self.client().messages.batches.create(
+            requests=[request.to_api() for request in requests]
+        )
+        return str(batch.id)
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self.client().messages.batches.retrieve(batch_id)
+        return str(batch.processing_status)
+
+    async def results(self, batch_id: str) -> list[BatchResult]:
+        entries = await self.client().messages.batches.results(batch_id)
+        return [BatchResult.from_api(entry.model_dump()) async for entry in entries]
+
+
+def fake_batch_reply(request: BatchRequest) -> str:
+    """The fake agent's canned JSON rows for a batched call."""
+    from .fake_agent import _fake_json_rows
+    from .structured_output import render_json_rows
+
+    metadata = request.metadata
+    phase = str(metadata.get("phase") or "").upper()
+    input_csv = Path(str(metadata["input_csv"])) if metadata.get("input_csv") else None
+    eip_number = str(metadata.get("eip_number") or "1559")
+    return render_json_rows(phase, _fake_json_rows(phase, input_csv, eip_number, 3))
+
+
+def write_local_status(batch_dir: Path, status: str, count: int) -> None:
+    (batch_dir / "status.json").write_text(
+        json.dumps(
+            {
+                "id": batch_dir.name,
+                "processing_status": status,
+                "request_count": count,
+                "updated_at": timestamp(),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+
+class LocalBatchServer:
+    """File-based stand-in for the batch service.
+
+    Jobs live in ``<root>/<batch id>/``: ``requests.jsonl`` (with the local
+    ``metadata``), ``status.json`` and, once processed, ``results.jsonl`` in
+    the Message Batches API shape. ``respond`` answers one request.
+    """
+
+    def __init__(
+        self, root: Path, respond: Callable[[BatchRequest], str] = fake_batch_reply
+    ) -> None:
+        self.root = root
+        self.respond = respond
+
+    def pending(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return [
+            path.parent.name
+            for path in sorted(self.root.glob("*/status.json"))
+            if json.loads(path.read_text(encoding="utf-8"))["processing_status"] != "ended"
+        ]
+
+    def process(self, batch_id: str) -> None:
+        batch_dir = self.root / batch_id
+        lines = []
+        for line in (batch_dir / "requests.jsonl").read_text(encoding="utf-8").splitlines():
+            entry = json.loads(line)
+            params = entry["params"]
+            request = BatchRequest(
+                custom_id=entry["custom_id"],
+                prompt=params["messages"][0]["content"],
+                model=params["model"],
+                max_tokens=params["max_tokens"],
+                metadata=entry.get("metadata") or {},
+            )
+            try:
+                text = self.respond(request)
+                result: dict[str, object] = {
+                    "type": "succeeded",
+                    "message": {
+                        "model": request.model,
+                        "content": [{"type": "text", "text": text}],
+                        "usage": {
+                            "input_tokens": estimate_tokens(request.prompt),
+                            "output_tokens": estimate_tokens(text),
+                        },
+                    },
+                }
+            except Exception as exc:
+                result = {"type": "errored", "error": {"type": "api_error", "message": str(exc)}}
+            lines.append(json.dumps({"custom_id": request.custom_id, "result": result}))
+        (batch_dir / "results.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        write_local_status(self.root / batch_id, "ended", len(lines))
+
+    def process_pending(self) -> int:
+        batch_ids = self.pending()
+        for batch_id in batch_ids:
+            self.process(batch_id)
+        return len(batch_ids)
+
+
+class LocalBatchTransport:
+    """Transport writing jobs for a LocalBatchServer under ``root``.
+
+    With ``server`` the job is processed in-process on its first status
+    check; without it the job waits for a server running elsewhere.
+    """
+
+    def __init__(self, root: Path, server: Optional[LocalBatchServer] = None) -> None:
+        self.root = root
+        self.server = server
+        self.submitted = 0
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        batch_dir = self.root / batch_id
+        ensure_dir(batch_dir)
+        lines = [
+            json.dumps({**request.to_api(), "metadata": request.metadata}, default=str)
+            for request in requests
+        ]
+        (batch_dir / "requests.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        write_local_status(batch_dir, "in_progress", len(requests))
+        self.submitted += 1
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        status_path = self.root / batch_id / "status.json"
+        status = json.loads(status_path.read_text(encoding="utf-8"))["processing_status"]
+        if status != "ended" and self.server is not None:
+            await anyio.to_thread.run_sync(self.server.process, batch_id)
+            return "ended"
+        return str(status)
+
+    async def results(self, batch_id: str) -> list[BatchResult]:
+        text = (self.root / batch_id / "results.jsonl").read_text(encoding="utf-8")
+        return [BatchResult.from_api(json.loads(line)) for line in text.splitlines() if line]
+
+
+def parse_batch_transport(spec: Optional[str]) -> BatchTransport:
+    """``anthropic`` (default), ``local:<dir>`` (in-process stand-in server) or
+    ``local-queue:<dir>`` (jobs wait for a LocalBatchServer run elsewhere)."""
+    kind, _, value = (spec or "anthropic").strip().partition(":")
+    kind = kind.lower()
+    if kind == "anthropic":
+        return AnthropicBatchTransport()
+    if kind in {"local", "local-queue"}:
+        root = Path(value or "runs/batches").expanduser()
+        server = LocalBatchServer(root) if kind == "local" else None
+        return LocalBatchTransport(root, server)
+    raise ValueError(f"batch_transport must be anthropic, local:<dir> or local-queue:<dir> — got {spec}")
+
+
+@dataclass
+class _Pending:
+    request: BatchRequest
+    queued: float = field(default_factory=time.monotonic)
+    done: anyio.Event = field(default_factory=anyio.Event)
+    batch_id: Optional[str] = None
+    result: Optional[BatchResult] = None
+    error: Optional[BaseException] = None
+
+
+class BatchAgent:
+    """Agent wrapper that submits tool-free phase calls as batch jobs.
+
+    Calls of ``phases`` in ``json`` output mode are queued; ``window_s`` after
+    the first one arrives, everything queued so far (up to ``max_requests``)
+    is submitted as one job, polled every ``poll_s`` seconds, and each reply is
+    written to its call's output file. Other calls go to ``inner``, and so do
+    calls of phases that read repo code (1B, 2B) whose prompt does not inline
+    it (no ``context_budget``): without tools they would have nothing to
+    analyse. Run many calls concurrently (shards, or a sweep over EIPs) to
+    fill the batches.
+
+    Batched calls skip the wrapped agents, so the rate ``limiter`` and the
+    circuit ``breaker`` of the chain (if any) are consulted here: each
+    request reserves tokens and is charged its usage, waits while the
+    circuit is open, and reports its outcome to it.
+    """
+
+    def __init__(
+        self,
+        inner: AgentProtocol,
+        transport: BatchTransport,
+        phases: Iterable[str] = DEFAULT_BATCH_PHASES,
+        window_s: float = DEFAULT_BATCH_WINDOW_S,
+        poll_s: float = DEFAULT_BATCH_POLL_S,
+        max_requests: int = DEFAULT_BATCH_MAX_REQUESTS,
+        max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+        limiter: Optional[SharedRateLimiter] = None,
+        breaker: Optional[SharedCircuitBreaker] = None,
+    ) -> None:
+        self.inner = inner
+        self.transport = transport
+        self.phases = {phase.upper() for phase in phases}
+        self.window_s = window_s
+        self.poll_s = poll_s
+        self.max_requests = max(1, max_requests)
+        self.max_tokens = max_tokens
+        self.limiter = limiter
+        self.breaker = breaker
+        self._queue: list[_Pending] = []
+        self._flushing = False
+        self._ids = 0
+        self._warned: set[str] = set()
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    def batches(self, metadata: dict[str, object]) -> bool:
+        phase = str(metadata.get("phase") or "").upper()
+        if phase not in self.phases or metadata.get("output_format") != "json":
+            return False
+        if phase in REPO_CONTEXT_PHASES and not metadata.get("repo_context"):
+            if phase not in self._warned:
+                self._warned.add(phase)
+                print(
+                    f"[batch] phase {phase} needs repo code and no context_budget is set; "
+                    "running it live"
+                )
+            return False
+        return True
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        if not self.batches(metadata):
+            return await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+        probe = await self.breaker.acquire() if self.breaker is not None else False
+        reserved = await self.limiter.acquire() if self.limiter is not None else 0
+        try:
+            telemetry = await self._batched(prompt, output_path, config, metadata)
+        except BaseException as exc:
+            if self.limiter is not None:
+                await self.limiter.arecord(None, reserved, aborted=True)
+            if self.breaker is not None:
+                await self._report_failure(exc, probe)
+            raise
+        if self.limiter is not None:
+            await self.limiter.arecord(telemetry, reserved)
+        if self.breaker is not None:
+            # Batch latency is queueing, not service health: only outcomes count.
+            await self.breaker.arecord_success()
+        return telemetry
+
+    async def _report_failure(self, exc: BaseException, probe: bool) -> None:
+        if isinstance(exc, Exception) and is_transient_error(exc):
+            if await self.breaker.arecord_failure(str(exc) or type(exc).__name__):
+                raise CircuitOpenError(f"Batch request failed while the circuit is open: {exc}") from exc
+        elif probe:
+            await self.breaker.arelease_probe()
+
+    async def _batched(
+        self,
+        prompt: str,
+        output_path: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> CallTelemetry:
+        self._ids += 1
+        pending = _Pending(
+            BatchRequest(
+                custom_id=f"{metadata.get('phase')}-{self._ids:06d}",
+                prompt=prompt,
+                model=config.model or DEFAULT_BATCH_MODEL,
+                max_tokens=self.max_tokens,
+                metadata=metadata,
+            )
+        )
+        self._queue.append(pending)
+        if not self._flushing:
+            await self._flush()
+        await pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return self._finish(pending, output_path, config)
+
+    async def _flush(self) -> None:
+        """Submit queued calls until the queue is empty (run by one caller at a time)."""
+        self._flushing = True
+        in_flight: list[_Pending] = []
+        try:
+            await anyio.sleep(self.window_s)
+            while self._queue:
+                in_flight = self._queue[: self.max_requests]
+                del self._queue[: len(in_flight)]
+                await self._run_batch(in_flight)
+                in_flight = []
+        except BaseException as exc:
+            error = exc if isinstance(exc, Exception) else RuntimeError("Batch submission cancelled")
+            for pending in [*in_flight, *self._queue]:
+                pending.error = error
+                pending.done.set()
+            self._queue.clear()
+            raise
+        finally:
+            self._flushing = False
+
+    async def _run_batch(self, items: list[_Pending]) -> None:
+        batch_id = await self.transport.submit([item.request for item in items])
+        print(f"[batch] submitted {batch_id} with {len(items)} request(s)")
+        while await self.transport.status(batch_id) != "ended":
+            await anyio.sleep(self.poll_s)
+        results = {result.custom_id: result for result in await self.transport.results(batch_id)}
+        print(f"[batch] {batch_id} ended with {len(results)} result(s)")
+        for item in items:
+            item.batch_id = batch_id
+            item.result = results.get(item.request.custom_id)
+            item.done.set()
+
+    def _finish(
+        self, pending: _Pending, output_path: Path, config: ClaudeConfig
+    ) -> CallTelemetry:
+        request, result = pending.request, pending.result
+        batch = {"id": pending.batch_id, "custom_id": request.custom_id}
+        if result is None:
+            raise TransientAgentError(f"Batch {pending.batch_id} has no result for {request.custom_id}")
+        if result.kind != "succeeded":
+            error = TransientAgentError if result.kind in RETRYABLE_RESULTS else RuntimeError
+            raise error(f"Batch request {request.custom_id} {result.kind}: {result.error or ''}")
+
+        model = result.model or request.model
+        telemetry = CallTelemetry(
+            model=model,
+            num_turns=1,
+            batched=True,
+            total_cost_usd=batch_cost_usd(model, result.usage),
+            wall_time_s=round(time.monotonic() - pending.queued, 3),
+            **result.usage,
+        )
+        with CallStream(output_path) as stream:
+            stream.write_text(result.text)
+            stream.write_event("assistant_text", text=result.text)
+            stream.write_event("batch_result", **batch)
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=request.prompt,
+                options_kwargs={"model": request.model, "max_tokens": request.max_tokens},
+                config=config,
+                used_fake=False,
+                extra={"batch": batch, "telemetry": telemetry.to_dict()},
+            )
+        return telemetry
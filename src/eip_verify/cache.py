@@ -0,0 +1,296 @@
+"""Content-addressed on-disk cache for agent responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import anyio
+
+from .agents import AgentProtocol, acall_agent
+from .llm import ClaudeConfig, config_metadata, write_llm_call_record
+from .spec_index import get_git_diff, get_git_info
+from .structured_output import (
+    PHASE_REQUIRED_COLUMNS,
+    StructuredOutputError,
+    parse_structured_rows,
+    read_csv_rows,
+    validate_phase_output,
+)
+from .telemetry import CallTelemetry
+from .utils import ensure_dir, timestamp
+
+
+CACHE_MODES = ("read", "write", "off")
+DEFAULT_CACHE_DIR = Path("~/.cache/eip-verify")
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+ENTRY_FILE = "entry.json"
+OUTPUT_FILE = "output.txt"
+CSV_FILE = "output.csv"
+
+
+def normalize_cache_mode(mode: Optional[str]) -> str:
+    value = (mode or "off").strip().lower()
+    if value not in CACHE_MODES:
+        raise ValueError(f"cache must be one of {', '.join(CACHE_MODES)}: {mode}")
+    return value
+
+
+def _file_digest(path: Optional[Path]) -> Optional[str]:
+    if path is None or not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _text_digest(text: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else None
+
+
+def reply_problems(
+    output_path: Path, output_csv: Optional[Path], metadata: dict[str, object]
+) -> list[str]:
+    """Why a finished call's output is not worth caching (empty when it is).
+
+    Mirrors the runner's checks after a call: a JSON reply must parse, and a
+    CSV the agent writes must pass phase validation.
+    """
+    phase = str(metadata.get("phase") or "")
+    if metadata.get("output_format") == "json" and phase in PHASE_REQUIRED_COLUMNS:
+        try:
+            parse_structured_rows(phase, output_path.read_text(encoding="utf-8"))
+        except (OSError, StructuredOutputError) as exc:
+            return [str(exc)]
+        return []
+    if output_csv is None or phase not in PHASE_REQUIRED_COLUMNS:
+        return []
+    input_csv = Path(str(metadata["input_csv"])) if metadata.get("input_csv") else None
+    row_ids = None
+    if input_csv is not None and input_csv.is_file():
+        _, rows = read_csv_rows(input_csv)
+        row_ids = [(row.get("id") or "").strip() for row in rows]
+    return validate_phase_output(phase, output_csv, row_ids, input_csv)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.iterdir() if item.is_file())
+
+
+class ResponseCache:
+    """Stores agent output text and produced CSV keyed by everything that shaped them.
+
+    Entries live under ``root/<key[:2]>/<key>/``. The LRU clock is the mtime of
+    each entry's ``entry.json``, refreshed on every hit; once the cache grows
+    past ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = root.expanduser().resolve()
+        self.max_bytes = max_bytes
+        self._commits: dict[Path, Optional[str]] = {}
+        self._diffs: dict[Path, Optional[str]] = {}
+
+    def _repo_commit(self, cwd: Path) -> Optional[str]:
+        if cwd not in self._commits:
+            self._commits[cwd] = get_git_info(cwd).commit
+        return self._commits[cwd]
+
+    def _repo_diff(self, cwd: Path) -> Optional[str]:
+        # Like the commit, read once per run: `git diff` is slow on large repos.
+        if cwd not in self._diffs:
+            self._diffs[cwd] = _text_digest(get_git_diff(cwd))
+        return self._diffs[cwd]
+
+    def key_for(
+        self,
+        prompt: str,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> str:
+        input_csv = Path(str(metadata["input_csv"])) if metadata.get("input_csv") else None
+        output_csv = Path(str(metadata["output_csv"])) if metadata.get("output_csv") else None
+        eip_file = Path(str(metadata["eip_file"])) if metadata.get("eip_file") else None
+        # Run directories are timestamped, so CSV paths are replaced by placeholders.
+        normalized = prompt
+        if input_csv is not None:
+            normalized = normalized.replace(str(input_csv), "<input_csv>")
+        if output_csv is not None:
+            normalized = normalized.replace(str(output_csv), "<output_csv>")
+        options = config_metadata(config)
+        options.pop("record_llm_calls", None)
+        material = {
+            "prompt": normalized,
+            "config": options,
+            "cwd_commit": self._repo_commit(cwd),
+            # Uncommitted edits to tracked files change what the agent reads.
+            "cwd_diff_sha256": self._repo_diff(cwd),
+            "input_csv_sha256": _file_digest(input_csv),
+            # Phase 0A reads the EIP by path only; its contents must key the entry.
+            "eip_file_sha256": _file_digest(eip_file),
+            "phase": metadata.get("phase"),
+        }
+        encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def lookup(self, key: str) -> Optional[Path]:
+        entry = self.entry_dir(key)
+        marker = entry / ENTRY_FILE
+        if not marker.exists():
+            return None
+        os.utime(marker)
+        return entry
+
+    def store(
+        self,
+        key: str,
+        output_path: Path,
+        output_csv: Optional[Path],
+        metadata: dict[str, object],
+        telemetry: Optional[CallTelemetry] = None,
+    ) -> Path:
+        entry = self.entry_dir(key)
+        staging = entry.parent / f".{key}.{uuid.uuid4().hex}"
+        ensure_dir(staging)
+        shutil.copy2(output_path, staging / OUTPUT_FILE)
+        if output_csv is not None:
+            shutil.copy2(output_csv, staging / CSV_FILE)
+        (staging / ENTRY_FILE).write_text(
+            json.dumps(
+                {
+                    "key": key,
+                    "stored_at": timestamp(),
+                    "phase": metadata.get("phase"),
+                    "eip_number": metadata.get("eip_number"),
+                    "has_csv": output_csv is not None,
+                    "telemetry": telemetry.to_dict() if telemetry else None,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Another process stored the same key first; theirs is as good as ours.
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+        return entry
+
+    def evict(self) -> list[Path]:
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        if not self.root.exists():
+            return []
+        entries: list[tuple[float, int, Path]] = []
+        for marker in self.root.glob(f"*/*/{ENTRY_FILE}"):
+            try:
+                entries.append((marker.stat().st_mtime, _dir_size(marker.parent), marker.parent))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        removed: list[Path] = []
+        for _, size, path in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed.append(path)
+        return removed
+
+
+class CachingAgent:
+    """Agent wrapper that serves and records responses through a ResponseCache.
+
+    Modes:
+        read: serve cached entries; misses call the wrapped agent and are stored.
+        write: always call the wrapped agent and refresh the stored entry.
+        off: pass straight through to the wrapped agent.
+    """
+
+    def __init__(self, inner: AgentProtocol, cache: ResponseCache, mode: str = "read") -> None:
+        self.inner = inner
+        self.cache = cache
+        self.mode = normalize_cache_mode(mode)
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        if self.mode == "off":
+            return await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+
+        output_csv = Path(str(metadata["output_csv"])) if metadata.get("output_csv") else None
+        # Git and file hashing block; keep them off the loop.
+        key = await anyio.to_thread.run_sync(
+            self.cache.key_for, prompt, cwd, config, metadata
+        )
+        if self.mode == "read":
+            entry = self.cache.lookup(key)
+            if entry is not None:
+                started = time.monotonic()
+                self._replay(entry, key, prompt, output_path, output_csv, config)
+                return CallTelemetry(
+                    model=config.model,
+                    wall_time_s=round(time.monotonic() - started, 3),
+                    cache_hit=True,
+                )
+
+        telemetry = await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+        if not output_path.exists() or (telemetry is not None and telemetry.is_error):
+            return telemetry
+        # Error replies and outputs the phase would reject are not worth replaying.
+        if reply_problems(output_path, output_csv, metadata):
+            return telemetry
+        self.cache.store(key, output_path, output_csv, metadata, telemetry)
+        return telemetry
+
+    def _replay(
+        self,
+        entry: Path,
+        key: str,
+        prompt: str,
+        output_path: Path,
+        output_csv: Optional[Path],
+        config: ClaudeConfig,
+    ) -> None:
+        shutil.copy2(entry / OUTPUT_FILE, output_path)
+        if output_csv is not None and (entry / CSV_FILE).exists():
+            shutil.copy2(entry / CSV_FILE, output_csv)
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=prompt,
+                options_kwargs={},
+                config=config,
+                used_fake=False,
+                extra={"cache": {"hit": True, "key": key, "entry": str(entry)}},
+            )
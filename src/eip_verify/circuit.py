@@ -0,0 +1,276 @@
+"""Cross-process circuit breaker for agent calls."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional, TypeVar
+
+import anyio
+
+from .agents import AgentProtocol, acall_agent, is_transient_error
+from .llm import ClaudeConfig
+from .telemetry import CallTelemetry
+from .utils import ensure_dir
+
+
+T = TypeVar("T")
+DEFAULT_CIRCUIT_DB = Path("~/.cache/eip-verify/circuit.sqlite")
+POLL_S = 5.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuit (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    open_since REAL,
+    opened_at REAL,
+    probe_at REAL
+);
+INSERT OR IGNORE INTO circuit (id, state, failures) VALUES (1, 'closed', 0);
+"""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit stayed open longer than a call may wait.
+
+    The call was never sent; the work it belongs to is left resumable.
+    """
+
+
+@dataclass(frozen=True)
+class CircuitSettings:
+    # Consecutive failed (or slow) calls that open the circuit.
+    failures: int = 5
+    # Calls slower than this per turn count as failures (None = latency ignored).
+    slow_turn_s: Optional[float] = 60.0
+    # How long an open circuit holds new calls before one probe call is let through.
+    cooldown_s: float = 30.0
+    # How long calls wait for an open circuit before giving up (parking their work).
+    max_wait_s: float = 900.0
+    # A probe that has not reported back by then is presumed lost.
+    probe_timeout_s: float = 900.0
+
+
+class SharedCircuitBreaker:
+    """Closed / open / half-open circuit shared through a SQLite file.
+
+    Every process pointing at the same ``db_path`` sees the same circuit.
+    ``failures`` consecutive transient failures or slow calls, from any
+    process, open it. While it is open new calls wait; after ``cooldown_s``
+    a single probe call goes through, and its success closes the circuit
+    for everyone while its failure restarts the cool-down. Calls give up
+    with CircuitOpenError once the circuit has been open for ``max_wait_s``.
+    """
+
+    def __init__(self, db_path: Path, settings: CircuitSettings) -> None:
+        self.db_path = db_path.expanduser().resolve()
+        self.settings = settings
+        # The open episode (its open_since) this process stopped waiting for.
+        self._given_up: Optional[float] = None
+        ensure_dir(self.db_path.parent)
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _state(self, conn: sqlite3.Connection) -> dict[str, object]:
+        state, failures, open_since, opened_at, probe_at = conn.execute(
+            "SELECT state, failures, open_since, opened_at, probe_at FROM circuit WHERE id = 1"
+        ).fetchone()
+        return {
+            "state": state,
+            "failures": int(failures),
+            "open_since": open_since,
+            "opened_at": opened_at,
+            "probe_at": probe_at,
+        }
+
+    def try_acquire(self, waiting_since: float) -> tuple[float, bool]:
+        """Ask to start a call that has been waiting since ``waiting_since``.
+
+        Returns ``(0, probe)`` when the call may start (``probe`` is True for
+        the one call testing a half-open circuit), otherwise the number of
+        seconds to wait before asking again. Raises CircuitOpenError once the
+        call has waited ``max_wait_s``; after that, later calls of this
+        process give up at once until the circuit closes or a probe is due.
+        """
+        now = time.time()
+        settings = self.settings
+        with self._transaction() as conn:
+            current = self._state(conn)
+            if current["state"] == CLOSED:
+                return 0.0, False
+            if current["state"] == OPEN:
+                wait = float(current["opened_at"] or now) + settings.cooldown_s - now
+            else:
+                probe_at = current["probe_at"]
+                wait = 0.0 if probe_at is None else float(probe_at) + settings.probe_timeout_s - now
+            if wait <= 0:
+                conn.execute(
+                    "UPDATE circuit SET state = ?, probe_at = ? WHERE id = 1", (HALF_OPEN, now)
+                )
+                return 0.0, True
+            episode = current["open_since"]
+            waited = now - waiting_since
+            if episode == self._given_up or waited >= settings.max_wait_s:
+                self._given_up = episode
+                raise CircuitOpenError(
+                    f"Circuit open after {current['failures']} failed calls; gave up after "
+                    f"{waited:.0f}s (rerun with --resume once the service recovers)"
+                )
+            return min(wait, POLL_S, settings.max_wait_s - waited), False
+
+    async def acquire(self) -> bool:
+        """Wait until a call may start; returns whether it is the probe.
+
+        Like the ``a``-prefixed recorders below, the sqlite transactions run
+        in a worker thread, so a lock held by another process never stalls
+        the other calls on this loop.
+        """
+        waiting_since = time.time()
+        while True:
+            wait, probe = await anyio.to_thread.run_sync(self.try_acquire, waiting_since)
+            if wait <= 0:
+                return probe
+            await anyio.sleep(wait)
+
+    def record_success(self) -> None:
+        with self._transaction() as conn:
+            was = self._state(conn)["state"]
+            conn.execute(
+                "UPDATE circuit SET state = ?, failures = 0, open_since = NULL, "
+                "opened_at = NULL, probe_at = NULL WHERE id = 1",
+                (CLOSED,),
+            )
+        if was != CLOSED:
+            print("[circuit] closed: the service is answering again")
+
+    def record_failure(self, reason: str) -> bool:
+        """Count a failed call; returns whether the circuit is open now."""
+        now = time.time()
+        with self._transaction() as conn:
+            current = self._state(conn)
+            failures = current["failures"] + 1
+            reopen = current["state"] == HALF_OPEN or (
+                current["state"] == CLOSED and failures >= self.settings.failures
+            )
+            if not reopen:
+                conn.execute("UPDATE circuit SET failures = ? WHERE id = 1", (failures,))
+                return current["state"] != CLOSED
+            conn.execute(
+                "UPDATE circuit SET state = ?, failures = ?, open_since = ?, opened_at = ?, "
+                "probe_at = NULL WHERE id = 1",
+                (OPEN, failures, current["open_since"] or now, now),
+            )
+        print(
+            f"[circuit] open after {failures} failed calls ({reason}); "
+            f"pausing new calls for {self.settings.cooldown_s:g}s"
+        )
+        return True
+
+    def release_probe(self) -> None:
+        """Let another call probe when the probe ended without a verdict (cancelled, bad output)."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE circuit SET probe_at = NULL WHERE id = 1 AND state = ?", (HALF_OPEN,))
+
+    def status(self) -> dict[str, object]:
+        with self._transaction() as conn:
+            return self._state(conn)
+
+    async def _offload(self, func: Callable[..., T], *args: object) -> T:
+        # Shielded: the outcome of a call that is being cancelled still counts.
+        with anyio.CancelScope(shield=True):
+            return await anyio.to_thread.run_sync(func, *args)
+
+    async def arecord_success(self) -> None:
+        await self._offload(self.record_success)
+
+    async def arecord_failure(self, reason: str) -> bool:
+        return await self._offload(self.record_failure, reason)
+
+    async def arelease_probe(self) -> None:
+        await self._offload(self.release_probe)
+
+
+class CircuitBreakerAgent:
+    """Agent wrapper that holds calls while a SharedCircuitBreaker is open.
+
+    Transient failures and calls slower than ``slow_turn_s`` per turn count
+    against the circuit; any other result closes it. Other errors (bad
+    output, permanent failures) say nothing about the service and are not
+    counted. A call that fails while the circuit is open raises
+    CircuitOpenError instead of its error, so its work is parked, not failed.
+    """
+
+    def __init__(self, inner: AgentProtocol, breaker: SharedCircuitBreaker) -> None:
+        self.inner = inner
+        self.breaker = breaker
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        probe = await self.breaker.acquire()
+        try:
+            telemetry = await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+        except Exception as exc:
+            if not is_transient_error(exc):
+                if probe:
+                    await self.breaker.arelease_probe()
+                raise
+            if await self.breaker.arecord_failure(str(exc) or type(exc).__name__):
+                # The service is down: park the call rather than fail it.
+                raise CircuitOpenError(f"Call failed while the circuit is open: {exc}") from exc
+            raise
+        except BaseException:
+            if probe:
+                await self.breaker.arelease_probe()
+            raise
+        slow_turn_s = self.breaker.settings.slow_turn_s
+        per_turn = (
+            telemetry.wall_time_s / max(1, telemetry.num_turns) if telemetry is not None else 0.0
+        )
+        if slow_turn_s is not None and per_turn > slow_turn_s:
+            await self.breaker.arecord_failure(
+                f"phase {metadata.get('phase')}: {per_turn:.0f}s per turn"
+            )
+        else:
+            await self.breaker.arecord_success()
+        return telemetry
@@ -6,15 +6,37 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import fire
 
-from .agents import ClaudeAgent
+from .agents import AgentPool, ClaudeAgent, PooledAgent, RetryingAgent, RetryPolicy
+from .cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_BYTES,
+    CachingAgent,
+    ResponseCache,
+    normalize_cache_mode,
+)
+from .circuit import DEFAULT_CIRCUIT_DB, CircuitBreakerAgent, CircuitSettings, SharedCircuitBreaker
+from .code_tools import CODE_TOOL_NAMES
 from .config import load_config
-from .pipeline import run_pipeline
+from .pipeline import PHASE_ORDER, run_pipeline, run_sweep
+from .hedging import DEFAULT_HEDGE_MIN_SAMPLES, HedgingAgent
+from .history import LatencyHistory
+from .llm import DEFAULT_ALLOWED_TOOLS
+from .ratelimit import (
+    DEFAULT_RATE_LIMIT_DB,
+    RateLimitedAgent,
+    RateLimitSettings,
+    SharedRateLimiter,
+)
 from .reporting import write_report
+from .routing import ModelRouting, parse_escalation, parse_models
+from .run_history import DEFAULT_HISTORY
+from .trace import write_trace_report
 from .runner import run_phase_0a, run_phase_1a, run_phase_1b, run_phase_2a, run_phase_2b
+from .snapshots import DEFAULT_SNAPSHOT_DIR, DEFAULT_SNAPSHOT_REF, SnapshotAgent, SnapshotManager
 from .spec_index import run_index_specs
 from . import spec_index
 from .utils import timestamp
@@ -30,12 +52,341 @@ def _resolve_config(config: Optional[str] = None) -> dict:
     return {}
 
 
-def _resolve_agent(llm_mode: str):
-    """Get the appropriate agent based on mode."""
+def _config_number(cfg: dict, key: str, env: str) -> Optional[float]:
+    """Read a numeric setting from config or env (None when unset)."""
+    value = cfg.get(key)
+    if value is None:
+        value = os.getenv(env) or None
+    return float(value) if value is not None else None
+
+
+def _resolve_rate_limits(cfg: dict) -> RateLimitSettings:
+    """Resolve shared rate limit and budget settings from config or env.
+
+    Without a ``batch_id`` every invocation (a run or a whole sweep) gets a
+    budget of its own.
+    """
+    budget_tokens = _config_number(cfg, "budget_tokens", "EIP_VERIFY_BUDGET_TOKENS")
+    batch_id = cfg.get("batch_id") or os.getenv("EIP_VERIFY_BATCH_ID")
+    return RateLimitSettings(
+        requests_per_minute=_config_number(cfg, "requests_per_minute", "EIP_VERIFY_REQUESTS_PER_MINUTE"),
+        tokens_per_minute=_config_number(cfg, "tokens_per_minute", "EIP_VERIFY_TOKENS_PER_MINUTE"),
+        budget_usd=_config_number(cfg, "budget_usd", "EIP_VERIFY_BUDGET_USD"),
+        budget_tokens=int(budget_tokens) if budget_tokens is not None else None,
+        **({"batch_id": str(batch_id)} if batch_id else {}),
+    )
+
+
+DEFAULT_MAX_RETRIES = 3
+
+
+def _resolve_fake_behavior(cfg: dict):
+    """Resolve fake agent latency, error injection and row count from config or env."""
+    from .fake_agent import FakeBehavior
+
+    latency = cfg.get("fake_latency") or os.getenv("EIP_VERIFY_FAKE_LATENCY") or "fixed:0"
+    error_rate = _config_number(cfg, "fake_error_rate", "EIP_VERIFY_FAKE_ERROR_RATE")
+    rows = _config_number(cfg, "fake_rows", "EIP_VERIFY_FAKE_ROWS")
+    seed = _config_number(cfg, "fake_seed", "EIP_VERIFY_FAKE_SEED")
+    return FakeBehavior(
+        latency=str(latency),
+        error_rate=error_rate or 0.0,
+        rows=int(rows) if rows is not None else 3,
+        seed=int(seed) if seed is not None else None,
+    )
+
+
+def _resolve_replay_agent(cfg: dict):
+    """Build a ReplayAgent over recorded runs from config or env."""
+    from .replay_agent import DEFAULT_REPLAY_DIR, ReplayAgent, ReplayLibrary
+
+    replay_dir = cfg.get("replay_dir") or os.getenv("EIP_VERIFY_REPLAY_DIR") or DEFAULT_REPLAY_DIR
+    latency = _config_number(cfg, "replay_latency", "EIP_VERIFY_REPLAY_LATENCY")
+    return ReplayAgent(ReplayLibrary(Path(replay_dir)), latency_scale=latency or 0.0)
+
+
+def _resolve_retry_policy(cfg: dict) -> Optional[RetryPolicy]:
+    """Resolve retry settings from config or env (None disables retries)."""
+    retries = _config_number(cfg, "max_retries", "EIP_VERIFY_MAX_RETRIES")
+    retries = DEFAULT_MAX_RETRIES if retries is None else int(retries)
+    if retries <= 0:
+        return None
+    return RetryPolicy(max_attempts=retries + 1)
+
+
+def _resolve_sessions(sessions: Optional[bool], cfg: dict) -> bool:
+    """Resolve the opt-in session mode from arg, config, or env."""
+    if sessions is not None:
+        return bool(sessions)
+    if cfg.get("sessions") is not None:
+        return bool(cfg["sessions"])
+    return os.getenv("EIP_VERIFY_SESSIONS", "").strip().lower() in {"1", "true", "yes", "y"}
+
+
+def _resolve_allowed_tools(allowed_tools: Optional[str], cfg: dict) -> Optional[list[str]]:
+    """Resolve the allowed tools, adding the in-process code tools when enabled."""
+    tools = allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools")
+    enabled = cfg.get("code_tools")
+    if enabled is None:
+        enabled = os.getenv("EIP_VERIFY_CODE_TOOLS", "").strip().lower() in {"1", "true", "yes", "y"}
+    if not enabled:
+        return tools
+    tools = list(tools or DEFAULT_ALLOWED_TOOLS)
+    return tools + [name for name in CODE_TOOL_NAMES if name not in tools]
+
+
+def _resolve_snapshots(cfg: dict, agent):
+    """Run calls in pooled repo snapshots when ``snapshots`` is enabled in config or env."""
+    enabled = cfg.get("snapshots")
+    if enabled is None:
+        enabled = os.getenv("EIP_VERIFY_SNAPSHOTS", "").strip().lower() in {"1", "true", "yes", "y"}
+    if not enabled:
+        return agent
+    root = cfg.get("snapshot_dir") or os.getenv("EIP_VERIFY_SNAPSHOT_DIR") or DEFAULT_SNAPSHOT_DIR
+    ref = cfg.get("snapshot_ref") or os.getenv("EIP_VERIFY_SNAPSHOT_REF") or DEFAULT_SNAPSHOT_REF
+    return SnapshotAgent(agent, SnapshotManager(Path(root), str(ref)))
+
+
+def _resolve_early_stop(cfg: dict) -> bool:
+    """Resolve the opt-in early stop of live sessions from config or env."""
+    if cfg.get("early_stop") is not None:
+        return bool(cfg["early_stop"])
+    return os.getenv("EIP_VERIFY_EARLY_STOP", "").strip().lower() in {"1", "true", "yes", "y"}
+
+
+def _resolve_pool(cfg: dict) -> Optional[AgentPool]:
+    """Resolve the warm worker pool from config or env (None when pool_size is unset)."""
+    size = _config_number(cfg, "pool_size", "EIP_VERIFY_POOL_SIZE")
+    if not size:
+        return None
+    max_calls = _config_number(cfg, "pool_max_calls", "EIP_VERIFY_POOL_MAX_CALLS")
+    max_growth = _config_number(cfg, "pool_max_rss_growth_mb", "EIP_VERIFY_POOL_MAX_RSS_GROWTH_MB")
+    max_workers = _config_number(cfg, "pool_max_workers", "EIP_VERIFY_POOL_MAX_WORKERS")
+    return AgentPool(
+        size=int(size),
+        max_calls=int(max_calls) if max_calls is not None else 25,
+        max_rss_growth_mb=max_growth if max_growth is not None else 1024.0,
+        max_workers=int(max_workers) if max_workers else None,
+    )
+
+
+def _resolve_circuit_breaker(cfg: dict, agent):
+    """Wrap ``agent`` in a CircuitBreakerAgent when ``circuit_breaker`` is enabled in config or env."""
+    enabled = cfg.get("circuit_breaker")
+    if enabled is None:
+        enabled = os.getenv("EIP_VERIFY_CIRCUIT_BREAKER", "").strip().lower() in {"1", "true", "yes", "y"}
+    if not enabled:
+        return agent
+    defaults = CircuitSettings()
+    failures = _config_number(cfg, "circuit_failures", "EIP_VERIFY_CIRCUIT_FAILURES")
+    slow_turn_s = _config_number(cfg, "circuit_slow_turn_s", "EIP_VERIFY_CIRCUIT_SLOW_TURN_S")
+    cooldown_s = _config_number(cfg, "circuit_cooldown_s", "EIP_VERIFY_CIRCUIT_COOLDOWN_S")
+    max_wait_s = _config_number(cfg, "circuit_max_wait_s", "EIP_VERIFY_CIRCUIT_MAX_WAIT_S")
+    settings = CircuitSettings(
+        failures=int(failures) if failures is not None else defaults.failures,
+        # 0 turns the latency trigger off.
+        slow_turn_s=(slow_turn_s or None) if slow_turn_s is not None else defaults.slow_turn_s,
+        cooldown_s=cooldown_s if cooldown_s is not None else defaults.cooldown_s,
+        max_wait_s=max_wait_s if max_wait_s is not None else defaults.max_wait_s,
+    )
+    db_path = cfg.get("circuit_db") or os.getenv("EIP_VERIFY_CIRCUIT_DB") or DEFAULT_CIRCUIT_DB
+    return CircuitBreakerAgent(agent, SharedCircuitBreaker(Path(db_path), settings))
+
+
+def _resolve_hedging(cfg: dict, agent):
+    """Wrap ``agent`` in a HedgingAgent when hedge_percentile is set in config or env."""
+    percentile = _config_number(cfg, "hedge_percentile", "EIP_VERIFY_HEDGE_PERCENTILE")
+    if not percentile:
+        return agent
+    if percentile > 1:
+        percentile /= 100
+    history = cfg.get("hedge_history") or os.getenv("EIP_VERIFY_HEDGE_HISTORY")
+    roots = _split_values(history) or [str(DEFAULT_HISTORY)]
+    min_samples = _config_number(cfg, "hedge_min_samples", "EIP_VERIFY_HEDGE_MIN_SAMPLES")
+    return HedgingAgent(
+        agent,
+        LatencyHistory.load(Path(root) for root in roots),
+        percentile=percentile,
+        min_samples=int(min_samples) if min_samples is not None else DEFAULT_HEDGE_MIN_SAMPLES,
+    )
+
+
+def _resolve_batch(cfg: dict, agent):
+    """Wrap ``agent`` in a BatchAgent for ``llm_mode=batch``."""
+    from .batch import (
+        DEFAULT_BATCH_MAX_REQUESTS,
+        DEFAULT_BATCH_MAX_TOKENS,
+        DEFAULT_BATCH_PHASES,
+        DEFAULT_BATCH_POLL_S,
+        DEFAULT_BATCH_WINDOW_S,
+        BatchAgent,
+        parse_batch_transport,
+    )
+
+    def number(key: str, env: str, default: float) -> float:
+        value = _config_number(cfg, key, env)
+        return value if value is not None else default
+
+    def layer(name: str):
+        # Batched calls bypass the wrapped agents; hand their limiter/breaker to the batcher.
+        inner = agent
+        while inner is not None:
+            if getattr(inner, name, None) is not None:
+                return getattr(inner, name)
+            inner = getattr(inner, "inner", None)
+        return None
+
+    transport = cfg.get("batch_transport") or os.getenv("EIP_VERIFY_BATCH_TRANSPORT")
+    phases = _split_values(cfg.get("batch_phases") or os.getenv("EIP_VERIFY_BATCH_PHASES"))
+    return BatchAgent(
+        agent,
+        parse_batch_transport(transport),
+        phases=phases or DEFAULT_BATCH_PHASES,
+        window_s=number("batch_window_s", "EIP_VERIFY_BATCH_WINDOW_S", DEFAULT_BATCH_WINDOW_S),
+        poll_s=number("batch_poll_s", "EIP_VERIFY_BATCH_POLL_S", DEFAULT_BATCH_POLL_S),
+        max_requests=int(
+            number("batch_max_requests", "EIP_VERIFY_BATCH_MAX_REQUESTS", DEFAULT_BATCH_MAX_REQUESTS)
+        ),
+        max_tokens=int(
+            number("batch_max_tokens", "EIP_VERIFY_BATCH_MAX_TOKENS", DEFAULT_BATCH_MAX_TOKENS)
+        ),
+        limiter=layer("limiter"),
+        breaker=layer("breaker"),
+    )
+
+
+def _resolve_max_turns(max_turns, cfg: dict, default: int):
+    """Resolve max_turns from arg, config, or env; "auto" gives a TurnBudget over past runs."""
+    from .turn_budget import AUTO_TURNS, TurnBudget
+
+    value = max_turns if max_turns is not None else cfg.get("max_turns")
+    if value is None:
+        value = os.getenv("EIP_VERIFY_MAX_TURNS") or default
+    if str(value).strip().lower() != AUTO_TURNS:
+        return int(value)
+    history = cfg.get("turn_history") or os.getenv("EIP_VERIFY_TURN_HISTORY")
+    roots = _split_values(history) or [str(DEFAULT_HISTORY)]
+    return TurnBudget.load(Path(root) for root in roots)
+
+
+def _estimate_sharding(shard_size, phases) -> dict:
+    """EstimateSettings shard fields; a ShardBudget becomes per-phase token budgets."""
+    from .estimate import normalize_phases
+    from .shard_budget import ShardBudget
+
+    if not isinstance(shard_size, ShardBudget):
+        return {"shard_size": shard_size}
+    return {
+        "shard_tokens": {
+            phase: shard_size.tokens_for(phase)
+            for phase in normalize_phases(_split_values(phases))
+            if phase != "0A"
+        }
+    }
+
+
+def _estimate_max_turns(max_turns, cfg: dict) -> int:
+    """Turn cap for estimates; with "auto" history decides, up to the adaptive maximum."""
+    from .turn_budget import MAX_AUTO_TURNS, TurnBudget
+
+    value = _resolve_max_turns(max_turns, cfg, 20)
+    return MAX_AUTO_TURNS if isinstance(value, TurnBudget) else value
+
+
+def _resolve_project_inputs(project_inputs: Optional[Union[bool, int]], cfg: dict) -> Union[bool, int]:
+    """Resolve column-projected inputs: True, a cell truncation length, or False."""
+    if project_inputs is None:
+        project_inputs = cfg.get("project_inputs")
+    if project_inputs is None:
+        project_inputs = os.getenv("EIP_VERIFY_PROJECT_INPUTS", "").strip().lower()
+    if isinstance(project_inputs, str):
+        if project_inputs in {"1", "true", "yes", "y"}:
+            return True
+        return int(project_inputs) if project_inputs.isdigit() else False
+    if isinstance(project_inputs, bool):
+        return project_inputs
+    return int(project_inputs) if project_inputs else False
+
+
+def _resolve_context_budget(context_budget: Optional[int], cfg: dict) -> Optional[int]:
+    """Resolve the pre-loaded context token budget from arg, config, or env."""
+    if context_budget is None:
+        value = _config_number(cfg, "context_budget", "EIP_VERIFY_CONTEXT_BUDGET")
+        context_budget = int(value) if value is not None else None
+    return int(context_budget) if context_budget else None
+
+
+def _resolve_output_format(
+    output_format: Optional[str], cfg: dict, llm_mode: Optional[str] = None
+) -> str:
+    """Resolve who writes phase CSVs ('csv': the agent, 'json': the runner).
+
+    Batch mode defaults to 'json', the only format batched calls can answer in.
+    """
+    from .structured_output import normalize_output_format
+
+    value = output_format or cfg.get("output_format") or os.getenv("EIP_VERIFY_OUTPUT_FORMAT")
+    return normalize_output_format(value or ("json" if llm_mode == "batch" else None))
+
+
+def _resolve_model_routing(model: Optional[str], cfg: dict) -> ModelRouting:
+    """Resolve per-phase models and the escalation ladder from config or env.
+
+    An explicit ``--model`` applies to every phase, so per-phase models are
+    ignored then; escalation still applies.
+    """
+    models = {} if model else parse_models(cfg.get("models") or os.getenv("EIP_VERIFY_MODELS"))
+    escalate_to = parse_escalation(cfg.get("escalate_to") or os.getenv("EIP_VERIFY_ESCALATE_TO"))
+    return ModelRouting(models=models, escalate_to=escalate_to)
+
+
+def _resolve_agent(
+    llm_mode: str,
+    cfg: Optional[dict] = None,
+    cache: Optional[str] = None,
+    sessions: Optional[bool] = None,
+):
+    """Get the appropriate agent based on mode, wrapped by any configured layers."""
+    cfg = cfg or {}
     if llm_mode == "fake":
         from .fake_agent import FakeClaudeAgent
-        return FakeClaudeAgent()
-    return ClaudeAgent()
+        agent = FakeClaudeAgent(_resolve_fake_behavior(cfg))
+    elif llm_mode == "replay":
+        agent = _resolve_replay_agent(cfg)
+    elif _resolve_sessions(sessions, cfg):
+        from .sessions import SessionAgent
+        reset = cfg.get("session_reset") or os.getenv("EIP_VERIFY_SESSION_RESET") or "none"
+        agent = SessionAgent(reset=reset, early_stop=_resolve_early_stop(cfg))
+    elif pool := _resolve_pool(cfg):
+        agent = PooledAgent(pool, early_stop=_resolve_early_stop(cfg))
+    else:
+        agent = ClaudeAgent(early_stop=_resolve_early_stop(cfg))
+    agent = _resolve_snapshots(cfg, agent)
+
+    limits = _resolve_rate_limits(cfg)
+    if limits.enabled:
+        db_path = cfg.get("rate_limit_db") or os.getenv("EIP_VERIFY_RATE_LIMIT_DB") or DEFAULT_RATE_LIMIT_DB
+        agent = RateLimitedAgent(agent, SharedRateLimiter(Path(db_path), limits))
+
+    agent = _resolve_circuit_breaker(cfg, agent)
+    agent = _resolve_hedging(cfg, agent)
+
+    if llm_mode == "batch":
+        agent = _resolve_batch(cfg, agent)
+
+    retry_policy = _resolve_retry_policy(cfg)
+    if retry_policy is not None:
+        agent = RetryingAgent(agent, retry_policy)
+
+    cache_mode = normalize_cache_mode(
+        cache or cfg.get("cache") or os.getenv("EIP_VERIFY_CACHE", "off")
+    )
+    if cache_mode != "off":
+        cache_dir = cfg.get("cache_dir") or os.getenv("EIP_VERIFY_CACHE_DIR") or DEFAULT_CACHE_DIR
+        max_mb = cfg.get("cache_max_mb") or os.getenv("EIP_VERIFY_CACHE_MAX_MB")
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_CACHE_MAX_BYTES
+        agent = CachingAgent(agent, ResponseCache(Path(cache_dir), max_bytes), cache_mode)
+    return agent
 
 
 def _resolve_llm_mode(llm_mode: Optional[str], cfg: dict) -> str:
@@ -54,6 +405,93 @@ def _resolve_record_calls(record_llm_calls: bool, cfg: dict) -> bool:
     return env_val in {"1", "true", "yes", "y"}
 
 
+def _resolve_sharding(
+    shard_size: Optional[Union[int, str]], concurrency: Optional[int], cfg: dict
+) -> dict:
+    """Resolve shard_size/concurrency from args or config; "auto" gives a ShardBudget over past runs."""
+    from .shard_budget import AUTO_SHARDS, DEFAULT_SHARD_TOKENS, ShardBudget
+
+    size = shard_size if shard_size is not None else cfg.get("shard_size")
+    limit = concurrency if concurrency is not None else cfg.get("concurrency", 4)
+    if str(size).strip().lower() == AUTO_SHARDS:
+        history = cfg.get("shard_history") or os.getenv("EIP_VERIFY_SHARD_HISTORY")
+        roots = _split_values(history) or [str(DEFAULT_HISTORY)]
+        fallback = _config_number(cfg, "shard_tokens", "EIP_VERIFY_SHARD_TOKENS")
+        size = ShardBudget.load(
+            (Path(root) for root in roots),
+            int(fallback) if fallback is not None else DEFAULT_SHARD_TOKENS,
+        )
+    return {
+        "shard_size": size if isinstance(size, ShardBudget) else int(size) if size else None,
+        "concurrency": int(limit),
+    }
+
+
+def _split_values(value) -> list[str]:
+    """Items of a comma-separated string, or of the tuple Fire makes from one."""
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else [value]
+    return [part.strip() for item in items for part in str(item).split(",") if part.strip()]
+
+
+def _resolve_eip_list(spec_repo: str, fork: Optional[str], eip=None) -> list[str]:
+    """Explicit EIPs (comma-separated or a list), else every EIP of ``fork`` in the spec repo."""
+    resolved_spec_repo = Path(spec_repo).resolve()
+    
+    # Determine strict eip list
+    eip_list = []
+    if eip is not None:
+        if isinstance(eip, (list, tuple)):
+            # Flatten valid items
+            for item in eip:
+                if isinstance(item, str):
+                    eip_list.extend([x.strip() for x in item.split(",") if x.strip()])
+                else:
+                    eip_list.append(str(item))
+        elif isinstance(eip, str):
+            eip_list = [e.strip() for e in eip.split(",") if e.strip()]
+        else:
+            eip_list = [str(eip)]
+    
+    # 1. If explicit EIPs provided, use them
+    if eip_list:
+        return eip_list
+
+    # 2. If no EIPs, look up the fork in the spec repo
+    if not fork:
+        raise ValueError("Provide --eip or --fork")
+    if not resolved_spec_repo.exists():
+        # Print error to stderr so it doesn't pollute the JSON output on stdout (if captured blindly)
+        # But normally fire handles exceptions.
+        raise FileNotFoundError(f"Spec repo not found at {resolved_spec_repo}")
+
+    readme_path = resolved_spec_repo / "README.md"
+    if not readme_path.exists():
+        raise FileNotFoundError(f"Spec README not found at {readme_path}")
+
+    # Use the existing logic to parse the table
+    eip_fork_map = spec_index.build_eip_fork_map(readme_path, resolved_spec_repo)
+    
+    forks_data = eip_fork_map.get("forks", [])
+    # Case-insensitive lookup
+    target_fork_data = next((f for f in forks_data if f["fork"].lower() == fork.lower()), None)
+
+    if not target_fork_data:
+        available = [f["fork"] for f in forks_data]
+        raise ValueError(f"Fork '{fork}' not found in spec README. Available: {available}")
+
+    # Prefer the 'eips_fork_init' (actual python code) if available, 
+    # otherwise fallback to 'eips_readme' (table)
+    eips = target_fork_data.get("eips_fork_init")
+    if eips is None:
+        eips = target_fork_data.get("eips_readme")
+    
+    # Convert to strings
+    result = [str(e) for e in eips] if eips else []
+    return result
+
+
 class CLI:
     """LLM-powered verification of EIP obligations against execution-specs and client implementations."""
 
@@ -65,10 +503,12 @@ class CLI:
         output_dir: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
+        output_format: Optional[str] = None,
     ):
         """
         Extract obligations from EIP markdown.
@@ -79,25 +519,30 @@ class CLI:
             eip: EIP number (e.g., "1559").
             output_dir: Directory to save results.
             config: Path to a YAML config file (default: config.yaml in CWD).
-            model: LLM model to use.
-            max_turns: Maximum conversation turns.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum conversation turns, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of allowed tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
+        routing = _resolve_model_routing(model, cfg)
         run_phase_0a(
             eip_file=eip_file or cfg.get("eip_file"),
             spec_repo=spec_repo or cfg.get("spec_repo"),
             output_dir=output_dir or cfg.get("output_dir") or str(Path.cwd() / "runs" / timestamp()),
             eip_number=eip or cfg.get("eip") or cfg.get("eip_number"),
-            model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 1),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            model=routing.model_for("0A", model or cfg.get("model")),
+            max_turns=_resolve_max_turns(max_turns, cfg, 1),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            escalate_to=routing.escalate_to,
         )
 
     def locate_spec(
@@ -108,11 +553,17 @@ class CLI:
         fork: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
         obligation_id: Optional[str] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        project_inputs: Optional[Union[bool, int]] = None,
+        output_format: Optional[str] = None,
     ):
         """
         Find implementation locations in execution-specs.
@@ -123,27 +574,39 @@ class CLI:
             eip: EIP number.
             fork: Target fork name (e.g., "london").
             config: Path to a YAML config file.
-            model: LLM model to use.
-            max_turns: Maximum conversation turns.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum conversation turns, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
             obligation_id: Specific obligation ID to locate.
+            shard_size: Rows per shard, or "auto" for learned token budgets; runs shards concurrently instead of one prompt.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of relevant repo slices to inline into each prompt.
+            project_inputs: Agents read only the CSV columns a phase uses (a number also truncates cells).
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
+        routing = _resolve_model_routing(model, cfg)
         run_phase_1a(
             parent_run=Path(parent_run).resolve(),
             spec_repo=spec_repo or cfg.get("spec_repo"),
             eip_number=eip or cfg.get("eip") or cfg.get("eip_number"),
             fork=fork or cfg.get("fork"),
-            model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 1),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            model=routing.model_for("1A", model or cfg.get("model")),
+            max_turns=_resolve_max_turns(max_turns, cfg, 1),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
             obligation_id=obligation_id,
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache),
+            **_resolve_sharding(shard_size, concurrency, cfg),
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            project_inputs=_resolve_project_inputs(project_inputs, cfg),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            escalate_to=routing.escalate_to,
         )
 
     def analyze_spec(
@@ -153,11 +616,17 @@ class CLI:
         spec_repo: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
         obligation_id: Optional[str] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        project_inputs: Optional[Union[bool, int]] = None,
+        output_format: Optional[str] = None,
     ):
         """
         Analyze code flow and gaps in spec.
@@ -167,26 +636,38 @@ class CLI:
             eip: EIP number.
             spec_repo: Path to the execution-specs repository.
             config: Path to a YAML config file.
-            model: LLM model to use.
-            max_turns: Maximum conversation turns.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum conversation turns, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
             obligation_id: Specific obligation ID to analyze.
+            shard_size: Rows per shard, or "auto" for learned token budgets; runs shards concurrently instead of one prompt.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of relevant repo slices to inline into each prompt.
+            project_inputs: Agents read only the CSV columns a phase uses (a number also truncates cells).
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
+        routing = _resolve_model_routing(model, cfg)
         run_phase_1b(
             parent_run=Path(parent_run).resolve(),
             spec_repo=spec_repo or cfg.get("spec_repo"),
             eip_number=eip or cfg.get("eip") or cfg.get("eip_number"),
-            model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 1),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            model=routing.model_for("1B", model or cfg.get("model")),
+            max_turns=_resolve_max_turns(max_turns, cfg, 1),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
             obligation_id=obligation_id,
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache),
+            **_resolve_sharding(shard_size, concurrency, cfg),
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            project_inputs=_resolve_project_inputs(project_inputs, cfg),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            escalate_to=routing.escalate_to,
         )
 
     def locate_client(
@@ -196,11 +677,17 @@ class CLI:
         eip: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
         obligation_id: Optional[str] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        project_inputs: Optional[Union[bool, int]] = None,
+        output_format: Optional[str] = None,
     ):
         """
         Find implementation locations in client repo.
@@ -210,26 +697,38 @@ class CLI:
             client_repo: Path to the client repository (e.g., go-ethereum).
             eip: EIP number.
             config: Path to a YAML config file.
-            model: LLM model to use.
-            max_turns: Maximum conversation turns.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum conversation turns, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
             obligation_id: Specific obligation ID to locate.
+            shard_size: Rows per shard, or "auto" for learned token budgets; runs shards concurrently instead of one prompt.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of relevant repo slices to inline into each prompt.
+            project_inputs: Agents read only the CSV columns a phase uses (a number also truncates cells).
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
+        routing = _resolve_model_routing(model, cfg)
         run_phase_2a(
             parent_run=Path(parent_run).resolve(),
             client_repo=client_repo or cfg.get("client_repo"),
             eip_number=eip or cfg.get("eip") or cfg.get("eip_number"),
-            model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 1),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            model=routing.model_for("2A", model or cfg.get("model")),
+            max_turns=_resolve_max_turns(max_turns, cfg, 1),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
             obligation_id=obligation_id,
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache),
+            **_resolve_sharding(shard_size, concurrency, cfg),
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            project_inputs=_resolve_project_inputs(project_inputs, cfg),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            escalate_to=routing.escalate_to,
         )
 
     def analyze_client(
@@ -239,11 +738,17 @@ class CLI:
         eip: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
         obligation_id: Optional[str] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        project_inputs: Optional[Union[bool, int]] = None,
+        output_format: Optional[str] = None,
     ):
         """
         Analyze code flow and gaps in client.
@@ -253,26 +758,38 @@ class CLI:
             client_repo: Path to the client repository.
             eip: EIP number.
             config: Path to a YAML config file.
-            model: LLM model to use.
-            max_turns: Maximum conversation turns.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum conversation turns, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
             obligation_id: Specific obligation ID to analyze.
+            shard_size: Rows per shard, or "auto" for learned token budgets; runs shards concurrently instead of one prompt.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of relevant repo slices to inline into each prompt.
+            project_inputs: Agents read only the CSV columns a phase uses (a number also truncates cells).
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
+        routing = _resolve_model_routing(model, cfg)
         run_phase_2b(
             parent_run=Path(parent_run).resolve(),
             client_repo=client_repo or cfg.get("client_repo"),
             eip_number=eip or cfg.get("eip") or cfg.get("eip_number"),
-            model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 1),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            model=routing.model_for("2B", model or cfg.get("model")),
+            max_turns=_resolve_max_turns(max_turns, cfg, 1),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
             obligation_id=obligation_id,
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache),
+            **_resolve_sharding(shard_size, concurrency, cfg),
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            project_inputs=_resolve_project_inputs(project_inputs, cfg),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            escalate_to=routing.escalate_to,
         )
 
     def pipeline(
@@ -286,17 +803,31 @@ class CLI:
         output_dir: Optional[str] = None,
         config: Optional[str] = None,
         model: Optional[str] = None,
-        max_turns: Optional[int] = None,
+        max_turns: Optional[Union[int, str]] = None,
         allowed_tools: Optional[str] = None,
         llm_mode: Optional[str] = None,
         record_llm_calls: bool = False,
+        cache: Optional[str] = None,
         obligation_id: Optional[str] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        project_inputs: Optional[Union[bool, int]] = None,
+        output_format: Optional[str] = None,
+        resume: bool = False,
+        sessions: Optional[bool] = None,
+        eips_dir: Optional[str] = None,
+        max_parallel: Optional[int] = None,
     ):
         """
         Run multiple verification phases in sequence.
 
+        With several EIPs they run concurrently on one shared agent (a sweep),
+        each under <output_dir>/eip-<N>; in batch mode their tool-free calls
+        share batch jobs.
+
         Args:
-            eip: EIP number (e.g., "1559").
+            eip: EIP number (e.g., "1559"), or several comma-separated.
             phases: Comma-separated list of phases to run.
             spec_repo: Path to the execution-specs repository.
             client_repo: Path to the client repository.
@@ -304,30 +835,59 @@ class CLI:
             fork: Target fork name.
             output_dir: Directory to save results.
             config: Path to a YAML config file.
-            model: LLM model to use.
-            max_turns: Maximum turns per phase.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum turns per phase, or "auto" to learn them from past runs.
             allowed_tools: Comma-separated list of tools.
-            llm_mode: Agent mode ("live" or "fake").
+            llm_mode: Agent mode ("live", "fake", "replay" or "batch").
             record_llm_calls: Whether to record LLM interactions.
+            cache: Response cache mode ("read", "write" or "off").
             obligation_id: Specific obligation ID to verify.
+            shard_size: Rows per shard, or "auto" for learned token budgets; runs shards concurrently instead of one prompt.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of relevant repo slices to inline into each prompt.
+            project_inputs: Agents read only the CSV columns a phase uses (a number also truncates cells).
+            output_format: "csv" (agent writes the CSV) or "json" (agent replies with JSON rows).
+            resume: Continue the latest run, skipping completed phases and shards.
+            sessions: Reuse one Claude client session per (EIP, repo) across phases.
+            eips_dir: Directory holding eip-<N>.md files for a sweep's extract phase.
+            max_parallel: EIPs of a sweep running at once (default 10).
         """
         cfg = _resolve_config(config)
         llm_mode = _resolve_llm_mode(llm_mode, cfg)
-        run_pipeline(
-            eip=str(eip),
-            phases=phases.split(","),
+        eips = _split_values(eip)
+        if len(eips) > 1:
+            if eip_file:
+                raise ValueError("--eip-file applies to a single EIP")
+            if max_parallel is None:
+                value = _config_number(cfg, "max_parallel", "EIP_VERIFY_MAX_PARALLEL")
+                max_parallel = int(value) if value is not None else 10
+            runner, target = run_sweep, {
+                "eips": eips,
+                "eips_dir": eips_dir or cfg.get("eips_dir"),
+                "max_parallel": int(max_parallel),
+            }
+        else:
+            runner, target = run_pipeline, {"eip": eips[0], "eip_file": eip_file or cfg.get("eip_file")}
+        runner(
+            **target,
+            phases=_split_values(phases),
             spec_repo=spec_repo or cfg.get("spec_repo"),
             client_repo=client_repo or cfg.get("client_repo"),
-            eip_file=eip_file or cfg.get("eip_file"),
             fork=fork or cfg.get("fork"),
             output_dir=output_dir or cfg.get("output_dir"),
             model=model or cfg.get("model"),
-            max_turns=max_turns if max_turns is not None else cfg.get("max_turns", 20),
-            allowed_tools=allowed_tools.split(",") if allowed_tools else cfg.get("allowed_tools"),
+            max_turns=_resolve_max_turns(max_turns, cfg, 20),
+            allowed_tools=_resolve_allowed_tools(allowed_tools, cfg),
             llm_mode=llm_mode,
             record_llm_calls=_resolve_record_calls(record_llm_calls, cfg),
             obligation_id=obligation_id,
-            agent=_resolve_agent(llm_mode),
+            agent=_resolve_agent(llm_mode, cfg, cache, sessions),
+            **_resolve_sharding(shard_size, concurrency, cfg),
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            project_inputs=_resolve_project_inputs(project_inputs, cfg),
+            output_format=_resolve_output_format(output_format, cfg, llm_mode),
+            model_routing=_resolve_model_routing(model, cfg),
+            resume=resume,
         )
 
     def index_specs(
@@ -360,6 +920,136 @@ class CLI:
         fmt_list = [f.strip() for f in formats.split(",") if f.strip()]
         write_report(run_root=root, output_dir=output_dir, formats=fmt_list)
 
+    def trace_report(
+        self,
+        *run_roots: str,
+        output_dir: Optional[str] = None,
+        formats: str = "json,md",
+        top: int = 25,
+    ):
+        """
+        Rank the files, searches and commands agents explore most across runs.
+
+        Args:
+            run_roots: Run directories (or trace files) to scan for *.trace.jsonl (default: cwd).
+            output_dir: Where to write trace_report.json/md (default: first run root).
+            formats: Comma-separated output formats (json, md).
+            top: Number of entries per ranking.
+        """
+        roots = [Path(root).resolve() for root in run_roots] or [Path.cwd().resolve()]
+        fmt_list = [f.strip() for f in formats.split(",") if f.strip()]
+        report = write_trace_report(roots, output_dir, fmt_list, top=int(top))
+        print(
+            f"Traced {report['tool_calls']} tool calls in {report['sessions']} sessions; "
+            f"report written to {Path(output_dir).resolve() if output_dir else roots[0]}"
+        )
+
+    def estimate(
+        self,
+        eip: Optional[str] = None,
+        fork: Optional[str] = None,
+        spec_repo: Optional[str] = None,
+        phases: str = ",".join(PHASE_ORDER),
+        client_repo: Optional[str] = None,
+        eip_file: Optional[str] = None,
+        eips_dir: Optional[str] = None,
+        config: Optional[str] = None,
+        model: Optional[str] = None,
+        max_turns: Optional[Union[int, str]] = None,
+        shard_size: Optional[Union[int, str]] = None,
+        concurrency: Optional[int] = None,
+        context_budget: Optional[int] = None,
+        output_format: Optional[str] = None,
+        history: Optional[str] = None,
+        max_parallel: Optional[int] = None,
+        budget_usd: Optional[float] = None,
+        output_dir: Optional[str] = None,
+        formats: str = "json,md",
+    ):
+        """
+        Estimate tokens, cost and wall time of a run or batch before starting it.
+
+        Args:
+            eip: EIP number(s), comma-separated (default: every EIP of --fork).
+            fork: Fork whose EIPs to estimate when --eip is not given.
+            spec_repo: Path to the execution-specs repository.
+            phases: Comma-separated list of phases to estimate.
+            client_repo: Comma-separated client repo paths (or names) for the client phases.
+            eip_file: EIP markdown file (single EIP only).
+            eips_dir: Directory holding eip-<N>.md files (default: <spec_repo>/EIPs).
+            config: Path to a YAML config file.
+            model: LLM model for every phase (overrides per-phase `models` from config).
+            max_turns: Maximum turns per call.
+            shard_size: Rows per shard, or "auto" for learned token budgets.
+            concurrency: Maximum number of shards running at once.
+            context_budget: Tokens of repo slices inlined into each prompt.
+            output_format: "csv" or "json".
+            history: Comma-separated run dirs to learn per-phase profiles from (default: runs).
+            max_parallel: EIPs run at once in a batch (default 10, as in the batch workflow).
+            budget_usd: Fail when the estimated cost exceeds this budget.
+            output_dir: Write estimate.json/md here instead of printing the markdown.
+            formats: Comma-separated output formats (json, md).
+        """
+        from .estimate import (
+            EstimateHistory,
+            EstimateSettings,
+            build_estimate,
+            normalize_phases,
+            estimate_markdown,
+            write_estimate,
+        )
+        from .ratelimit import BudgetExceededError
+
+        cfg = _resolve_config(config)
+        spec_repo = spec_repo or cfg.get("spec_repo") or "."
+        eips = _resolve_eip_list(spec_repo, fork or cfg.get("fork"), eip or cfg.get("eip"))
+        if eip_file and len(eips) != 1:
+            raise ValueError("--eip-file applies to a single EIP")
+        eips_root = Path(eips_dir or cfg.get("eips_dir") or Path(spec_repo) / "EIPs")
+        eip_files = [
+            (number, Path(eip_file) if eip_file else eips_root / f"eip-{number}.md")
+            for number in eips
+        ]
+        clients = client_repo or cfg.get("client_repo")
+        sharding = _resolve_sharding(shard_size, concurrency, cfg)
+        if max_parallel is None:
+            value = _config_number(cfg, "max_parallel", "EIP_VERIFY_MAX_PARALLEL")
+            max_parallel = int(value) if value is not None else None
+        settings = EstimateSettings(
+            phases=normalize_phases(_split_values(phases)),
+            clients=tuple(_split_values(clients)),
+            model=model or cfg.get("model"),
+            models=_resolve_model_routing(model, cfg).models,
+            max_turns=_estimate_max_turns(max_turns, cfg),
+            **_estimate_sharding(sharding["shard_size"], phases),
+            concurrency=sharding["concurrency"],
+            context_budget=_resolve_context_budget(context_budget, cfg),
+            output_format=_resolve_output_format(output_format, cfg),
+            **({"max_parallel": int(max_parallel)} if max_parallel else {}),
+        )
+        history = history or cfg.get("estimate_history") or os.getenv("EIP_VERIFY_ESTIMATE_HISTORY")
+        roots = _split_values(history) or [str(DEFAULT_HISTORY)]
+        if budget_usd is None:
+            budget_usd = _config_number(cfg, "budget_usd", "EIP_VERIFY_BUDGET_USD")
+        estimate = build_estimate(
+            [(number, path if path.exists() else None) for number, path in eip_files],
+            settings,
+            EstimateHistory.load(Path(root) for root in roots),
+            budget_usd=budget_usd,
+        )
+        total = estimate["total"]
+        if output_dir:
+            write_estimate(estimate, Path(output_dir).resolve(), _split_values(formats))
+            print(
+                f"Estimated {len(eips)} EIPs: ${total['cost_usd']:.2f}, "
+                f"~{total['wall_time_s']:.0f}s wall time; written to {Path(output_dir).resolve()}"
+            )
+        else:
+            print(estimate_markdown(estimate))
+        if estimate["within_budget"] is False:
+            raise BudgetExceededError(
+                f"Estimated cost ${total['cost_usd']:.2f} exceeds budget ${budget_usd:.2f}"
+            )
 
     def get_matrix(
         self,
@@ -375,58 +1065,7 @@ class CLI:
             fork: Fork name (e.g. London).
             eip: Optional comma-separated list of EIPs.
         """
-        resolved_spec_repo = Path(spec_repo).resolve()
-        
-        # Determine strict eip list
-        eip_list = []
-        if eip is not None:
-            if isinstance(eip, (list, tuple)):
-                # Flatten valid items
-                for item in eip:
-                    if isinstance(item, str):
-                        eip_list.extend([x.strip() for x in item.split(",") if x.strip()])
-                    else:
-                        eip_list.append(str(item))
-            elif isinstance(eip, str):
-                eip_list = [e.strip() for e in eip.split(",") if e.strip()]
-            else:
-                eip_list = [str(eip)]
-        
-        # 1. If explicit EIPs provided, use them
-        if eip_list:
-            print(json.dumps(eip_list))
-            return
-
-        # 2. If no EIPs, look up the fork in the spec repo
-        if not resolved_spec_repo.exists():
-            # Print error to stderr so it doesn't pollute the JSON output on stdout (if captured blindly)
-            # But normally fire handles exceptions.
-            raise FileNotFoundError(f"Spec repo not found at {resolved_spec_repo}")
-
-        readme_path = resolved_spec_repo / "README.md"
-        if not readme_path.exists():
-            raise FileNotFoundError(f"Spec README not found at {readme_path}")
-
-        # Use the existing logic to parse the table
-        eip_fork_map = spec_index.build_eip_fork_map(readme_path, resolved_spec_repo)
-        
-        forks_data = eip_fork_map.get("forks", [])
-        # Case-insensitive lookup
-        target_fork_data = next((f for f in forks_data if f["fork"].lower() == fork.lower()), None)
-
-        if not target_fork_data:
-            available = [f["fork"] for f in forks_data]
-            raise ValueError(f"Fork '{fork}' not found in spec README. Available: {available}")
-
-        # Prefer the 'eips_fork_init' (actual python code) if available, 
-        # otherwise fallback to 'eips_readme' (table)
-        eips = target_fork_data.get("eips_fork_init")
-        if eips is None:
-            eips = target_fork_data.get("eips_readme")
-        
-        # Convert to strings
-        result = [str(e) for e in eips] if eips else []
-        print(json.dumps(result))
+        print(json.dumps(_resolve_eip_list(spec_repo, fork, eip)))
 
 
 def main():
@@ -0,0 +1,321 @@
+"""In-process code-intelligence tools (an SDK MCP server) for agent calls.
+
+Generic ``Grep``/``Glob``/``Bash`` exploration spawns a process per step and
+returns unranked text. These tools answer from indexes of the call's cwd
+repo built once per process: symbol definitions, a word index, and raise
+sites, each line tagged with its enclosing definition.
+"""
+
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import anyio
+
+from .context_pack import ContextIndex
+
+
+CODE_SERVER = "code"
+CODE_TOOLS = ("find_symbol", "read_range", "find_callers", "find_raises", "grep_indexed")
+CODE_TOOL_NAMES = [f"mcp__{CODE_SERVER}__{name}" for name in CODE_TOOLS]
+MAX_RESULTS = 50
+MAX_RANGE_LINES = 200
+MAX_LINE_CHARS = 200
+
+SYMBOL_RE = re.compile(
+    r"^\s*(?:(?:pub(?:\([^)]*\))?|export|async|static|public|private|protected|final)\s+)*"
+    r"(?P<kind>def|class|func|fn|type|struct|enum|interface|trait|const|var|let)\s+"
+    r"(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_]\w*)"
+)
+CONSTANT_RE = re.compile(r"^(?P<name>[A-Z][A-Z0-9_]{2,})\s*(?::[^=]*)?=(?!=)")
+RAISE_RE = re.compile(
+    r"\braise\s+(?P<py>[A-Za-z_][\w.]*)"
+    r"|\b(?P<go>errors\.New|fmt\.Errorf)\("
+    r"|\bErr\((?P<rs>[A-Za-z_][\w:]*)"
+    r"|\bthrow\s+new\s+(?P<java>[A-Za-z_]\w*)"
+)
+WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Definitions that own the lines below them (constants do not).
+SCOPE_KINDS = {"def", "class", "func", "fn", "struct", "enum", "interface", "trait", "type"}
+
+
+@dataclass(frozen=True)
+class Symbol:
+    name: str
+    kind: str
+    path: str
+    line: int
+
+
+@dataclass(frozen=True)
+class RaiseSite:
+    error: str
+    path: str
+    line: int
+
+
+class CodeIndex:
+    """Symbol, word and raise-site indexes of one repo, built on first use."""
+
+    def __init__(self, root: Path) -> None:
+        self.files = ContextIndex(root)
+        self.root = self.files.root
+        self.symbols: dict[str, list[Symbol]] = {}
+        self.scopes: dict[str, list[Symbol]] = {}
+        self.words: dict[str, list[tuple[str, int]]] = {}
+        self.raises: list[RaiseSite] = []
+        self.definitions: set[tuple[str, int]] = set()
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self) -> "CodeIndex":
+        with self._lock:
+            if self._built:
+                return self
+            for rel in self.files.files:
+                for number, line in enumerate(self.files.lines(rel), start=1):
+                    self._index_line(rel, number, line)
+            for scopes in self.scopes.values():
+                scopes.sort(key=lambda symbol: symbol.line)
+            self._built = True
+        return self
+
+    def _index_line(self, rel: str, number: int, line: str) -> None:
+        match = SYMBOL_RE.match(line) or CONSTANT_RE.match(line)
+        if match:
+            kind = match.groupdict().get("kind") or "const"
+            symbol = Symbol(match.group("name"), kind, rel, number)
+            self.symbols.setdefault(symbol.name, []).append(symbol)
+            self.definitions.add((rel, number))
+            if kind in SCOPE_KINDS:
+                self.scopes.setdefault(rel, []).append(symbol)
+        for word in set(WORD_RE.findall(line)):
+            self.words.setdefault(word, []).append((rel, number))
+        raised = RAISE_RE.search(line)
+        if raised:
+            error = next(group for group in raised.groups() if group)
+            self.raises.append(RaiseSite(error, rel, number))
+
+    def enclosing(self, rel: str, line: int) -> Optional[Symbol]:
+        scopes = self.scopes.get(rel) or []
+        position = bisect.bisect_right([symbol.line for symbol in scopes], line) - 1
+        return scopes[position] if position >= 0 else None
+
+    def text(self, rel: str, line: int) -> str:
+        lines = self.files.lines(rel)
+        text = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+        return text if len(text) <= MAX_LINE_CHARS else text[:MAX_LINE_CHARS] + "..."
+
+    def format_hit(self, rel: str, line: int) -> str:
+        scope = self.enclosing(rel, line)
+        where = f" [{scope.name}]" if scope and scope.line != line else ""
+        return f"{rel}:{line}{where}: {self.text(rel, line)}"
+
+    def _path_filter(self, path: Optional[str]) -> Callable[[str], bool]:
+        if not path:
+            return lambda rel: True
+        if any(char in path for char in "*?["):
+            return lambda rel: fnmatch.fnmatch(rel, path)
+        return lambda rel: path in rel
+
+    def find_symbol(self, name: str, kind: Optional[str] = None, limit: int = MAX_RESULTS) -> str:
+        """Definitions of ``name`` (the last part of ``a.b``), or names containing it."""
+        self.build()
+        name = name.strip().split(".")[-1]
+        found = list(self.symbols.get(name, []))
+        if not found:
+            needle = name.lower()
+            found = [
+                symbol
+                for key in sorted(self.symbols)
+                if needle in key.lower()
+                for symbol in self.symbols[key]
+            ]
+        if kind:
+            found = [symbol for symbol in found if symbol.kind == kind]
+        found.sort(key=lambda symbol: (_is_test(symbol.path), symbol.name != name, symbol.path))
+        return _render(
+            (f"{symbol.path}:{symbol.line}: {self.text(symbol.path, symbol.line)}" for symbol in found),
+            limit,
+            f"No definition of {name}",
+        )
+
+    def read_range(
+        self, path: str, start: Optional[int] = 1, end: Optional[int] = None
+    ) -> str:
+        """Numbered lines ``start``..``end`` of a file (at most MAX_RANGE_LINES)."""
+        rel = self.files.resolve(path)
+        if rel is None:
+            return f"No file matching {path}"
+        lines = self.files.lines(rel)
+        start = max(1, int(start or 1))
+        end = min(len(lines), int(end) if end else start + MAX_RANGE_LINES - 1)
+        end = min(end, start + MAX_RANGE_LINES - 1)
+        body = "\n".join(f"{number:>6}  {lines[number - 1]}" for number in range(start, end + 1))
+        return f"{rel}:L{start}-L{end} of {len(lines)}\n{body}"
+
+    def find_callers(self, name: str, limit: int = MAX_RESULTS) -> str:
+        """Lines calling ``name(...)``, with the definition each call sits in."""
+        self.build()
+        name = name.strip().split(".")[-1]
+        call = re.compile(rf"(?<![\w]){re.escape(name)}\s*\(")
+        definitions = {(symbol.path, symbol.line) for symbol in self.symbols.get(name, [])}
+        hits = [
+            (rel, line)
+            for rel, line in self.words.get(name, [])
+            if (rel, line) not in definitions and call.search(self.files.lines(rel)[line - 1])
+        ]
+        hits.sort(key=lambda hit: (_is_test(hit[0]), hit))
+        return _render(
+            (self.format_hit(rel, line) for rel, line in hits), limit, f"No calls to {name}"
+        )
+
+    def find_raises(
+        self, query: Optional[str] = None, path: Optional[str] = None, limit: int = MAX_RESULTS
+    ) -> str:
+        """Raise/error sites whose error, enclosing function or line mentions ``query``."""
+        self.build()
+        in_path = self._path_filter(path)
+        needle = (query or "").strip().lower()
+        hits = []
+        for site in self.raises:
+            if not in_path(site.path):
+                continue
+            if needle:
+                scope = self.enclosing(site.path, site.line)
+                haystack = " ".join(
+                    [site.error, scope.name if scope else "", self.text(site.path, site.line)]
+                ).lower()
+                if needle not in haystack:
+                    continue
+            hits.append(site)
+        hits.sort(key=lambda site: (_is_test(site.path), site.path, site.line))
+        return _render(
+            (f"{self.format_hit(site.path, site.line)}  <{site.error}>" for site in hits),
+            limit,
+            "No raise sites found",
+        )
+
+    def grep_indexed(self, pattern: str, path: Optional[str] = None, limit: int = MAX_RESULTS) -> str:
+        """Regex search over the cached files; definitions first, tests last.
+
+        A plain identifier is answered from the word index.
+        """
+        self.build()
+        in_path = self._path_filter(path)
+        if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", pattern):
+            candidates = [hit for hit in self.words.get(pattern, []) if in_path(hit[0])]
+        else:
+            try:
+                regex = re.compile(pattern)
+            except re.error as exc:
+                return f"Invalid pattern: {exc}"
+            candidates = [
+                (rel, number)
+                for rel in self.files.files
+                if in_path(rel)
+                for number, line in enumerate(self.files.lines(rel), start=1)
+                if regex.search(line)
+            ]
+        candidates.sort(key=lambda hit: (hit not in self.definitions, _is_test(hit[0]), hit))
+        return _render(
+            (self.format_hit(rel, line) for rel, line in candidates),
+            limit,
+            f"No matches for {pattern}",
+        )
+
+
+def _is_test(rel: str) -> bool:
+    return "test" in rel.lower()
+
+
+def _render(lines: Iterable[str], limit: int, empty: str) -> str:
+    items = list(lines)
+    if not items:
+        return empty
+    shown = items[: max(1, limit)]
+    if len(items) > len(shown):
+        shown.append(f"... {len(items) - len(shown)} more; narrow the query or pass a path")
+    return "\n".join(shown)
+
+
+_INDEXES: dict[Path, CodeIndex] = {}
+
+
+def code_index(root: Path) -> CodeIndex:
+    """The shared (lazily built) index of ``root``."""
+    key = root.resolve()
+    if key not in _INDEXES:
+        _INDEXES[key] = CodeIndex(key)
+    return _INDEXES[key]
+
+
+def uses_code_tools(allowed_tools: Iterable[str]) -> bool:
+    return any(name in CODE_TOOL_NAMES for name in allowed_tools)
+
+
+def _schema(properties: dict[str, dict[str, Any]], required: list[str]) -> dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": required}
+
+
+STRING = {"type": "string"}
+INTEGER = {"type": "integer"}
+SYMBOL_KIND = {"type": "string", "description": "def, class, func, fn, struct, const, ..."}
+PATH_FILTER = {"type": "string", "description": "Substring or glob the file path must match"}
+
+
+def build_code_tools(root: Path) -> list[Any]:
+    """The SDK tool definitions backed by the shared index of ``root``."""
+    from claude_agent_sdk import tool
+
+    index = code_index(root)
+
+    def handler(method: Callable[..., str], *names: str):
+        async def call(args: dict[str, Any]) -> dict[str, Any]:
+            # Arguments left out (or sent as null) keep the method's defaults.
+            values = {name: args[name] for name in names if args.get(name) is not None}
+            text = await anyio.to_thread.run_sync(lambda: method(**values))
+            return {"content": [{"type": "text", "text": text}]}
+
+        return call
+
+    return [
+        tool(
+            "find_symbol",
+            "Find where a function, class, type or constant is defined (path:line and signature).",
+            _schema({"name": STRING, "kind": SYMBOL_KIND}, ["name"]),
+        )(handler(index.find_symbol, "name", "kind")),
+        tool(
+            "read_range",
+            "Read numbered lines of a file (path may be a suffix such as vm/gas.py); at most 200 lines.",
+            _schema({"path": STRING, "start": INTEGER, "end": INTEGER}, ["path"]),
+        )(handler(index.read_range, "path", "start", "end")),
+        tool(
+            "find_callers",
+            "Find call sites of a function, each with the function it is called from.",
+            _schema({"name": STRING}, ["name"]),
+        )(handler(index.find_callers, "name")),
+        tool(
+            "find_raises",
+            "Find raise/error sites, filtered by error name, enclosing function or text.",
+            _schema({"query": STRING, "path": PATH_FILTER}, []),
+        )(handler(index.find_raises, "query", "path")),
+        tool(
+            "grep_indexed",
+            "Search the repo with a regex (or identifier); definitions first, tests last.",
+            _schema({"pattern": STRING, "path": PATH_FILTER}, ["pattern"]),
+        )(handler(index.grep_indexed, "pattern", "path")),
+    ]
+
+
+def code_tool_server(root: Path) -> Any:
+    """An in-process MCP server exposing the code tools for ``root``."""
+    from claude_agent_sdk import create_sdk_mcp_server
+
+    return create_sdk_mcp_server(CODE_SERVER, tools=build_code_tools(root))
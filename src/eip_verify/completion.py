@@ -0,0 +1,99 @@
+"""Early-stop detection: end an agent session once its output CSV is done."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from .structured_output import PHASE_REQUIRED_COLUMNS, read_csv_rows, validate_phase_output
+
+
+DEFAULT_STABLE_CHECKS = 1
+INTERRUPT_TIMEOUT_S = 60.0
+
+
+class CompletionWatcher:
+    """Watches a call's ``output_csv`` while the agent session runs.
+
+    ``check`` is called after every tool result. The output is complete once
+    every ``input_csv`` row is present with a required column filled (for
+    phase 0A, which has no input CSV: every row). It is stable once it stayed
+    byte-identical for ``stable_checks`` further tool results, e.g. the
+    "re-open the CSV and confirm" read the prompts end with. An output that
+    still matches the CSV seeded before the call (the input copy) is never
+    complete, whatever columns that copy already fills.
+    """
+
+    def __init__(
+        self,
+        phase: str,
+        output_csv: Path,
+        input_csv: Optional[Path] = None,
+        stable_checks: int = DEFAULT_STABLE_CHECKS,
+    ) -> None:
+        self.phase = phase
+        self.output_csv = output_csv
+        self.input_csv = input_csv
+        self.stable_checks = stable_checks
+        self.checks = 0
+        self._row_ids: Optional[list[str]] = None
+        self._digest: Optional[str] = None
+        self._streak = 0
+        self._seed_digest = self._read_digest()
+
+    @classmethod
+    def for_call(
+        cls, metadata: dict[str, object], stable_checks: int = DEFAULT_STABLE_CHECKS
+    ) -> Optional["CompletionWatcher"]:
+        """A watcher for a CSV-writing phase call, or None when there is no CSV to watch."""
+        phase = str(metadata.get("phase") or "")
+        if phase not in PHASE_REQUIRED_COLUMNS or not metadata.get("output_csv"):
+            return None
+        if metadata.get("output_format") == "json":
+            return None
+        input_csv = metadata.get("input_csv")
+        return cls(
+            phase,
+            Path(str(metadata["output_csv"])),
+            Path(str(input_csv)) if input_csv else None,
+            stable_checks,
+        )
+
+    def row_ids(self) -> Optional[list[str]]:
+        if self._row_ids is None and self.input_csv is not None and self.input_csv.is_file():
+            _, rows = read_csv_rows(self.input_csv)
+            self._row_ids = [(row.get("id") or "").strip() for row in rows]
+        return self._row_ids
+
+    def problems(self) -> list[str]:
+        if self.input_csv is not None and self.row_ids() is None:
+            return [f"{self.input_csv.name} is missing"]
+        return validate_phase_output(self.phase, self.output_csv, self.row_ids(), self.input_csv)
+
+    def _read_digest(self) -> Optional[str]:
+        try:
+            return hashlib.sha256(self.output_csv.read_bytes()).hexdigest()
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """True once the output is complete and unchanged for ``stable_checks`` checks."""
+        self.checks += 1
+        digest = self._read_digest()
+        if digest is None or digest == self._seed_digest:
+            self._digest = digest
+            self._streak = 0
+            return False
+        if digest != self._digest:
+            self._digest = digest
+            self._streak = 0
+            return False
+        self._streak += 1
+        if self._streak < self.stable_checks:
+            return False
+        try:
+            return not self.problems()
+        except (OSError, csv.Error):
+            return False
@@ -0,0 +1,371 @@
+"""Deterministic pre-flight context packing for phase prompts.
+
+Before a call, the obligation rows it covers are mined for the EIP number,
+constants, identifiers and ``path:symbol`` / ``path:Lx-Ly`` location refs.
+Matching file slices from the repo are ranked and inlined into the prompt
+under a token budget, so the agent starts with the code it would otherwise
+spend turns finding with Glob/Grep/Read.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+ROW_FIELDS = ("statement", "locations", "code_flow", "client_locations")
+SOURCE_SUFFIXES = {
+    ".py", ".go", ".rs", ".java", ".kt", ".ts", ".js", ".cs", ".nim", ".zig",
+    ".c", ".h", ".cc", ".cpp", ".hpp", ".sol",
+}
+SKIP_DIRS = {
+    ".git", ".hg", ".venv", "venv", "node_modules", "vendor", "third_party",
+    "build", "dist", "target", "__pycache__", ".tox", ".mypy_cache",
+}
+MAX_FILE_BYTES = 512 * 1024
+MAX_TERMS = 60
+CONTEXT_LINES = 12
+DEFINITION_LINES = 40
+MAX_SLICES_PER_FILE = 3
+CHARS_PER_TOKEN = 4
+LOCATION_SCORE = 100.0
+
+DEFINITION_RE = (
+    r"^\s*(?:(?:pub(?:\([^)]*\))?|export|async|static|public|private|protected|final)\s+)*"
+    r"(?:def|class|func|fn|type|struct|enum|interface|trait|const|var|let)\s+"
+    r"(?:\([^)]*\)\s*)?{name}\b"
+)
+ASSIGNMENT_RE = r"^\s*{name}\s*(?::[^=]*)?=(?!=)"
+IDENTIFIER_RE = re.compile(r"`([^`\s]+)`|\b([A-Za-z_][A-Za-z0-9_]*)\b")
+LOCATION_RE = re.compile(
+    r"(?P<path>[\w./-]+\.(?P<ext>[A-Za-z]{1,4}))"
+    r"(?::L?(?P<start>\d+)(?:-L?(?P<end>\d+))?)?"
+    r"(?::(?P<symbol>[A-Za-z_][\w.]*))?"
+)
+
+
+@dataclass(frozen=True)
+class LocationRef:
+    path: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+    symbol: Optional[str] = None
+
+
+@dataclass
+class ContextQuery:
+    """Search terms mined from obligation rows."""
+
+    terms: list[str] = field(default_factory=list)
+    locations: list[LocationRef] = field(default_factory=list)
+
+
+@dataclass
+class ContextSlice:
+    path: str
+    start: int
+    end: int
+    score: float
+    terms: set[str] = field(default_factory=set)
+    text: str = ""
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _is_interesting(name: str) -> bool:
+    """Keep code-looking names: snake_case, CamelCase or UPPER_SNAKE."""
+    if len(name) < 4 or name.isdigit():
+        return False
+    if "_" in name.strip("_"):
+        return True
+    # CamelCase / camelCase: an upper-case letter after the first character.
+    return any(char.isupper() for char in name[1:]) and any(char.islower() for char in name)
+
+
+def _camel_variants(name: str) -> list[str]:
+    parts = [part for part in name.split("_") if part]
+    if len(parts) < 2 or not name.islower():
+        return []
+    lower = parts[0] + "".join(part.capitalize() for part in parts[1:])
+    return [lower, lower[0].upper() + lower[1:]]
+
+
+def eip_terms(eip_number: Optional[str]) -> list[str]:
+    if not eip_number:
+        return []
+    return [f"EIP-{eip_number}", f"EIP{eip_number}", f"eip{eip_number}", f"eip_{eip_number}"]
+
+
+def parse_locations(text: str) -> list[LocationRef]:
+    refs = []
+    for match in LOCATION_RE.finditer(text or ""):
+        if match.group("ext").lower() in {"md", "txt", "csv", "json"}:
+            continue
+        start = int(match.group("start")) if match.group("start") else None
+        end = int(match.group("end")) if match.group("end") else start
+        refs.append(LocationRef(match.group("path"), start, end, match.group("symbol")))
+    return refs
+
+
+def extract_query(rows: Iterable[dict[str, str]], eip_number: Optional[str]) -> ContextQuery:
+    """Collect location refs and identifiers from the rows, most frequent first."""
+    counts: dict[str, int] = {}
+    locations: list[LocationRef] = []
+
+    def add(name: str, weight: int = 1) -> None:
+        name = name.strip("()`.,:;")
+        if _is_interesting(name):
+            counts[name] = counts.get(name, 0) + weight
+            for variant in _camel_variants(name):
+                counts.setdefault(variant, 0)
+
+    for row in rows:
+        for column in ROW_FIELDS:
+            text = row.get(column) or ""
+            for ref in parse_locations(text):
+                if ref not in locations:
+                    locations.append(ref)
+                for part in (ref.symbol or "").split("."):
+                    add(part, weight=2)
+            for match in IDENTIFIER_RE.finditer(text):
+                if match.group(1):
+                    for part in re.split(r"[.()]", match.group(1)):
+                        add(part, weight=2)
+                else:
+                    add(match.group(2))
+
+    ranked = sorted(counts, key=lambda name: (-counts[name], name))
+    return ContextQuery(terms=eip_terms(eip_number) + ranked[:MAX_TERMS], locations=locations)
+
+
+class ContextIndex:
+    """Source files of one repo root, searched for context slices.
+
+    The file list is built once and shared by every call of a phase.
+    Searches use ``git grep`` inside a git work tree and a Python scan
+    otherwise.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.resolve()
+        self._files: Optional[list[str]] = None
+        self._lines: dict[str, list[str]] = {}
+        self.use_git = (self.root / ".git").exists()
+
+    @property
+    def files(self) -> list[str]:
+        if self._files is None:
+            files = []
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = sorted(name for name in dirnames if name not in SKIP_DIRS)
+                for name in sorted(filenames):
+                    path = Path(dirpath) / name
+                    if path.suffix not in SOURCE_SUFFIXES:
+                        continue
+                    try:
+                        if path.stat().st_size > MAX_FILE_BYTES:
+                            continue
+                    except OSError:
+                        continue
+                    files.append(path.relative_to(self.root).as_posix())
+            self._files = files
+        return self._files
+
+    def lines(self, rel: str) -> list[str]:
+        if rel not in self._lines:
+            try:
+                text = (self.root / rel).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                text = ""
+            self._lines[rel] = text.splitlines()
+        return self._lines[rel]
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Map a location path (possibly relative to a sub-package) to a file."""
+        path = path.removeprefix("./")
+        if (self.root / path).is_file():
+            return path
+        suffix = "/" + path
+        matches = [rel for rel in self.files if rel.endswith(suffix)]
+        return min(matches, key=len) if matches else None
+
+    def search(self, terms: list[str]) -> dict[str, list[tuple[int, set[str]]]]:
+        """Return ``{file: [(line_number, matched_terms)]}`` for whole-word hits."""
+        if not terms:
+            return {}
+        pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b")
+        hits = self._git_grep(terms, pattern) if self.use_git else None
+        if hits is None:
+            hits = self._scan(pattern)
+        return hits
+
+    def _git_grep(
+        self, terms: list[str], pattern: re.Pattern[str]
+    ) -> Optional[dict[str, list[tuple[int, set[str]]]]]:
+        args = ["git", "-C", str(self.root), "grep", "-n", "-I", "-w", "-F", "-z"]
+        for term in terms:
+            args += ["-e", term]
+        args += ["--", *[f"*{suffix}" for suffix in sorted(SOURCE_SUFFIXES)]]
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, errors="replace")
+        except OSError:
+            return None
+        if result.returncode not in (0, 1):
+            return None
+        allowed = set(self.files)
+        hits: dict[str, list[tuple[int, set[str]]]] = {}
+        for line in result.stdout.splitlines():
+            parts = line.split("\0", 2)
+            if len(parts) != 3 or parts[0] not in allowed:
+                continue
+            found = set(pattern.findall(parts[2]))
+            if found:
+                hits.setdefault(parts[0], []).append((int(parts[1]), found))
+        return hits
+
+    def _scan(self, pattern: re.Pattern[str]) -> dict[str, list[tuple[int, set[str]]]]:
+        hits: dict[str, list[tuple[int, set[str]]]] = {}
+        for rel in self.files:
+            try:
+                text = (self.root / rel).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            if not pattern.search(text):
+                continue
+            for number, line in enumerate(text.splitlines(), start=1):
+                found = set(pattern.findall(line))
+                if found:
+                    hits.setdefault(rel, []).append((number, found))
+        return hits
+
+    def definition_line(self, rel: str, name: str) -> Optional[int]:
+        definition = re.compile(DEFINITION_RE.format(name=re.escape(name)))
+        assignment = re.compile(ASSIGNMENT_RE.format(name=re.escape(name)))
+        lines = self.lines(rel)
+        for regex in (definition, assignment):
+            for number, line in enumerate(lines, start=1):
+                if regex.search(line):
+                    return number
+        return None
+
+
+def _location_slices(index: ContextIndex, query: ContextQuery) -> list[ContextSlice]:
+    slices = []
+    for rank, ref in enumerate(query.locations):
+        rel = index.resolve(ref.path)
+        if rel is None:
+            continue
+        score = LOCATION_SCORE - rank * 0.01
+        start = end = None
+        if ref.start:
+            start, end = ref.start - 2, (ref.end or ref.start) + 2
+        elif ref.symbol:
+            line = index.definition_line(rel, ref.symbol.split(".")[-1])
+            if line is None and "." in ref.symbol:
+                line = index.definition_line(rel, ref.symbol.split(".")[0])
+            if line is not None:
+                start, end = line - 2, line + DEFINITION_LINES
+        if start is not None:
+            slices.append(ContextSlice(rel, max(1, start), end, score))
+    return slices
+
+
+def _search_slices(index: ContextIndex, query: ContextQuery) -> list[ContextSlice]:
+    slices = []
+    for rel, file_hits in index.search(query.terms).items():
+        numbers = [number for number, _ in file_hits]
+        candidates = []
+        for number, found in file_hits:
+            low = bisect.bisect_left(numbers, number - CONTEXT_LINES)
+            high = bisect.bisect_right(numbers, number + CONTEXT_LINES)
+            window_terms = set().union(*(terms for _, terms in file_hits[low:high]))
+            score = float(len(window_terms))
+            line_text = index.lines(rel)[number - 1] if number <= len(index.lines(rel)) else ""
+            if any(
+                re.search(DEFINITION_RE.format(name=re.escape(term)), line_text)
+                for term in found
+            ):
+                score += 3
+            if "test" in rel.lower():
+                score /= 2
+            candidates.append(
+                ContextSlice(
+                    rel,
+                    max(1, number - CONTEXT_LINES),
+                    number + CONTEXT_LINES,
+                    score,
+                    window_terms,
+                )
+            )
+        candidates.sort(key=lambda item: (-item.score, item.start))
+        slices.extend(_dedupe(candidates)[:MAX_SLICES_PER_FILE])
+    return slices
+
+
+def _overlaps(left: ContextSlice, right: ContextSlice) -> bool:
+    return left.path == right.path and left.start <= right.end and right.start <= left.end
+
+
+def _dedupe(slices: list[ContextSlice]) -> list[ContextSlice]:
+    """Drop slices overlapping an earlier (higher-ranked) one."""
+    kept: list[ContextSlice] = []
+    for item in slices:
+        if not any(_overlaps(item, other) for other in kept):
+            kept.append(item)
+    return kept
+
+
+def build_context_pack(
+    index: ContextIndex,
+    rows: Iterable[dict[str, str]],
+    eip_number: Optional[str],
+    budget_tokens: int,
+) -> list[ContextSlice]:
+    """Pick the best-ranked file slices for the rows within ``budget_tokens``."""
+    query = extract_query(rows, eip_number)
+    ranked = sorted(
+        _location_slices(index, query) + _search_slices(index, query),
+        key=lambda item: (-item.score, item.path, item.start),
+    )
+    chosen: list[ContextSlice] = []
+    used = 0
+    for item in ranked:
+        if any(_overlaps(item, kept) for kept in chosen):
+            continue
+        lines = index.lines(item.path)
+        item.end = min(item.end, len(lines))
+        if item.start > item.end:
+            continue
+        item.text = "\n".join(lines[item.start - 1 : item.end])
+        if used + item.tokens > budget_tokens:
+            continue
+        chosen.append(item)
+        used += item.tokens
+    return sorted(chosen, key=lambda item: (item.path, item.start))
+
+
+def render_context_pack(slices: list[ContextSlice], root: Path) -> str:
+    if not slices:
+        return ""
+    lines = [
+        "",
+        "",
+        "## Pre-loaded context",
+        "",
+        f"Excerpts below were selected from {root} for the rows in this task.",
+        "Use them before searching; read further only when they are not enough.",
+    ]
+    for item in slices:
+        lines += ["", f"### {item.path}:L{item.start}-L{item.end}", "```", item.text, "```"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,466 @@
+"""Pre-flight token, cost and wall-time estimates for pipeline and batch runs.
+
+Estimates combine what is known before a run (rendered prompt sizes, EIP
+markdown and CSV sizes, sharding) with per-phase profiles fitted from the
+``run_manifest.json`` telemetry of recorded runs: turns per call, billed
+input tokens per prompt token and turn, output tokens per obligation, seconds
+per turn and cost per token. Phases without history use conservative
+defaults, and every estimate says which basis it used.
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from .context_pack import estimate_tokens
+from .prompts import load_prompt
+from .routing import PHASE_ALIASES, PHASE_IDS
+from .run_history import RecordedRun, load_runs
+from .utils import ensure_dir, timestamp
+
+
+DEFAULT_MAX_PARALLEL = 10
+DEFAULT_EIP_TOKENS = 8_000
+
+PHASE_PROMPTS = {
+    "0A": "phase0A_obligations",
+    "1A": "phase1A_locations",
+    "1B": "phase1B_codeflow",
+    "2A": "phase2A_client_locations",
+    "2B": "phase2B_client_gaps",
+}
+# The phase whose output CSV a phase reads.
+PHASE_INPUTS = {"1A": "0A", "1B": "1A", "2A": "1B", "2B": "2A"}
+CLIENT_PHASES = {"2A", "2B"}
+
+# CSV tokens per obligation row after each phase, when no history has them.
+DEFAULT_CSV_TOKENS_PER_ROW = {"0A": 40, "1A": 70, "1B": 180, "2A": 260, "2B": 350}
+
+
+@dataclass(frozen=True)
+class PhaseProfile:
+    """Per-call behaviour of one phase; defaults apply without history."""
+
+    runs: int = 0
+    turns_per_call: float = 10.0
+    input_per_seed_turn: float = 4.0
+    output_per_row: float = 300.0
+    seconds_per_turn: float = 10.0
+    usd_per_token: float = 1.5e-6
+    rows_per_eip_ktoken: float = 3.0
+    csv_tokens_per_row: Optional[float] = None
+
+    @property
+    def basis(self) -> str:
+        return f"history ({self.runs} runs)" if self.runs else "default"
+
+
+@dataclass
+class _Sample:
+    calls: int = 0
+    turns: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    wall_time_s: float = 0.0
+    seed_turns: float = 0.0
+    rows: int = 0
+    eip_tokens: int = 0
+    csv_tokens: int = 0
+    runs: int = 0
+
+    def add(self, other: "_Sample") -> None:
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+def _file_tokens(path: Optional[Path]) -> int:
+    if path is None or not path.is_file():
+        return 0
+    return estimate_tokens(path.read_text(encoding="utf-8", errors="replace"))
+
+
+def _count_rows(path: Optional[Path]) -> int:
+    if path is None or not path.is_file():
+        return 0
+    with path.open(encoding="utf-8", newline="") as handle:
+        return sum(1 for _ in csv.DictReader(handle))
+
+
+def _run_sample(run: RecordedRun) -> Optional[_Sample]:
+    """Phase totals of a recorded run; runs with batched calls say nothing about turns."""
+    if not run.calls or any(call.turns is None for call in run.calls):
+        return None
+    manifest, run_dir, phase = run.manifest, run.run_dir, run.phase
+    telemetry = manifest.get("telemetry")
+    if not isinstance(telemetry, dict) or not telemetry.get("num_turns"):
+        return None
+    calls = int(telemetry["calls"])
+    turns = int(telemetry["num_turns"])
+    prompts = [
+        *run_dir.glob(f"phase{phase}_prompt.txt"),
+        *run_dir.glob(f"shards/*/phase{phase}_prompt.txt"),
+    ]
+    prompt_tokens = sum(_file_tokens(path) for path in prompts)
+    output_csv = Path(manifest["output_csv"]) if manifest.get("output_csv") else None
+    rows = _count_rows(output_csv)
+    if phase == "0A":
+        eip_tokens = _file_tokens(Path(manifest["eip_file"])) if manifest.get("eip_file") else 0
+        doc_tokens = eip_tokens
+    else:
+        eip_tokens = 0
+        doc_tokens = _file_tokens(Path(manifest["input_csv"])) if manifest.get("input_csv") else 0
+    seed = prompt_tokens + doc_tokens
+    return _Sample(
+        calls=calls,
+        turns=turns,
+        input_tokens=sum(
+            int(telemetry.get(key) or 0)
+            for key in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        ),
+        output_tokens=int(telemetry.get("output_tokens") or 0),
+        cost_usd=float(telemetry.get("total_cost_usd") or 0.0),
+        wall_time_s=float(telemetry.get("wall_time_s") or 0.0),
+        seed_turns=seed * turns / calls,
+        rows=rows,
+        eip_tokens=eip_tokens if rows else 0,
+        csv_tokens=_file_tokens(output_csv) if rows else 0,
+        runs=1,
+    )
+
+
+def _fit(sample: _Sample) -> PhaseProfile:
+    default = PhaseProfile()
+    tokens = sample.input_tokens + sample.output_tokens
+    return PhaseProfile(
+        runs=sample.runs,
+        turns_per_call=sample.turns / sample.calls,
+        input_per_seed_turn=(
+            sample.input_tokens / sample.seed_turns
+            if sample.seed_turns
+            else default.input_per_seed_turn
+        ),
+        output_per_row=(
+            sample.output_tokens / sample.rows if sample.rows else default.output_per_row
+        ),
+        seconds_per_turn=(
+            sample.wall_time_s / sample.turns if sample.wall_time_s else default.seconds_per_turn
+        ),
+        usd_per_token=(
+            sample.cost_usd / tokens if sample.cost_usd and tokens else default.usd_per_token
+        ),
+        rows_per_eip_ktoken=(
+            sample.rows * 1000 / sample.eip_tokens
+            if sample.eip_tokens
+            else default.rows_per_eip_ktoken
+        ),
+        csv_tokens_per_row=sample.csv_tokens / sample.rows if sample.csv_tokens else None,
+    )
+
+
+ProfileKey = tuple[str, Optional[str], Optional[str]]
+
+
+def _profile_keys(phase: str, model: Optional[str], client: Optional[str]) -> list[ProfileKey]:
+    """Keys from most to least specific, without duplicates."""
+    return list(dict.fromkeys([(phase, model, client), (phase, model, None), (phase, None, None)]))
+
+
+class EstimateHistory:
+    """Phase profiles fitted from recorded run manifests.
+
+    Profiles are kept per (phase, model, client), per (phase, model) and per
+    phase; ``profile`` uses the most specific one with data.
+    """
+
+    def __init__(self, samples: Optional[dict[ProfileKey, _Sample]] = None) -> None:
+        self.samples = samples or {}
+
+    @classmethod
+    def load(cls, roots: Iterable[Path]) -> "EstimateHistory":
+        samples: dict[ProfileKey, _Sample] = {}
+        for run in load_runs(roots):
+            if run.phase not in PHASE_IDS:
+                continue
+            sample = _run_sample(run)
+            if sample is None:
+                continue
+            model = run.manifest.get("model")
+            client = run.manifest.get("client_name")
+            for key in _profile_keys(run.phase, model, client):
+                samples.setdefault(key, _Sample()).add(sample)
+        return cls(samples)
+
+    def profile(
+        self, phase: str, model: Optional[str] = None, client: Optional[str] = None
+    ) -> PhaseProfile:
+        for key in _profile_keys(phase, model, client):
+            sample = self.samples.get(key)
+            if sample is not None and sample.runs:
+                return _fit(sample)
+        return PhaseProfile()
+
+    @property
+    def runs(self) -> int:
+        return sum(
+            sample.runs for (_, model, client), sample in self.samples.items()
+            if model is None and client is None
+        )
+
+
+@dataclass(frozen=True)
+class EstimateSettings:
+    phases: tuple[str, ...] = PHASE_IDS
+    clients: tuple[str, ...] = ()
+    model: Optional[str] = None
+    models: dict[str, str] = field(default_factory=dict)
+    max_turns: int = 20
+    shard_size: Optional[int] = None
+    # Row-token budget per shard by phase (``shard_size=auto``); overrides shard_size.
+    shard_tokens: dict[str, int] = field(default_factory=dict)
+    concurrency: int = 4
+    context_budget: Optional[int] = None
+    output_format: str = "csv"
+    max_parallel: int = DEFAULT_MAX_PARALLEL
+
+    def model_for(self, phase: str) -> Optional[str]:
+        return self.models.get(phase, self.model)
+
+
+@dataclass
+class PhaseEstimate:
+    eip: str
+    phase: str
+    client: Optional[str]
+    model: Optional[str]
+    rows: int
+    calls: int
+    prompt_tokens: int
+    input_doc_tokens: int
+    turns: float
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    wall_time_s: float
+    basis: str
+
+
+def normalize_phases(phases: Sequence[str]) -> tuple[str, ...]:
+    """Phase ids for CLI phase names (``extract``) or ids (``1A``), in pipeline order."""
+    wanted = {
+        PHASE_ALIASES.get(phase.strip().lower(), phase.strip().upper())
+        for phase in phases
+        if phase.strip()
+    }
+    unknown = wanted - set(PHASE_IDS)
+    if unknown:
+        raise ValueError(f"Unknown phases: {', '.join(sorted(unknown))}")
+    return tuple(phase for phase in PHASE_IDS if phase in wanted)
+
+
+class _Placeholders(dict):
+    def __missing__(self, key: str) -> str:
+        return f"/path/to/{key}"
+
+
+def prompt_tokens(
+    phase: str, values: dict[str, object], settings: EstimateSettings, rows_tokens: int
+) -> int:
+    """Tokens of the rendered phase prompt, including inlined context and JSON rows."""
+    text = load_prompt(PHASE_PROMPTS[phase]).format_map(_Placeholders(values))
+    tokens = estimate_tokens(text)
+    if settings.context_budget and phase != "0A":
+        tokens += settings.context_budget
+    if settings.output_format == "json":
+        # Schema and instructions replace the file-writing sections; rows are inlined.
+        tokens += 400 + (rows_tokens if phase != "0A" else 0)
+    return tokens
+
+
+def estimate_eip(
+    eip: str,
+    eip_file: Optional[Path],
+    settings: EstimateSettings,
+    history: EstimateHistory,
+) -> list[PhaseEstimate]:
+    """Estimate every requested phase (and client) of one EIP."""
+    eip_tokens = _file_tokens(eip_file) or DEFAULT_EIP_TOKENS
+    extract = history.profile("0A", settings.model_for("0A"))
+    rows = max(1, round(eip_tokens / 1000 * extract.rows_per_eip_ktoken))
+    values: dict[str, object] = {
+        "eip_path": eip_file or f"/path/to/eip-{eip}.md",
+        "eip_label": f"EIP-{eip}",
+        "eip_number": eip,
+        "eip_id_prefix": f"EIP{eip}",
+    }
+    estimates: list[PhaseEstimate] = []
+    for phase in settings.phases:
+        model = settings.model_for(phase)
+        clients: Sequence[Optional[str]] = (
+            (settings.clients or (None,)) if phase in CLIENT_PHASES else (None,)
+        )
+        for client in clients:
+            client_name = Path(client).name if client else None
+            profile = history.profile(phase, model, client_name)
+            if phase == "0A":
+                doc_tokens = eip_tokens
+            else:
+                parent = PHASE_INPUTS[phase]
+                source = history.profile(parent, settings.model_for(parent), client_name)
+                per_row = source.csv_tokens_per_row or DEFAULT_CSV_TOKENS_PER_ROW[parent]
+                doc_tokens = round(rows * per_row)
+            if phase in settings.shard_tokens:
+                calls = max(1, math.ceil(doc_tokens / settings.shard_tokens[phase]))
+            elif settings.shard_size and phase != "0A":
+                calls = math.ceil(rows / settings.shard_size)
+            else:
+                calls = 1
+            doc_per_call = doc_tokens / calls
+            prompt = prompt_tokens(
+                phase,
+                {
+                    **values,
+                    "client_root": client or "/path/to/client",
+                    "client_name": client_name or "client",
+                },
+                settings,
+                round(doc_per_call),
+            )
+            turns = min(float(settings.max_turns), profile.turns_per_call)
+            input_tokens = calls * turns * (prompt + doc_per_call) * profile.input_per_seed_turn
+            output_tokens = rows * profile.output_per_row
+            waves = math.ceil(calls / max(1, settings.concurrency))
+            estimates.append(
+                PhaseEstimate(
+                    eip=eip,
+                    phase=phase,
+                    client=client_name,
+                    model=model,
+                    rows=rows,
+                    calls=calls,
+                    prompt_tokens=prompt,
+                    input_doc_tokens=doc_tokens,
+                    turns=round(turns, 1),
+                    input_tokens=round(input_tokens),
+                    output_tokens=round(output_tokens),
+                    cost_usd=round((input_tokens + output_tokens) * profile.usd_per_token, 4),
+                    wall_time_s=round(waves * turns * profile.seconds_per_turn, 1),
+                    basis=profile.basis,
+                )
+            )
+    return estimates
+
+
+def batch_makespan(durations: Sequence[float], max_parallel: int) -> float:
+    """Wall time of running ``durations`` longest-first on ``max_parallel`` slots."""
+    if not durations:
+        return 0.0
+    slots = [0.0] * max(1, min(max_parallel, len(durations)))
+    for duration in sorted(durations, reverse=True):
+        heapq.heapreplace(slots, slots[0] + duration)
+    return max(slots)
+
+
+def build_estimate(
+    eips: Sequence[tuple[str, Optional[Path]]],
+    settings: EstimateSettings,
+    history: EstimateHistory,
+    budget_usd: Optional[float] = None,
+) -> dict[str, object]:
+    """Estimate a batch of EIPs; ``schedule`` lists them longest first."""
+    items: list[PhaseEstimate] = []
+    per_eip: list[dict[str, object]] = []
+    for eip, eip_file in eips:
+        estimates = estimate_eip(eip, eip_file, settings, history)
+        items.extend(estimates)
+        # Phases run one after another; clients of the same phase run in sequence too.
+        per_eip.append(
+            {
+                "eip": eip,
+                "eip_file": str(eip_file) if eip_file else None,
+                "rows": estimates[0].rows if estimates else 0,
+                "cost_usd": round(sum(item.cost_usd for item in estimates), 4),
+                "wall_time_s": round(sum(item.wall_time_s for item in estimates), 1),
+            }
+        )
+    # Longest first; cost (which grows with obligations) breaks wall-time ties.
+    longest_first = sorted(
+        per_eip, key=lambda entry: (-float(entry["wall_time_s"]), -float(entry["cost_usd"]))
+    )
+    schedule = [entry["eip"] for entry in longest_first]
+    durations = [float(entry["wall_time_s"]) for entry in per_eip]
+    total_cost = round(sum(item.cost_usd for item in items), 4)
+    return {
+        "generated_at": timestamp(),
+        "settings": {
+            **asdict(settings),
+            "phases": list(settings.phases),
+            "clients": list(settings.clients),
+        },
+        "history_runs": history.runs,
+        "items": [asdict(item) for item in items],
+        "eips": per_eip,
+        "schedule": schedule,
+        "total": {
+            "calls": sum(item.calls for item in items),
+            "input_tokens": sum(item.input_tokens for item in items),
+            "output_tokens": sum(item.output_tokens for item in items),
+            "cost_usd": total_cost,
+            "serial_wall_time_s": round(sum(durations), 1),
+            "wall_time_s": round(batch_makespan(durations, settings.max_parallel), 1),
+        },
+        "budget_usd": budget_usd,
+        "within_budget": None if budget_usd is None else total_cost <= budget_usd,
+    }
+
+
+def _estimate_lines(estimate: dict) -> list[str]:
+    total = estimate["total"]
+    lines = [
+        "# Batch Estimate",
+        "",
+        f"- EIPs: {len(estimate['eips'])} (history runs: {estimate['history_runs']})",
+        f"- Estimated cost (USD): {total['cost_usd']:.2f}",
+        f"- Estimated wall time (s): {total['wall_time_s']:.0f} "
+        f"(serial {total['serial_wall_time_s']:.0f}, "
+        f"max parallel {estimate['settings']['max_parallel']})",
+    ]
+    if estimate.get("budget_usd") is not None:
+        status = "within" if estimate["within_budget"] else "OVER"
+        lines.append(f"- Budget (USD): {estimate['budget_usd']:.2f} ({status} budget)")
+    lines += [
+        "",
+        "| EIP | Phase | Client | Calls | Prompt tokens | Input tokens | Output tokens "
+        "| Cost (USD) | Wall time (s) | Basis |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for item in estimate["items"]:
+        lines.append(
+            f"| {item['eip']} | {item['phase']} | {item['client'] or '-'} | {item['calls']} "
+            f"| {item['prompt_tokens']} | {item['input_tokens']} | {item['output_tokens']} "
+            f"| {item['cost_usd']:.4f} | {item['wall_time_s']:.0f} | {item['basis']} |"
+        )
+    lines += ["", f"Schedule (longest first): {', '.join(estimate['schedule']) or 'None'}", ""]
+    return lines
+
+
+def estimate_markdown(estimate: dict) -> str:
+    return "\n".join(_estimate_lines(estimate))
+
+
+def write_estimate(
+    estimate: dict, output_dir: Path, formats: Sequence[str] = ("json", "md")
+) -> Path:
+    ensure_dir(output_dir)
+    if "json" in formats:
+        (output_dir / "estimate.json").write_text(json.dumps(estimate, indent=2), encoding="utf-8")
+    if "md" in formats:
+        (output_dir / "estimate.md").write_text(estimate_markdown(estimate), encoding="utf-8")
+    return output_dir
+
@@ -3,12 +3,77 @@
 from __future__ import annotations
 
 import csv
+import math
+import random
+import re
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Optional
 
-from .llm import ClaudeConfig, write_llm_call_record
+import anyio
 
+from .agents import TransientAgentError
+from .llm import CallStream, ClaudeConfig, write_llm_call_record
+from .structured_output import render_json_rows
+from .telemetry import CallTelemetry, TelemetryRecorder
 
-def _write_fake_obligations_csv(path: Path, eip_number: str) -> None:
+
+LatencySampler = Callable[[random.Random, str], float]
+
+
+def parse_latency(spec: Optional[str]) -> LatencySampler:
+    """Parse a fake latency spec into a sampler of seconds per call.
+
+    Supported specs:
+        fixed:<seconds>            every call takes the same time
+        lognormal:<median>,<sigma> heavy-tailed latency around ``median`` seconds
+        replay:<dir>               latencies of recorded sessions of the same phase
+    """
+    kind, _, value = (spec or "fixed:0").strip().partition(":")
+    kind = kind.lower()
+    try:
+        if kind == "fixed":
+            seconds = float(value or 0)
+            return lambda rng, phase: seconds
+        if kind == "lognormal":
+            median, _, sigma = value.partition(",")
+            mu = math.log(float(median))
+            spread = float(sigma or 0.5)
+            return lambda rng, phase: rng.lognormvariate(mu, spread)
+    except ValueError as exc:
+        raise ValueError(f"Invalid fake latency: {spec}") from exc
+    if kind == "replay":
+        from .replay_agent import DEFAULT_REPLAY_DIR, ReplayLibrary
+
+        library = ReplayLibrary(Path(value) if value else DEFAULT_REPLAY_DIR)
+        by_phase: dict[str, list[float]] = {}
+        for (phase, _), sessions in library.sessions.items():
+            by_phase.setdefault(phase, []).extend(
+                session.latency_s for session in sessions if session.latency_s
+            )
+        every = [latency for values in by_phase.values() for latency in values]
+        if not every:
+            raise ValueError(f"No recorded latencies under {library.root}")
+        return lambda rng, phase: rng.choice(by_phase.get(phase.upper()) or every)
+    raise ValueError(f"fake latency must be fixed:, lognormal: or replay: — got {spec}")
+
+
+@dataclass(frozen=True)
+class FakeBehavior:
+    """Load-testing knobs for FakeClaudeAgent (defaults keep it instant and reliable)."""
+
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    rows: int = 3
+    seed: Optional[int] = None
+
+
+def _fake_row_number(row_id: str) -> int:
+    match = re.search(r"OBL-(\d+)", row_id)
+    return int(match.group(1)) if match else 0
+
+
+def _write_fake_obligations_csv(path: Path, eip_number: str, rows: int = 3) -> None:
     fieldnames = [
         "id",
         "category",
@@ -22,51 +87,49 @@ def _write_fake_obligations_csv(path: Path, eip_number: str) -> None:
     with path.open("w", encoding="utf-8", newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
-        
-        # Row 1: Perfect obligation
-        writer.writerow(
-            {
-                "id": f"EIP{eip_number}-OBL-001",
-                "category": "core",
-                "enforcement_type": "state_change",
-                "statement": f"Perfect obligation for EIP-{eip_number}.",
-                "locations": "spec.py:100",
-                "code_flow": "entry -> verification",
-                "obligation_gap": "",
-                "code_gap": "",
-            }
-        )
-        
-        # Row 2: Obligation with gaps
-        writer.writerow(
-            {
-                "id": f"EIP{eip_number}-OBL-002",
-                "category": "edge_case",
-                "enforcement_type": "check",
-                "statement": f"Gap obligation for EIP-{eip_number}.",
-                "locations": "spec.py:200",
-                "code_flow": "entry -> check",
-                "obligation_gap": "Ambiguous specific condition",
-                "code_gap": "Missing assertion in spec",
-            }
-        )
-        
-        # Row 3: Empty/Missing obligation
-        writer.writerow(
-            {
-                "id": f"EIP{eip_number}-OBL-003",
-                "category": "future",
-                "enforcement_type": "",
-                "statement": f"Empty obligation for EIP-{eip_number}.",
-                "locations": "",
-                "code_flow": "",
-                "obligation_gap": "",
-                "code_gap": "",
-            }
-        )
+        for number in range(1, rows + 1):
+            writer.writerow(_fake_obligation_row(eip_number, number))
 
 
-def _write_fake_client_csv(input_csv: Path, output_csv: Path, phase: str) -> None:
+def _fake_obligation_row(eip_number: str, number: int) -> dict[str, str]:
+    """Rows cycle through a perfect obligation, one with gaps and an empty one."""
+    row_id = f"EIP{eip_number}-OBL-{number:03d}"
+    shape = number % 3
+    if shape == 1:
+        return {
+            "id": row_id,
+            "category": "core",
+            "enforcement_type": "state_change",
+            "statement": f"Perfect obligation for EIP-{eip_number}.",
+            "locations": f"spec.py:{100 * number}",
+            "code_flow": "entry -> verification",
+            "obligation_gap": "",
+            "code_gap": "",
+        }
+    if shape == 2:
+        return {
+            "id": row_id,
+            "category": "edge_case",
+            "enforcement_type": "check",
+            "statement": f"Gap obligation for EIP-{eip_number}.",
+            "locations": f"spec.py:{100 * number}",
+            "code_flow": "entry -> check",
+            "obligation_gap": "Ambiguous specific condition",
+            "code_gap": "Missing assertion in spec",
+        }
+    return {
+        "id": row_id,
+        "category": "future",
+        "enforcement_type": "",
+        "statement": f"Empty obligation for EIP-{eip_number}.",
+        "locations": "",
+        "code_flow": "",
+        "obligation_gap": "",
+        "code_gap": "",
+    }
+
+
+def _fake_client_rows(input_csv: Path, phase: str) -> tuple[list[str], list[dict[str, str]]]:
     with input_csv.open(encoding="utf-8", newline="") as handle:
         reader = csv.DictReader(handle)
         fieldnames = list(reader.fieldnames or [])
@@ -85,13 +148,15 @@ def _write_fake_client_csv(input_csv: Path, output_csv: Path, phase: str) -> Non
             for col in extras:
                 row.setdefault(col, "")
             
+            # Rows follow the obligation shapes: 1 = perfect, 2 = gaps, 0 = empty.
+            shape = _fake_row_number(row.get("id", "")) % 3
+
             # Logic for Phase 2B gaps
             if phase == "2B":
-                row_id = row.get("id", "")
-                if "OBL-001" in row_id:
+                if shape == 1:
                     row["client_locations"] = "client/file.go:50"
                     row["client_code_flow"] = "HandleMsg -> correct"
-                elif "OBL-002" in row_id:
+                elif shape == 2:
                     row["client_locations"] = "client/file.go:99"
                     row["client_obligation_gap"] = "Client implements older version"
                     row["client_code_gap"] = "Missing bounds check"
@@ -99,14 +164,17 @@ def _write_fake_client_csv(input_csv: Path, output_csv: Path, phase: str) -> Non
             # Phase 2A just keeps defaults (empty or copied) for now, 
             # or could mirror logic if we wanted 2A to populate locations too.
             if phase == "2A":
-                row_id = row.get("id", "")
-                if "OBL-001" in row_id:
+                if shape == 1:
                      row["client_locations"] = "client/file.go:50"
-                if "OBL-002" in row_id:
+                if shape == 2:
                      row["client_locations"] = "client/file.go:99"
 
             rows.append(row)
+    return fieldnames, rows
 
+
+def _write_fake_client_csv(input_csv: Path, output_csv: Path, phase: str) -> None:
+    fieldnames, rows = _fake_client_rows(input_csv, phase)
     with output_csv.open("w", encoding="utf-8", newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=fieldnames)
         writer.writeheader()
@@ -114,7 +182,32 @@ def _write_fake_client_csv(input_csv: Path, output_csv: Path, phase: str) -> Non
             writer.writerow(row)
 
 
+def _fake_json_rows(
+    phase: str, input_csv: Optional[Path], eip_number: str, rows: int
+) -> list[dict[str, str]]:
+    """Rows the fake agent returns in ``json`` output mode (same data as its CSVs)."""
+    if phase == "0A":
+        return [_fake_obligation_row(eip_number, number) for number in range(1, rows + 1)]
+    if input_csv is None or not input_csv.exists():
+        return []
+    if phase in {"2A", "2B"}:
+        return _fake_client_rows(input_csv, phase)[1]
+    # 1A/1B fill the columns the fake 0A CSV pre-populates.
+    with input_csv.open(encoding="utf-8", newline="") as handle:
+        return [
+            {**_fake_obligation_row(eip_number, _fake_row_number(row.get("id", ""))), "id": row["id"]}
+            for row in csv.DictReader(handle)
+        ]
+
+
 class FakeClaudeAgent:
+    """Offline agent writing canned outputs, optionally slow and flaky for load tests."""
+
+    def __init__(self, behavior: Optional[FakeBehavior] = None) -> None:
+        self.behavior = behavior or FakeBehavior()
+        self._sample_latency = parse_latency(self.behavior.latency)
+        self._rng = random.Random(self.behavior.seed)
+
     def run(
         self,
         prompt: str,
@@ -123,6 +216,24 @@ class FakeClaudeAgent:
         config: ClaudeConfig,
         metadata: dict[str, object],
     ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        recorder = TelemetryRecorder(model=config.model)
+        phase = str(metadata.get("phase") or "").upper()
+        delay = self._sample_latency(self._rng, phase)
+        if delay > 0:
+            await anyio.sleep(delay)
+        if self.behavior.error_rate and self._rng.random() < self.behavior.error_rate:
+            raise TransientAgentError(f"Injected fake failure in phase {phase}")
+
         options_kwargs: dict[str, object] = {
             "allowed_tools": config.allowed_tools,
             "permission_mode": "bypassPermissions",
@@ -144,16 +255,25 @@ class FakeClaudeAgent:
             "FAKE MODE: Claude call skipped.\n"
             f"Recorded call metadata in {output_path.with_suffix('.call.json').name}.\n"
         )
-        output_path.write_text(output_text, encoding="utf-8")
-
-        phase = str(metadata.get("phase") or "").upper()
         output_csv = Path(metadata["output_csv"]) if metadata.get("output_csv") else None
         input_csv = Path(metadata["input_csv"]) if metadata.get("input_csv") else None
         eip_number = str(metadata.get("eip_number") or "1559")
+        json_mode = metadata.get("output_format") == "json"
+        if json_mode:
+            output_text += render_json_rows(
+                phase, _fake_json_rows(phase, input_csv, eip_number, self.behavior.rows)
+            )
+
+        with CallStream(output_path) as stream:
+            stream.write_text(output_text)
+            stream.write_event("assistant_text", text=output_text)
+        if json_mode:
+            return recorder.finish()
 
         if phase == "0A" and output_csv and not output_csv.exists():
-            _write_fake_obligations_csv(output_csv, eip_number)
+            _write_fake_obligations_csv(output_csv, eip_number, self.behavior.rows)
         if phase == "2A" and output_csv and input_csv and input_csv.exists():
             _write_fake_client_csv(input_csv, output_csv, phase="2A")
         if phase == "2B" and output_csv and input_csv and input_csv.exists():
             _write_fake_client_csv(input_csv, output_csv, phase="2B")
+        return recorder.finish()
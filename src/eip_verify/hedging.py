@@ -0,0 +1,205 @@
+"""Hedged agent calls for tail-latency control."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import anyio
+
+from .agents import AgentProtocol, acall_agent
+from .history import LatencyHistory
+from .llm import ClaudeConfig
+from .run_history import call_size
+from .ratelimit import billable_tokens
+from .telemetry import CallTelemetry
+from .utils import ensure_dir
+
+
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 5
+
+
+def _promote(
+    attempt_dir: Path,
+    output_dir: Path,
+    attempt_csv: Optional[Path],
+    output_csv: Optional[Path],
+) -> None:
+    """Move the winning attempt's files over the call's real outputs."""
+    if attempt_csv is not None and output_csv is not None and attempt_csv.exists():
+        os.replace(attempt_csv, output_csv)
+    for path in attempt_dir.iterdir():
+        if path.is_file():
+            os.replace(path, output_dir / path.name)
+
+
+def charge_loser(telemetry: CallTelemetry, share: float) -> None:
+    """Add the estimated spend of a hedge's losing attempt to the winner's telemetry.
+
+    A cancelled call never reports usage, but both attempts ran the same
+    prompt, so the loser is charged the winner's tokens and cost scaled by
+    how long it ran relative to the winner (at most all of them).
+    """
+    share = max(0.0, min(1.0, share))
+    telemetry.hedge_tokens = round(billable_tokens(telemetry) * share)
+    telemetry.hedge_cost_usd = round(telemetry.total_cost_usd * share, 6)
+    telemetry.total_cost_usd = round(telemetry.total_cost_usd + telemetry.hedge_cost_usd, 6)
+
+
+class HedgingAgent:
+    """Agent wrapper that races a duplicate call once the first one runs long.
+
+    A call that has not finished after the ``percentile`` latency of similar
+    calls (same phase, similar size; learned from ``history``) gets a
+    second, identical attempt; the first attempt to succeed wins and the
+    other is cancelled. Both attempts write
+    into their own directory under ``.hedge-<output stem>/`` with a private
+    copy of the output CSV, and only the winner's files are moved into place,
+    so the loser never touches the real outputs. Phases with fewer than
+    ``min_samples`` recorded calls are not hedged.
+    """
+
+    def __init__(
+        self,
+        inner: AgentProtocol,
+        history: LatencyHistory,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError(f"hedge_percentile must be between 0 and 1: {percentile}")
+        self.inner = inner
+        self.history = history
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+    def threshold(self, phase: str, size: float = 0.0) -> Optional[float]:
+        return self.history.percentile(phase, self.percentile, self.min_samples, size)
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        phase = str(metadata.get("phase") or "")
+        size = call_size(
+            phase,
+            Path(str(metadata["input_csv"])) if metadata.get("input_csv") else None,
+            Path(str(metadata["eip_file"])) if metadata.get("eip_file") else None,
+        )
+        threshold = self.threshold(phase, size)
+        if threshold is None:
+            started = time.monotonic()
+            telemetry = await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+            self.history.add(phase, time.monotonic() - started, size)
+            return telemetry
+        return await self._hedged(
+            prompt, output_path, cwd, config, metadata, phase, threshold, size
+        )
+
+    async def _hedged(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+        phase: str,
+        threshold: float,
+        size: float,
+    ) -> Optional[CallTelemetry]:
+        output_csv = Path(str(metadata["output_csv"])) if metadata.get("output_csv") else None
+        seed = output_csv.read_bytes() if output_csv and output_csv.exists() else None
+        workdir = output_path.parent / f".hedge-{output_path.stem}"
+        shutil.rmtree(workdir, ignore_errors=True)
+
+        winner: list[tuple[int, Optional[CallTelemetry], float]] = []
+        errors: list[Exception] = []
+        primary_done = anyio.Event()
+        # attempt -> (started, ended); a cancelled attempt ends when the winner does.
+        spans: dict[int, list[float]] = {}
+
+        def attempt_csv(attempt: int) -> Optional[Path]:
+            return workdir / str(attempt) / output_csv.name if output_csv else None
+
+        async def run_attempt(attempt: int, scope: anyio.CancelScope) -> None:
+            attempt_dir = workdir / str(attempt)
+            ensure_dir(attempt_dir)
+            csv_path = attempt_csv(attempt)
+            attempt_prompt = prompt
+            attempt_metadata = dict(metadata)
+            if output_csv is not None and csv_path is not None:
+                if seed is not None:
+                    csv_path.write_bytes(seed)
+                attempt_prompt = prompt.replace(str(output_csv), str(csv_path))
+                attempt_metadata["output_csv"] = str(csv_path)
+            span = spans[attempt] = [time.monotonic(), 0.0]
+            try:
+                telemetry = await acall_agent(
+                    self.inner,
+                    attempt_prompt,
+                    attempt_dir / output_path.name,
+                    cwd,
+                    config,
+                    attempt_metadata,
+                )
+            except Exception as exc:
+                errors.append(exc)
+            else:
+                if not winner:
+                    winner.append((attempt, telemetry, time.monotonic() - span[0]))
+                    scope.cancel()
+            finally:
+                span[1] = time.monotonic()
+                if attempt == 1:
+                    primary_done.set()
+
+        started = time.monotonic()
+        hedged = False
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(run_attempt, 1, tg.cancel_scope)
+                with anyio.move_on_after(threshold):
+                    await primary_done.wait()
+                if not primary_done.is_set():
+                    print(
+                        f"[hedge] phase {phase} call still running after "
+                        f"p{self.percentile * 100:g} ({threshold:.1f}s); starting a duplicate"
+                    )
+                    hedged = True
+                    tg.start_soon(run_attempt, 2, tg.cancel_scope)
+            if not winner:
+                raise errors[0]
+            attempt, telemetry, latency = winner[0]
+            _promote(workdir / str(attempt), output_path.parent, attempt_csv(attempt), output_csv)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        # The latency the caller saw, which a winning duplicate's own runtime understates.
+        self.history.add(phase, time.monotonic() - started, size)
+        if attempt == 2:
+            print(f"[hedge] phase {phase} duplicate finished first")
+        if telemetry is not None:
+            telemetry.hedged = hedged
+            telemetry.wall_time_s = round(time.monotonic() - started, 3)
+            loser = spans.get(3 - attempt)
+            if loser is not None:
+                charge_loser(telemetry, (loser[1] - loser[0]) / latency if latency > 0 else 1.0)
+        return telemetry
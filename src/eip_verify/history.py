@@ -0,0 +1,62 @@
+"""Per-phase, per-size call latency history learned from recorded run telemetry."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .run_history import load_calls
+
+
+class LatencyHistory:
+    """Wall-clock latencies of agent calls, grouped by phase and call size.
+
+    ``load`` reads the calls recorded in earlier runs' manifests (one sample
+    per shard or unsharded phase; batched and cached calls are skipped).
+    ``add`` folds in calls finished during the current run, so percentiles
+    follow the live latency distribution as well. Like turn
+    budgets, percentiles use calls of the phase within a factor of two of the
+    call's size (rows, or EIP kilotokens for phase 0A), falling back to the
+    whole phase when too few match.
+    """
+
+    def __init__(self, samples: Optional[dict[str, list[tuple[float, float]]]] = None) -> None:
+        # phase -> [(size, seconds)]
+        self.samples: dict[str, list[tuple[float, float]]] = {
+            phase.upper(): [(float(size), float(seconds)) for size, seconds in values]
+            for phase, values in (samples or {}).items()
+        }
+
+    @classmethod
+    def load(cls, roots: Iterable[Path]) -> "LatencyHistory":
+        history = cls()
+        for call in load_calls(roots):
+            if call.wall_time_s is not None:
+                history.add(call.phase, call.wall_time_s, call.rows)
+        return history
+
+    def add(self, phase: str, seconds: float, size: float = 0.0) -> None:
+        if seconds > 0:
+            self.samples.setdefault(phase.upper(), []).append((size, seconds))
+
+    def count(self, phase: str) -> int:
+        return len(self.samples.get(phase.upper(), []))
+
+    def _similar(self, phase: str, size: float, min_samples: int) -> list[float]:
+        same_phase = self.samples.get(phase.upper(), [])
+        every = [seconds for _, seconds in same_phase]
+        if size <= 0:
+            return every
+        near = [seconds for other, seconds in same_phase if size / 2 <= other <= size * 2]
+        return near if len(near) >= max(1, min_samples) else every
+
+    def percentile(
+        self, phase: str, q: float, min_samples: int = 5, size: float = 0.0
+    ) -> Optional[float]:
+        """Nearest-rank ``q`` percentile (0-1) of calls like this one, None below ``min_samples``."""
+        values = sorted(self._similar(phase, size, min_samples))
+        if len(values) < max(1, min_samples):
+            return None
+        rank = min(len(values), max(1, math.ceil(q * len(values))))
+        return values[rank - 1]
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Iterable, Optional
 
 from .utils import timestamp
@@ -55,6 +56,7 @@ def write_llm_call_record(
     options_kwargs: dict[str, object],
     config: ClaudeConfig,
     used_fake: bool,
+    extra: Optional[dict[str, object]] = None,
 ) -> Path:
     record_path = output_path.with_suffix(".call.json")
     record = {
@@ -64,6 +66,52 @@ def write_llm_call_record(
         "prompt": prompt,
         "options": options_kwargs,
         "output_path": str(output_path),
+        **(extra or {}),
     }
     record_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
     return record_path
+
+
+MAX_EVENT_TEXT = 4000
+
+
+def events_path(output_path: Path) -> Path:
+    return output_path.with_suffix(".events.jsonl")
+
+
+class CallStream:
+    """Writes agent output text and a JSONL event log as messages arrive.
+
+    Both files are flushed after every write so they can be tailed while the
+    session runs, and nothing is buffered in memory beyond the current event.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        self.output_path = output_path
+        self.events_path = events_path(output_path)
+        self._output = output_path.open("w", encoding="utf-8")
+        self._events = self.events_path.open("w", encoding="utf-8")
+
+    def __enter__(self) -> "CallStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write_text(self, text: str) -> None:
+        self._output.write(text)
+        self._output.flush()
+
+    def write_event(self, kind: str, **fields: object) -> None:
+        event: dict[str, object] = {"ts": timestamp(), "type": kind}
+        for key, value in fields.items():
+            if isinstance(value, str) and len(value) > MAX_EVENT_TEXT:
+                event[f"{key}_size"] = len(value)
+                value = value[:MAX_EVENT_TEXT] + "... (truncated)"
+            event[key] = value
+        self._events.write(json.dumps(event, default=str) + "\n")
+        self._events.flush()
+
+    def close(self) -> None:
+        self._output.close()
+        self._events.close()
@@ -2,18 +2,43 @@
 
 from __future__ import annotations
 
+import json
 import os
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from contextlib import contextmanager
 
-from .agents import AgentProtocol, ClaudeAgent
+import anyio
+
+from .agents import AgentProtocol, ClaudeAgent, aclose_agent
+from .circuit import CircuitOpenError
 from .reporting import write_report
-from .runner import run_phase_0a, run_phase_1a, run_phase_1b, run_phase_2a, run_phase_2b
+from .routing import ModelRouting
+from .shard_budget import ShardBudget, shard_budget_for
+from .turn_budget import TurnBudget, turn_budget_for
+from .runner import (
+    arun_phase_0a,
+    arun_phase_1a,
+    arun_phase_1b,
+    arun_phase_2a,
+    arun_phase_2b,
+    run_sync,
+)
 from .utils import timestamp
 
 
+PIPELINE_STATUS_FILE = "pipeline_status.json"
+
+
+def write_pipeline_status(run_root: Path, status: str, **fields: object) -> dict[str, object]:
+    """Record how a pipeline run ended ("complete" or "parked") in its run root."""
+    payload = {"status": status, "updated_at": timestamp(), **fields}
+    (run_root / PIPELINE_STATUS_FILE).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return payload
+
+
 @contextmanager
 def github_log_group(title: str):
     """Wrap logs in a GitHub Actions group if running in CI."""
@@ -30,6 +55,82 @@ def github_log_group(title: str):
 
 PHASE_ORDER = ["extract", "locate-spec", "analyze-spec", "locate-client", "analyze-client"]
 
+EVENT_TAIL_LINES = 50
+
+
+def format_event(event: dict) -> str:
+    """Render one agent event log entry as a single log line."""
+    kind = event.get("type", "?")
+    if kind == "tool_use":
+        detail = json.dumps(event.get("input", {}), default=str)
+        return f"tool_use {event.get('name')} {detail[:200]}"
+    if kind == "tool_result":
+        size = event.get("content_size") or len(str(event.get("content", "")))
+        status = "error" if event.get("is_error") else "ok"
+        return f"tool_result {status} ({size} chars)"
+    if kind == "assistant_text":
+        text = " ".join(str(event.get("text", "")).split())
+        return f"text {text[:200]}"
+    if kind == "result":
+        return f"result {event.get('subtype')} turns={event.get('num_turns')}"
+    return kind
+
+
+def read_event_tail(path: Path, limit: int = EVENT_TAIL_LINES) -> list[str]:
+    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    formatted = []
+    for line in lines[-limit:]:
+        try:
+            formatted.append(format_event(json.loads(line)))
+        except json.JSONDecodeError:
+            continue
+    return formatted
+
+
+class EventFollower:
+    """Print new agent events from every ``*.events.jsonl`` under a run root.
+
+    Runs in a daemon thread so agent calls on the event loop are unaffected.
+    """
+
+    def __init__(self, run_root: Path, interval: float = 2.0) -> None:
+        self.run_root = run_root
+        self.interval = interval
+        self._offsets: dict[Path, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self) -> "EventFollower":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.poll()
+
+    def poll(self) -> None:
+        for path in sorted(self.run_root.rglob("*.events.jsonl")):
+            offset = self._offsets.get(path, 0)
+            with path.open(encoding="utf-8", errors="replace") as handle:
+                handle.seek(offset)
+                chunk = handle.read()
+            # Only consume complete lines; a partial line is picked up next poll.
+            complete, _, _ = chunk.rpartition("\n")
+            if not complete:
+                continue
+            self._offsets[path] = offset + len(complete.encode("utf-8")) + 1
+            label = path.parent.relative_to(self.run_root)
+            for line in complete.splitlines():
+                try:
+                    print(f"[{label}] {format_event(json.loads(line))}", flush=True)
+                except json.JSONDecodeError:
+                    continue
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
 
 
 def _log_phase_to_summary(phase: str, run_dir: Path) -> None:
@@ -81,12 +182,39 @@ def _log_phase_to_summary(phase: str, run_dir: Path) -> None:
                 f.write(content)
                 f.write("\n```\n\n")
                 
+            event_logs = [
+                *run_dir.glob("*.events.jsonl"),
+                *run_dir.glob("shards/*/*.events.jsonl"),
+            ]
+            for events in sorted(event_logs):
+                tail = read_event_tail(events)
+                if not tail:
+                    continue
+                f.write(f"#### {events.relative_to(run_dir)} (last {len(tail)} events)\n")
+                f.write("```text\n")
+                f.write("\n".join(tail))
+                f.write("\n```\n\n")
+
             f.write("</details>\n")
     except Exception as e:
         print(f"Failed to write to step summary: {e}")
 
 
-def run_pipeline(
+def default_agent(llm_mode: str) -> AgentProtocol:
+    """The agent for ``llm_mode`` when the caller did not configure one."""
+    if llm_mode == "fake":
+        from .fake_agent import FakeClaudeAgent
+        return FakeClaudeAgent()
+    if llm_mode == "replay":
+        from .replay_agent import DEFAULT_REPLAY_DIR, ReplayAgent, ReplayLibrary
+        return ReplayAgent(ReplayLibrary(DEFAULT_REPLAY_DIR))
+    if llm_mode == "batch":
+        from .batch import BatchAgent, parse_batch_transport
+        return BatchAgent(ClaudeAgent(), parse_batch_transport(None))
+    return ClaudeAgent()
+
+
+async def arun_pipeline(
     eip: str,
     phases: List[str],
     spec_repo: str,
@@ -95,27 +223,63 @@ def run_pipeline(
     fork: Optional[str] = None,
     output_dir: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[List[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     obligation_id: Optional[str] = None,
     agent: Optional[AgentProtocol] = None,
-):
-    """Run multiple verification phases in sequence."""
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    follow_events: Optional[bool] = None,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    output_format: str = "csv",
+    model_routing: Optional[ModelRouting] = None,
+    close_agent: bool = True,
+    project_inputs: Union[bool, int] = False,
+) -> dict[str, object]:
+    """Run multiple verification phases in sequence on the caller's event loop.
+
+    With ``resume`` every phase reuses its latest run directory: phases with a
+    checkpoint are skipped, and sharded phases keep their completed shards.
+    Without ``output_dir`` the latest ``runs/<timestamp>`` is resumed.
+    ``context_budget`` inlines that many tokens of relevant repo slices into
+    the prompts of the CSV-driven phases, and ``project_inputs`` has their
+    agents read only the CSV columns each phase uses. With
+    ``output_format="json"`` the agent replies with JSON rows and the runner
+    writes every CSV.
+    ``model_routing`` picks the model per phase and the escalation ladder.
+    ``max_turns="auto"`` (or a TurnBudget) adapts the turn cap of every call
+    to what similar past calls needed, and ``shard_size="auto"`` (or a
+    ShardBudget) packs shards to a learned token budget. ``close_agent=False`` leaves a shared
+    agent open for the caller (see :func:`arun_sweep`).
+
+    A phase stopped by an open circuit breaker parks the run instead of
+    failing it: no report is written, ``pipeline_status.json`` says
+    "parked", and a rerun with ``resume`` finishes it. Returns that status.
+    """
     
     # Setup run directory
-    run_root = Path(output_dir) if output_dir else Path.cwd() / "runs" / timestamp()
+    if output_dir:
+        run_root = Path(output_dir)
+    else:
+        runs_dir = Path.cwd() / "runs"
+        previous = sorted(runs_dir.glob("*")) if resume and runs_dir.exists() else []
+        run_root = previous[-1] if previous else runs_dir / timestamp()
     run_root.mkdir(parents=True, exist_ok=True)
     print(f"Pipeline started. Run root: {run_root}")
+    if follow_events is None:
+        follow_events = os.getenv("GITHUB_ACTIONS") == "true"
 
     # Resolve agent
     if not agent:
-        if llm_mode == "fake":
-            from .fake_agent import FakeClaudeAgent
-            agent = FakeClaudeAgent()
-        else:
-            agent = ClaudeAgent()
+        agent = default_agent(llm_mode)
+
+    routing = model_routing or ModelRouting()
+    # Load the run history once for all phases.
+    max_turns = turn_budget_for(max_turns) or max_turns
+    shard_size = shard_budget_for(shard_size) or shard_size
 
     # Track output paths for chaining (and logging at the end)
     current_parent_run: Optional[Path] = None
@@ -131,129 +295,173 @@ def run_pipeline(
             else:
                 raise ValueError("Phase 'extract' requires --eip-file or a findable EIP in spec-repo")
     
-    for phase in PHASE_ORDER:
-        if phase not in phases:
-            continue
+    follower = EventFollower(run_root).start() if follow_events else None
+
+    try:
+        for phase in PHASE_ORDER:
+            if phase not in phases:
+                continue
 
-        with github_log_group(f"Phase: {phase}"):
-            print(f"\n=== Running Phase: {phase} ===")
+            with github_log_group(f"Phase: {phase}"):
+                print(f"\n=== Running Phase: {phase} ===")
         
-        phase_output_dir = None
-
-        if phase == "extract":
-            run_phase_0a(
-                eip_file=eip_file,
-                spec_repo=spec_repo,
-                output_dir=str(run_root),
-                eip_number=eip,
-                model=model,
-                max_turns=max_turns,
-                allowed_tools=allowed_tools,
-                llm_mode=llm_mode,
-                record_llm_calls=record_llm_calls,
-                agent=agent,
-            )
-            # Find the output folder (it's created inside run_root/phase0A_runs/<timestamp>)
-            # This is a bit hacky because runner creates nested timestamps. 
-            # In a full refactor, runner should accept exact output path.
-            # tailored for now:
-            phase_runs = list((run_root / "phase0A_runs").glob("*"))
-            if phase_runs:
-                current_parent_run = sorted(phase_runs)[-1]
-                phase_output_dir = current_parent_run
-            else:
-                raise RuntimeError("Phase extract failed to produce output directory")
-
-        elif phase == "locate-spec":
-            if not current_parent_run:
-                raise ValueError(f"Cannot run {phase} without previous phase output")
-            run_phase_1a(
-                parent_run=current_parent_run,
-                spec_repo=spec_repo,
-                eip_number=eip,
-                fork=fork or "london",
-                model=model,
-                max_turns=max_turns,
-                allowed_tools=allowed_tools,
-                llm_mode=llm_mode,
-                record_llm_calls=record_llm_calls,
-                obligation_id=obligation_id,
-                agent=agent,
-            )
-            # Find next parent
-            phase_runs = list((current_parent_run / "phase1A_runs").glob("*"))
-            if phase_runs:
-                current_parent_run = sorted(phase_runs)[-1]
-                phase_output_dir = current_parent_run
-
-        elif phase == "analyze-spec":
-            if not current_parent_run:
-                raise ValueError(f"Cannot run {phase} without previous phase output")
-            run_phase_1b(
-                parent_run=current_parent_run,
-                spec_repo=spec_repo,
-                eip_number=eip,
-                model=model,
-                max_turns=max_turns,
-                allowed_tools=allowed_tools,
-                llm_mode=llm_mode,
-                record_llm_calls=record_llm_calls,
-                obligation_id=obligation_id,
-                agent=agent,
-            )
-            phase_runs = list((current_parent_run / "phase1B_runs").glob("*"))
-            if phase_runs:
-                current_parent_run = sorted(phase_runs)[-1]
-                phase_output_dir = current_parent_run
-
-        elif phase == "locate-client":
-            if not current_parent_run:
-                raise ValueError(f"Cannot run {phase} without previous phase output")
-            if not client_repo:
-                raise ValueError(f"Phase {phase} requires --client-repo")
-            run_phase_2a(
-                parent_run=current_parent_run,
-                client_repo=client_repo,
-                eip_number=eip,
-                model=model,
-                max_turns=max_turns,
-                allowed_tools=allowed_tools,
-                llm_mode=llm_mode,
-                record_llm_calls=record_llm_calls,
-                obligation_id=obligation_id,
-                agent=agent,
-            )
-            phase_runs = list((current_parent_run / "phase2A_runs").glob("*"))
-            if phase_runs:
-                current_parent_run = sorted(phase_runs)[-1]
-                phase_output_dir = current_parent_run
-
-        elif phase == "analyze-client":
-            if not current_parent_run:
-                raise ValueError(f"Cannot run {phase} without previous phase output")
-            if not client_repo:
-                raise ValueError(f"Phase {phase} requires --client-repo")
-            run_phase_2b(
-                parent_run=current_parent_run,
-                client_repo=client_repo,
-                eip_number=eip,
-                model=model,
-                max_turns=max_turns,
-                allowed_tools=allowed_tools,
-                llm_mode=llm_mode,
-                record_llm_calls=record_llm_calls,
-                obligation_id=obligation_id,
-                agent=agent,
-            )
-            # Last phase, no update needed to current_parent_run logically for next step, 
-            # but we define phase_output_dir for logging.
-            # Usually it's in phase2B_runs/timestamp
-            phase_runs = list((current_parent_run / "phase2B_runs").glob("*"))
-            if phase_runs:
-                phase_output_dir = sorted(phase_runs)[-1]
+            phase_output_dir = None
+
+            if phase == "extract":
+                await arun_phase_0a(
+                    eip_file=eip_file,
+                    spec_repo=spec_repo,
+                    output_dir=str(run_root),
+                    eip_number=eip,
+                    model=routing.model_for(phase, model),
+                    max_turns=max_turns,
+                    allowed_tools=allowed_tools,
+                    llm_mode=llm_mode,
+                    record_llm_calls=record_llm_calls,
+                    agent=agent,
+                    resume=resume,
+                    output_format=output_format,
+                    escalate_to=routing.escalate_to,
+                )
+                # Find the output folder (it's created inside run_root/phase0A_runs/<timestamp>)
+                # This is a bit hacky because runner creates nested timestamps. 
+                # In a full refactor, runner should accept exact output path.
+                # tailored for now:
+                phase_runs = list((run_root / "phase0A_runs").glob("*"))
+                if phase_runs:
+                    current_parent_run = sorted(phase_runs)[-1]
+                    phase_output_dir = current_parent_run
+                else:
+                    raise RuntimeError("Phase extract failed to produce output directory")
+
+            elif phase == "locate-spec":
+                if not current_parent_run:
+                    raise ValueError(f"Cannot run {phase} without previous phase output")
+                await arun_phase_1a(
+                    parent_run=current_parent_run,
+                    spec_repo=spec_repo,
+                    eip_number=eip,
+                    fork=fork or "london",
+                    model=routing.model_for(phase, model),
+                    max_turns=max_turns,
+                    allowed_tools=allowed_tools,
+                    llm_mode=llm_mode,
+                    record_llm_calls=record_llm_calls,
+                    obligation_id=obligation_id,
+                    agent=agent,
+                    shard_size=shard_size,
+                    concurrency=concurrency,
+                    resume=resume,
+                    context_budget=context_budget,
+                    project_inputs=project_inputs,
+                    output_format=output_format,
+                    escalate_to=routing.escalate_to,
+                )
+                # Find next parent
+                phase_runs = list((current_parent_run / "phase1A_runs").glob("*"))
+                if phase_runs:
+                    current_parent_run = sorted(phase_runs)[-1]
+                    phase_output_dir = current_parent_run
+
+            elif phase == "analyze-spec":
+                if not current_parent_run:
+                    raise ValueError(f"Cannot run {phase} without previous phase output")
+                await arun_phase_1b(
+                    parent_run=current_parent_run,
+                    spec_repo=spec_repo,
+                    eip_number=eip,
+                    model=routing.model_for(phase, model),
+                    max_turns=max_turns,
+                    allowed_tools=allowed_tools,
+                    llm_mode=llm_mode,
+                    record_llm_calls=record_llm_calls,
+                    obligation_id=obligation_id,
+                    agent=agent,
+                    shard_size=shard_size,
+                    concurrency=concurrency,
+                    resume=resume,
+                    context_budget=context_budget,
+                    project_inputs=project_inputs,
+                    output_format=output_format,
+                    escalate_to=routing.escalate_to,
+                )
+                phase_runs = list((current_parent_run / "phase1B_runs").glob("*"))
+                if phase_runs:
+                    current_parent_run = sorted(phase_runs)[-1]
+                    phase_output_dir = current_parent_run
+
+            elif phase == "locate-client":
+                if not current_parent_run:
+                    raise ValueError(f"Cannot run {phase} without previous phase output")
+                if not client_repo:
+                    raise ValueError(f"Phase {phase} requires --client-repo")
+                await arun_phase_2a(
+                    parent_run=current_parent_run,
+                    client_repo=client_repo,
+                    eip_number=eip,
+                    model=routing.model_for(phase, model),
+                    max_turns=max_turns,
+                    allowed_tools=allowed_tools,
+                    llm_mode=llm_mode,
+                    record_llm_calls=record_llm_calls,
+                    obligation_id=obligation_id,
+                    agent=agent,
+                    shard_size=shard_size,
+                    concurrency=concurrency,
+                    resume=resume,
+                    context_budget=context_budget,
+                    project_inputs=project_inputs,
+                    output_format=output_format,
+                    escalate_to=routing.escalate_to,
+                )
+                phase_runs = list((current_parent_run / "phase2A_runs").glob("*"))
+                if phase_runs:
+                    current_parent_run = sorted(phase_runs)[-1]
+                    phase_output_dir = current_parent_run
+
+            elif phase == "analyze-client":
+                if not current_parent_run:
+                    raise ValueError(f"Cannot run {phase} without previous phase output")
+                if not client_repo:
+                    raise ValueError(f"Phase {phase} requires --client-repo")
+                await arun_phase_2b(
+                    parent_run=current_parent_run,
+                    client_repo=client_repo,
+                    eip_number=eip,
+                    model=routing.model_for(phase, model),
+                    max_turns=max_turns,
+                    allowed_tools=allowed_tools,
+                    llm_mode=llm_mode,
+                    record_llm_calls=record_llm_calls,
+                    obligation_id=obligation_id,
+                    agent=agent,
+                    shard_size=shard_size,
+                    concurrency=concurrency,
+                    resume=resume,
+                    context_budget=context_budget,
+                    project_inputs=project_inputs,
+                    output_format=output_format,
+                    escalate_to=routing.escalate_to,
+                )
+                # Last phase, no update needed to current_parent_run logically for next step, 
+                # but we define phase_output_dir for logging.
+                # Usually it's in phase2B_runs/timestamp
+                phase_runs = list((current_parent_run / "phase2B_runs").glob("*"))
+                if phase_runs:
+                    phase_output_dir = sorted(phase_runs)[-1]
         
-        if phase_output_dir:
-            phase_outputs.append((phase, phase_output_dir))
+            if phase_output_dir:
+                phase_outputs.append((phase, phase_output_dir))
+    except CircuitOpenError as exc:
+        # Completed phases and shards are checkpointed; --resume picks up the rest.
+        print(f"[pipeline] EIP-{eip} parked in phase {phase}: {exc}")
+        print(f"Pipeline parked. Rerun with --resume --output-dir {run_root} to finish it.")
+        return write_pipeline_status(run_root, "parked", phase=phase, error=str(exc))
+    finally:
+        if follower:
+            follower.stop()
+        if close_agent:
+            await aclose_agent(agent)
 
     # Generate report at the end
     print("\n=== Generating Report ===")
@@ -272,3 +480,86 @@ def run_pipeline(
         # 2. Phase Artifacts (at the bottom)
         for phase, out_dir in phase_outputs:
             _log_phase_to_summary(phase, out_dir)
+    return write_pipeline_status(run_root, "complete")
+
+
+def run_pipeline(*args, **kwargs) -> dict[str, object]:
+    """Sync wrapper for :func:`arun_pipeline`."""
+    return run_sync(arun_pipeline, *args, **kwargs)
+
+
+async def arun_sweep(
+    eips: List[str],
+    output_dir: Optional[str] = None,
+    eips_dir: Optional[str] = None,
+    max_parallel: int = 10,
+    llm_mode: str = "live",
+    agent: Optional[AgentProtocol] = None,
+    **kwargs,
+) -> Path:
+    """Run the pipeline for many EIPs at once on one shared agent.
+
+    Each EIP gets its own run root ``<output_dir>/eip-<n>`` (its EIP file is
+    ``<eips_dir>/eip-<n>.md`` when ``eips_dir`` is set); at most
+    ``max_parallel`` run at a time. With a BatchAgent the tool-free calls of
+    all of them share batch jobs. A failing EIP is recorded in
+    ``sweep.json`` without stopping the others; one stopped by an open
+    circuit breaker is recorded as parked, to be finished with ``resume``.
+    """
+    sweep_root = Path(output_dir) if output_dir else Path.cwd() / "runs" / f"sweep_{timestamp()}"
+    sweep_root.mkdir(parents=True, exist_ok=True)
+    agent = agent or default_agent(llm_mode)
+    limiter = anyio.CapacityLimiter(max(1, max_parallel))
+    results: dict[str, dict[str, object]] = {}
+
+    async def run_one(eip: str) -> None:
+        run_root = sweep_root / f"eip-{eip}"
+        eip_file = str(Path(eips_dir) / f"eip-{eip}.md") if eips_dir else kwargs.get("eip_file")
+        async with limiter:
+            try:
+                status = await arun_pipeline(
+                    eip=eip,
+                    output_dir=str(run_root),
+                    llm_mode=llm_mode,
+                    agent=agent,
+                    close_agent=False,
+                    follow_events=False,
+                    **{**kwargs, "eip_file": eip_file},
+                )
+            except Exception as exc:
+                print(f"[sweep] EIP-{eip} failed: {exc}")
+                results[eip] = {"run_root": str(run_root), "status": "failed", "error": str(exc)}
+            else:
+                if status["status"] == "parked":
+                    results[eip] = {
+                        "run_root": str(run_root),
+                        "status": "parked",
+                        "error": status["error"],
+                    }
+                else:
+                    results[eip] = {"run_root": str(run_root), "status": "ok"}
+
+    try:
+        async with anyio.create_task_group() as tg:
+            for eip in eips:
+                tg.start_soon(run_one, eip)
+    finally:
+        await aclose_agent(agent)
+
+    sweep = {
+        "generated_at": timestamp(),
+        "eips": {eip: results[eip] for eip in eips if eip in results},
+        "failed": sorted(eip for eip, item in results.items() if item["status"] == "failed"),
+        "parked": sorted(eip for eip, item in results.items() if item["status"] == "parked"),
+    }
+    (sweep_root / "sweep.json").write_text(json.dumps(sweep, indent=2), encoding="utf-8")
+    done = len(eips) - len(sweep["failed"]) - len(sweep["parked"])
+    print(f"Sweep completed: {done}/{len(eips)} EIPs ok. Root: {sweep_root}")
+    if sweep["parked"]:
+        print(f"[sweep] {len(sweep['parked'])} EIPs parked; rerun with --resume to finish them")
+    return sweep_root
+
+
+def run_sweep(*args, **kwargs) -> Path:
+    """Sync wrapper for :func:`arun_sweep`."""
+    return run_sync(arun_sweep, *args, **kwargs)
@@ -0,0 +1,82 @@
+"""Column-projected input views for the CSV-driven phases.
+
+Phase CSVs accumulate columns: by 2B a row carries the statement, spec
+locations, code flow and gap text, most of which that phase's prompt never
+uses. With ``project_inputs`` the agent gets a view holding only ``id``, the
+columns its prompt reads and the columns it fills. Optionally, long
+read-only cells are truncated. The columns the phase fills are merged back
+into the full CSV by ``id``, so downstream phases see every column as before.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from .structured_output import CLIENT_COLUMNS, PHASE_OUTPUT_COLUMNS
+
+
+# Columns each phase's prompt reads (the columns it fills are added).
+PHASE_INPUT_COLUMNS: dict[str, tuple[str, ...]] = {
+    "1A": ("id", "statement"),
+    "1B": ("id", "statement", "locations"),
+    "2A": ("id", "statement", "locations", "code_flow"),
+    "2B": ("id", "statement", "client_locations", "client_code_flow"),
+}
+TRUNCATION_MARK = " [...]"
+
+
+def written_columns(phase: str) -> list[str]:
+    """Columns a phase's agent fills (2A adds every client column)."""
+    return list(CLIENT_COLUMNS if phase.startswith("2") else PHASE_OUTPUT_COLUMNS[phase])
+
+
+@dataclass(frozen=True)
+class Projection:
+    """The view of a phase's input CSV the agent reads."""
+
+    phase: str
+    columns: list[str]
+    written: list[str]
+    max_chars: Optional[int] = None
+
+    @classmethod
+    def for_phase(
+        cls, phase: str, fieldnames: list[str], project_inputs: Union[bool, int, None]
+    ) -> Optional["Projection"]:
+        """The projection for ``phase``, or None when ``project_inputs`` is off.
+
+        ``project_inputs`` is True, or a number of characters read-only cells
+        are truncated to.
+        """
+        if not project_inputs or phase not in PHASE_INPUT_COLUMNS:
+            return None
+        max_chars = None if project_inputs is True else int(project_inputs)
+        written = written_columns(phase)
+        wanted = set(PHASE_INPUT_COLUMNS[phase]) | set(written)
+        columns = [name for name in fieldnames if name in wanted]
+        return cls(phase, columns, written, max_chars)
+
+    def cell(self, name: str, value: str) -> str:
+        if self.max_chars is None or name == "id" or name in self.written:
+            return value
+        if len(value) <= self.max_chars:
+            return value
+        return value[: self.max_chars].rstrip() + TRUNCATION_MARK
+
+    def project(self, rows: list[dict[str, str]]) -> list[dict[str, str]]:
+        return [
+            {name: self.cell(name, row.get(name) or "") for name in self.columns} for row in rows
+        ]
+
+    def merge(
+        self, rows: list[dict[str, str]], view_rows: list[dict[str, str]]
+    ) -> list[dict[str, str]]:
+        """Apply the written columns of ``view_rows`` to the full ``rows`` by id."""
+        updates = {
+            (row.get("id") or "").strip(): {
+                name: row[name] for name in self.written if row.get(name) is not None
+            }
+            for row in view_rows
+        }
+        return [{**row, **updates.get((row.get("id") or "").strip(), {})} for row in rows]
@@ -0,0 +1,278 @@
+"""Cross-process rate limiting and batch budgets for agent calls."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+import anyio
+
+from .agents import AgentProtocol, acall_agent
+from .llm import ClaudeConfig
+from .telemetry import CallTelemetry
+from .utils import ensure_dir, timestamp
+
+
+DEFAULT_RATE_LIMIT_DB = Path("~/.cache/eip-verify/ratelimit.sqlite")
+DEFAULT_TOKENS_PER_CALL = 20_000
+MAX_WAIT_S = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batch_usage (
+    batch_id TEXT PRIMARY KEY,
+    calls INTEGER NOT NULL DEFAULT 0,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def new_batch_id() -> str:
+    """A batch id of its own for a run that does not share one explicitly."""
+    return f"{timestamp()}-{os.getpid()}"
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when the shared batch budget is used up."""
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    budget_usd: Optional[float] = None
+    budget_tokens: Optional[int] = None
+    tokens_per_call: int = DEFAULT_TOKENS_PER_CALL
+    # Budgets are charged per batch; processes share one by sharing its id.
+    batch_id: str = field(default_factory=new_batch_id)
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            value is not None
+            for value in (
+                self.requests_per_minute,
+                self.tokens_per_minute,
+                self.budget_usd,
+                self.budget_tokens,
+            )
+        )
+
+
+def billable_tokens(telemetry: CallTelemetry) -> int:
+    # Cache reads do not count towards input-token rate limits.
+    return (
+        telemetry.input_tokens
+        + telemetry.cache_creation_input_tokens
+        + telemetry.output_tokens
+    )
+
+
+class SharedRateLimiter:
+    """Token buckets over requests and tokens, shared through a SQLite file.
+
+    Every process pointing at the same ``db_path`` draws from the same buckets;
+    those with the same ``batch_id`` also share the budget, so a new batch
+    starts with its whole budget. Each bucket holds at most one minute of capacity and
+    refills continuously. Token cost is estimated from the running average of
+    recorded calls, then corrected once the real usage is known, so bursts of
+    expensive calls push later callers back.
+    """
+
+    def __init__(self, db_path: Path, settings: RateLimitSettings) -> None:
+        self.db_path = db_path.expanduser().resolve()
+        self.settings = settings
+        ensure_dir(self.db_path.parent)
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _bucket_level(self, conn: sqlite3.Connection, name: str, rate: float, now: float) -> float:
+        row = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return rate
+        level, updated = row
+        return min(rate, level + (now - updated) * rate / 60.0)
+
+    def _set_bucket(self, conn: sqlite3.Connection, name: str, level: float, now: float) -> None:
+        conn.execute(
+            "INSERT INTO buckets (name, level, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET level = excluded.level, updated = excluded.updated",
+            (name, level, now),
+        )
+
+    def _check_budget(self, conn: sqlite3.Connection) -> None:
+        _, tokens, cost = self._usage(conn)
+        budget_usd = self.settings.budget_usd
+        budget_tokens = self.settings.budget_tokens
+        if budget_usd is not None and cost >= budget_usd:
+            raise BudgetExceededError(
+                f"Batch budget exhausted: ${cost:.2f} spent of ${budget_usd:.2f}"
+            )
+        if budget_tokens is not None and tokens >= budget_tokens:
+            raise BudgetExceededError(
+                f"Batch token budget exhausted: {tokens} of {budget_tokens} tokens used"
+            )
+
+    def _usage(self, conn: sqlite3.Connection) -> tuple[int, int, float]:
+        row = conn.execute(
+            "SELECT calls, tokens, cost_usd FROM batch_usage WHERE batch_id = ?",
+            (self.settings.batch_id,),
+        ).fetchone()
+        if row is None:
+            return 0, 0, 0.0
+        calls, tokens, cost = row
+        return int(calls), int(tokens), float(cost)
+
+    def estimate_tokens(self) -> int:
+        with self._transaction() as conn:
+            calls, tokens, _ = self._usage(conn)
+        return int(tokens / calls) if calls else self.settings.tokens_per_call
+
+    def try_acquire(self, tokens: int) -> float:
+        """Take one request and ``tokens`` from the buckets.
+
+        Returns 0 on success, otherwise the number of seconds to wait before
+        trying again. Raises BudgetExceededError once the budget is spent.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._check_budget(conn)
+            wants = []
+            if self.settings.requests_per_minute:
+                wants.append(("requests", float(self.settings.requests_per_minute), 1.0))
+            if self.settings.tokens_per_minute:
+                rate = float(self.settings.tokens_per_minute)
+                # A single call larger than the bucket would otherwise wait forever.
+                wants.append(("tokens", rate, min(float(tokens), rate)))
+            levels = {name: self._bucket_level(conn, name, rate, now) for name, rate, _ in wants}
+            wait = 0.0
+            for name, rate, amount in wants:
+                if levels[name] < amount:
+                    wait = max(wait, (amount - levels[name]) * 60.0 / rate)
+            if wait > 0:
+                return min(wait, MAX_WAIT_S)
+            for name, _, amount in wants:
+                self._set_bucket(conn, name, levels[name] - amount, now)
+            return 0.0
+
+    async def acquire(self) -> int:
+        """Wait until a call may start; returns the token estimate that was reserved.
+
+        The sqlite transactions run in a worker thread: while another process
+        holds the database lock, the other calls on this loop keep running.
+        """
+        tokens = await anyio.to_thread.run_sync(self.estimate_tokens)
+        while True:
+            wait = await anyio.to_thread.run_sync(self.try_acquire, tokens)
+            if wait <= 0:
+                return tokens
+            await anyio.sleep(wait)
+
+    def record(
+        self, telemetry: Optional[CallTelemetry], reserved_tokens: int, aborted: bool = False
+    ) -> None:
+        """Charge the real usage of a finished call to the budget and token bucket.
+
+        An ``aborted`` call (cancelled or failed before reporting usage) may
+        still have been billed, so it is charged at least the tokens it reserved,
+        priced at the batch's average cost per token so far.
+        """
+        used = billable_tokens(telemetry) if telemetry else 0
+        if aborted:
+            used = max(used, reserved_tokens)
+        cost = telemetry.total_cost_usd if telemetry else 0.0
+        now = time.time()
+        with self._transaction() as conn:
+            if aborted and not cost:
+                _, tokens, spent = self._usage(conn)
+                cost = used * spent / tokens if tokens else 0.0
+            conn.execute(
+                "INSERT INTO batch_usage (batch_id, calls, tokens, cost_usd) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(batch_id) DO UPDATE SET calls = calls + excluded.calls, "
+                "tokens = tokens + excluded.tokens, cost_usd = cost_usd + excluded.cost_usd",
+                (self.settings.batch_id, 1 if telemetry or aborted else 0, used, cost),
+            )
+            rate = self.settings.tokens_per_minute
+            if rate and used != reserved_tokens:
+                level = self._bucket_level(conn, "tokens", float(rate), now)
+                self._set_bucket(conn, "tokens", level - (used - reserved_tokens), now)
+
+    async def arecord(
+        self, telemetry: Optional[CallTelemetry], reserved_tokens: int, aborted: bool = False
+    ) -> None:
+        """:meth:`record` in a worker thread; shielded so cancelled calls are still charged."""
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(self.record, telemetry, reserved_tokens, aborted)
+
+    def usage(self) -> dict[str, object]:
+        with self._transaction() as conn:
+            calls, tokens, cost = self._usage(conn)
+        return {
+            "batch_id": self.settings.batch_id,
+            "calls": calls,
+            "tokens": tokens,
+            "cost_usd": round(cost, 6),
+        }
+
+
+class RateLimitedAgent:
+    """Agent wrapper that consults a SharedRateLimiter before every call."""
+
+    def __init__(self, inner: AgentProtocol, limiter: SharedRateLimiter) -> None:
+        self.inner = inner
+        self.limiter = limiter
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        reserved = await self.limiter.acquire()
+        try:
+            telemetry = await acall_agent(self.inner, prompt, output_path, cwd, config, metadata)
+        except BaseException:
+            # Hedged losers are cancelled mid-call; their tokens are spent all the same.
+            await self.limiter.arecord(None, reserved, aborted=True)
+            raise
+        await self.limiter.arecord(telemetry, reserved)
+        return telemetry
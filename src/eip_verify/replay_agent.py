@@ -0,0 +1,249 @@
+"""Replay agent that serves recorded sessions for offline benchmarking."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import anyio
+
+from .llm import CallStream, ClaudeConfig, write_llm_call_record
+from .runner import infer_eip_number_from_csv, read_csv_rows, write_csv_rows
+from .structured_output import render_json_rows
+from .telemetry import CallTelemetry, TelemetryRecorder
+
+
+# The recorded runs shipped with the repo, wherever the command is run from.
+DEFAULT_REPLAY_DIR = Path(__file__).resolve().parents[2] / "examples" / "runs"
+
+OUTPUT_PATTERN = re.compile(r"^phase(\w+)_output\.txt$")
+RUN_DIR_PATTERN = re.compile(r"^\d{8}_\d{6}$")
+
+
+@dataclass(frozen=True)
+class ReplaySession:
+    phase: str
+    eip_number: Optional[str]
+    run_dir: Path
+    output_path: Path
+    csv_paths: list[Path]
+    telemetry: Optional[CallTelemetry]
+    latency_s: Optional[float]
+
+
+def _parse_run_timestamp(path: Path) -> Optional[datetime]:
+    if not RUN_DIR_PATTERN.match(path.name):
+        return None
+    return datetime.strptime(path.name, "%Y%m%d_%H%M%S")
+
+
+def _recorded_telemetry(output_path: Path) -> Optional[CallTelemetry]:
+    record_path = output_path.with_suffix(".call.json")
+    if not record_path.exists():
+        return None
+    try:
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    data = record.get("telemetry")
+    return CallTelemetry.from_dict(data) if isinstance(data, dict) else None
+
+
+def _derived_latency(run_dir: Path) -> Optional[float]:
+    """Approximate a call's latency from the gap to the next phase's run dir.
+
+    Run dirs are named after their start time, and a child phase starts right
+    after its parent's single agent call finishes.
+    """
+    started = _parse_run_timestamp(run_dir)
+    if started is None:
+        return None
+    children = [
+        stamp
+        for child in run_dir.glob("phase*_runs/*")
+        if (stamp := _parse_run_timestamp(child)) is not None and stamp >= started
+    ]
+    if not children:
+        return None
+    return (min(children) - started).total_seconds()
+
+
+def load_session(output_path: Path) -> Optional[ReplaySession]:
+    match = OUTPUT_PATTERN.match(output_path.name)
+    if not match:
+        return None
+    run_dir = output_path.parent
+    csv_paths = sorted(path for path in run_dir.glob("*.csv") if not path.name.startswith("input_"))
+    eip_number = next(
+        (eip for path in csv_paths if (eip := infer_eip_number_from_csv(path))), None
+    )
+    telemetry = _recorded_telemetry(output_path)
+    latency = telemetry.wall_time_s if telemetry and telemetry.wall_time_s else _derived_latency(run_dir)
+    return ReplaySession(
+        phase=match.group(1).upper(),
+        eip_number=eip_number,
+        run_dir=run_dir,
+        output_path=output_path,
+        csv_paths=csv_paths,
+        telemetry=telemetry,
+        latency_s=latency,
+    )
+
+
+class ReplayLibrary:
+    """Index of recorded sessions under ``root`` keyed by (phase, EIP).
+
+    Any directory holding a ``phase<XX>_output.txt`` counts as a session; its
+    CSVs, ``.call.json`` telemetry and timing come along with it. When several
+    sessions match, the most recent one wins, so replays are deterministic.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.expanduser().resolve()
+        if not self.root.exists():
+            raise FileNotFoundError(f"Replay directory not found: {self.root}")
+        self.sessions: dict[tuple[str, Optional[str]], list[ReplaySession]] = {}
+        for output_path in sorted(self.root.rglob("phase*_output.txt")):
+            session = load_session(output_path)
+            if session is None:
+                continue
+            key = (session.phase, session.eip_number)
+            self.sessions.setdefault(key, []).append(session)
+        for sessions in self.sessions.values():
+            sessions.sort(key=lambda item: (item.run_dir.name, str(item.run_dir)))
+
+    def find(self, phase: str, eip_number: Optional[str]) -> ReplaySession:
+        """Latest session for (phase, EIP); any session of the phase as a fallback."""
+        phase = phase.upper()
+        exact = self.sessions.get((phase, eip_number))
+        if exact:
+            return exact[-1]
+        same_phase = [
+            session
+            for (key_phase, _), sessions in sorted(
+                self.sessions.items(), key=lambda item: (item[0][0], item[0][1] or "")
+            )
+            if key_phase == phase
+            for session in sessions
+        ]
+        if not same_phase:
+            raise FileNotFoundError(f"No recorded session for phase {phase} under {self.root}")
+        return same_phase[-1]
+
+
+def _projected_rows(
+    recorded_csv: Path, input_csv: Optional[Path]
+) -> tuple[list[str], list[dict[str, str]]]:
+    """The recorded rows that belong to ``input_csv`` (all rows without one).
+
+    Rows are matched by id; if none match (a session borrowed from another
+    EIP), the first rows are used positionally and take the input ids.
+    """
+    fieldnames, rows = read_csv_rows(recorded_csv)
+    if input_csv is None or not input_csv.exists():
+        return fieldnames, rows
+    input_fields, input_rows = read_csv_rows(input_csv)
+    by_id = {(row.get("id") or "").strip(): row for row in rows}
+    wanted = [(row.get("id") or "").strip() for row in input_rows]
+    if any(row_id in by_id for row_id in wanted):
+        projected = [by_id.get(row_id, row) for row_id, row in zip(wanted, input_rows)]
+    else:
+        projected = [
+            {**recorded, "id": row_id} for row_id, recorded in zip(wanted, rows)
+        ]
+    fieldnames += [name for name in input_fields if name not in fieldnames]
+    return fieldnames, projected
+
+
+def _project_rows(recorded_csv: Path, input_csv: Optional[Path], output_csv: Path) -> None:
+    write_csv_rows(output_csv, *_projected_rows(recorded_csv, input_csv))
+
+
+class ReplayAgent:
+    """Agent that replays recorded output text and CSVs instead of calling the API.
+
+    ``latency_scale`` reproduces the recorded call latency (1.0 = real time,
+    0 = as fast as possible), so orchestration can be benchmarked offline.
+    A call for an EIP without recordings is served another EIP's session with
+    a warning, and its telemetry names that EIP (``replayed_from``), which the
+    phase manifest lists as ``replayed_from_eips``. Call records are written
+    only with ``config.record_calls``, as for live calls.
+    """
+
+    def __init__(self, library: ReplayLibrary, latency_scale: float = 0.0) -> None:
+        self.library = library
+        self.latency_scale = latency_scale
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        recorder = TelemetryRecorder(model=config.model)
+        phase = str(metadata.get("phase") or "")
+        eip_number = str(metadata.get("eip_number")) if metadata.get("eip_number") else None
+        session = self.library.find(phase, eip_number)
+        borrowed = eip_number is not None and session.eip_number != eip_number
+        if borrowed:
+            print(
+                f"[replay] WARNING no recorded phase {phase.upper()} session for EIP "
+                f"{eip_number}; replaying EIP {session.eip_number} from {session.run_dir}"
+            )
+
+        if self.latency_scale > 0 and session.latency_s:
+            await anyio.sleep(session.latency_s * self.latency_scale)
+
+        replay = {"source": str(session.output_path), "eip_number": session.eip_number}
+        text = session.output_path.read_text(encoding="utf-8", errors="replace")
+        output_csv = Path(str(metadata["output_csv"])) if metadata.get("output_csv") else None
+        input_csv = Path(str(metadata["input_csv"])) if metadata.get("input_csv") else None
+        recorded = None
+        if output_csv is not None:
+            recorded = next(
+                (path for path in session.csv_paths if path.name == output_csv.name),
+                session.csv_paths[0] if session.csv_paths else None,
+            )
+        json_mode = metadata.get("output_format") == "json"
+        if json_mode and recorded is not None:
+            # Recorded sessions wrote CSVs; serve their rows as a JSON reply.
+            text += "\n" + render_json_rows(phase, _projected_rows(recorded, input_csv)[1])
+
+        with CallStream(output_path) as stream:
+            stream.write_text(text)
+            stream.write_event("assistant_text", text=text)
+        if recorded is not None and not json_mode:
+            _project_rows(recorded, input_csv, output_csv)
+
+        telemetry = recorder.finish()
+        if session.telemetry is not None:
+            replayed = CallTelemetry.from_dict(session.telemetry.to_dict())
+            replayed.wall_time_s = telemetry.wall_time_s
+            telemetry = replayed
+        telemetry.replayed_from = session.eip_number if borrowed else None
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=prompt,
+                options_kwargs={},
+                config=config,
+                used_fake=True,
+                extra={"replay": replay, "telemetry": telemetry.to_dict()},
+            )
+        return telemetry
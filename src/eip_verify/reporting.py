@@ -7,6 +7,7 @@ import json
 from pathlib import Path
 from typing import Optional, Any
 
+from .telemetry import add_totals
 from .utils import ensure_dir, timestamp
 
 PHASE_DESCRIPTIONS = {
@@ -24,6 +25,8 @@ CONFIG_KEYS = [
     "record_llm_calls",
     "allowed_tools",
     "obligation_id",
+    "shard_size",
+    "concurrency",
 ]
 
 
@@ -123,6 +126,26 @@ def _analyze_csv(csv_path: Path) -> dict[str, Any]:
     }
 
 
+def _telemetry_lines(telemetry: dict) -> list[str]:
+    lines = [
+        "## Telemetry",
+        "",
+        "| Phase | Calls | Turns | Input tokens | Output tokens | Cache read | Cache write | Cost (USD) | Wall time (s) |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    rows = [*telemetry.get("phases", {}).items(), ("Total", telemetry.get("total", {}))]
+    for phase, data in rows:
+        lines.append(
+            f"| {phase} | {data.get('calls', 0)} | {data.get('num_turns', 0)} "
+            f"| {data.get('input_tokens', 0)} | {data.get('output_tokens', 0)} "
+            f"| {data.get('cache_read_input_tokens', 0)} "
+            f"| {data.get('cache_creation_input_tokens', 0)} "
+            f"| {float(data.get('total_cost_usd', 0.0)):.4f} "
+            f"| {float(data.get('wall_time_s', 0.0)):.1f} |"
+        )
+    return lines
+
+
 def _find_run_root(path: Path) -> Path:
     current = path.resolve()
     for parent in [current, *current.parents]:
@@ -224,6 +247,16 @@ def build_summary(run_root: Path) -> dict[str, object]:
     
     csv_analysis = _analyze_csv(Path(analysis_csv)) if analysis_csv else None
 
+    phase_telemetry = {
+        phase: manifest["telemetry"]
+        for phase, manifest in sorted(latest_by_phase.items())
+        if manifest and isinstance(manifest.get("telemetry"), dict)
+    }
+    telemetry = {
+        "phases": phase_telemetry,
+        "total": add_totals(phase_telemetry.values()),
+    } if phase_telemetry else None
+
     summary: dict[str, object] = {
         "run_root": str(run_root),
         "generated_at": timestamp(),
@@ -239,6 +272,7 @@ def build_summary(run_root: Path) -> dict[str, object]:
         "run_config": run_config,
         "csv_analysis": csv_analysis,
         "analysis_phase": analysis_phase,
+        "telemetry": telemetry,
         "manifests": [
             {"phase": m.get("_phase"), "path": m.get("_path")}
             for m in sorted(manifests, key=lambda x: x.get("_path", ""))
@@ -290,6 +324,7 @@ def write_report(
             f"- Record LLM calls: {format_value(run_config.get('record_llm_calls'))}",
             f"- Allowed tools: {format_value(run_config.get('allowed_tools'))}",
             f"- Obligation filter: {format_value(run_config.get('obligation_id'))}",
+            f"- Shard size: {format_value(run_config.get('shard_size'))}",
             "",
             "## Phases",
         ]
@@ -323,6 +358,11 @@ def write_report(
             lines.append(json.dumps(summary["spec_map_check"], indent=2))
             lines.append("```")
         
+        telemetry = summary.get("telemetry")
+        if telemetry:
+            lines.append("")
+            lines.extend(_telemetry_lines(telemetry))
+
         analysis = summary.get("csv_analysis")
         phase_label_str = summary.get("analysis_phase") or "Unknown"
         
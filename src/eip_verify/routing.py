@@ -0,0 +1,76 @@
+"""Per-phase model routing and escalation to stronger models."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Mapping, Optional, Sequence, Union
+
+
+PHASE_ALIASES = {
+    "extract": "0A",
+    "locate-spec": "1A",
+    "analyze-spec": "1B",
+    "locate-client": "2A",
+    "analyze-client": "2B",
+}
+PHASE_IDS = ("0A", "1A", "1B", "2A", "2B")
+
+
+def normalize_phase(phase: str) -> str:
+    value = phase.strip()
+    value = PHASE_ALIASES.get(value.lower(), value.upper())
+    if value not in PHASE_IDS:
+        raise ValueError(f"Unknown phase in model routing: {phase}")
+    return value
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_models(value: Union[None, str, Mapping[str, str]]) -> dict[str, str]:
+    """Parse ``{"1A": model}`` or ``"1A=model,2A=model"`` into phase ids -> model."""
+    if not value:
+        return {}
+    if isinstance(value, str):
+        pairs = []
+        for item in _split(value):
+            phase, sep, model = item.partition("=")
+            if not sep or not model.strip():
+                raise ValueError(f"models entries must look like PHASE=MODEL: {item}")
+            pairs.append((phase, model.strip()))
+    else:
+        pairs = [(str(phase), str(model)) for phase, model in value.items()]
+    return {normalize_phase(phase): model for phase, model in pairs}
+
+
+def parse_escalation(value: Union[None, str, Sequence[str]]) -> tuple[str, ...]:
+    if not value:
+        return ()
+    items = _split(value) if isinstance(value, str) else [str(item).strip() for item in value]
+    return tuple(item for item in items if item)
+
+
+@dataclass(frozen=True)
+class ModelRouting:
+    """Model per phase plus an escalation ladder, weakest to strongest.
+
+    Phases without an entry in ``models`` use the run's default model. A call
+    whose output fails validation is rerun on the next model of
+    ``escalate_to`` after the one it ran on (from the bottom when its model is
+    not listed).
+    """
+
+    models: dict[str, str] = field(default_factory=dict)
+    escalate_to: tuple[str, ...] = ()
+
+    def model_for(self, phase: str, default: Optional[str] = None) -> Optional[str]:
+        return self.models.get(normalize_phase(phase), default)
+
+
+def escalation_chain(model: Optional[str], escalate_to: Sequence[str]) -> list[str]:
+    """Models to try, in order, after a call on ``model`` fails validation."""
+    ladder = list(escalate_to)
+    if model in ladder:
+        return ladder[ladder.index(model) + 1 :]
+    return [item for item in ladder if item != model]
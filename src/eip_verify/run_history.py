@@ -0,0 +1,192 @@
+"""Per-call samples read from recorded runs.
+
+Turn budgets (``max_turns=auto``), shard budgets (``shard_size=auto``),
+hedge thresholds and pre-flight estimates all learn from the
+``run_manifest.json`` files under their history dirs. This module walks
+those dirs, reads each manifest once and validates each recorded output CSV
+once per process, however many consumers ask for it.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .context_pack import estimate_tokens
+from .structured_output import read_csv_rows, validate_phase_output
+
+
+DEFAULT_HISTORY = Path("runs")
+
+
+def eip_size(eip_path: Optional[Path]) -> float:
+    """Size of an EIP for phase 0A budgets, in kilotokens."""
+    if eip_path is None or not eip_path.is_file():
+        return 0.0
+    return estimate_tokens(eip_path.read_text(encoding="utf-8", errors="replace")) / 1000
+
+
+def call_size(
+    phase: str,
+    input_csv: Optional[Path] = None,
+    eip_file: Optional[Path] = None,
+    obligation_id: Optional[str] = None,
+) -> float:
+    """Size of one unsharded call: rows it covers, or EIP kilotokens for phase 0A."""
+    if phase == "0A":
+        return eip_size(eip_file)
+    if obligation_id:
+        return 1.0
+    if input_csv is None or not input_csv.is_file():
+        return 0.0
+    return float(len(read_csv_rows(input_csv)[1]))
+
+
+@dataclass(frozen=True)
+class CallSample:
+    """One recorded agent call (a shard, or a whole unsharded phase).
+
+    ``rows`` is the rows the call covered (EIP kilotokens for phase 0A).
+    ``turns`` and ``wall_time_s`` are per call; ``turns`` is None for batched
+    calls and ``wall_time_s`` is None when every call was batched or served
+    from the cache. ``passed`` says whether the output validated without
+    escalation. ``budget`` is the row-token budget an auto-sized shard was
+    planned with.
+    """
+
+    phase: str
+    rows: float
+    turns: Optional[float]
+    wall_time_s: Optional[float]
+    passed: bool
+    max_turns: Optional[int] = None
+    shard: Optional[int] = None
+    row_tokens: Optional[int] = None
+    budget: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class RecordedRun:
+    """A phase run directory, its manifest and the calls it recorded."""
+
+    run_dir: Path
+    manifest: dict
+    calls: tuple[CallSample, ...]
+
+    @property
+    def phase(self) -> str:
+        return str(self.manifest["phase"])
+
+
+def _per_call(telemetry: dict) -> tuple[Optional[float], Optional[float]]:
+    calls = int(telemetry.get("calls") or 0)
+    batched = int(telemetry.get("batched_calls") or 0)
+    turns = telemetry.get("num_turns")
+    # Batched calls are single tool-free turns; they say nothing about agent sessions.
+    per_turns = float(turns) / calls if turns and not batched else None
+    live = calls - batched - int(telemetry.get("cache_hits") or 0)
+    seconds = float(telemetry.get("wall_time_s") or 0.0)
+    return per_turns, seconds / live if live > 0 else None
+
+
+def _call_samples(manifest: dict) -> tuple[CallSample, ...]:
+    phase = str(manifest["phase"])
+    cap = manifest.get("max_turns")
+    cap = int(cap) if isinstance(cap, int) else None
+    escalated = {item.get("shard") for item in manifest.get("escalations") or []}
+    planned = manifest.get("shard_tokens")
+
+    def passed(
+        output_csv: Optional[str], row_ids: Optional[list[str]], shard: Optional[int]
+    ) -> bool:
+        if shard in escalated or not output_csv:
+            return False
+        return not validate_phase_output(phase, Path(output_csv), row_ids)
+
+    samples = []
+    for shard in manifest.get("shards") or []:
+        telemetry = shard.get("telemetry")
+        if not isinstance(telemetry, dict) or not telemetry.get("calls"):
+            continue
+        turns, seconds = _per_call(telemetry)
+        row_ids = list(shard.get("row_ids") or [])
+        samples.append(
+            CallSample(
+                phase=phase,
+                rows=float(len(row_ids)),
+                turns=turns,
+                wall_time_s=seconds,
+                passed=passed(shard.get("output_csv"), row_ids, shard.get("index")),
+                max_turns=shard.get("max_turns") or cap,
+                shard=shard.get("index"),
+                row_tokens=shard.get("row_tokens"),
+                budget=int(planned) if planned else None,
+            )
+        )
+    if manifest.get("shards"):
+        return tuple(samples)
+
+    telemetry = manifest.get("telemetry")
+    if not isinstance(telemetry, dict) or not telemetry.get("calls"):
+        return ()
+    turns, seconds = _per_call(telemetry)
+    rows = call_size(
+        phase,
+        Path(manifest["input_csv"]) if manifest.get("input_csv") else None,
+        Path(manifest["eip_file"]) if manifest.get("eip_file") else None,
+        manifest.get("obligation_id"),
+    )
+    row_ids = [manifest["obligation_id"]] if manifest.get("obligation_id") else None
+    return (
+        CallSample(
+            phase=phase,
+            rows=rows,
+            turns=turns,
+            wall_time_s=seconds,
+            passed=passed(manifest.get("output_csv"), row_ids, None),
+            max_turns=cap,
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _read_run(path: Path, mtime_ns: int) -> Optional[RecordedRun]:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or not manifest.get("phase"):
+        return None
+    return RecordedRun(path.parent, manifest, _call_samples(manifest))
+
+
+def load_runs(roots: Iterable[Path]) -> list[RecordedRun]:
+    """Phase runs recorded under ``roots``, each manifest once."""
+    runs = []
+    seen: set[Path] = set()
+    for root in roots:
+        root = Path(root).expanduser()
+        if not root.exists():
+            continue
+        for path in sorted(root.rglob("run_manifest.json")):
+            resolved = path.resolve()
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+            try:
+                mtime_ns = resolved.stat().st_mtime_ns
+            except OSError:
+                continue
+            run = _read_run(resolved, mtime_ns)
+            if run is not None:
+                runs.append(run)
+    return runs
+
+
+def load_calls(roots: Iterable[Path]) -> Iterator[CallSample]:
+    """Every call recorded under ``roots``."""
+    for run in load_runs(roots):
+        yield from run.calls
@@ -3,17 +3,37 @@
 from __future__ import annotations
 
 import csv
+import inspect
 import json
 import re
 import shutil
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence, TypeVar, Union
 
-from .agents import AgentProtocol
+import anyio
+
+from .agents import AgentProtocol, acall_agent, aclose_agent
+from .circuit import CircuitOpenError
+from .context_pack import ContextIndex, build_context_pack, render_context_pack
 from .llm import ClaudeConfig, build_claude_config, config_metadata
+from .projection import Projection
 from .prompts import load_prompt
 from .spec_index import write_spec_index_bundle
+from .routing import escalation_chain
+from .structured_output import (
+    StructuredOutputError,
+    json_prompt,
+    merge_structured_rows,
+    output_fieldnames,
+    parse_structured_rows,
+    read_csv_rows,
+    validate_phase_output,
+)
+from .run_history import eip_size
+from .telemetry import CallTelemetry, summarize_telemetry
+from .shard_budget import ShardBudget, row_tokens, shard_budget_for, shard_size_metadata
+from .turn_budget import TurnBudget, turn_budget_for
 from .utils import ensure_dir, timestamp
 
 
@@ -119,30 +139,70 @@ class PhaseContext:
     input_csv: Optional[Path] = None
     output_csv: Optional[Path] = None
     eip_number: Optional[str] = None
+    output_format: str = "csv"
+    # The EIP markdown a phase reads by path (0A).
+    eip_file: Optional[Path] = None
+    # Whether prompts inline repo slices (context_budget), so the call needs no tools.
+    repo_context: bool = False
 
 
-def run_query(
+T = TypeVar("T")
+
+
+def run_sync(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """Drive an async runner to completion on a fresh event loop.
+
+    Long-lived resources of the ``agent`` argument (client sessions), passed
+    by keyword or by position, are bound to that loop, so they are closed
+    before it ends.
+    """
+    agent = inspect.signature(func).bind_partial(*args, **kwargs).arguments.get("agent")
+
+    async def main() -> T:
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            await aclose_agent(agent)
+
+    return anyio.run(main)
+
+
+def context_metadata(context: PhaseContext) -> dict[str, object]:
+    return {
+        "phase": context.phase,
+        "input_csv": str(context.input_csv) if context.input_csv else None,
+        "output_csv": str(context.output_csv) if context.output_csv else None,
+        "eip_number": context.eip_number,
+        "output_format": context.output_format,
+        "eip_file": str(context.eip_file) if context.eip_file else None,
+        "repo_context": context.repo_context,
+    }
+
+
+async def arun_query(
     prompt: str,
     output_path: Path,
     cwd: Path,
     config: ClaudeConfig,
     agent: AgentProtocol,
     context: PhaseContext,
-) -> None:
-    agent.run(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        {
-            "phase": context.phase,
-            "input_csv": str(context.input_csv) if context.input_csv else None,
-            "output_csv": str(context.output_csv) if context.output_csv else None,
-            "eip_number": context.eip_number,
-        },
+) -> Optional[CallTelemetry]:
+    return await acall_agent(
+        agent, prompt, output_path, cwd, config, context_metadata(context)
     )
 
 
+def run_query(
+    prompt: str,
+    output_path: Path,
+    cwd: Path,
+    config: ClaudeConfig,
+    agent: AgentProtocol,
+    context: PhaseContext,
+) -> Optional[CallTelemetry]:
+    return run_sync(arun_query, prompt, output_path, cwd, config, agent, context)
+
+
 def write_prompt(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
@@ -153,17 +213,613 @@ def copy_csv(source: Path, dest: Path) -> None:
     shutil.copy2(source, dest)
 
 
-def run_phase_0a(
+def write_csv_rows(path: Path, fieldnames: list[str], rows: list[dict[str, str]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({name: row.get(name) or "" for name in fieldnames})
+
+
+def write_structured_output(
+    phase: str,
+    output_path: Path,
+    output_csv: Path,
+    input_fields: list[str],
+    rows: list[dict[str, str]],
+    row_ids: Optional[list[str]] = None,
+) -> None:
+    """Validate a ``json`` mode reply and write the phase CSV from it."""
+    text = output_path.read_text(encoding="utf-8") if output_path.exists() else ""
+    updates = parse_structured_rows(phase, text, row_ids)
+    merged = updates if phase == "0A" else merge_structured_rows(rows, updates)
+    write_csv_rows(output_csv, output_fieldnames(phase, input_fields), merged)
+
+
+def write_run_manifest(run_dir: Path, manifest: dict[str, object]) -> None:
+    (run_dir / "run_manifest.json").write_text(
+        json.dumps(manifest, indent=2), encoding="utf-8"
+    )
+
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def write_checkpoint(run_dir: Path, **fields: object) -> None:
+    """Mark a phase (or shard) run directory as complete."""
+    payload = {"status": "complete", "completed_at": timestamp(), **fields}
+    staging = run_dir / f".{CHECKPOINT_FILE}.tmp"
+    staging.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    staging.replace(run_dir / CHECKPOINT_FILE)
+
+
+def read_checkpoint(run_dir: Path) -> Optional[dict[str, object]]:
+    path = run_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    return data if data.get("status") == "complete" else None
+
+
+def prepare_run_dir(runs_root: Path, resume: bool = False) -> tuple[Path, bool]:
+    """Pick the run directory for a phase under ``runs_root``.
+
+    Returns ``(run_dir, complete)``. Without ``resume`` a fresh timestamped
+    directory is created. With it, the latest existing directory is reused:
+    ``complete`` is True when it already holds a checkpoint, otherwise the
+    phase reruns inside it and keeps any finished shards.
+    """
+    if resume and runs_root.exists():
+        existing = sorted(path for path in runs_root.iterdir() if path.is_dir())
+        if existing:
+            latest = existing[-1]
+            return latest, read_checkpoint(latest) is not None
+    run_dir = runs_root / timestamp()
+    ensure_dir(run_dir)
+    return run_dir, False
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    row_ids: list[str]
+    run_dir: Path
+    input_csv: Path
+    output_csv: Path
+    rows: list[dict[str, str]] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class Escalation:
+    """A call whose output failed validation and was rerun on a stronger model."""
+
+    shard: Optional[int]
+    from_model: Optional[str]
+    to_model: str
+    problems: list[str]
+    telemetry: Optional[CallTelemetry]
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "shard": self.shard,
+            "from_model": self.from_model,
+            "to_model": self.to_model,
+            "problems": self.problems,
+            "telemetry": summarize_telemetry([self.telemetry]),
+        }
+
+
+@dataclass
+class PhaseCalls:
+    shards: list[Shard]
+    telemetry: list[Optional[CallTelemetry]]
+    escalations: list[Escalation] = field(default_factory=list)
+    # Per call (shard index) turn caps picked by a TurnBudget; empty without one.
+    max_turns: list[Optional[int]] = field(default_factory=list)
+    # Row-token budget of each shard, picked by a ShardBudget.
+    shard_tokens: Optional[int] = None
+
+
+def phase_turns(max_turns: Union[int, str, TurnBudget]) -> tuple[int, Optional[TurnBudget]]:
+    """The phase's base ``max_turns`` and, for ``auto``, the budget that adapts it per call."""
+    turn_budget = turn_budget_for(max_turns)
+    if turn_budget is not None:
+        return turn_budget.fallback, turn_budget
+    return int(max_turns), None
+
+
+def turn_budget_metadata(turn_budget: Optional[TurnBudget]) -> dict[str, object]:
+    return {"max_turns_mode": "auto"} if turn_budget is not None else {}
+
+
+def budget_config(
+    config: ClaudeConfig, turn_budget: Optional[TurnBudget], phase: str, size: float
+) -> ClaudeConfig:
+    if turn_budget is None:
+        return config
+    return replace(config, max_turns=turn_budget.turns_for(phase, size))
+
+
+async def arun_escalating(
+    *,
+    phase: str,
+    config: ClaudeConfig,
+    escalate_to: Sequence[str],
+    call: Callable[[ClaudeConfig], Awaitable[Optional[CallTelemetry]]],
+    finish: Callable[[], list[str]],
+    shard: Optional[int] = None,
+    output_csv: Optional[Path] = None,
+) -> tuple[Optional[CallTelemetry], list[Escalation]]:
+    """Run ``call`` and rerun it on stronger models while ``finish`` reports problems.
+
+    ``finish`` writes/validates the call output and returns its problems; a
+    StructuredOutputError it raises counts as one. Once ``escalate_to`` is
+    exhausted the last output is kept (errors are raised). ``output_csv``, the
+    CSV the agent edits, is put back as it was before the first call ahead of
+    each rerun, so escalated runs do not build on the weaker model's output.
+    """
+    chain = escalation_chain(config.model, escalate_to)
+    escalations: list[Escalation] = []
+    seed = output_csv.read_bytes() if output_csv and output_csv.exists() else None
+    while True:
+        telemetry = await call(config)
+        try:
+            problems = finish()
+        except StructuredOutputError as exc:
+            if not chain:
+                raise
+            problems = [str(exc)]
+        if problems and chain:
+            next_model = chain.pop(0)
+            where = f" shard {shard:03d}" if shard is not None else ""
+            print(
+                f"[escalate] phase {phase}{where}: {len(problems)} problem(s) on "
+                f"{config.model or 'default model'}, rerunning on {next_model}"
+            )
+            escalations.append(
+                Escalation(shard, config.model, next_model, problems[:20], telemetry)
+            )
+            config = replace(config, model=next_model)
+            if output_csv is not None:
+                if seed is not None:
+                    output_csv.write_bytes(seed)
+                else:
+                    output_csv.unlink(missing_ok=True)
+            continue
+        if problems:
+            print(f"[escalate] phase {phase}: keeping output with {len(problems)} problem(s)")
+        return telemetry, escalations
+
+
+def plan_shards(rows: list[dict[str, str]], shard_size: int) -> list[list[dict[str, str]]]:
+    """Split obligation rows into consecutive groups of at most ``shard_size``."""
+    if shard_size < 1:
+        raise ValueError(f"shard_size must be >= 1: {shard_size}")
+    return [rows[start : start + shard_size] for start in range(0, len(rows), shard_size)]
+
+
+LOCATION_FILE_RE = re.compile(r"[\w./-]+\.\w+")
+
+
+def row_module(phase: str, row: dict[str, str]) -> str:
+    """What a row is grouped by when packing shards.
+
+    The first file in its client locations (phase 2B), else in its spec
+    locations; rows without locations group by category.
+    """
+    refs = (row.get("client_locations") or "") if phase == "2B" else ""
+    match = LOCATION_FILE_RE.search(refs) or LOCATION_FILE_RE.search(row.get("locations") or "")
+    if match:
+        return match.group(0)
+    return f"category:{(row.get('category') or '').strip()}"
+
+
+def plan_token_shards(
+    phase: str, rows: list[dict[str, str]], token_budget: int
+) -> list[list[dict[str, str]]]:
+    """Pack rows into shards of at most ``token_budget`` row tokens.
+
+    Rows of the same module (see :func:`row_module`) travel together: a
+    group that fits a shard is never split across two, and a shard is closed
+    early rather than start a group it cannot finish. Groups keep the order
+    of their first row; a single row over budget gets a shard of its own.
+    """
+    if token_budget < 1:
+        raise ValueError(f"token_budget must be >= 1: {token_budget}")
+    groups: dict[str, list[dict[str, str]]] = {}
+    for row in rows:
+        groups.setdefault(row_module(phase, row), []).append(row)
+    shards: list[list[dict[str, str]]] = []
+    current: list[dict[str, str]] = []
+    used = 0
+    for group in groups.values():
+        group_tokens = sum(row_tokens(row) for row in group)
+        if current and used + group_tokens > token_budget and group_tokens <= token_budget:
+            shards.append(current)
+            current, used = [], 0
+        for row in group:
+            tokens = row_tokens(row)
+            if current and used + tokens > token_budget:
+                shards.append(current)
+                current, used = [], 0
+            current.append(row)
+            used += tokens
+    if current:
+        shards.append(current)
+    return shards
+
+
+def merge_shard_outputs(
+    input_csv: Path,
+    shards: list[Shard],
+    output_csv: Path,
+    columns: Optional[list[str]] = None,
+) -> None:
+    """Merge per-shard CSVs back into one CSV in the input row order.
+
+    Rows are matched by ``id``; rows that no shard produced are kept unchanged
+    and columns added by any shard are appended after the input columns.
+    With ``columns`` only those are taken from the shards (projected views).
+    """
+    fieldnames, rows = read_csv_rows(input_csv)
+    updates: dict[str, dict[str, str]] = {}
+    for shard in shards:
+        if not shard.output_csv.exists():
+            raise FileNotFoundError(
+                f"Shard {shard.index} did not produce {shard.output_csv}"
+            )
+        shard_fields, shard_rows = read_csv_rows(shard.output_csv)
+        for name in shard_fields:
+            if name not in fieldnames:
+                fieldnames.append(name)
+        wanted = set(shard.row_ids)
+        for position, row in enumerate(shard_rows):
+            row_id = (row.get("id") or "").strip()
+            if row_id not in wanted and position < len(shard.row_ids):
+                # Agents occasionally rewrite ids; fall back to row position.
+                row_id = shard.row_ids[position]
+            if row_id in wanted:
+                updates[row_id] = (
+                    row if columns is None else {name: row[name] for name in columns if row.get(name) is not None}
+                )
+    merged = []
+    for row in rows:
+        update = updates.get((row.get("id") or "").strip())
+        merged.append({**row, **update} if update else row)
+    write_csv_rows(output_csv, fieldnames, merged)
+
+
+async def arun_phase_calls(
+    *,
+    phase: str,
+    run_dir: Path,
+    input_csv: Path,
+    output_csv: Path,
+    render_prompt: Callable[[Path, Path, Optional[str]], str],
+    cwd: Path,
+    config: ClaudeConfig,
+    agent: AgentProtocol,
+    eip_number: str,
+    obligation_id: Optional[str] = None,
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    seed_output: bool = True,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    context_root: Optional[Path] = None,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
+    turn_budget: Optional[TurnBudget] = None,
+    project_inputs: Union[bool, int] = False,
+) -> PhaseCalls:
+    """Run the agent call(s) for a CSV-driven phase.
+
+    Without ``shard_size`` a single prompt covers the whole CSV. With it, the
+    input rows are split into shards under ``run_dir/shards``, run concurrently
+    (at most ``concurrency`` at a time) and merged into ``output_csv``. Each
+    finished shard writes a checkpoint; with ``resume`` those shards are kept
+    as long as they cover the same rows. ``shard_size="auto"`` (or a
+    ShardBudget) packs rows into shards of a learned row-token budget
+    instead, keeping rows of the same module together.
+
+    With ``context_budget`` (tokens) each prompt gets the repo slices most
+    relevant to its rows appended, searched under ``context_root`` (``cwd``
+    by default).
+
+    With ``output_format="json"`` the prompts carry the rows inline and ask
+    for a JSON reply; the runner validates it and writes each CSV itself.
+
+    With ``escalate_to`` every call's output is validated and the call is
+    rerun on the next stronger model while rows are missing or empty.
+
+    With ``turn_budget`` each call's ``max_turns`` is picked from the turns
+    past calls of the phase with a similar number of rows needed.
+
+    With ``project_inputs`` the agent reads (and edits) a view of the input
+    holding only the columns the phase uses; an int also truncates read-only
+    cells to that many characters. The columns the phase fills are merged
+    back into ``output_csv``.
+    """
+    context_index = ContextIndex(context_root or cwd) if context_budget else None
+    json_mode = output_format == "json"
+
+    async def build_prompt(prompt: str, rows: list[dict[str, str]]) -> str:
+        if json_mode:
+            prompt = json_prompt(prompt, phase, view_rows(rows))
+        if context_index is None:
+            return prompt
+        slices = await anyio.to_thread.run_sync(
+            build_context_pack, context_index, rows, eip_number, int(context_budget)
+        )
+        return prompt + render_context_pack(slices, context_index.root)
+
+    fieldnames, all_rows = read_csv_rows(input_csv)
+    projection = Projection.for_phase(phase, fieldnames, project_inputs)
+    view_fields = projection.columns if projection else fieldnames
+
+    def view_rows(rows: list[dict[str, str]]) -> list[dict[str, str]]:
+        return projection.project(rows) if projection else rows
+
+    rows = all_rows
+    if obligation_id:
+        rows = [row for row in rows if (row.get("id") or "").strip() == obligation_id]
+        if not rows and (shard_size or json_mode):
+            raise ValueError(f"Obligation id not found in {input_csv}: {obligation_id}")
+    context = PhaseContext(
+        phase=phase,
+        input_csv=input_csv,
+        output_csv=output_csv,
+        eip_number=eip_number,
+        output_format=output_format,
+        repo_context=context_index is not None,
+    )
+
+    if not shard_size:
+        call_input, call_output = input_csv, output_csv
+        if projection:
+            view_dir = run_dir / "view"
+            ensure_dir(view_dir)
+            call_input = view_dir / f"input_{input_csv.name}"
+            call_output = view_dir / output_csv.name
+            write_csv_rows(call_input, view_fields, view_rows(all_rows))
+            if output_csv.exists() and not json_mode:
+                copy_csv(call_input, call_output)
+            context = replace(context, input_csv=call_input, output_csv=call_output)
+        prompt = await build_prompt(render_prompt(call_input, call_output, obligation_id), rows)
+        write_prompt(run_dir / f"phase{phase}_prompt.txt", prompt)
+        output_path = run_dir / f"phase{phase}_output.txt"
+        row_ids = [(row.get("id") or "").strip() for row in rows]
+        call_config = budget_config(config, turn_budget, phase, len(rows))
+
+        def finish() -> list[str]:
+            if json_mode:
+                write_structured_output(
+                    phase, output_path, output_csv, fieldnames, all_rows, row_ids
+                )
+            elif projection and call_output.exists():
+                _, written = read_csv_rows(call_output)
+                write_csv_rows(
+                    output_csv,
+                    output_fieldnames(phase, fieldnames),
+                    projection.merge(all_rows, written),
+                )
+            if not escalate_to:
+                return []
+            return validate_phase_output(phase, output_csv, row_ids, input_csv)
+
+        telemetry, escalations = await arun_escalating(
+            phase=phase,
+            config=call_config,
+            escalate_to=escalate_to or (),
+            call=lambda attempt_config: arun_query(
+                prompt, output_path, cwd, attempt_config, agent, context
+            ),
+            finish=finish,
+            output_csv=call_output,
+        )
+        return PhaseCalls(
+            shards=[],
+            telemetry=[telemetry],
+            escalations=escalations,
+            max_turns=[call_config.max_turns] if turn_budget else [],
+        )
+
+    shard_budget = shard_budget_for(shard_size)
+    if shard_budget is not None:
+        shard_tokens: Optional[int] = shard_budget.tokens_for(phase)
+        planned = plan_token_shards(phase, rows, shard_tokens)
+        print(f"[shards] phase {phase}: {len(planned)} shards of up to {shard_tokens} row tokens")
+    else:
+        shard_tokens = None
+        planned = plan_shards(rows, int(shard_size))
+
+    shards: list[Shard] = []
+    pending: list[Shard] = []
+    telemetry: list[Optional[CallTelemetry]] = []
+    for index, shard_rows in enumerate(planned):
+        shard_dir = run_dir / "shards" / f"{index:03d}"
+        ensure_dir(shard_dir)
+        shard = Shard(
+            index=index,
+            row_ids=[(row.get("id") or "").strip() for row in shard_rows],
+            run_dir=shard_dir,
+            input_csv=shard_dir / f"input_{input_csv.name}",
+            output_csv=shard_dir / output_csv.name,
+            rows=shard_rows,
+        )
+        shards.append(shard)
+        checkpoint = read_checkpoint(shard_dir) if resume else None
+        if (
+            checkpoint is not None
+            and checkpoint.get("row_ids") == shard.row_ids
+            and shard.output_csv.exists()
+        ):
+            saved = checkpoint.get("telemetry")
+            telemetry.append(CallTelemetry.from_dict(saved) if saved else None)
+            continue
+        (shard_dir / CHECKPOINT_FILE).unlink(missing_ok=True)
+        write_csv_rows(shard.input_csv, view_fields, view_rows(shard_rows))
+        if seed_output and not json_mode:
+            copy_csv(shard.input_csv, shard.output_csv)
+        telemetry.append(None)
+        pending.append(shard)
+
+    if resume and len(pending) < len(shards):
+        print(
+            f"[resume] phase {phase}: {len(shards) - len(pending)} of "
+            f"{len(shards)} shards already complete"
+        )
+
+    limiter = anyio.CapacityLimiter(max(1, concurrency))
+    escalations: list[Escalation] = []
+    shard_turns: list[Optional[int]] = [None] * len(shards) if turn_budget else []
+    parked: list[int] = []
+    failed: list[tuple[int, Exception]] = []
+
+    async def run_shard(shard: Shard) -> None:
+        prompt = await build_prompt(
+            render_prompt(shard.input_csv, shard.output_csv, None), shard.rows
+        )
+        write_prompt(shard.run_dir / f"phase{phase}_prompt.txt", prompt)
+        output_path = shard.run_dir / f"phase{phase}_output.txt"
+        shard_context = replace(context, input_csv=shard.input_csv, output_csv=shard.output_csv)
+        shard_config = budget_config(config, turn_budget, phase, len(shard.rows))
+        if turn_budget:
+            shard_turns[shard.index] = shard_config.max_turns
+
+        def finish() -> list[str]:
+            if json_mode:
+                write_structured_output(
+                    phase, output_path, shard.output_csv, fieldnames, shard.rows, shard.row_ids
+                )
+            if not escalate_to:
+                return []
+            return validate_phase_output(
+                phase, shard.output_csv, shard.row_ids, shard.input_csv
+            )
+
+        async with limiter:
+            try:
+                result, shard_escalations = await arun_escalating(
+                    phase=phase,
+                    config=shard_config,
+                    escalate_to=escalate_to or (),
+                    call=lambda attempt_config: arun_query(
+                        prompt, output_path, cwd, attempt_config, agent, shard_context
+                    ),
+                    finish=finish,
+                    shard=shard.index,
+                    output_csv=shard.output_csv,
+                )
+            except CircuitOpenError:
+                # Park the shard: without a checkpoint, --resume runs it again.
+                parked.append(shard.index)
+                return
+            except Exception as exc:
+                # Let the other shards finish and checkpoint; the first error is raised after.
+                failed.append((shard.index, exc))
+                return
+        telemetry[shard.index] = result
+        escalations.extend(shard_escalations)
+        write_checkpoint(
+            shard.run_dir,
+            row_ids=shard.row_ids,
+            telemetry=result.to_dict() if result else None,
+        )
+
+    async with anyio.create_task_group() as tg:
+        for shard in pending:
+            tg.start_soon(run_shard, shard)
+    if failed:
+        index, error = failed[0]
+        raise RuntimeError(
+            f"Phase {phase} shard {index:03d} failed ({len(failed)} of {len(shards)} shards "
+            f"failed; rerun with --resume to retry them): {error}"
+        ) from error
+    if parked:
+        raise CircuitOpenError(
+            f"Phase {phase}: {len(parked)} of {len(shards)} shards parked while the circuit "
+            f"was open; rerun with --resume to finish them"
+        )
+
+    merge_shard_outputs(
+        input_csv, shards, output_csv, projection.written if projection else None
+    )
+    return PhaseCalls(
+        shards=shards,
+        telemetry=telemetry,
+        escalations=escalations,
+        max_turns=shard_turns,
+        shard_tokens=shard_tokens,
+    )
+
+
+def record_phase_calls(
+    run_dir: Path, run_manifest: dict[str, object], calls: PhaseCalls
+) -> None:
+    """Add shard layout and telemetry totals to the phase manifest."""
+    if calls.shards:
+        run_manifest["shards"] = [
+            {
+                "index": shard.index,
+                "row_ids": shard.row_ids,
+                "run_dir": str(shard.run_dir),
+                "output_csv": str(shard.output_csv),
+                "row_tokens": sum(row_tokens(row) for row in shard.rows),
+                "telemetry": summarize_telemetry([calls.telemetry[shard.index]]),
+                **({"max_turns": calls.max_turns[shard.index]} if calls.max_turns else {}),
+            }
+            for shard in calls.shards
+        ]
+    elif calls.max_turns:
+        run_manifest["max_turns"] = calls.max_turns[0]
+    if calls.shard_tokens:
+        run_manifest["shard_tokens"] = calls.shard_tokens
+    if calls.escalations:
+        run_manifest["escalations"] = [item.to_dict() for item in calls.escalations]
+    replayed_from = sorted(
+        {item.replayed_from for item in calls.telemetry if item and item.replayed_from}
+    )
+    if replayed_from:
+        run_manifest["replayed_from_eips"] = replayed_from
+    run_manifest["telemetry"] = summarize_telemetry(
+        [*calls.telemetry, *(item.telemetry for item in calls.escalations)]
+    )
+    write_run_manifest(run_dir, run_manifest)
+    write_checkpoint(run_dir, phase=run_manifest.get("phase"))
+
+
+def render_eip_text(eip_path: Path) -> str:
+    text = eip_path.read_text(encoding="utf-8", errors="replace").rstrip()
+    return f"\nEIP text ({eip_path.name}):\n````markdown\n{text}\n````\n"
+
+
+def obligation_filter_suffix(obligation_id: Optional[str]) -> str:
+    if not obligation_id:
+        return ""
+    return (
+        f"\n\nOnly update the row with id '{obligation_id}'. "
+        "Leave all other rows unchanged.\n"
+    )
+
+
+async def arun_phase_0a(
     eip_file: str,
     spec_repo: str,
     output_dir: str,
     eip_number: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[Iterable[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     agent: Optional[AgentProtocol] = None,
+    resume: bool = False,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
 ) -> Path:
     """Run Phase 0A: Extract obligations from EIP.
     
@@ -173,18 +829,25 @@ def run_phase_0a(
         output_dir: Directory for outputs (required)
         eip_number: EIP number (inferred from filename if not provided)
         model: Claude model identifier
-        max_turns: Maximum turns per query
+        max_turns: Maximum turns per query, or 'auto' / a TurnBudget to adapt it per call
         allowed_tools: List of allowed tools for Claude
-        llm_mode: 'live' or 'fake'
+        llm_mode: 'live', 'fake', 'replay' or 'batch' (inlines the EIP text in json mode)
         record_llm_calls: Whether to record LLM call metadata
         agent: Agent implementation (defaults to ClaudeAgent)
+        resume: Reuse the latest phase run dir; skip it if already complete
+        output_format: 'csv' (agent writes the CSV) or 'json' (runner writes it from a JSON reply)
+        escalate_to: Stronger models to rerun calls on when their output fails validation
     """
     from .agents import ClaudeAgent
     if agent is None:
         agent = ClaudeAgent()
     
-    run_dir = Path(output_dir).expanduser().resolve() / "phase0A_runs" / timestamp()
-    ensure_dir(run_dir)
+    run_dir, complete = prepare_run_dir(
+        Path(output_dir).expanduser().resolve() / "phase0A_runs", resume
+    )
+    if complete:
+        print(f"[resume] phase 0A already complete: {run_dir}")
+        return run_dir
 
     eip_path, resolved_eip_number = resolve_eip(eip_file, eip_number)
     resolved_eip_number = resolve_eip_number(resolved_eip_number, eip_path=eip_path)
@@ -201,13 +864,15 @@ def run_phase_0a(
         report_path=str(run_dir / "spec_index_report.md"),
     )
 
+    base_turns, turn_budget = phase_turns(max_turns)
     config = build_claude_config(
         model,
-        max_turns,
+        base_turns,
         allowed_tools,
         llm_mode=llm_mode,
         record_calls=record_llm_calls,
     )
+    config = budget_config(config, turn_budget, "0A", eip_size(eip_path))
     run_manifest = {
         "phase": "0A",
         "generated_at": timestamp(),
@@ -223,11 +888,12 @@ def run_phase_0a(
         "spec_index_report": str(spec_outputs.report_path) if spec_outputs.report_path else None,
         "mismatch_forks": spec_outputs.mismatch_forks,
         "output_csv": str(output_csv),
+        "output_format": output_format,
+        "escalate_to": list(escalate_to or []),
         **config_metadata(config),
+        **turn_budget_metadata(turn_budget),
     }
-    (run_dir / "run_manifest.json").write_text(
-        json.dumps(run_manifest, indent=2), encoding="utf-8"
-    )
+    write_run_manifest(run_dir, run_manifest)
 
     prompt_template = load_prompt("phase0A_obligations")
     prompt = prompt_template.format(
@@ -237,39 +903,70 @@ def run_phase_0a(
         eip_number=resolved_eip_number,
         eip_id_prefix=eip_id_prefix(resolved_eip_number),
     )
+    if output_format == "json":
+        prompt = json_prompt(prompt, "0A")
+        if llm_mode == "batch":
+            # Batched calls have no tools to read the EIP with.
+            prompt += render_eip_text(eip_path)
 
     prompt_path = run_dir / "phase0A_prompt.txt"
     output_path = run_dir / "phase0A_output.txt"
 
     write_prompt(prompt_path, prompt)
-    run_query(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        agent,
-        PhaseContext(
-            phase="0A",
-            output_csv=output_csv,
-            eip_number=resolved_eip_number,
-        ),
+    context = PhaseContext(
+        phase="0A",
+        output_csv=output_csv,
+        eip_number=resolved_eip_number,
+        output_format=output_format,
+        eip_file=eip_path,
+    )
+
+    def finish() -> list[str]:
+        if output_format == "json":
+            write_structured_output("0A", output_path, output_csv, [], [])
+        return validate_phase_output("0A", output_csv) if escalate_to else []
+
+    telemetry, escalations = await arun_escalating(
+        phase="0A",
+        config=config,
+        escalate_to=escalate_to or (),
+        call=lambda call_config: arun_query(prompt, output_path, cwd, call_config, agent, context),
+        finish=finish,
+        output_csv=output_csv,
+    )
+    record_phase_calls(
+        run_dir,
+        run_manifest,
+        PhaseCalls(shards=[], telemetry=[telemetry], escalations=escalations),
     )
     return run_dir
 
 
-def run_phase_1a(
+def run_phase_0a(*args: Any, **kwargs: Any) -> Path:
+    """Sync wrapper for :func:`arun_phase_0a`."""
+    return run_sync(arun_phase_0a, *args, **kwargs)
+
+
+async def arun_phase_1a(
     parent_run: Path,
     spec_repo: str,
     eip_number: Optional[str] = None,
     fork: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[Iterable[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     obligation_id: Optional[str] = None,
     agent: Optional[AgentProtocol] = None,
     spec_map_strict: bool = False,
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
+    project_inputs: Union[bool, int] = False,
 ) -> Path:
     """Run Phase 1A: Find spec locations for obligations.
     
@@ -279,20 +976,29 @@ def run_phase_1a(
         eip_number: EIP number (inferred from parent run if not provided)
         fork: Fork name (defaults to 'london')
         model: Claude model identifier
-        max_turns: Maximum turns per query
+        max_turns: Maximum turns per query, or 'auto' / a TurnBudget to adapt it per call
         allowed_tools: List of allowed tools for Claude
-        llm_mode: 'live' or 'fake'
+        llm_mode: 'live', 'fake', 'replay' or 'batch'
         record_llm_calls: Whether to record LLM call metadata
         obligation_id: Limit to single obligation
         agent: Agent implementation (defaults to ClaudeAgent)
         spec_map_strict: Raise error on spec map mismatch
+        shard_size: Rows per shard, or 'auto' / a ShardBudget for learned token budgets (None = one prompt)
+        concurrency: Maximum number of shards running at once
+        resume: Reuse the latest phase run dir, keeping completed shards
+        context_budget: Token budget for repo slices inlined into each prompt (None = off)
+        output_format: 'csv' (agent writes the CSV) or 'json' (runner writes it from a JSON reply)
+        escalate_to: Stronger models to rerun calls on when their output fails validation
+        project_inputs: Agent reads only the columns the phase uses (an int also truncates cells)
     """
     from .agents import ClaudeAgent
     if agent is None:
         agent = ClaudeAgent()
     
-    run_dir = parent_run / "phase1A_runs" / timestamp()
-    ensure_dir(run_dir)
+    run_dir, complete = prepare_run_dir(parent_run / "phase1A_runs", resume)
+    if complete:
+        print(f"[resume] phase 1A already complete: {run_dir}")
+        return run_dir
 
     input_csv = parent_run / "obligations_index.csv"
     output_csv = run_dir / "obligations_index.csv"
@@ -356,9 +1062,10 @@ def run_phase_1a(
             f"fork-only: {spec_map_check.get('fork_init_only')}"
         )
 
+    base_turns, turn_budget = phase_turns(max_turns)
     config = build_claude_config(
         model,
-        max_turns,
+        base_turns,
         allowed_tools,
         llm_mode=llm_mode,
         record_calls=record_llm_calls,
@@ -376,56 +1083,77 @@ def run_phase_1a(
         "spec_map_check": str(spec_map_check_path),
         "obligation_id": obligation_id,
         "parent_run": str(parent_run),
+        "shard_size": shard_size_metadata(shard_size),
+        "concurrency": concurrency,
+        "context_budget": context_budget,
+        "project_inputs": project_inputs,
+        "output_format": output_format,
+        "escalate_to": list(escalate_to or []),
         **config_metadata(config),
+        **turn_budget_metadata(turn_budget),
     }
-    (run_dir / "run_manifest.json").write_text(
-        json.dumps(run_manifest, indent=2), encoding="utf-8"
-    )
+    write_run_manifest(run_dir, run_manifest)
     prompt_template = load_prompt("phase1A_locations")
-    prompt = prompt_template.format(
+
+    def render_prompt(
+        prompt_input: Path, prompt_output: Path, row_filter: Optional[str]
+    ) -> str:
+        return prompt_template.format(
+            input_csv=prompt_input,
+            output_csv=prompt_output,
+            spec_root=fork_root,
+            fork_name=fork_name,
+            eip_label=eip_label(resolved_eip_number),
+        ) + obligation_filter_suffix(row_filter)
+
+    calls = await arun_phase_calls(
+        phase="1A",
+        run_dir=run_dir,
         input_csv=input_csv,
         output_csv=output_csv,
-        spec_root=fork_root,
-        fork_name=fork_name,
-        eip_label=eip_label(resolved_eip_number),
+        render_prompt=render_prompt,
+        cwd=cwd,
+        config=config,
+        agent=agent,
+        eip_number=resolved_eip_number,
+        obligation_id=obligation_id,
+        shard_size=shard_size,
+        concurrency=concurrency,
+        resume=resume,
+        context_budget=context_budget,
+        context_root=fork_root,
+        output_format=output_format,
+        escalate_to=escalate_to,
+        turn_budget=turn_budget,
+        project_inputs=project_inputs,
     )
-    if obligation_id:
-        prompt += (
-            f"\n\nOnly update the row with id '{obligation_id}'. "
-            "Leave all other rows unchanged.\n"
-        )
+    record_phase_calls(run_dir, run_manifest, calls)
+    return run_dir
 
-    prompt_path = run_dir / "phase1A_prompt.txt"
-    output_path = run_dir / "phase1A_output.txt"
 
-    write_prompt(prompt_path, prompt)
-    run_query(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        agent,
-        PhaseContext(
-            phase="1A",
-            input_csv=input_csv,
-            output_csv=output_csv,
-            eip_number=resolved_eip_number,
-        ),
-    )
-    return run_dir
+def run_phase_1a(*args: Any, **kwargs: Any) -> Path:
+    """Sync wrapper for :func:`arun_phase_1a`."""
+    return run_sync(arun_phase_1a, *args, **kwargs)
 
 
-def run_phase_1b(
+async def arun_phase_1b(
     parent_run: Path,
     spec_repo: Optional[str] = None,
     eip_number: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[Iterable[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     obligation_id: Optional[str] = None,
     agent: Optional[AgentProtocol] = None,
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
+    project_inputs: Union[bool, int] = False,
 ) -> Path:
     """Run Phase 1B: Analyze code flow for obligations.
     
@@ -434,56 +1162,69 @@ def run_phase_1b(
         spec_repo: Path to execution-specs repo (inferred from parent manifest if not provided)
         eip_number: EIP number (inferred from parent run if not provided)
         model: Claude model identifier
-        max_turns: Maximum turns per query
+        max_turns: Maximum turns per query, or 'auto' / a TurnBudget to adapt it per call
         allowed_tools: List of allowed tools for Claude
-        llm_mode: 'live' or 'fake'
+        llm_mode: 'live', 'fake', 'replay' or 'batch'
         record_llm_calls: Whether to record LLM call metadata
         obligation_id: Limit to single obligation
         agent: Agent implementation (defaults to ClaudeAgent)
+        shard_size: Rows per shard, or 'auto' / a ShardBudget for learned token budgets (None = one prompt)
+        concurrency: Maximum number of shards running at once
+        resume: Reuse the latest phase run dir, keeping completed shards
+        context_budget: Token budget for repo slices inlined into each prompt (None = off)
+        output_format: 'csv' (agent writes the CSV) or 'json' (runner writes it from a JSON reply)
+        escalate_to: Stronger models to rerun calls on when their output fails validation
+        project_inputs: Agent reads only the columns the phase uses (an int also truncates cells)
     """
     from .agents import ClaudeAgent
     if agent is None:
         agent = ClaudeAgent()
     
-    run_dir = parent_run / "phase1B_runs" / timestamp()
-    ensure_dir(run_dir)
+    run_dir, complete = prepare_run_dir(parent_run / "phase1B_runs", resume)
+    if complete:
+        print(f"[resume] phase 1B already complete: {run_dir}")
+        return run_dir
 
     input_csv = parent_run / "obligations_index.csv"
     output_csv = run_dir / "obligations_index.csv"
     copy_csv(input_csv, output_csv)
 
-    # Infer spec_repo from parent manifest if not provided
+    # Infer spec_repo (and the fork root for context packing) from parent manifest
+    manifest_data: dict[str, Any] = {}
+    parent_manifest = parent_run / "run_manifest.json"
+    if parent_manifest.exists():
+        try:
+            manifest_data = json.loads(parent_manifest.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
     if not spec_repo:
-        parent_manifest = parent_run / "run_manifest.json"
-        if parent_manifest.exists():
-            try:
-                manifest_data = json.loads(parent_manifest.read_text(encoding="utf-8"))
-                spec_repo = manifest_data.get("spec_repo")
-            except (json.JSONDecodeError, KeyError):
-                pass
+        spec_repo = manifest_data.get("spec_repo")
     
     if not spec_repo:
         raise ValueError("spec_repo is required: provide --spec-repo or ensure parent run manifest contains spec_repo")
     
     # Claude runs from the spec repo root
     cwd = Path(spec_repo).expanduser().resolve()
+    # Phase 1A locations are relative to the fork package
+    fork_root = manifest_data.get("fork_root")
+    context_root = Path(fork_root) if fork_root and Path(fork_root).is_dir() else cwd
 
     resolved_eip_number = resolve_eip_number(eip_number, input_csv=input_csv)
     prompt_template = load_prompt("phase1B_codeflow")
-    prompt = prompt_template.format(
-        input_csv=input_csv,
-        output_csv=output_csv,
-        eip_label=eip_label(resolved_eip_number),
-    )
-    if obligation_id:
-        prompt += (
-            f"\n\nOnly update the row with id '{obligation_id}'. "
-            "Leave all other rows unchanged.\n"
-        )
 
+    def render_prompt(
+        prompt_input: Path, prompt_output: Path, row_filter: Optional[str]
+    ) -> str:
+        return prompt_template.format(
+            input_csv=prompt_input,
+            output_csv=prompt_output,
+            eip_label=eip_label(resolved_eip_number),
+        ) + obligation_filter_suffix(row_filter)
+
+    base_turns, turn_budget = phase_turns(max_turns)
     config = build_claude_config(
         model,
-        max_turns,
+        base_turns,
         allowed_tools,
         llm_mode=llm_mode,
         record_calls=record_llm_calls,
@@ -498,43 +1239,65 @@ def run_phase_1b(
         "cwd": str(cwd),
         "obligation_id": obligation_id,
         "parent_run": str(parent_run),
+        "shard_size": shard_size_metadata(shard_size),
+        "concurrency": concurrency,
+        "context_budget": context_budget,
+        "project_inputs": project_inputs,
+        "output_format": output_format,
+        "escalate_to": list(escalate_to or []),
         **config_metadata(config),
+        **turn_budget_metadata(turn_budget),
     }
-    (run_dir / "run_manifest.json").write_text(
-        json.dumps(run_manifest, indent=2), encoding="utf-8"
-    )
-
-    prompt_path = run_dir / "phase1B_prompt.txt"
-    output_path = run_dir / "phase1B_output.txt"
+    write_run_manifest(run_dir, run_manifest)
 
-    write_prompt(prompt_path, prompt)
-    run_query(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        agent,
-        PhaseContext(
-            phase="1B",
-            input_csv=input_csv,
-            output_csv=output_csv,
-            eip_number=resolved_eip_number,
-        ),
+    calls = await arun_phase_calls(
+        phase="1B",
+        run_dir=run_dir,
+        input_csv=input_csv,
+        output_csv=output_csv,
+        render_prompt=render_prompt,
+        cwd=cwd,
+        config=config,
+        agent=agent,
+        eip_number=resolved_eip_number,
+        obligation_id=obligation_id,
+        shard_size=shard_size,
+        concurrency=concurrency,
+        resume=resume,
+        context_budget=context_budget,
+        context_root=context_root,
+        output_format=output_format,
+        escalate_to=escalate_to,
+        turn_budget=turn_budget,
+        project_inputs=project_inputs,
     )
+    record_phase_calls(run_dir, run_manifest, calls)
     return run_dir
 
 
-def run_phase_2a(
+def run_phase_1b(*args: Any, **kwargs: Any) -> Path:
+    """Sync wrapper for :func:`arun_phase_1b`."""
+    return run_sync(arun_phase_1b, *args, **kwargs)
+
+
+async def arun_phase_2a(
     parent_run: Path,
     client_repo: str,
     eip_number: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[Iterable[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     obligation_id: Optional[str] = None,
     agent: Optional[AgentProtocol] = None,
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
+    project_inputs: Union[bool, int] = False,
 ) -> Path:
     """Run Phase 2A: Find client locations for obligations.
     
@@ -543,19 +1306,28 @@ def run_phase_2a(
         client_repo: Path to client repo (e.g., geth) (required)
         eip_number: EIP number (inferred from parent run if not provided)
         model: Claude model identifier
-        max_turns: Maximum turns per query
+        max_turns: Maximum turns per query, or 'auto' / a TurnBudget to adapt it per call
         allowed_tools: List of allowed tools for Claude
-        llm_mode: 'live' or 'fake'
+        llm_mode: 'live', 'fake', 'replay' or 'batch'
         record_llm_calls: Whether to record LLM call metadata
         obligation_id: Limit to single obligation
         agent: Agent implementation (defaults to ClaudeAgent)
+        shard_size: Rows per shard, or 'auto' / a ShardBudget for learned token budgets (None = one prompt)
+        concurrency: Maximum number of shards running at once
+        resume: Reuse the latest phase run dir, keeping completed shards
+        context_budget: Token budget for repo slices inlined into each prompt (None = off)
+        output_format: 'csv' (agent writes the CSV) or 'json' (runner writes it from a JSON reply)
+        escalate_to: Stronger models to rerun calls on when their output fails validation
+        project_inputs: Agent reads only the columns the phase uses (an int also truncates cells)
     """
     from .agents import ClaudeAgent
     if agent is None:
         agent = ClaudeAgent()
     
-    run_dir = parent_run / "phase2A_runs" / timestamp()
-    ensure_dir(run_dir)
+    run_dir, complete = prepare_run_dir(parent_run / "phase2A_runs", resume)
+    if complete:
+        print(f"[resume] phase 2A already complete: {run_dir}")
+        return run_dir
 
     input_csv = parent_run / "obligations_index.csv"
     if not input_csv.exists():
@@ -569,23 +1341,23 @@ def run_phase_2a(
     cwd = resolved_client_root
     
     prompt_template = load_prompt("phase2A_client_locations")
-    prompt = prompt_template.format(
-        input_csv=input_csv,
-        output_csv=output_csv,
-        client_root=resolved_client_root,
-        client_name=resolved_client_name,
-        eip_label=eip_label(resolved_eip_number),
-        eip_number=resolved_eip_number,
-    )
-    if obligation_id:
-        prompt += (
-            f"\n\nOnly update the row with id '{obligation_id}'. "
-            "Leave all other rows unchanged.\n"
-        )
 
+    def render_prompt(
+        prompt_input: Path, prompt_output: Path, row_filter: Optional[str]
+    ) -> str:
+        return prompt_template.format(
+            input_csv=prompt_input,
+            output_csv=prompt_output,
+            client_root=resolved_client_root,
+            client_name=resolved_client_name,
+            eip_label=eip_label(resolved_eip_number),
+            eip_number=resolved_eip_number,
+        ) + obligation_filter_suffix(row_filter)
+
+    base_turns, turn_budget = phase_turns(max_turns)
     config = build_claude_config(
         model,
-        max_turns,
+        base_turns,
         allowed_tools,
         llm_mode=llm_mode,
         record_calls=record_llm_calls,
@@ -601,43 +1373,65 @@ def run_phase_2a(
         "cwd": str(cwd),
         "obligation_id": obligation_id,
         "parent_run": str(parent_run),
+        "shard_size": shard_size_metadata(shard_size),
+        "concurrency": concurrency,
+        "context_budget": context_budget,
+        "project_inputs": project_inputs,
+        "output_format": output_format,
+        "escalate_to": list(escalate_to or []),
         **config_metadata(config),
+        **turn_budget_metadata(turn_budget),
     }
-    (run_dir / "run_manifest.json").write_text(
-        json.dumps(run_manifest, indent=2), encoding="utf-8"
-    )
-
-    prompt_path = run_dir / "phase2A_prompt.txt"
-    output_path = run_dir / "phase2A_output.txt"
+    write_run_manifest(run_dir, run_manifest)
 
-    write_prompt(prompt_path, prompt)
-    run_query(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        agent,
-        PhaseContext(
-            phase="2A",
-            input_csv=input_csv,
-            output_csv=output_csv,
-            eip_number=resolved_eip_number,
-        ),
+    calls = await arun_phase_calls(
+        phase="2A",
+        run_dir=run_dir,
+        input_csv=input_csv,
+        output_csv=output_csv,
+        render_prompt=render_prompt,
+        cwd=cwd,
+        config=config,
+        agent=agent,
+        eip_number=resolved_eip_number,
+        obligation_id=obligation_id,
+        shard_size=shard_size,
+        concurrency=concurrency,
+        resume=resume,
+        seed_output=False,
+        context_budget=context_budget,
+        output_format=output_format,
+        escalate_to=escalate_to,
+        turn_budget=turn_budget,
+        project_inputs=project_inputs,
     )
+    record_phase_calls(run_dir, run_manifest, calls)
     return run_dir
 
 
-def run_phase_2b(
+def run_phase_2a(*args: Any, **kwargs: Any) -> Path:
+    """Sync wrapper for :func:`arun_phase_2a`."""
+    return run_sync(arun_phase_2a, *args, **kwargs)
+
+
+async def arun_phase_2b(
     parent_run: Path,
     client_repo: str,
     eip_number: Optional[str] = None,
     model: Optional[str] = None,
-    max_turns: int = 1,
+    max_turns: Union[int, str, TurnBudget] = 1,
     allowed_tools: Optional[Iterable[str]] = None,
     llm_mode: str = "live",
     record_llm_calls: bool = False,
     obligation_id: Optional[str] = None,
     agent: Optional[AgentProtocol] = None,
+    shard_size: Union[int, str, ShardBudget, None] = None,
+    concurrency: int = 1,
+    resume: bool = False,
+    context_budget: Optional[int] = None,
+    output_format: str = "csv",
+    escalate_to: Optional[Sequence[str]] = None,
+    project_inputs: Union[bool, int] = False,
 ) -> Path:
     """Run Phase 2B: Identify gaps in client implementation.
     
@@ -646,19 +1440,28 @@ def run_phase_2b(
         client_repo: Path to client repo (e.g., geth) (required)
         eip_number: EIP number (inferred from parent run if not provided)
         model: Claude model identifier
-        max_turns: Maximum turns per query
+        max_turns: Maximum turns per query, or 'auto' / a TurnBudget to adapt it per call
         allowed_tools: List of allowed tools for Claude
-        llm_mode: 'live' or 'fake'
+        llm_mode: 'live', 'fake', 'replay' or 'batch'
         record_llm_calls: Whether to record LLM call metadata
         obligation_id: Limit to single obligation
         agent: Agent implementation (defaults to ClaudeAgent)
+        shard_size: Rows per shard, or 'auto' / a ShardBudget for learned token budgets (None = one prompt)
+        concurrency: Maximum number of shards running at once
+        resume: Reuse the latest phase run dir, keeping completed shards
+        context_budget: Token budget for repo slices inlined into each prompt (None = off)
+        output_format: 'csv' (agent writes the CSV) or 'json' (runner writes it from a JSON reply)
+        escalate_to: Stronger models to rerun calls on when their output fails validation
+        project_inputs: Agent reads only the columns the phase uses (an int also truncates cells)
     """
     from .agents import ClaudeAgent
     if agent is None:
         agent = ClaudeAgent()
     
-    run_dir = parent_run / "phase2B_runs" / timestamp()
-    ensure_dir(run_dir)
+    run_dir, complete = prepare_run_dir(parent_run / "phase2B_runs", resume)
+    if complete:
+        print(f"[resume] phase 2B already complete: {run_dir}")
+        return run_dir
 
     input_csv = parent_run / "client_obligations_index.csv"
     output_csv = run_dir / "client_obligations_index.csv"
@@ -671,23 +1474,23 @@ def run_phase_2b(
     cwd = resolved_client_root
     
     prompt_template = load_prompt("phase2B_client_gaps")
-    prompt = prompt_template.format(
-        input_csv=input_csv,
-        output_csv=output_csv,
-        client_root=resolved_client_root,
-        client_name=resolved_client_name,
-        eip_label=eip_label(resolved_eip_number),
-        eip_number=resolved_eip_number,
-    )
-    if obligation_id:
-        prompt += (
-            f"\n\nOnly update the row with id '{obligation_id}'. "
-            "Leave all other rows unchanged.\n"
-        )
 
+    def render_prompt(
+        prompt_input: Path, prompt_output: Path, row_filter: Optional[str]
+    ) -> str:
+        return prompt_template.format(
+            input_csv=prompt_input,
+            output_csv=prompt_output,
+            client_root=resolved_client_root,
+            client_name=resolved_client_name,
+            eip_label=eip_label(resolved_eip_number),
+            eip_number=resolved_eip_number,
+        ) + obligation_filter_suffix(row_filter)
+
+    base_turns, turn_budget = phase_turns(max_turns)
     config = build_claude_config(
         model,
-        max_turns,
+        base_turns,
         allowed_tools,
         llm_mode=llm_mode,
         record_calls=record_llm_calls,
@@ -703,27 +1506,42 @@ def run_phase_2b(
         "cwd": str(cwd),
         "obligation_id": obligation_id,
         "parent_run": str(parent_run),
+        "shard_size": shard_size_metadata(shard_size),
+        "concurrency": concurrency,
+        "context_budget": context_budget,
+        "project_inputs": project_inputs,
+        "output_format": output_format,
+        "escalate_to": list(escalate_to or []),
         **config_metadata(config),
+        **turn_budget_metadata(turn_budget),
     }
-    (run_dir / "run_manifest.json").write_text(
-        json.dumps(run_manifest, indent=2), encoding="utf-8"
-    )
-
-    prompt_path = run_dir / "phase2B_prompt.txt"
-    output_path = run_dir / "phase2B_output.txt"
+    write_run_manifest(run_dir, run_manifest)
 
-    write_prompt(prompt_path, prompt)
-    run_query(
-        prompt,
-        output_path,
-        cwd,
-        config,
-        agent,
-        PhaseContext(
-            phase="2B",
-            input_csv=input_csv,
-            output_csv=output_csv,
-            eip_number=resolved_eip_number,
-        ),
+    calls = await arun_phase_calls(
+        phase="2B",
+        run_dir=run_dir,
+        input_csv=input_csv,
+        output_csv=output_csv,
+        render_prompt=render_prompt,
+        cwd=cwd,
+        config=config,
+        agent=agent,
+        eip_number=resolved_eip_number,
+        obligation_id=obligation_id,
+        shard_size=shard_size,
+        concurrency=concurrency,
+        resume=resume,
+        seed_output=True,
+        context_budget=context_budget,
+        output_format=output_format,
+        escalate_to=escalate_to,
+        turn_budget=turn_budget,
+        project_inputs=project_inputs,
     )
+    record_phase_calls(run_dir, run_manifest, calls)
     return run_dir
+
+
+def run_phase_2b(*args: Any, **kwargs: Any) -> Path:
+    """Sync wrapper for :func:`arun_phase_2b`."""
+    return run_sync(arun_phase_2b, *args, **kwargs)
@@ -0,0 +1,250 @@
+"""Long-lived Claude client sessions reused across phases that share a repo."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Optional
+
+import anyio
+
+from .agents import (
+    build_options_kwargs,
+    clear_client,
+    connect_client,
+    raise_for_retryable,
+    require_credentials,
+    stream_client_call,
+)
+from .llm import ClaudeConfig, write_llm_call_record
+from .telemetry import CallTelemetry
+
+
+SESSION_RESETS = ("none", "phase", "call")
+# Turn cap sessions are started with; each call's own max_turns is enforced per call.
+SESSION_MAX_TURNS = 50
+
+SessionKey = tuple[Optional[str], str, tuple[str, ...]]
+
+
+def normalize_session_reset(reset: Optional[str]) -> str:
+    value = (reset or "none").strip().lower()
+    if value not in SESSION_RESETS:
+        raise ValueError(f"session_reset must be one of {', '.join(SESSION_RESETS)}: {reset}")
+    return value
+
+
+@dataclass
+class Session:
+    key: SessionKey
+    client: Any
+    # What the client was started with, and the model it currently uses.
+    config: Optional[ClaudeConfig] = None
+    model: Optional[str] = None
+    phase: Optional[str] = None
+    calls: int = 0
+    # ResultMessage cost is a running total for the conversation.
+    reported_cost_usd: float = 0.0
+    busy: bool = False
+    history: list[str] = field(default_factory=list)
+
+
+class SessionAgent:
+    """Agent that keeps ClaudeSDKClient sessions open per (EIP, cwd, tools).
+
+    Phases running in the same repo for the same EIP (1A then 1B, 2A then 2B)
+    reuse one agent process and, unless reset, the conversation holding the
+    files it already read. Concurrent callers with the same key (shards) get
+    additional sessions, which later phases reuse as well. The model and
+    ``max_turns`` are per call: the session switches model when a call
+    (routed or escalated) asks for another one, and is started with a turn
+    cap of at least ``SESSION_MAX_TURNS`` while each call is interrupted
+    after its own ``max_turns``.
+
+    ``reset`` controls the context between calls: ``none`` keeps it,
+    ``phase`` clears it when a session moves to a new phase and ``call`` clears
+    it before every call. ``areset`` drops sessions explicitly.
+
+    With ``early_stop`` a call is interrupted once its output CSV is complete;
+    the session is kept unless the interrupted call never reported a result.
+    """
+
+    def __init__(self, reset: str = "none", early_stop: bool = False) -> None:
+        self.reset = normalize_session_reset(reset)
+        self.early_stop = early_stop
+        self._sessions: dict[SessionKey, list[Session]] = {}
+        self._lock = anyio.Lock()
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        async def main() -> None:
+            try:
+                await self.arun(prompt, output_path, cwd, config, metadata)
+            finally:
+                await self.aclose()
+
+        anyio.run(main)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        options_kwargs = build_options_kwargs(config, cwd)
+        require_credentials()
+        phase = str(metadata.get("phase") or "")
+        session = await self._checkout(config, cwd, metadata)
+        try:
+            if self.reset == "call" or (
+                self.reset == "phase" and session.phase not in (None, phase)
+            ):
+                await self._clear(session)
+            if session.model != config.model:
+                await session.client.set_model(config.model)
+                session.model = config.model
+            if config.record_calls:
+                write_llm_call_record(
+                    output_path=output_path,
+                    prompt=prompt,
+                    options_kwargs=options_kwargs,
+                    config=config,
+                    used_fake=False,
+                    extra={"session": self._describe(session)},
+                )
+
+            started_with = session.config.max_turns if session.config else config.max_turns
+            telemetry = await stream_client_call(
+                session.client,
+                prompt,
+                output_path,
+                config,
+                metadata,
+                self.early_stop,
+                max_turns=config.max_turns if config.max_turns < started_with else None,
+            )
+            reported = telemetry.total_cost_usd
+            telemetry.total_cost_usd = round(max(0.0, reported - session.reported_cost_usd), 6)
+            session.reported_cost_usd = reported
+            session.phase = phase
+            session.calls += 1
+            session.history.append(phase)
+        except BaseException:
+            # A session that failed mid-call is in an unknown state.
+            await self._discard(session)
+            raise
+        if telemetry.is_error and not telemetry.num_turns:
+            # Interrupted without a result: the client is in an unknown state.
+            await self._discard(session)
+        else:
+            self._checkin(session)
+
+        if config.record_calls:
+            write_llm_call_record(
+                output_path=output_path,
+                prompt=prompt,
+                options_kwargs=options_kwargs,
+                config=config,
+                used_fake=False,
+                extra={
+                    "telemetry": telemetry.to_dict(),
+                    "session": self._describe(session),
+                },
+            )
+        raise_for_retryable(telemetry)
+        return telemetry
+
+    def _describe(self, session: Session) -> dict[str, object]:
+        return {
+            "eip_number": session.key[0],
+            "cwd": session.key[1],
+            "model": session.model,
+            "calls": session.calls,
+            "phases": list(session.history),
+            "reset": self.reset,
+        }
+
+    async def _checkout(
+        self, config: ClaudeConfig, cwd: Path, metadata: dict[str, object]
+    ) -> Session:
+        eip_number = str(metadata["eip_number"]) if metadata.get("eip_number") else None
+        key: SessionKey = (eip_number, str(cwd.resolve()), tuple(config.allowed_tools))
+        async with self._lock:
+            session = next((item for item in self._sessions.get(key, []) if not item.busy), None)
+            if session is not None:
+                session.busy = True
+            else:
+                session = Session(key=key, client=None, busy=True)
+                self._sessions.setdefault(key, []).append(session)
+        if session.client is not None and session.config.max_turns >= config.max_turns:
+            return session
+        # New, or started with too small a turn cap for this call.
+        session_config = replace(config, max_turns=max(config.max_turns, SESSION_MAX_TURNS))
+        try:
+            if session.client is not None:
+                await session.client.disconnect()
+                session.reported_cost_usd = 0.0
+                session.phase = None
+            session.client = await self._connect(session_config, cwd)
+        except BaseException:
+            self._sessions[key].remove(session)
+            raise
+        session.config, session.model = session_config, config.model
+        return session
+
+    def _checkin(self, session: Session) -> None:
+        session.busy = False
+
+    async def _connect(self, config: ClaudeConfig, cwd: Path) -> Any:
+        return await connect_client(config, cwd)
+
+    async def _clear(self, session: Session) -> None:
+        """Drop the conversation; reconnect if the CLI does not confirm the reset."""
+        if not await clear_client(session.client):
+            await session.client.disconnect()
+            session.client = await self._connect_like(session)
+        session.reported_cost_usd = 0.0
+        session.phase = None
+
+    async def _connect_like(self, session: Session) -> Any:
+        config = replace(session.config, model=session.model)
+        session.config = config
+        return await self._connect(config, Path(session.key[1]))
+
+    async def _discard(self, session: Session) -> None:
+        sessions = self._sessions.get(session.key, [])
+        if session in sessions:
+            sessions.remove(session)
+        if session.client is not None:
+            with anyio.CancelScope(shield=True):
+                await session.client.disconnect()
+
+    async def areset(
+        self, eip_number: Optional[str] = None, cwd: Optional[Path] = None
+    ) -> int:
+        """Close idle sessions matching the EIP and/or cwd (all when both are None)."""
+        wanted_cwd = str(cwd.resolve()) if cwd is not None else None
+        closed = 0
+        for key, sessions in list(self._sessions.items()):
+            if eip_number is not None and key[0] != eip_number:
+                continue
+            if wanted_cwd is not None and key[1] != wanted_cwd:
+                continue
+            for session in [item for item in sessions if not item.busy]:
+                await self._discard(session)
+                closed += 1
+        return closed
+
+    async def aclose(self) -> None:
+        for sessions in list(self._sessions.values()):
+            for session in list(sessions):
+                await self._discard(session)
+        self._sessions.clear()
@@ -0,0 +1,125 @@
+"""Token-budgeted shards sized from recorded runs (``shard_size=auto``).
+
+A fixed ``shard_size`` counts rows, so one number overflows the context on
+EIPs with long rows and wastes the shared prompt on EIPs with short ones.
+With ``auto`` each CSV-driven phase packs rows into shards of a token
+budget (see :func:`eip_verify.runner.plan_token_shards`). The budget is
+picked per phase from the latency and validation results of past shards.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .context_pack import estimate_tokens
+from .run_history import DEFAULT_HISTORY, load_calls
+
+
+AUTO_SHARDS = "auto"
+DEFAULT_SHARD_TOKENS = 4000
+# Budgets tried and compared, in row tokens per shard.
+BUDGET_LEVELS = (500, 1000, 2000, 4000, 8000, 16000, 32000)
+QUALITY_TOLERANCE = 0.1
+MIN_SAMPLES = 3
+
+
+def row_tokens(row: dict[str, str]) -> int:
+    """Approximate tokens a CSV row adds to a prompt."""
+    return estimate_tokens(",".join(value or "" for value in row.values()))
+
+
+def budget_level(tokens: int) -> int:
+    """The smallest of ``BUDGET_LEVELS`` that fits ``tokens``."""
+    return next((level for level in BUDGET_LEVELS if tokens <= level), BUDGET_LEVELS[-1])
+
+
+@dataclass(frozen=True)
+class ShardSample:
+    """One past shard call: the budget it was planned with, its size, wall time and result."""
+
+    phase: str
+    budget: int
+    row_tokens: int
+    wall_time_s: float
+    passed: bool
+
+
+class ShardBudget:
+    """Picks the row-token budget of a phase's shards from past shard calls.
+
+    Past shards are bucketed by the budget they were planned with (the
+    nearest of ``BUDGET_LEVELS`` for row-count shards). Among buckets with at
+    least ``MIN_SAMPLES`` shards whose validation pass rate is within
+    ``QUALITY_TOLERANCE`` of the best bucket, the one with the lowest wall
+    time per row token wins. If that is the largest bucket tried and every
+    shard in it passed, the next level up is tried. Phases without history
+    get ``fallback``.
+    """
+
+    def __init__(
+        self, samples: Iterable[ShardSample] = (), fallback: int = DEFAULT_SHARD_TOKENS
+    ) -> None:
+        self.samples = list(samples)
+        self.fallback = fallback
+
+    @classmethod
+    def load(cls, roots: Iterable[Path], fallback: int = DEFAULT_SHARD_TOKENS) -> "ShardBudget":
+        samples = [
+            ShardSample(
+                call.phase,
+                call.budget or budget_level(call.row_tokens),
+                call.row_tokens,
+                call.wall_time_s,
+                call.passed,
+            )
+            for call in load_calls(roots)
+            if call.row_tokens and call.wall_time_s is not None
+        ]
+        return cls(samples, fallback)
+
+    def tokens_for(self, phase: str) -> int:
+        buckets: dict[int, list[ShardSample]] = {}
+        for sample in self.samples:
+            if sample.phase == phase:
+                buckets.setdefault(sample.budget, []).append(sample)
+        stats = {
+            level: (
+                sum(sample.passed for sample in items) / len(items),
+                sum(sample.wall_time_s for sample in items)
+                / max(1, sum(sample.row_tokens for sample in items)),
+            )
+            for level, items in buckets.items()
+            if len(items) >= MIN_SAMPLES
+        }
+        if not stats:
+            return self.fallback
+        best_quality = max(quality for quality, _ in stats.values())
+        eligible = [
+            level
+            for level, (quality, _) in stats.items()
+            if quality >= best_quality - QUALITY_TOLERANCE
+        ]
+        level = min(eligible, key=lambda candidate: (stats[candidate][1], -candidate))
+        if level == max(stats) and stats[level][0] == 1.0 and level < BUDGET_LEVELS[-1]:
+            level = budget_level(level + 1)
+        return level
+
+
+def shard_budget_for(shard_size: Union[int, str, ShardBudget, None]) -> Optional[ShardBudget]:
+    """The ShardBudget behind a ``shard_size`` setting, or None for a row count."""
+    if isinstance(shard_size, ShardBudget):
+        return shard_size
+    if isinstance(shard_size, str) and shard_size.strip().lower() == AUTO_SHARDS:
+        return ShardBudget.load([DEFAULT_HISTORY])
+    return None
+
+
+def shard_size_metadata(shard_size: Union[int, str, ShardBudget, None]) -> Union[int, str, None]:
+    """``shard_size`` as recorded in manifests."""
+    if isinstance(shard_size, ShardBudget) or (
+        isinstance(shard_size, str) and shard_size.strip().lower() == AUTO_SHARDS
+    ):
+        return AUTO_SHARDS
+    return int(shard_size) if shard_size else None
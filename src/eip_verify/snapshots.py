@@ -0,0 +1,318 @@
+"""Pooled, isolated snapshots of the repos agents explore.
+
+Agents have ``Write`` and ``Bash`` and run with the repo as cwd, so parallel
+calls against one live checkout can step on each other (and on the user's
+working tree). ``SnapshotAgent`` runs every call in a snapshot of its cwd
+instead: a git worktree detached at a pinned commit (sharing the repo's
+object store), or a plain copy for directories outside git. Snapshots
+are created once per slot, reset between calls, reused from a pool and
+removed when the agent is closed; the run dir stays where it is, so
+outputs land in the run as before.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import anyio
+
+from .agents import AgentProtocol, acall_agent
+from .llm import ClaudeConfig
+from .telemetry import CallTelemetry
+
+
+DEFAULT_SNAPSHOT_DIR = Path("~/.cache/eip-verify/snapshots")
+DEFAULT_SNAPSHOT_REF = "HEAD"
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(cwd), *args], capture_output=True, text=True, errors="replace"
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed in {cwd}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+@dataclass(frozen=True)
+class SnapshotSource:
+    """What a snapshot is taken of: a repo root and the commit it is pinned to."""
+
+    root: Path
+    commit: Optional[str]  # None: not a git work tree, snapshot as a copy
+
+    @property
+    def kind(self) -> str:
+        return "worktree" if self.commit else "copy"
+
+    @property
+    def repo_label(self) -> str:
+        digest = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()[:8]
+        return f"{self.root.name}-{digest}"
+
+    @property
+    def label(self) -> str:
+        return f"{self.repo_label}-{self.commit[:12] if self.commit else 'tree'}"
+
+
+@dataclass
+class Snapshot:
+    source: SnapshotSource
+    path: Path
+    lock: int = field(repr=False)  # fd holding this slot's lock for the process lifetime
+
+
+class SnapshotManager:
+    """Hands out isolated snapshots of repos, one per concurrent call.
+
+    Slots live under ``root/<repo>-<hash>-<commit>/<n>`` and are locked
+    (``flock``) by the process using them, so concurrent runs on the same
+    machine claim different slots. ``aclose`` removes the slots this
+    manager created (``git worktree remove`` for worktrees).
+    """
+
+    def __init__(self, root: Path = DEFAULT_SNAPSHOT_DIR, ref: str = DEFAULT_SNAPSHOT_REF) -> None:
+        self.root = root.expanduser()
+        self.ref = ref
+        self.created = 0
+        self.reused = 0
+        self._sources: dict[Path, SnapshotSource] = {}
+        self._free: dict[SnapshotSource, list[Snapshot]] = {}
+        self._claimed: list[Snapshot] = []
+        self._lock = threading.Lock()
+
+    def source(self, path: Path) -> SnapshotSource:
+        """The snapshot source containing ``path``; the commit is pinned on first use."""
+        path = path.resolve()
+        with self._lock:
+            for root, source in self._sources.items():
+                if path == root or root in path.parents:
+                    return source
+            try:
+                root = Path(_git(path, "rev-parse", "--show-toplevel")).resolve()
+            except (RuntimeError, FileNotFoundError):
+                source = SnapshotSource(path, None)
+            else:
+                commit = _git(root, "rev-parse", f"{self.ref}^{{commit}}")
+                if self.ref == DEFAULT_SNAPSHOT_REF and _git(root, "status", "--porcelain", "-uno"):
+                    print(
+                        f"[snapshot] WARNING {root} has uncommitted changes; "
+                        f"snapshots use commit {commit[:12]}"
+                    )
+                source = SnapshotSource(root, commit)
+            self._sources[source.root] = source
+            return source
+
+    def acquire(self, path: Path) -> tuple[Snapshot, Path]:
+        """A pristine snapshot for ``path`` and where ``path`` is inside it."""
+        source = self.source(path)
+        with self._lock:
+            free = self._free.get(source)
+            snapshot = free.pop() if free else None
+        if snapshot is None:
+            snapshot = self._claim(source)
+            with self._lock:
+                self._claimed.append(snapshot)
+        self._prepare(snapshot)
+        return snapshot, snapshot.path / path.resolve().relative_to(source.root)
+
+    def release(self, snapshot: Snapshot) -> None:
+        with self._lock:
+            self._free.setdefault(snapshot.source, []).append(snapshot)
+
+    @asynccontextmanager
+    async def view(self, path: Path) -> AsyncIterator[tuple[Snapshot, Path]]:
+        snapshot, view = await anyio.to_thread.run_sync(self.acquire, path)
+        try:
+            yield snapshot, view
+        finally:
+            self.release(snapshot)
+
+    async def aclose(self) -> None:
+        await anyio.to_thread.run_sync(self.remove_all)
+
+    def remove_all(self) -> None:
+        """Remove every snapshot this manager created and free their slots."""
+        with self._lock:
+            claimed, self._claimed = self._claimed, []
+            self._free.clear()
+        for snapshot in claimed:
+            source, path = snapshot.source, snapshot.path
+            try:
+                if source.commit is not None and path.exists():
+                    with self._worktree_lock(source):
+                        _git(source.root, "worktree", "remove", "--force", str(path))
+                shutil.rmtree(path, ignore_errors=True)
+            except (RuntimeError, OSError) as exc:
+                print(f"[snapshot] WARNING could not remove {path}: {exc}")
+            finally:
+                os.close(snapshot.lock)
+
+    @contextmanager
+    def _worktree_lock(self, source: SnapshotSource) -> Iterator[None]:
+        """Serialise worktree add/prune/remove on one repo across processes."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / f"{source.repo_label}.worktrees.lock", "w") as admin:
+            fcntl.flock(admin, fcntl.LOCK_EX)
+            yield
+
+    def _claim(self, source: SnapshotSource) -> Snapshot:
+        base = self.root / source.label
+        base.mkdir(parents=True, exist_ok=True)
+        slot = 0
+        while True:
+            fd = os.open(base / f"{slot}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                slot += 1
+                continue
+            return Snapshot(source, base / str(slot), fd)
+
+    def _prepare(self, snapshot: Snapshot) -> None:
+        source, path = snapshot.source, snapshot.path
+        if source.commit is None:
+            fresh = not path.exists()
+            copy_tree(source.root, path)
+        elif (path / ".git").is_file():
+            fresh = False
+            _git(path, "reset", "-q", "--hard", source.commit)
+            _git(path, "clean", "-ffdxq")
+        else:
+            fresh = True
+            # git's worktree bookkeeping is not safe against concurrent add/prune.
+            with self._worktree_lock(source):
+                shutil.rmtree(path, ignore_errors=True)
+                _git(source.root, "worktree", "prune")
+                _git(source.root, "worktree", "add", "--detach", "-q", str(path), source.commit)
+        if fresh:
+            self.created += 1
+            print(f"[snapshot] created {source.kind} {path} ({source.root})")
+        else:
+            self.reused += 1
+
+
+def copy_tree(source: Path, target: Path) -> None:
+    """Make ``target`` a copy of ``source`` (minus ``.git``).
+
+    Files the agent added, edited, replaced or deleted are put back; files
+    whose size and mtime still match the source are left alone, so a reset
+    only copies what changed.
+    """
+    wanted: set[Path] = set()
+    for directory, dirnames, filenames in os.walk(source):
+        dirnames[:] = [name for name in dirnames if name != ".git"]
+        rel_dir = Path(directory).relative_to(source)
+        if (target / rel_dir).is_symlink() or (target / rel_dir).is_file():
+            (target / rel_dir).unlink()
+        (target / rel_dir).mkdir(parents=True, exist_ok=True)
+        wanted.add(rel_dir)
+        # Symlinked directories are not descended into; they are copied as links.
+        links = [name for name in dirnames if (Path(directory) / name).is_symlink()]
+        for name in filenames + links:
+            rel = rel_dir / name
+            wanted.add(rel)
+            original, copy = source / rel, target / rel
+            if _same_file(original, copy):
+                continue
+            if copy.is_dir() and not copy.is_symlink():
+                shutil.rmtree(copy)
+            elif copy.exists() or copy.is_symlink():
+                copy.unlink()
+            shutil.copy2(original, copy, follow_symlinks=False)
+    for directory, dirnames, filenames in os.walk(target, topdown=False):
+        rel_dir = Path(directory).relative_to(target)
+        for name in filenames:
+            if rel_dir / name not in wanted:
+                (target / rel_dir / name).unlink()
+        for name in dirnames:
+            if rel_dir / name not in wanted:
+                path = target / rel_dir / name
+                if path.is_symlink():
+                    path.unlink()
+                else:
+                    shutil.rmtree(path, ignore_errors=True)
+
+
+def _same_file(original: Path, copy: Path) -> bool:
+    if original.is_symlink() or copy.is_symlink():
+        return (
+            original.is_symlink()
+            and copy.is_symlink()
+            and os.readlink(original) == os.readlink(copy)
+        )
+    try:
+        left, right = original.stat(), copy.stat()
+    except OSError:
+        return False
+    return (
+        copy.is_file()
+        and left.st_size == right.st_size
+        and left.st_mtime_ns == right.st_mtime_ns
+        and left.st_ino != right.st_ino
+    )
+
+
+def rebase_prompt(prompt: str, root: Path, view: Path, keep: Iterable[Path] = ()) -> str:
+    """Point paths under ``root`` in ``prompt`` at ``view``, except the ``keep`` paths."""
+    kept = sorted({str(path) for path in keep}, key=len, reverse=True)
+    for index, text in enumerate(kept):
+        prompt = prompt.replace(text, f"\0{index}\0")
+    prompt = re.sub(re.escape(str(root)) + r"(?![\w.-])", lambda _: str(view), prompt)
+    for index, text in enumerate(kept):
+        prompt = prompt.replace(f"\0{index}\0", text)
+    return prompt
+
+
+class SnapshotAgent:
+    """Agent wrapper that runs every call in a pooled snapshot of its cwd.
+
+    The call's cwd and any prompt paths under the snapshotted repo are
+    rebased onto the snapshot. The run dir (``output_path``'s directory and
+    the call's CSVs) keeps its real path even when it sits inside the repo.
+    """
+
+    def __init__(self, inner: AgentProtocol, manager: SnapshotManager) -> None:
+        self.inner = inner
+        self.manager = manager
+
+    def run(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> None:
+        anyio.run(self.arun, prompt, output_path, cwd, config, metadata)
+
+    async def arun(
+        self,
+        prompt: str,
+        output_path: Path,
+        cwd: Path,
+        config: ClaudeConfig,
+        metadata: dict[str, object],
+    ) -> Optional[CallTelemetry]:
+        async with self.manager.view(cwd) as (snapshot, view):
+            keep = [output_path.parent.resolve()] + [
+                Path(str(metadata[key])).resolve()
+                for key in ("input_csv", "output_csv")
+                if metadata.get(key)
+            ]
+            prompt = rebase_prompt(prompt, snapshot.source.root, snapshot.path, keep)
+            return await acall_agent(self.inner, prompt, output_path, view, config, metadata)
+
+    async def aclose(self) -> None:
+        await self.manager.aclose()
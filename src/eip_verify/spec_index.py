@@ -53,6 +53,11 @@ def get_git_info(repo_path: Path) -> GitInfo:
     return GitInfo(branch=branch, commit=commit)
 
 
+def get_git_diff(repo_path: Path) -> Optional[str]:
+    """Uncommitted changes to tracked files (staged or not), or None when clean."""
+    return _run_git(repo_path, ["diff", "HEAD"])
+
+
 def extract_table_rows(text: str) -> list[str]:
     lines = text.splitlines()
     start = None
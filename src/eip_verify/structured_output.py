@@ -0,0 +1,306 @@
+"""Structured JSON output mode: the agent returns rows, the runner writes the CSV.
+
+In ``json`` mode phase prompts drop the write-and-verify-the-CSV instructions.
+The agent replies with one JSON object holding a row per obligation, using
+the phase's output columns. The runner validates the reply and merges it row
+by row into the CSV, so no turns are spent writing or re-reading files.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+
+OUTPUT_FORMATS = ("csv", "json")
+
+OBLIGATION_COLUMNS = [
+    "id",
+    "category",
+    "enforcement_type",
+    "statement",
+    "locations",
+    "code_flow",
+    "obligation_gap",
+    "code_gap",
+]
+CLIENT_COLUMNS = [
+    "client_locations",
+    "client_code_flow",
+    "client_obligation_gap",
+    "client_code_gap",
+]
+
+# Columns the agent fills in each phase (besides ``id``).
+PHASE_OUTPUT_COLUMNS: dict[str, list[str]] = {
+    "0A": ["category", "enforcement_type", "statement"],
+    "1A": ["locations"],
+    "1B": ["enforcement_type", "code_flow", "obligation_gap", "code_gap"],
+    "2A": ["client_locations", "client_code_flow"],
+    "2B": CLIENT_COLUMNS,
+}
+LIST_COLUMNS = {"locations", "client_locations"}
+
+# A phase output row counts as empty when none of these columns is filled.
+PHASE_REQUIRED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "0A": ("statement",),
+    "1A": ("locations",),
+    "1B": ("code_flow", "code_gap"),
+    "2A": ("client_locations",),
+    "2B": ("client_code_gap", "client_obligation_gap"),
+}
+# Phases whose output starts as a copy of rows that may already carry the
+# required columns: a row only counts as done once one of them changed.
+PHASE_CHANGED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "2B": ("client_code_gap", "client_obligation_gap"),
+}
+
+DROPPED_SECTIONS = {"output", "completion requirements"}
+SECTION_RE = re.compile(r"^([A-Z][A-Za-z ]+):\s*$")
+FILE_CONSTRAINT_RE = re.compile(r"\bcsv\b|\bwrite\b", re.IGNORECASE)
+FENCED_JSON_RE = re.compile(r"```(?:json)?\s*\n(.*?)```", re.DOTALL)
+
+
+def read_csv_rows(path: Path) -> tuple[list[str], list[dict[str, str]]]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        reader = csv.DictReader(handle)
+        rows = list(reader)
+        return list(reader.fieldnames or []), rows
+
+
+def validate_phase_output(
+    phase: str,
+    output_csv: Path,
+    row_ids: Optional[list[str]] = None,
+    input_csv: Optional[Path] = None,
+) -> list[str]:
+    """Problems with a phase output CSV: missing rows or empty required columns.
+
+    With ``input_csv``, rows of phases in ``PHASE_CHANGED_COLUMNS`` (2B)
+    also count as empty while those columns still match the input row.
+    """
+    if not output_csv.exists():
+        return [f"{output_csv.name} was not written"]
+    try:
+        _, rows = read_csv_rows(output_csv)
+    except (csv.Error, UnicodeDecodeError) as exc:
+        return [f"{output_csv.name} is not a readable CSV: {exc}"]
+    by_id = {(row.get("id") or "").strip(): row for row in rows}
+    wanted = row_ids if row_ids is not None else list(by_id)
+    if not wanted:
+        return [f"{output_csv.name} has no rows"]
+    required = PHASE_REQUIRED_COLUMNS[phase]
+    changed = PHASE_CHANGED_COLUMNS.get(phase, ())
+    inputs: dict[str, dict[str, str]] = {}
+    if changed and input_csv is not None and input_csv.is_file():
+        _, input_rows = read_csv_rows(input_csv)
+        inputs = {(row.get("id") or "").strip(): row for row in input_rows}
+    problems = []
+    for row_id in wanted:
+        row = by_id.get(row_id)
+        before = inputs.get(row_id)
+        if row is None:
+            problems.append(f"{row_id}: missing from output")
+        elif not any((row.get(name) or "").strip() for name in required):
+            problems.append(f"{row_id}: empty {' / '.join(required)}")
+        elif before is not None and all(
+            (row.get(name) or "").strip() == (before.get(name) or "").strip() for name in changed
+        ):
+            problems.append(f"{row_id}: {' / '.join(changed)} unchanged from the input")
+    return problems
+
+
+class StructuredOutputError(ValueError):
+    """The agent reply is not a valid JSON row set for the phase."""
+
+
+def normalize_output_format(output_format: Optional[str]) -> str:
+    value = (output_format or "csv").strip().lower()
+    if value not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}: {output_format}")
+    return value
+
+
+def output_fieldnames(phase: str, input_fields: list[str]) -> list[str]:
+    """CSV header of a phase output: the input header plus the columns it adds."""
+    if phase == "0A":
+        return list(OBLIGATION_COLUMNS)
+    added = CLIENT_COLUMNS if phase.startswith("2") else PHASE_OUTPUT_COLUMNS[phase]
+    return list(input_fields) + [name for name in added if name not in input_fields]
+
+
+def row_schema(phase: str) -> dict[str, object]:
+    """JSON schema of the reply for ``phase``."""
+    columns = PHASE_OUTPUT_COLUMNS[phase]
+    properties: dict[str, object] = {"id": {"type": "string"}}
+    for name in columns:
+        if name in LIST_COLUMNS:
+            properties[name] = {"type": "array", "items": {"type": "string"}}
+        else:
+            properties[name] = {"type": "string"}
+    return {
+        "type": "object",
+        "required": ["rows"],
+        "properties": {
+            "rows": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["id", *columns],
+                    "properties": properties,
+                    "additionalProperties": False,
+                },
+            }
+        },
+    }
+
+
+def strip_file_instructions(prompt: str) -> str:
+    """Remove the Output/Completion sections and file-writing constraints."""
+    lines: list[str] = []
+    section = ""
+    for line in prompt.splitlines():
+        match = SECTION_RE.match(line)
+        if match:
+            section = match.group(1).strip().lower()
+        if section in DROPPED_SECTIONS:
+            continue
+        if section == "constraints" and line.startswith("-") and FILE_CONSTRAINT_RE.search(line):
+            continue
+        lines.append(line)
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def render_json_instructions(
+    phase: str, rows: Optional[list[dict[str, str]]] = None
+) -> str:
+    """Output section for ``json`` mode, with the input rows inlined."""
+    columns = PHASE_OUTPUT_COLUMNS[phase]
+    lines = ["", "Output:"]
+    if phase == "0A":
+        lines.append("- Return one JSON row per obligation, in order, with its id.")
+    else:
+        lines.append("- Return one JSON row per input row below, keyed by its id.")
+    lines += [
+        f"- Fill these fields: {', '.join(columns)}. Use an empty string when a value is unknown.",
+    ]
+    listed = [name for name in columns if name in LIST_COLUMNS]
+    if listed:
+        lines.append(f"- {', '.join(listed)} must be a JSON array of location strings.")
+    lines += [
+        "- Do not create or modify any files; the runner writes the CSV from your reply.",
+        "- End your reply with a single ```json fenced block matching this schema:",
+        "",
+        "```json",
+        json.dumps(row_schema(phase), indent=2),
+        "```",
+    ]
+    if rows is not None:
+        lines += [
+            "",
+            "Input rows:",
+            "```json",
+            json.dumps(rows, indent=2, ensure_ascii=False),
+            "```",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def json_prompt(prompt: str, phase: str, rows: Optional[list[dict[str, str]]] = None) -> str:
+    return strip_file_instructions(prompt) + render_json_instructions(phase, rows)
+
+
+def extract_json_payload(text: str) -> dict[str, object]:
+    """Find the JSON reply: the last fenced block, else the last bare object with ``rows``."""
+    candidates = [block.strip() for block in FENCED_JSON_RE.findall(text)]
+    for block in reversed(candidates):
+        try:
+            payload = json.loads(block)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(payload, dict) and "rows" in payload:
+            return payload
+    decoder = json.JSONDecoder()
+    found: Optional[dict[str, object]] = None
+    for match in re.finditer(r"\{", text):
+        try:
+            payload, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(payload, dict) and "rows" in payload:
+            found = payload
+    if found is None:
+        raise StructuredOutputError("No JSON object with a 'rows' array in the agent reply")
+    return found
+
+
+def _cell(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "[" + ", ".join(str(item).strip() for item in value) + "]"
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+
+def parse_structured_rows(
+    phase: str, text: str, row_ids: Optional[list[str]] = None
+) -> list[dict[str, str]]:
+    """Validate the agent reply and return its rows as CSV cells.
+
+    With ``row_ids`` every returned id must be one of them and appear once;
+    ids the reply leaves out keep their input values.
+    """
+    payload = extract_json_payload(text)
+    rows = payload.get("rows")
+    if not isinstance(rows, list):
+        raise StructuredOutputError("'rows' must be a JSON array")
+    columns = PHASE_OUTPUT_COLUMNS[phase]
+    allowed = set(row_ids) if row_ids is not None else None
+    parsed: list[dict[str, str]] = []
+    seen: set[str] = set()
+    for position, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise StructuredOutputError(f"Row {position} is not a JSON object")
+        row_id = _cell(row.get("id"))
+        if not row_id:
+            raise StructuredOutputError(f"Row {position} has no id")
+        if allowed is not None and row_id not in allowed:
+            raise StructuredOutputError(f"Row id {row_id!r} is not in the input rows")
+        if row_id in seen:
+            raise StructuredOutputError(f"Row id {row_id!r} appears more than once")
+        seen.add(row_id)
+        cells = {"id": row_id}
+        for name in columns:
+            if name in row:
+                cells[name] = _cell(row[name])
+        parsed.append(cells)
+    if phase == "0A" and not parsed:
+        raise StructuredOutputError("Phase 0A reply has no obligation rows")
+    return parsed
+
+
+def merge_structured_rows(
+    rows: list[dict[str, str]], updates: list[dict[str, str]]
+) -> list[dict[str, str]]:
+    """Apply reply rows to the input rows by id, keeping order and other columns."""
+    by_id = {update["id"]: update for update in updates}
+    return [
+        {**row, **by_id.get((row.get("id") or "").strip(), {})} for row in rows
+    ]
+
+
+def render_json_rows(phase: str, rows: list[dict[str, str]]) -> str:
+    """A reply in the ``json`` mode format (used by the offline agents)."""
+    columns = PHASE_OUTPUT_COLUMNS[phase]
+    payload = {
+        "rows": [
+            {"id": row.get("id", ""), **{name: row.get(name) or "" for name in columns}}
+            for row in rows
+        ]
+    }
+    return "```json\n" + json.dumps(payload, indent=2, ensure_ascii=False) + "\n```\n"
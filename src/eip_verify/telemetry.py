@@ -0,0 +1,185 @@
+"""Token, cost and latency telemetry for agent calls."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+
+USAGE_KEYS = [
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+]
+
+TOTAL_KEYS = [
+    *USAGE_KEYS,
+    "total_cost_usd",
+    "num_turns",
+    "tool_calls",
+    "wall_time_s",
+]
+
+
+@dataclass
+class CallTelemetry:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    total_cost_usd: float = 0.0
+    num_turns: int = 0
+    duration_ms: Optional[int] = None
+    duration_api_ms: Optional[int] = None
+    wall_time_s: float = 0.0
+    turn_wall_times_s: list[float] = field(default_factory=list)
+    tool_calls: list[dict[str, object]] = field(default_factory=list)
+    model: Optional[str] = None
+    is_error: bool = False
+    error: Optional[str] = None
+    api_error_status: Optional[int] = None
+    cache_hit: bool = False
+    hedged: bool = False
+    # Estimated spend of a hedge's cancelled attempt; hedge_cost_usd is in total_cost_usd.
+    hedge_tokens: int = 0
+    hedge_cost_usd: float = 0.0
+    early_stopped: bool = False
+    batched: bool = False
+    # Replay mode: the EIP whose recorded session was served when the call's own had none.
+    replayed_from: Optional[str] = None
+
+    def to_dict(self) -> dict[str, object]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> "CallTelemetry":
+        known = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+class TelemetryRecorder:
+    """Builds a CallTelemetry from the SDK message stream of one call.
+
+    A turn is timed from the previous message (or the call start) to the
+    assistant message that ends it; a tool call is timed from its ToolUseBlock
+    to the matching ToolResultBlock.
+    """
+
+    def __init__(self, model: Optional[str] = None) -> None:
+        self.telemetry = CallTelemetry(model=model)
+        self._started = time.monotonic()
+        self._last_message = self._started
+        self._pending_tools: dict[str, tuple[str, float]] = {}
+
+    def observe(self, message: object) -> None:
+        from claude_agent_sdk import (
+            AssistantMessage,
+            ResultMessage,
+            ToolResultBlock,
+            ToolUseBlock,
+            UserMessage,
+        )
+
+        now = time.monotonic()
+        if isinstance(message, AssistantMessage):
+            self.telemetry.turn_wall_times_s.append(round(now - self._last_message, 3))
+            self.telemetry.model = message.model or self.telemetry.model
+            # AssistantMessage.error only exists in newer SDK releases.
+            error = getattr(message, "error", None)
+            if error:
+                self.telemetry.error = error
+            for block in message.content:
+                if isinstance(block, ToolUseBlock):
+                    self._pending_tools[block.id] = (block.name, now)
+        elif isinstance(message, UserMessage) and isinstance(message.content, list):
+            for block in message.content:
+                if isinstance(block, ToolResultBlock):
+                    self.tool_finished(block.tool_use_id, now, bool(block.is_error))
+        elif isinstance(message, ResultMessage):
+            self.record_result(message)
+        self._last_message = now
+
+    def tool_finished(self, tool_use_id: str, now: float, is_error: bool = False) -> None:
+        pending = self._pending_tools.pop(tool_use_id, None)
+        if pending is None:
+            return
+        name, started = pending
+        self.telemetry.tool_calls.append(
+            {
+                "id": tool_use_id,
+                "name": name,
+                "duration_s": round(now - started, 3),
+                "is_error": is_error,
+            }
+        )
+
+    def record_result(self, message: object) -> None:
+        usage = getattr(message, "usage", None) or {}
+        for key in USAGE_KEYS:
+            setattr(self.telemetry, key, int(usage.get(key) or 0))
+        self.telemetry.total_cost_usd = float(getattr(message, "total_cost_usd", None) or 0.0)
+        self.telemetry.num_turns = int(getattr(message, "num_turns", 0) or 0)
+        self.telemetry.duration_ms = getattr(message, "duration_ms", None)
+        self.telemetry.duration_api_ms = getattr(message, "duration_api_ms", None)
+        self.telemetry.is_error = bool(getattr(message, "is_error", False))
+        self.telemetry.api_error_status = getattr(message, "api_error_status", None)
+
+    def finish(self) -> CallTelemetry:
+        self.telemetry.wall_time_s = round(time.monotonic() - self._started, 3)
+        return self.telemetry
+
+
+def summarize_telemetry(items: Iterable[Optional[CallTelemetry]]) -> dict[str, object]:
+    """Sum telemetry over calls; ``max_call_wall_time_s`` tracks the slowest call."""
+    totals: dict[str, object] = {key: 0 for key in TOTAL_KEYS}
+    totals["total_cost_usd"] = 0.0
+    totals["wall_time_s"] = 0.0
+    totals["calls"] = 0
+    totals["cache_hits"] = 0
+    totals["hedged_calls"] = 0
+    totals["hedge_tokens"] = 0
+    totals["hedge_cost_usd"] = 0.0
+    totals["early_stopped_calls"] = 0
+    totals["batched_calls"] = 0
+    totals["max_call_wall_time_s"] = 0.0
+    for item in items:
+        if item is None:
+            continue
+        totals["calls"] += 1
+        totals["cache_hits"] += int(item.cache_hit)
+        totals["hedged_calls"] += int(item.hedged)
+        totals["hedge_tokens"] += item.hedge_tokens
+        totals["hedge_cost_usd"] += item.hedge_cost_usd
+        totals["early_stopped_calls"] += int(item.early_stopped)
+        totals["batched_calls"] += int(item.batched)
+        for key in USAGE_KEYS:
+            totals[key] += getattr(item, key)
+        totals["total_cost_usd"] += item.total_cost_usd
+        totals["num_turns"] += item.num_turns
+        totals["tool_calls"] += len(item.tool_calls)
+        totals["wall_time_s"] += item.wall_time_s
+        totals["max_call_wall_time_s"] = max(totals["max_call_wall_time_s"], item.wall_time_s)
+    totals["total_cost_usd"] = round(totals["total_cost_usd"], 6)
+    totals["hedge_cost_usd"] = round(totals["hedge_cost_usd"], 6)
+    totals["wall_time_s"] = round(totals["wall_time_s"], 3)
+    return totals
+
+
+def add_totals(items: Iterable[dict[str, object]]) -> dict[str, object]:
+    """Add already summarized telemetry dicts (e.g. across phases)."""
+    result: dict[str, object] = {}
+    for item in items:
+        for key, value in item.items():
+            if not isinstance(value, (int, float)):
+                continue
+            if key.startswith("max_"):
+                result[key] = max(result.get(key, 0), value)
+            else:
+                result[key] = result.get(key, 0) + value
+    if "total_cost_usd" in result:
+        result["total_cost_usd"] = round(float(result["total_cost_usd"]), 6)
+    if "wall_time_s" in result:
+        result["wall_time_s"] = round(float(result["wall_time_s"]), 3)
+    return result
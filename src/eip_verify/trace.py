@@ -0,0 +1,294 @@
+"""Tool-call traces for agent calls and the exploration hot-spot report."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .utils import ensure_dir, timestamp
+
+
+TRACE_SUFFIX = ".trace.jsonl"
+MAX_TARGET_LEN = 160
+
+
+def trace_path(output_path: Path) -> Path:
+    return output_path.with_suffix(TRACE_SUFFIX)
+
+
+def _result_size(content: object) -> int:
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return len(content)
+    return len(json.dumps(content, default=str))
+
+
+class ToolTracer:
+    """Writes one JSONL record per finished tool call of an agent session.
+
+    A record holds the tool name, its full input, wall-clock duration, result
+    size and error flag, plus the phase and EIP of the call. Tool calls still
+    pending when the session ends are written with ``finished: false``.
+    """
+
+    def __init__(self, path: Path, metadata: dict[str, object]) -> None:
+        self.path = path
+        self.phase = metadata.get("phase")
+        self.eip_number = metadata.get("eip_number")
+        self._handle = path.open("w", encoding="utf-8")
+        self._pending: dict[str, tuple[str, dict[str, object], float, int]] = {}
+        self._turn = 0
+
+    def __enter__(self) -> "ToolTracer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def observe(self, message: object) -> None:
+        from claude_agent_sdk import AssistantMessage, ToolResultBlock, ToolUseBlock, UserMessage
+
+        now = time.monotonic()
+        if isinstance(message, AssistantMessage):
+            self._turn += 1
+            for block in message.content:
+                if isinstance(block, ToolUseBlock):
+                    self._pending[block.id] = (block.name, dict(block.input), now, self._turn)
+        elif isinstance(message, UserMessage) and isinstance(message.content, list):
+            for block in message.content:
+                if isinstance(block, ToolResultBlock):
+                    self.tool_finished(
+                        block.tool_use_id,
+                        now,
+                        _result_size(block.content),
+                        bool(block.is_error),
+                    )
+
+    def tool_finished(
+        self, tool_use_id: str, now: float, result_size: int, is_error: bool = False
+    ) -> None:
+        pending = self._pending.pop(tool_use_id, None)
+        if pending is None:
+            return
+        name, tool_input, started, turn = pending
+        duration = round(now - started, 3)
+        self._write(tool_use_id, name, tool_input, turn, duration, result_size, is_error, True)
+
+    def _write(
+        self,
+        tool_use_id: str,
+        name: str,
+        tool_input: dict[str, object],
+        turn: int,
+        duration_s: Optional[float],
+        result_size: int,
+        is_error: bool,
+        finished: bool,
+    ) -> None:
+        record = {
+            "ts": timestamp(),
+            "phase": self.phase,
+            "eip_number": self.eip_number,
+            "turn": turn,
+            "id": tool_use_id,
+            "tool": name,
+            "input": tool_input,
+            "duration_s": duration_s,
+            "result_size": result_size,
+            "is_error": is_error,
+            "finished": finished,
+        }
+        self._handle.write(json.dumps(record, default=str) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        for tool_use_id, (name, tool_input, _, turn) in self._pending.items():
+            self._write(tool_use_id, name, tool_input, turn, None, 0, False, False)
+        self._pending.clear()
+        self._handle.close()
+
+
+def tool_target(tool: str, tool_input: dict[str, object]) -> str:
+    """What a tool call explored: the file read, the search run or the command."""
+    if tool == "Read":
+        target = str(tool_input.get("file_path") or "")
+    elif tool == "Grep":
+        where = tool_input.get("path") or tool_input.get("glob") or "."
+        target = f"{tool_input.get('pattern')} in {where}"
+    elif tool == "Glob":
+        where = tool_input.get("path")
+        target = f"{tool_input.get('pattern')}" + (f" in {where}" if where else "")
+    elif tool == "Bash":
+        target = str(tool_input.get("command") or "")
+    else:
+        target = json.dumps(tool_input, sort_keys=True, default=str)
+    target = " ".join(target.split())
+    if len(target) > MAX_TARGET_LEN:
+        target = target[: MAX_TARGET_LEN - 3] + "..."
+    return target
+
+
+def load_trace_records(roots: Iterable[Path]) -> list[dict[str, object]]:
+    """Read every ``*.trace.jsonl`` under the given run roots."""
+    records: list[dict[str, object]] = []
+    for root in roots:
+        paths = [root] if root.is_file() else sorted(root.rglob(f"*{TRACE_SUFFIX}"))
+        for path in paths:
+            with path.open(encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    record["trace_file"] = str(path)
+                    records.append(record)
+    return records
+
+
+def build_trace_report(records: list[dict[str, object]], top: int = 25) -> dict[str, object]:
+    """Rank tools and explored targets by how often and how long they were used.
+
+    ``repeats`` counts calls that re-ran the same tool on the same target
+    within one session; those are turns a pre-indexed or inlined file would save.
+    """
+    tools: dict[str, dict[str, object]] = {}
+    targets: dict[tuple[str, str], dict[str, object]] = {}
+    seen: set[tuple[str, str, str]] = set()
+    for record in records:
+        tool = str(record.get("tool") or "")
+        target = tool_target(tool, record.get("input") or {})
+        duration = float(record.get("duration_s") or 0.0)
+        size = int(record.get("result_size") or 0)
+        trace_file = str(record.get("trace_file") or "")
+
+        stats = tools.setdefault(
+            tool, {"tool": tool, "calls": 0, "errors": 0, "duration_s": 0.0, "result_bytes": 0}
+        )
+        stats["calls"] += 1
+        stats["errors"] += int(bool(record.get("is_error")))
+        stats["duration_s"] += duration
+        stats["result_bytes"] += size
+
+        entry = targets.setdefault(
+            (tool, target),
+            {
+                "tool": tool,
+                "target": target,
+                "calls": 0,
+                "repeats": 0,
+                "sessions": set(),
+                "phases": set(),
+                "duration_s": 0.0,
+                "result_bytes": 0,
+            },
+        )
+        entry["calls"] += 1
+        entry["duration_s"] += duration
+        entry["result_bytes"] += size
+        entry["sessions"].add(trace_file)
+        if record.get("phase"):
+            entry["phases"].add(str(record["phase"]))
+        key = (trace_file, tool, target)
+        if key in seen:
+            entry["repeats"] += 1
+        seen.add(key)
+
+    def finish(entry: dict[str, object]) -> dict[str, object]:
+        return {
+            **entry,
+            "sessions": len(entry["sessions"]),
+            "phases": sorted(entry["phases"]),
+            "duration_s": round(entry["duration_s"], 3),
+        }
+
+    ranked = sorted(targets.values(), key=lambda item: (-item["calls"], -item["duration_s"]))
+    reads = [finish(item) for item in ranked if item["tool"] == "Read"][:top]
+    searches = [finish(item) for item in ranked if item["tool"] in {"Grep", "Glob"}][:top]
+    commands = [finish(item) for item in ranked if item["tool"] == "Bash"][:top]
+    repeated = sorted(
+        (finish(item) for item in targets.values() if item["repeats"]),
+        key=lambda item: (-item["repeats"], -item["duration_s"]),
+    )[:top]
+    tool_rows = sorted(
+        ({**stats, "duration_s": round(stats["duration_s"], 3)} for stats in tools.values()),
+        key=lambda item: -item["duration_s"],
+    )
+    return {
+        "generated_at": timestamp(),
+        "sessions": len({str(record.get("trace_file")) for record in records}),
+        "tool_calls": len(records),
+        "tools": tool_rows,
+        "top_reads": reads,
+        "top_searches": searches,
+        "top_commands": commands,
+        "repeated": repeated,
+    }
+
+
+def _target_table(title: str, rows: list[dict[str, object]]) -> list[str]:
+    lines = [f"## {title}", ""]
+    if not rows:
+        return lines + ["None", ""]
+    lines += [
+        "| Calls | Repeats | Sessions | Phases | Time (s) | Result bytes | Target |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for row in rows:
+        target = str(row["target"]).replace("|", "\\|")
+        lines.append(
+            f"| {row['calls']} | {row['repeats']} | {row['sessions']} | "
+            f"{', '.join(row['phases'])} | {row['duration_s']} | {row['result_bytes']} | `{target}` |"
+        )
+    return lines + [""]
+
+
+def render_trace_report_md(report: dict[str, object]) -> str:
+    lines = [
+        "# Tool Trace Report",
+        "",
+        f"- Generated at: {report['generated_at']}",
+        f"- Sessions: {report['sessions']}",
+        f"- Tool calls: {report['tool_calls']}",
+        "",
+        "## Tools",
+        "",
+        "| Tool | Calls | Errors | Time (s) | Result bytes |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    for row in report["tools"]:
+        lines.append(
+            f"| {row['tool']} | {row['calls']} | {row['errors']} | "
+            f"{row['duration_s']} | {row['result_bytes']} |"
+        )
+    lines.append("")
+    lines += _target_table("Most read files", report["top_reads"])
+    lines += _target_table("Most run searches", report["top_searches"])
+    lines += _target_table("Most run commands", report["top_commands"])
+    lines += _target_table("Repeated within a session", report["repeated"])
+    return "\n".join(lines)
+
+
+def write_trace_report(
+    run_roots: list[Path],
+    output_dir: Optional[str],
+    formats: Optional[list[str]] = None,
+    top: int = 25,
+) -> dict[str, object]:
+    report = build_trace_report(load_trace_records(run_roots), top=top)
+    if output_dir:
+        out_dir = Path(output_dir).expanduser().resolve()
+    else:
+        out_dir = run_roots[0] if run_roots[0].is_dir() else run_roots[0].parent
+    ensure_dir(out_dir)
+    formats = formats or ["json", "md"]
+    if "json" in formats:
+        (out_dir / "trace_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if "md" in formats:
+        (out_dir / "trace_report.md").write_text(render_trace_report_md(report), encoding="utf-8")
+    return report
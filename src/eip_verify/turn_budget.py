@@ -0,0 +1,96 @@
+"""Adaptive per-call turn budgets learned from recorded runs (``max_turns=auto``)."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .run_history import DEFAULT_HISTORY, load_calls
+
+
+AUTO_TURNS = "auto"
+DEFAULT_AUTO_TURNS = 20
+MIN_AUTO_TURNS = 3
+MAX_AUTO_TURNS = 50
+TURN_PERCENTILE = 0.9
+HEADROOM = 1.25
+STARVED_GROWTH = 1.5
+MIN_SAMPLES = 3
+
+
+@dataclass(frozen=True)
+class TurnSample:
+    """Turns one call used, its cap, and whether its output validated.
+
+    ``size`` is the rows the call covered, or the EIP size in kilotokens for
+    phase 0A.
+    """
+
+    phase: str
+    size: float
+    turns: float
+    max_turns: Optional[int]
+    passed: bool
+
+    @property
+    def starved(self) -> bool:
+        return not self.passed and self.max_turns is not None and self.turns >= self.max_turns
+
+
+class TurnBudget:
+    """Picks ``max_turns`` per call from the turns similar past calls needed.
+
+    Similar calls are those of the same phase whose size is within a factor
+    of two (all calls of the phase when fewer than ``MIN_SAMPLES`` match). The
+    budget is the 90th percentile of the turns validated calls used, plus
+    headroom; if similar calls failed validation after using their whole cap,
+    the budget grows past that cap instead. Phases without history get
+    ``fallback``.
+    """
+
+    def __init__(
+        self, samples: Iterable[TurnSample] = (), fallback: int = DEFAULT_AUTO_TURNS
+    ) -> None:
+        self.samples = list(samples)
+        self.fallback = fallback
+
+    @classmethod
+    def load(cls, roots: Iterable[Path], fallback: int = DEFAULT_AUTO_TURNS) -> "TurnBudget":
+        samples = [
+            TurnSample(call.phase, call.rows, call.turns, call.max_turns, call.passed)
+            for call in load_calls(roots)
+            if call.turns is not None and call.rows > 0
+        ]
+        return cls(samples, fallback)
+
+    def _similar(self, phase: str, size: float) -> list[TurnSample]:
+        same_phase = [sample for sample in self.samples if sample.phase == phase]
+        if size <= 0:
+            return same_phase
+        near = [sample for sample in same_phase if size / 2 <= sample.size <= size * 2]
+        return near if len(near) >= MIN_SAMPLES else same_phase
+
+    def turns_for(self, phase: str, size: float) -> int:
+        similar = self._similar(phase, size)
+        passing = sorted(sample.turns for sample in similar if sample.passed)
+        starved = [sample.max_turns for sample in similar if sample.starved]
+        if not passing and not starved:
+            return self.fallback
+        budget = 0
+        if passing:
+            rank = min(len(passing), max(1, math.ceil(TURN_PERCENTILE * len(passing))))
+            budget = math.ceil(passing[rank - 1] * HEADROOM)
+        if starved:
+            budget = max(budget, math.ceil(max(starved) * STARVED_GROWTH))
+        return max(MIN_AUTO_TURNS, min(MAX_AUTO_TURNS, budget))
+
+
+def turn_budget_for(max_turns: Union[int, str, TurnBudget, None]) -> Optional[TurnBudget]:
+    """The TurnBudget behind a ``max_turns`` setting, or None for a fixed number."""
+    if isinstance(max_turns, TurnBudget):
+        return max_turns
+    if isinstance(max_turns, str) and max_turns.strip().lower() == AUTO_TURNS:
+        return TurnBudget.load([DEFAULT_HISTORY])
+    return None
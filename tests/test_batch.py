@@ -0,0 +1,154 @@
+import json
+from pathlib import Path
+
+import anyio
+import pytest
+
+from eip_verify.agents import TransientAgentError
+from eip_verify.batch import BatchAgent, LocalBatchServer, LocalBatchTransport, batch_cost_usd
+from eip_verify.circuit import CircuitOpenError, CircuitSettings, SharedCircuitBreaker
+from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.llm import build_claude_config
+from eip_verify.pipeline import run_sweep
+from eip_verify.ratelimit import RateLimitSettings, SharedRateLimiter
+
+
+README = """# Execution Specs
+
+### Ethereum Protocol Releases
+
+| | Fork | EIPs |
+| - | - | - |
+| 1 | London | [EIP-1559](./EIPs/eip-1559.md), [EIP-3198](./EIPs/eip-3198.md) |
+"""
+
+
+class CountingAgent(FakeClaudeAgent):
+    def __init__(self) -> None:
+        super().__init__()
+        self.phases: list[str] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.phases.append(str(metadata["phase"]))
+        return await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def _spec_repo(tmp_path: Path) -> Path:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    (spec_repo / "EIPs").mkdir()
+    (spec_repo / "README.md").write_text(README, encoding="utf-8")
+    for number in ("1559", "3198"):
+        (spec_repo / "EIPs" / f"eip-{number}.md").write_text(
+            f"# EIP-{number}\n\nText of EIP-{number}.\n", encoding="utf-8"
+        )
+    return spec_repo
+
+
+def test_sweep_batches_tool_free_calls_across_eips(tmp_path: Path) -> None:
+    spec_repo = _spec_repo(tmp_path)
+    inner = CountingAgent()
+    transport = LocalBatchTransport(tmp_path / "batches", LocalBatchServer(tmp_path / "batches"))
+    agent = BatchAgent(inner, transport, window_s=0.05, poll_s=0)
+
+    root = run_sweep(
+        eips=["1559", "3198"],
+        phases=["extract", "locate-spec", "analyze-spec"],
+        spec_repo=str(spec_repo),
+        eips_dir=str(spec_repo / "EIPs"),
+        output_dir=str(tmp_path / "sweep"),
+        llm_mode="batch",
+        agent=agent,
+        output_format="json",
+        context_budget=2000,
+    )
+
+    # One job per batched phase, each covering both EIPs; 1A needs tools and ran live.
+    assert transport.submitted == 2
+    assert sorted(inner.phases) == ["1A", "1A"]
+    jobs = sorted((tmp_path / "batches").glob("*/requests.jsonl"))
+    requests = [json.loads(line) for job in jobs for line in job.read_text(encoding="utf-8").splitlines()]
+    assert sorted(request["metadata"]["eip_number"] for request in requests) == ["1559", "1559", "3198", "3198"]
+    extract = next(r for r in requests if r["metadata"]["phase"] == "0A")
+    assert "Text of EIP-" in extract["params"]["messages"][0]["content"]
+
+    sweep = json.loads((root / "sweep.json").read_text(encoding="utf-8"))
+    assert sweep["failed"] == []
+    manifests = sorted((root / "eip-3198").rglob("phase1B_runs/*/run_manifest.json"))
+    manifest = json.loads(manifests[-1].read_text(encoding="utf-8"))
+    assert manifest["telemetry"]["batched_calls"] == 1
+    rows = Path(manifest["output_csv"]).read_text(encoding="utf-8")
+    assert "EIP3198-OBL-002" in rows and "Missing assertion in spec" in rows
+
+
+def test_failed_batch_requests_are_retryable(tmp_path: Path) -> None:
+    def respond(request):
+        raise RuntimeError("overloaded")
+
+    queue = LocalBatchTransport(tmp_path)
+    agent = BatchAgent(FakeClaudeAgent(), queue, window_s=0, poll_s=0.01)
+    config = build_claude_config(None, 1, None, llm_mode="batch")
+    metadata = {"phase": "1B", "output_format": "json", "eip_number": "1", "repo_context": True}
+
+    async def main() -> None:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(agent.arun, "prompt", tmp_path / "out.txt", tmp_path, config, metadata)
+            while not LocalBatchServer(tmp_path).pending():
+                await anyio.sleep(0.01)
+            # A server running elsewhere picks the queued job up.
+            assert LocalBatchServer(tmp_path, respond).process_pending() == 1
+
+    with pytest.raises(Exception) as excinfo:
+        anyio.run(main)
+    errors = getattr(excinfo.value, "exceptions", [excinfo.value])
+    assert isinstance(errors[0], TransientAgentError)
+    assert "overloaded" in str(errors[0])
+
+
+def test_gap_analysis_without_repo_context_runs_live(tmp_path: Path) -> None:
+    inner = CountingAgent()
+    transport = LocalBatchTransport(tmp_path / "batches", LocalBatchServer(tmp_path / "batches"))
+    agent = BatchAgent(inner, transport, window_s=0, poll_s=0)
+    config = build_claude_config(None, 1, None, llm_mode="batch")
+    metadata = {"phase": "1B", "output_format": "json", "eip_number": "1"}
+
+    anyio.run(agent.arun, "prompt", tmp_path / "out.txt", tmp_path, config, metadata)
+
+    assert inner.phases == ["1B"] and transport.submitted == 0
+
+
+def test_batched_calls_are_charged_and_reported(tmp_path: Path) -> None:
+    limiter = SharedRateLimiter(tmp_path / "limits.sqlite", RateLimitSettings(budget_tokens=10**6))
+    breaker = SharedCircuitBreaker(
+        tmp_path / "circuit.sqlite", CircuitSettings(failures=1, cooldown_s=60, max_wait_s=60)
+    )
+    config = build_claude_config(None, 1, None, llm_mode="batch")
+    metadata = {"phase": "0A", "output_format": "json", "eip_number": "1"}
+
+    def agent_for(*respond) -> BatchAgent:
+        transport = LocalBatchTransport(tmp_path / "batches", LocalBatchServer(tmp_path / "batches", *respond))
+        return BatchAgent(
+            FakeClaudeAgent(), transport, window_s=0, poll_s=0, limiter=limiter, breaker=breaker
+        )
+
+    telemetry = anyio.run(
+        agent_for().arun, "prompt", tmp_path / "out.txt", tmp_path, config, metadata
+    )
+    usage = limiter.usage()
+    assert usage["calls"] == 1 and usage["tokens"] == telemetry.input_tokens + telemetry.output_tokens
+    # Sonnet at half price: $1.5 / $7.5 per million input / output tokens.
+    cost = (telemetry.input_tokens * 1.5 + telemetry.output_tokens * 7.5) / 1_000_000
+    assert telemetry.total_cost_usd == pytest.approx(cost, abs=1e-6) and cost > 0
+    assert usage["cost_usd"] == pytest.approx(telemetry.total_cost_usd)
+    assert batch_cost_usd("claude-opus-4-1", {"output_tokens": 10**6}) == 37.5
+    assert batch_cost_usd("some-new-model", {"input_tokens": 10**6}) == 7.5
+
+    def respond(request):
+        raise RuntimeError("overloaded")
+
+    with pytest.raises(CircuitOpenError):
+        anyio.run(
+            agent_for(respond).arun, "prompt", tmp_path / "out.txt", tmp_path, config, metadata
+        )
+    assert breaker.status()["state"] == "open"
+    assert limiter.usage()["calls"] == 2
@@ -0,0 +1,157 @@
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from eip_verify.cache import CachingAgent, ResponseCache
+from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.llm import build_claude_config
+from eip_verify.runner import PhaseContext, run_query
+from eip_verify.telemetry import CallTelemetry
+
+
+class CountingAgent(FakeClaudeAgent):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def arun(self, prompt, output_path, cwd, config, metadata) -> None:
+        self.calls += 1
+        await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def _config():
+    return build_claude_config(
+        model="claude-sonnet-4-5",
+        max_turns=1,
+        allowed_tools=None,
+        llm_mode="fake",
+    )
+
+
+def _run(
+    agent,
+    run_dir: Path,
+    prompt_suffix: str = "",
+    cwd: Optional[Path] = None,
+    eip_file: Optional[Path] = None,
+) -> Path:
+    run_dir.mkdir(parents=True)
+    output_csv = run_dir / "obligations_index.csv"
+    run_query(
+        f"Write CSV to: {output_csv}{prompt_suffix}",
+        run_dir / "phase0A_output.txt",
+        cwd or run_dir,
+        _config(),
+        agent,
+        PhaseContext(phase="0A", output_csv=output_csv, eip_number="1559", eip_file=eip_file),
+    )
+    return output_csv
+
+
+def test_cache_read_replays_across_run_dirs(tmp_path: Path) -> None:
+    inner = CountingAgent()
+    agent = CachingAgent(inner, ResponseCache(tmp_path / "cache"), mode="read")
+
+    first = _run(agent, tmp_path / "runs" / "a")
+    second = _run(agent, tmp_path / "runs" / "b")
+
+    assert inner.calls == 1
+    assert second.read_text(encoding="utf-8") == first.read_text(encoding="utf-8")
+    assert (second.parent / "phase0A_output.txt").exists()
+
+    _run(agent, tmp_path / "runs" / "c", prompt_suffix="\nchanged")
+    assert inner.calls == 2
+
+
+def test_cache_write_mode_always_calls_agent(tmp_path: Path) -> None:
+    inner = CountingAgent()
+    agent = CachingAgent(inner, ResponseCache(tmp_path / "cache"), mode="write")
+
+    _run(agent, tmp_path / "runs" / "a")
+    _run(agent, tmp_path / "runs" / "b")
+
+    assert inner.calls == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache", max_bytes=10**9)
+    sources = tmp_path / "src"
+    sources.mkdir()
+    keys = []
+    for idx in range(3):
+        output = sources / f"out{idx}.txt"
+        output.write_text("x" * 1000, encoding="utf-8")
+        key = f"{idx:02d}" * 32
+        cache.store(key, output, None, {})
+        marker = cache.entry_dir(key) / "entry.json"
+        os.utime(marker, (1000 + idx, 1000 + idx))
+        keys.append(key)
+
+    cache.lookup(keys[0])
+    cache.max_bytes = 2500
+    removed = cache.evict()
+
+    assert removed == [cache.entry_dir(keys[1])]
+    assert cache.lookup(keys[0]) is not None
+    assert cache.lookup(keys[2]) is not None
+
+
+def test_cache_key_covers_the_eip_file_and_uncommitted_edits(tmp_path: Path) -> None:
+    eips = tmp_path / "EIPs"
+    eips.mkdir()
+    eip_file = eips / "eip-1559.md"
+    eip_file.write_text("Base fee v1\n", encoding="utf-8")
+    git = ["git", "-C", str(eips), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "init"], check=True)
+    inner = CountingAgent()
+    agent = CachingAgent(inner, ResponseCache(tmp_path / "cache"), mode="read")
+    runs = tmp_path / "runs"
+
+    _run(agent, runs / "a", cwd=eips, eip_file=eip_file)
+    _run(agent, runs / "b", cwd=eips, eip_file=eip_file)
+    assert inner.calls == 1
+
+    eip_file.write_text("Base fee v2\n", encoding="utf-8")
+    _run(agent, runs / "c", cwd=eips, eip_file=eip_file)
+    _run(agent, runs / "d", cwd=eips, eip_file=eip_file)
+    assert inner.calls == 2
+    # A dirty tracked file outside the EIP changes the key of the next run. Within a
+    # run the repo state is read once per cwd, like its commit.
+    (eips / "README.md").write_text("x", encoding="utf-8")
+    subprocess.run([*git, "add", "README.md"], check=True)
+    _run(agent, runs / "e", cwd=eips, eip_file=eip_file)
+    assert inner.calls == 2
+    next_run = CachingAgent(inner, ResponseCache(tmp_path / "cache"), mode="read")
+    _run(next_run, runs / "f", cwd=eips, eip_file=eip_file)
+    assert inner.calls == 3
+
+
+class FailingReplyAgent(CountingAgent):
+    """Replies with an API error, or (``empty``) with a CSV holding no obligations."""
+
+    def __init__(self, empty: bool = False) -> None:
+        super().__init__()
+        self.empty = empty
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.calls += 1
+        if self.empty:
+            output_path.write_text("Done.", encoding="utf-8")
+            Path(str(metadata["output_csv"])).write_text("id,statement\n", encoding="utf-8")
+            return CallTelemetry()
+        output_path.write_text("API Error: overloaded", encoding="utf-8")
+        return CallTelemetry(is_error=True, error="server_error")
+
+
+def test_cache_skips_error_replies_and_rejected_outputs(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache")
+    for empty in (False, True):
+        agent = FailingReplyAgent(empty)
+        _run(CachingAgent(agent, cache), tmp_path / "runs" / f"{empty}-a")
+        _run(CachingAgent(agent, cache), tmp_path / "runs" / f"{empty}-b")
+        assert agent.calls == 2
+
+    assert not list((tmp_path / "cache").glob("*/*/entry.json"))
@@ -0,0 +1,154 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from eip_verify.agents import RetryingAgent, RetryPolicy, TransientAgentError
+from eip_verify.circuit import (
+    CircuitBreakerAgent,
+    CircuitOpenError,
+    CircuitSettings,
+    SharedCircuitBreaker,
+)
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.pipeline import run_pipeline
+from eip_verify.runner import read_checkpoint, run_phase_1a
+
+
+SETTINGS = CircuitSettings(failures=2, slow_turn_s=None, cooldown_s=0.05, max_wait_s=0.3)
+
+
+def test_circuit_is_shared_between_breakers(tmp_path: Path) -> None:
+    db_path = tmp_path / "circuit.sqlite"
+    first = SharedCircuitBreaker(db_path, SETTINGS)
+    second = SharedCircuitBreaker(db_path, SETTINGS)
+
+    assert first.record_failure("overloaded") is False
+    assert second.record_failure("overloaded") is True
+    wait, probe = first.try_acquire(time.time())
+    assert 0 < wait <= SETTINGS.cooldown_s and not probe
+
+    time.sleep(SETTINGS.cooldown_s)
+    assert second.try_acquire(time.time()) == (0.0, True)
+    # Only one probe at a time; a call that waited too long gives up.
+    assert first.try_acquire(time.time())[0] > 0
+    with pytest.raises(CircuitOpenError):
+        first.try_acquire(time.time() - SETTINGS.max_wait_s)
+    second.record_success()
+    assert first.try_acquire(time.time()) == (0.0, False)
+    assert first.status()["failures"] == 0
+
+
+class OutageAgent:
+    """Fake agent whose service goes down after ``healthy_calls`` calls."""
+
+    def __init__(self, healthy_calls: int) -> None:
+        self.inner = FakeClaudeAgent()
+        self.healthy_calls = healthy_calls
+        self.calls = 0
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.calls += 1
+        if self.calls > self.healthy_calls:
+            raise TransientAgentError("overloaded_error")
+        return await self.inner.arun(prompt, output_path, cwd, config, metadata)
+
+
+def test_outage_parks_shards_until_resume(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    kwargs = dict(parent_run=parent, spec_repo=str(spec_repo), llm_mode="fake", shard_size=1)
+    breaker = SharedCircuitBreaker(tmp_path / "circuit.sqlite", SETTINGS)
+    policy = RetryPolicy(max_attempts=3, base_delay_s=0.0, max_delay_s=0.0)
+
+    down = OutageAgent(healthy_calls=1)
+    with pytest.raises(CircuitOpenError, match="2 of 3 shards parked"):
+        run_phase_1a(
+            agent=RetryingAgent(CircuitBreakerAgent(down, breaker), policy), concurrency=1, **kwargs
+        )
+    run_dir = next((parent / "phase1A_runs").iterdir())
+    done = [read_checkpoint(shard) is not None for shard in sorted((run_dir / "shards").iterdir())]
+    assert done == [True, False, False]
+    assert breaker.status()["state"] != "closed"
+
+    time.sleep(SETTINGS.cooldown_s)
+    healthy = OutageAgent(healthy_calls=10)
+    agent = RetryingAgent(CircuitBreakerAgent(healthy, breaker), policy)
+    assert run_phase_1a(agent=agent, resume=True, **kwargs) == run_dir
+    assert healthy.calls == 2
+    assert breaker.status()["state"] == "closed"
+    assert read_checkpoint(run_dir)["phase"] == "1A"
+
+
+def test_open_circuit_parks_a_single_eip_pipeline(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    (spec_repo / "README.md").write_text(
+        "### Ethereum Protocol Releases\n\n| | Fork | EIPs |\n| - | - | - |\n"
+        "| 1 | London | [EIP-1559](./EIPs/eip-1559.md) |\n",
+        encoding="utf-8",
+    )
+    eip_file = tmp_path / "eip-1559.md"
+    eip_file.write_text("# EIP-1559\n", encoding="utf-8")
+    run_root = tmp_path / "run"
+    kwargs = dict(
+        eip="1559",
+        phases=["extract", "locate-spec"],
+        spec_repo=str(spec_repo),
+        eip_file=str(eip_file),
+        output_dir=str(run_root),
+        llm_mode="fake",
+    )
+    breaker = SharedCircuitBreaker(tmp_path / "circuit.sqlite", SETTINGS)
+    policy = RetryPolicy(max_attempts=3, base_delay_s=0.0, max_delay_s=0.0)
+
+    # The unsharded locate-spec call hits the outage after extract succeeded.
+    down = OutageAgent(healthy_calls=1)
+    status = run_pipeline(agent=RetryingAgent(CircuitBreakerAgent(down, breaker), policy), **kwargs)
+
+    assert status["status"] == "parked" and status["phase"] == "locate-spec"
+    recorded = json.loads((run_root / "pipeline_status.json").read_text(encoding="utf-8"))
+    assert recorded["status"] == "parked"
+    assert not (run_root / "summary.md").exists()
+
+    time.sleep(SETTINGS.cooldown_s)
+    healthy = OutageAgent(healthy_calls=10)
+    agent = RetryingAgent(CircuitBreakerAgent(healthy, breaker), policy)
+    assert run_pipeline(agent=agent, resume=True, **kwargs)["status"] == "complete"
+    assert healthy.calls == 1
+    assert (run_root / "summary.md").exists()
+
+
+def test_waiting_on_the_database_lock_does_not_block_the_loop(tmp_path: Path) -> None:
+    import sqlite3
+
+    import anyio
+
+    db = tmp_path / "circuit.sqlite"
+    breaker = SharedCircuitBreaker(db, SETTINGS)
+    # Another process holds the write lock for a while.
+    other = sqlite3.connect(db, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    ticks: list[int] = []
+
+    async def main() -> None:
+        async def release() -> None:
+            for tick in range(5):
+                ticks.append(tick)
+                await anyio.sleep(0.02)
+            other.execute("COMMIT")
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(release)
+            assert await breaker.acquire() is False
+            assert await breaker.arecord_failure("overloaded") is False
+
+    anyio.run(main)
+    other.close()
+
+    assert ticks == [0, 1, 2, 3, 4]
+    assert breaker.status()["failures"] == 1
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import anyio
+
+from eip_verify.agents import build_options, build_options_kwargs
+from eip_verify.cli import _resolve_allowed_tools
+from eip_verify.code_tools import CODE_TOOL_NAMES, CodeIndex, build_code_tools
+from eip_verify.llm import DEFAULT_ALLOWED_TOOLS, build_claude_config
+
+
+GAS = '''"""Gas accounting."""
+
+GAS_LIMIT_ADJUSTMENT_FACTOR = 1024
+
+
+class InvalidBlock(Exception):
+    pass
+
+
+def calculate_base_fee(parent_gas_used, parent_gas_target):
+    if parent_gas_target == 0:
+        raise InvalidBlock("zero target")
+    return parent_gas_used // GAS_LIMIT_ADJUSTMENT_FACTOR
+
+
+def validate_header(header):
+    fee = calculate_base_fee(header.gas_used, header.gas_target)
+    if fee < 0:
+        raise InvalidBlock
+    return fee
+'''
+
+
+def _repo(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "london").mkdir(parents=True)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "src" / "london" / "gas.py").write_text(GAS, encoding="utf-8")
+    (tmp_path / "tests" / "test_gas.py").write_text(
+        "from london.gas import calculate_base_fee\n\n\n"
+        "def test_fee():\n    assert calculate_base_fee(1, 1) == 0\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+def test_index_answers_symbol_caller_and_raise_queries(tmp_path: Path) -> None:
+    index = CodeIndex(_repo(tmp_path))
+
+    assert index.find_symbol("gas.calculate_base_fee") == (
+        "src/london/gas.py:10: def calculate_base_fee(parent_gas_used, parent_gas_target):"
+    )
+    assert index.find_symbol("ADJUSTMENT").startswith("src/london/gas.py:3: GAS_LIMIT_ADJUSTMENT_FACTOR")
+    assert index.find_symbol("InvalidBlock", kind="def") == "No definition of InvalidBlock"
+
+    callers = index.find_callers("calculate_base_fee").splitlines()
+    assert callers[0].startswith("src/london/gas.py:17 [validate_header]:")
+    assert callers[-1].startswith("tests/test_gas.py:5 [test_fee]:")
+
+    raises = index.find_raises("validate_header").splitlines()
+    assert raises == ["src/london/gas.py:19 [validate_header]: raise InvalidBlock  <InvalidBlock>"]
+    assert len(index.find_raises(path="src/*").splitlines()) == 2
+
+    grep = index.grep_indexed("GAS_LIMIT_ADJUSTMENT_FACTOR").splitlines()
+    assert grep[0].startswith("src/london/gas.py:3:") and len(grep) == 2
+    assert index.grep_indexed(r"gas_\w+ //", limit=1).startswith("src/london/gas.py:13 [calculate_base_fee]")
+    assert index.grep_indexed("InvalidBlock", limit=1).endswith("... 2 more; narrow the query or pass a path")
+
+    assert index.read_range("london/gas.py", 10, 11).splitlines() == [
+        "src/london/gas.py:L10-L11 of 20",
+        "    10  def calculate_base_fee(parent_gas_used, parent_gas_target):",
+        "    11      if parent_gas_target == 0:",
+    ]
+
+
+def test_code_tools_are_served_in_process_when_allowed(tmp_path: Path, monkeypatch) -> None:
+    repo = _repo(tmp_path)
+    plain = build_claude_config(None, 5, None)
+    assert "mcp_servers" not in build_options_kwargs(plain, repo)
+    assert not build_options(plain, repo).mcp_servers
+
+    monkeypatch.setenv("EIP_VERIFY_CODE_TOOLS", "1")
+    tools = _resolve_allowed_tools(None, {})
+    assert tools == DEFAULT_ALLOWED_TOOLS + CODE_TOOL_NAMES
+    assert _resolve_allowed_tools("Read", {"code_tools": False}) == ["Read"]
+
+    options = build_options(build_claude_config(None, 5, tools), repo)
+    assert options.mcp_servers["code"]["type"] == "sdk"
+    assert "mcp_servers" not in build_options_kwargs(build_claude_config(None, 5, tools), repo)
+
+    find_callers = {tool.name: tool for tool in build_code_tools(repo)}["find_callers"]
+    reply = anyio.run(find_callers.handler, {"name": "validate_header"})
+    assert reply == {"content": [{"type": "text", "text": "No calls to validate_header"}]}
+
+    read_range = {tool.name: tool for tool in build_code_tools(repo)}["read_range"]
+    text = anyio.run(read_range.handler, {"path": "london/gas.py"})["content"][0]["text"]
+    assert text.splitlines()[0] == "src/london/gas.py:L1-L20 of 20"
+    assert CodeIndex(repo).read_range("london/gas.py", None, None) == text
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from eip_verify.context_pack import ContextIndex, build_context_pack, extract_query
+from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.runner import run_phase_1b
+
+
+FORK_PY = '''"""London fork."""
+
+BASE_FEE_MAX_CHANGE_DENOMINATOR = 8
+ELASTICITY_MULTIPLIER = 2
+
+
+def calculate_base_fee_per_gas(parent_gas_limit, parent_gas_used, parent_base_fee_per_gas):
+    parent_gas_target = parent_gas_limit // ELASTICITY_MULTIPLIER
+    if parent_gas_used == parent_gas_target:
+        return parent_base_fee_per_gas
+    delta = parent_base_fee_per_gas // BASE_FEE_MAX_CHANGE_DENOMINATOR
+    return parent_base_fee_per_gas + delta
+'''
+
+ROW = {
+    "id": "EIP1559-OBL-001",
+    "statement": "The base fee MUST change by at most 1/BASE_FEE_MAX_CHANGE_DENOMINATOR per block.",
+    "locations": "[fork.py:calculate_base_fee_per_gas]",
+    "code_flow": "",
+}
+
+
+def _fork_root(tmp_path: Path) -> Path:
+    fork_root = tmp_path / "spec" / "src" / "ethereum" / "london"
+    fork_root.mkdir(parents=True)
+    (fork_root / "fork.py").write_text(FORK_PY, encoding="utf-8")
+    (fork_root / "blocks.py").write_text("class Header:\n    base_fee_per_gas: int\n", encoding="utf-8")
+    return fork_root
+
+
+def test_context_pack_picks_located_and_matching_slices(tmp_path: Path) -> None:
+    fork_root = _fork_root(tmp_path)
+    query = extract_query([ROW], "1559")
+    assert "EIP-1559" in query.terms
+    assert "BASE_FEE_MAX_CHANGE_DENOMINATOR" in query.terms
+    assert "calculateBaseFeePerGas" in query.terms
+    assert query.locations[0].symbol == "calculate_base_fee_per_gas"
+
+    index = ContextIndex(tmp_path / "spec")
+    slices = build_context_pack(index, [ROW], "1559", budget_tokens=1000)
+    fork_slice = next(item for item in slices if item.path.endswith("fork.py"))
+    assert "def calculate_base_fee_per_gas" in fork_slice.text
+
+    assert build_context_pack(index, [ROW], "1559", budget_tokens=10) == []
+
+
+def test_phase_prompt_includes_context_pack(tmp_path: Path) -> None:
+    fork_root = _fork_root(tmp_path)
+    parent = tmp_path / "phase1A"
+    parent.mkdir()
+    (parent / "obligations_index.csv").write_text(
+        "id,statement,locations,code_flow\n"
+        f"{ROW['id']},{ROW['statement']},{ROW['locations']},\n",
+        encoding="utf-8",
+    )
+    (parent / "run_manifest.json").write_text(
+        f'{{"spec_repo": "{tmp_path / "spec"}", "fork_root": "{fork_root}"}}', encoding="utf-8"
+    )
+
+    run_dir = run_phase_1b(
+        parent_run=parent,
+        eip_number="1559",
+        llm_mode="fake",
+        agent=FakeClaudeAgent(),
+        context_budget=500,
+    )
+
+    prompt = (run_dir / "phase1B_prompt.txt").read_text(encoding="utf-8")
+    assert "## Pre-loaded context" in prompt
+    assert "### fork.py:L" in prompt
+    assert "def calculate_base_fee_per_gas" in prompt
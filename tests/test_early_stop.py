@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import anyio
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+from eip_verify import agents
+from eip_verify.agents import ClaudeAgent
+from eip_verify.completion import CompletionWatcher
+from eip_verify.llm import build_claude_config
+
+
+INPUT = "id,statement,locations\nEIP1-OBL-001,a,\nEIP1-OBL-002,b,\n"
+DONE = "id,statement,locations\nEIP1-OBL-001,a,[x.py:1]\nEIP1-OBL-002,b,[x.py:2]\n"
+
+
+class ExploringClient:
+    """Writes the output CSV on turn 2, confirms it on turn 3, then keeps exploring."""
+
+    def __init__(self, output_csv: Path) -> None:
+        self.output_csv = output_csv
+        self.turns = 0
+        self.interrupted = False
+        self.disconnected = False
+
+    async def query(self, prompt: str) -> None:
+        pass
+
+    async def interrupt(self) -> None:
+        self.interrupted = True
+
+    async def receive_response(self):
+        for turn, tool in enumerate(["Read", "Write", "Read", "Grep", "Grep", "Read"], 1):
+            if self.interrupted:
+                break
+            self.turns = turn
+            yield AssistantMessage(
+                content=[ToolUseBlock(id=f"t{turn}", name=tool, input={})], model="m"
+            )
+            if tool == "Write":
+                self.output_csv.write_text(DONE, encoding="utf-8")
+            yield UserMessage(content=[ToolResultBlock(tool_use_id=f"t{turn}", content="ok")])
+        yield ResultMessage(
+            subtype="error_during_execution" if self.interrupted else "success",
+            duration_ms=10,
+            duration_api_ms=8,
+            is_error=self.interrupted,
+            num_turns=self.turns,
+            session_id="s",
+            total_cost_usd=0.01 * self.turns,
+            usage={"input_tokens": 100 * self.turns, "output_tokens": 10},
+        )
+
+    async def disconnect(self) -> None:
+        self.disconnected = True
+
+
+def _call(tmp_path: Path, monkeypatch, output_format: str) -> tuple[ExploringClient, object]:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    input_csv = tmp_path / "input.csv"
+    output_csv = tmp_path / "obligations_index.csv"
+    input_csv.write_text(INPUT, encoding="utf-8")
+    output_csv.write_text(INPUT, encoding="utf-8")
+    client = ExploringClient(output_csv)
+
+    async def connect(config, cwd):
+        return client
+
+    monkeypatch.setattr(agents, "connect_client", connect)
+    metadata = {
+        "phase": "1A",
+        "input_csv": str(input_csv),
+        "output_csv": str(output_csv),
+        "output_format": output_format,
+    }
+    config = build_claude_config(None, 20, None)
+    agent = ClaudeAgent(early_stop=True)
+    telemetry = anyio.run(agent.arun, "prompt", tmp_path / "out.txt", tmp_path, config, metadata)
+    return client, telemetry
+
+
+def test_session_ends_once_output_is_complete_and_stable(tmp_path: Path, monkeypatch) -> None:
+    client, telemetry = _call(tmp_path, monkeypatch, "csv")
+
+    assert client.interrupted and client.disconnected
+    assert client.turns == 3
+    assert telemetry.early_stopped and not telemetry.is_error
+    assert telemetry.num_turns == 3 and telemetry.input_tokens == 300
+    assert (tmp_path / "obligations_index.csv").read_text(encoding="utf-8") == DONE
+    assert '"early_stop"' in (tmp_path / "out.events.jsonl").read_text(encoding="utf-8")
+
+
+def test_no_early_stop_without_a_csv_to_watch(tmp_path: Path, monkeypatch) -> None:
+    client, telemetry = _call(tmp_path, monkeypatch, "json")
+
+    assert not client.interrupted and client.turns == 6
+    assert not telemetry.early_stopped
+
+
+def test_watcher_waits_for_every_input_row(tmp_path: Path) -> None:
+    input_csv = tmp_path / "input.csv"
+    output_csv = tmp_path / "output.csv"
+    input_csv.write_text(INPUT, encoding="utf-8")
+    output_csv.write_text(DONE.rsplit("EIP1-OBL-002", 1)[0], encoding="utf-8")
+    watcher = CompletionWatcher("1A", output_csv, input_csv)
+
+    assert not watcher.check() and not watcher.check()
+    output_csv.write_text(DONE, encoding="utf-8")
+    assert not watcher.check()
+    assert watcher.check()
+
+
+def test_watcher_ignores_the_untouched_2b_seed(tmp_path: Path) -> None:
+    header = "id,client_code_flow,client_obligation_gap,client_code_gap\n"
+    seeded = header + "EIP1-OBL-001,a -> b,,\n"
+    input_csv = tmp_path / "input.csv"
+    output_csv = tmp_path / "client_obligations_index.csv"
+    input_csv.write_text(seeded, encoding="utf-8")
+    output_csv.write_text(seeded, encoding="utf-8")
+    watcher = CompletionWatcher("2B", output_csv, input_csv)
+
+    assert not any(watcher.check() for _ in range(4))
+    output_csv.write_text(header + "EIP1-OBL-001,a -> b,,Missing bounds check\n", encoding="utf-8")
+    assert not watcher.check()
+    assert watcher.check()
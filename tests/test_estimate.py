@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from eip_verify.cli import CLI
+from eip_verify.estimate import (
+    EstimateHistory,
+    EstimateSettings,
+    batch_makespan,
+    build_estimate,
+    estimate_eip,
+)
+from eip_verify.ratelimit import BudgetExceededError
+
+
+def _eip(tmp_path: Path, number: str, kilobytes: int) -> Path:
+    path = tmp_path / f"eip-{number}.md"
+    path.write_text("word " * (kilobytes * 200), encoding="utf-8")
+    return path
+
+
+def _record_run(tmp_path: Path) -> Path:
+    run_dir = tmp_path / "runs" / "r1" / "phase1A_runs" / "20260101_000000"
+    run_dir.mkdir(parents=True)
+    input_csv = run_dir.parent.parent / "obligations_index.csv"
+    input_csv.write_text("id,statement\n" + "EIP1-OBL-001,x\n" * 4, encoding="utf-8")
+    output_csv = run_dir / "obligations_index.csv"
+    output_csv.write_text("id,statement,locations\n" + "EIP1-OBL-001,x,[a.py:1]\n" * 4, encoding="utf-8")
+    (run_dir / "phase1A_prompt.txt").write_text("p" * 400, encoding="utf-8")
+    manifest = {
+        "phase": "1A",
+        "model": "m",
+        "input_csv": str(input_csv),
+        "output_csv": str(output_csv),
+        "telemetry": {
+            "calls": 2,
+            "num_turns": 10,
+            "input_tokens": 15000,
+            "cache_read_input_tokens": 5000,
+            "output_tokens": 1000,
+            "total_cost_usd": 0.21,
+            "wall_time_s": 50.0,
+        },
+    }
+    (run_dir / "run_manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return tmp_path / "runs"
+
+
+def test_estimate_scales_with_eip_size_shards_and_clients(tmp_path: Path) -> None:
+    settings = EstimateSettings(clients=("geth", "reth"), shard_size=5)
+    history = EstimateHistory()
+
+    small = estimate_eip("1", _eip(tmp_path, "1", 4), settings, history)
+    large = estimate_eip("2", _eip(tmp_path, "2", 40), settings, history)
+
+    assert [(item.phase, item.client) for item in small] == [
+        ("0A", None), ("1A", None), ("1B", None),
+        ("2A", "geth"), ("2A", "reth"), ("2B", "geth"), ("2B", "reth"),
+    ]
+    assert large[0].rows > small[0].rows
+    assert sum(item.cost_usd for item in large) > sum(item.cost_usd for item in small)
+    assert large[1].calls == -(-large[1].rows // 5) and large[0].calls == 1
+    assert all(item.basis == "default" for item in small)
+
+
+def test_estimate_uses_recorded_phase_profiles(tmp_path: Path) -> None:
+    history = EstimateHistory.load([_record_run(tmp_path)])
+
+    profile = history.profile("1A", "m")
+    assert history.runs == 1 and profile.runs == 1
+    assert profile.turns_per_call == 5 and profile.seconds_per_turn == 5
+    assert profile.output_per_row == 250
+    assert profile.usd_per_token == pytest.approx(0.21 / 21000)
+    assert history.profile("1B").runs == 0
+
+    estimate = build_estimate(
+        [("1", None)], EstimateSettings(phases=("1A",), model="m"), history, budget_usd=100
+    )
+    item = estimate["items"][0]
+    assert item["basis"] == "history (1 runs)" and item["turns"] == 5
+    assert estimate["within_budget"] is True
+
+
+def test_batch_makespan_packs_longest_first() -> None:
+    assert batch_makespan([3, 5, 3, 4, 3], max_parallel=2) == 10
+    assert batch_makespan([3, 5], max_parallel=10) == 5
+    assert batch_makespan([], max_parallel=2) == 0
+
+
+def test_estimate_command_writes_report_and_gates_budget(tmp_path: Path) -> None:
+    eips_dir = tmp_path / "EIPS"
+    eips_dir.mkdir()
+    _eip(eips_dir, "1559", 30)
+    _eip(eips_dir, "2930", 5)
+    kwargs = dict(
+        eip="2930,1559",
+        eips_dir=str(eips_dir),
+        phases="extract,locate-spec",
+        history=str(tmp_path / "none"),
+    )
+
+    CLI().estimate(output_dir=str(tmp_path / "out"), **kwargs)
+    estimate = json.loads((tmp_path / "out" / "estimate.json").read_text(encoding="utf-8"))
+    assert estimate["schedule"] == ["1559", "2930"]
+    assert (tmp_path / "out" / "estimate.md").exists()
+
+    with pytest.raises(BudgetExceededError):
+        CLI().estimate(budget_usd=0.01, **kwargs)
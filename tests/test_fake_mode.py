@@ -1,9 +1,14 @@
+import csv
 import json
+import random
 from pathlib import Path
 
+import pytest
+
+from eip_verify.agents import TransientAgentError
 from eip_verify.llm import DEFAULT_ALLOWED_TOOLS, build_claude_config
 from eip_verify.runner import PhaseContext, run_query
-from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.fake_agent import FakeBehavior, FakeClaudeAgent, parse_latency
 
 
 def test_fake_mode_records_call_and_output(tmp_path: Path) -> None:
@@ -42,3 +47,116 @@ def test_fake_mode_records_call_and_output(tmp_path: Path) -> None:
     assert record["options"]["model"] == "claude-sonnet-4-5"
     assert record["options"]["allowed_tools"] == DEFAULT_ALLOWED_TOOLS
     assert record["output_path"] == str(output_path)
+
+
+class ClosingAgent(FakeClaudeAgent):
+    """Fake agent that counts how often its resources are closed."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.closed = 0
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+
+def test_run_query_closes_a_positional_agent(tmp_path: Path) -> None:
+    config = build_claude_config(model=None, max_turns=1, allowed_tools=None, llm_mode="fake")
+    agent = ClosingAgent()
+
+    run_query("hello", tmp_path / "out.txt", tmp_path, config, agent, PhaseContext(phase="0A"))
+
+    assert agent.closed == 1
+
+
+class InFlightAgent:
+    """Fake agent that records how many of its calls overlap."""
+
+    def __init__(self, delay: float) -> None:
+        self.inner = FakeClaudeAgent(FakeBehavior(latency=f"fixed:{delay}"))
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.inner.arun(prompt, output_path, cwd, config, metadata)
+        finally:
+            self.in_flight -= 1
+
+
+def test_arun_query_runs_calls_concurrently_on_one_event_loop(tmp_path: Path) -> None:
+    import threading
+    import time
+
+    import anyio
+
+    from eip_verify.runner import arun_query
+
+    config = build_claude_config(
+        model=None,
+        max_turns=1,
+        allowed_tools=None,
+        llm_mode="fake",
+        record_calls=False,
+    )
+    agent = InFlightAgent(delay=0.2)
+    threads: set[int] = set()
+
+    async def call(idx: int) -> None:
+        threads.add(threading.get_ident())
+        await arun_query(
+            f"prompt {idx}",
+            tmp_path / f"out_{idx}.txt",
+            tmp_path,
+            config,
+            agent,
+            PhaseContext(phase="1A"),
+        )
+
+    async def main() -> None:
+        async with anyio.create_task_group() as tg:
+            for idx in range(5):
+                tg.start_soon(call, idx)
+
+    started = time.monotonic()
+    anyio.run(main)
+    elapsed = time.monotonic() - started
+
+    # All five calls were in flight at once, in the one loop thread.
+    assert agent.max_in_flight == 5
+    assert threads == {threading.get_ident()}
+    assert elapsed < 5 * 0.2
+    for idx in range(5):
+        assert (tmp_path / f"out_{idx}.txt").exists()
+
+
+def test_fake_behavior_rows_cycle_statements(tmp_path: Path) -> None:
+    config = build_claude_config(None, 1, None, llm_mode="fake")
+    output_csv = tmp_path / "obligations_index.csv"
+    agent = FakeClaudeAgent(FakeBehavior(rows=7))
+    context = PhaseContext(phase="0A", output_csv=output_csv, eip_number="1559")
+    run_query("p", tmp_path / "out.txt", tmp_path, config, agent, context)
+
+    with output_csv.open(encoding="utf-8", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == 7
+    assert rows[6]["id"] == "EIP1559-OBL-007"
+    assert rows[3]["statement"].startswith("Perfect")
+
+
+def test_fake_latency_specs() -> None:
+    rng = random.Random(0)
+    assert parse_latency("fixed:1.5")(rng, "1A") == 1.5
+    samples = [parse_latency("lognormal:2,0.5")(rng, "1A") for _ in range(200)]
+    assert 1.0 < sorted(samples)[100] < 4.0
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+
+
+def test_fake_error_rate_injects_transient_failures(tmp_path: Path) -> None:
+    config = build_claude_config(None, 1, None, llm_mode="fake")
+    flaky = FakeClaudeAgent(FakeBehavior(error_rate=1.0))
+    with pytest.raises(TransientAgentError):
+        run_query("p", tmp_path / "flaky.txt", tmp_path, config, flaky, PhaseContext(phase="1A"))
@@ -0,0 +1,137 @@
+import json
+from pathlib import Path
+
+import anyio
+
+from eip_verify.hedging import HedgingAgent
+from eip_verify.history import LatencyHistory
+from eip_verify.llm import build_claude_config
+from eip_verify.telemetry import CallTelemetry, summarize_telemetry
+
+
+CONFIG = build_claude_config(None, 1, None, llm_mode="fake")
+
+
+class StragglerAgent:
+    """The first call hangs for ``delay`` seconds; later calls answer at once."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.calls += 1
+        attempt = self.calls
+        output_csv = Path(str(metadata["output_csv"]))
+        assert str(output_csv) in prompt
+        try:
+            if attempt == 1:
+                await anyio.sleep(self.delay)
+        except BaseException:
+            self.cancelled += 1
+            raise
+        output_csv.write_text(output_csv.read_text(encoding="utf-8") + f"row{attempt}\n", encoding="utf-8")
+        output_path.write_text(f"attempt {attempt}\n", encoding="utf-8")
+        return CallTelemetry(input_tokens=1000, output_tokens=200, total_cost_usd=0.03)
+
+
+def _run(agent: HedgingAgent, run_dir: Path) -> Path:
+    output_csv = run_dir / "obligations_index.csv"
+    output_csv.write_text("id\n", encoding="utf-8")
+    prompt = f"Update {output_csv} in place."
+    metadata = {"phase": "1A", "output_csv": str(output_csv)}
+    agent.run(prompt, run_dir / "phase1A_output.txt", run_dir, CONFIG, metadata)
+    return output_csv
+
+
+def test_hedged_duplicate_wins_and_only_its_outputs_land(tmp_path: Path) -> None:
+    inner = StragglerAgent(delay=30)
+    agent = HedgingAgent(inner, LatencyHistory({"1A": [(0, 0.05)] * 5}), percentile=0.9)
+
+    output_csv = _run(agent, tmp_path)
+
+    assert inner.calls == 2 and inner.cancelled == 1
+    assert output_csv.read_text(encoding="utf-8") == "id\nrow2\n"
+    assert (tmp_path / "phase1A_output.txt").read_text(encoding="utf-8") == "attempt 2\n"
+    assert not list(tmp_path.glob(".hedge-*"))
+    assert agent.history.count("1A") == 6
+    # The sample is the latency the caller saw, not the duplicate's own runtime.
+    assert agent.history.samples["1A"][-1][1] >= 0.05
+
+
+def test_hedged_call_is_charged_for_its_cancelled_attempt(tmp_path: Path) -> None:
+    agent = HedgingAgent(
+        StragglerAgent(delay=30), LatencyHistory({"1A": [(0, 0.05)] * 5}), percentile=0.9
+    )
+    output_csv = tmp_path / "obligations_index.csv"
+    output_csv.write_text("id\n", encoding="utf-8")
+    metadata = {"phase": "1A", "output_csv": str(output_csv)}
+
+    telemetry = anyio.run(
+        agent.arun, f"Update {output_csv}.", tmp_path / "out.txt", tmp_path, CONFIG, metadata
+    )
+
+    # The loser ran longer than the winner: it is charged the winner's whole spend.
+    assert telemetry.hedged
+    assert telemetry.hedge_tokens == 1200 and telemetry.hedge_cost_usd == 0.03
+    assert telemetry.total_cost_usd == 0.06
+    totals = summarize_telemetry([telemetry])
+    assert totals["hedge_tokens"] == 1200 and totals["total_cost_usd"] == 0.06
+
+
+def test_no_hedging_without_enough_history(tmp_path: Path) -> None:
+    inner = StragglerAgent(delay=0.05)
+    agent = HedgingAgent(inner, LatencyHistory({"1A": [(0, 0.01)] * 2}), min_samples=5)
+
+    output_csv = _run(agent, tmp_path)
+
+    assert inner.calls == 1
+    assert output_csv.read_text(encoding="utf-8") == "id\nrow1\n"
+
+
+def test_latency_history_loads_recorded_telemetry(tmp_path: Path) -> None:
+    shards = [
+        {
+            "index": index,
+            "row_ids": ["1"] * (index + 1),
+            "telemetry": {"calls": 1, "wall_time_s": seconds},
+        }
+        for index, seconds in enumerate([10.0, 20.0, 30.0, 40.0])
+    ]
+    runs = {
+        "phase1A_runs": {"phase": "1A", "shards": shards},
+        # Two calls, one served from the cache: 5s for the live one.
+        "phase2A_runs": {
+            "phase": "2A",
+            "telemetry": {"calls": 2, "cache_hits": 1, "wall_time_s": 5.0},
+        },
+        "phase2B_runs": {
+            "phase": "2B",
+            "telemetry": {"calls": 1, "batched_calls": 1, "wall_time_s": 90.0},
+        },
+    }
+    for name, manifest in runs.items():
+        run_dir = tmp_path / name / "r"
+        run_dir.mkdir(parents=True)
+        (run_dir / "run_manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    history = LatencyHistory.load([tmp_path, tmp_path / "missing"])
+
+    assert history.count("1A") == 4 and history.count("2A") == 1 and history.count("2B") == 0
+    assert history.samples["2A"] == [(0.0, 5.0)]
+    assert history.percentile("1A", 0.5, min_samples=4) == 20.0
+    assert history.percentile("1A", 0.95, min_samples=4) == 40.0
+    assert history.percentile("2A", 0.95) is None
+    # Calls of a similar size (2-4 rows: within a factor of two of 4).
+    assert history.percentile("1A", 0.5, min_samples=3, size=4) == 30.0
+    # Too few similar calls: the whole phase counts.
+    assert history.percentile("1A", 0.5, min_samples=4, size=4) == 20.0
+
+
+def test_hedge_threshold_follows_call_size(tmp_path: Path) -> None:
+    history = LatencyHistory({"1A": [(1, 0.01)] * 5 + [(20, 60.0)] * 5})
+    agent = HedgingAgent(StragglerAgent(delay=0.0), history, percentile=0.9)
+
+    assert agent.threshold("1A", 1) == 0.01
+    assert agent.threshold("1A", 16) == 60.0
@@ -43,7 +43,7 @@ def test_truncation(tmp_path):
     assert len(content) < len(large_content)
 
 # New integration test for the bottom-logging logic
-@patch("eip_verify.pipeline.run_phase_0a") # Mock actual runner
+@patch("eip_verify.pipeline.arun_phase_0a") # Mock actual runner
 @patch("eip_verify.pipeline.write_report") # Mock report writer
 def test_pipeline_logs_at_bottom(mock_write_report, mock_phase_0a, tmp_path):
     """Test that artifacts are logged AFTER the summary report."""
@@ -53,7 +53,7 @@ def test_pipeline_logs_at_bottom(mock_write_report, mock_phase_0a, tmp_path):
     summary_file.touch()
     
     # Create a fake run output logic
-    def side_effect_phase_0a(**kwargs):
+    async def side_effect_phase_0a(**kwargs):
         # Create output dir that pipeline expects
         out_dir = Path(kwargs['output_dir']) / "phase0A_runs" / "fake_timestamp"
         out_dir.mkdir(parents=True, exist_ok=True)
@@ -90,3 +90,47 @@ def test_pipeline_logs_at_bottom(mock_write_report, mock_phase_0a, tmp_path):
     assert report_idx != -1
     assert artifact_idx != -1
     assert report_idx < artifact_idx, "Report should be written before artifacts"
+
+
+def test_log_phase_to_summary_includes_event_tail(tmp_path):
+    """Test that the streamed agent event log is tailed into the summary."""
+    from eip_verify.llm import CallStream
+
+    run_dir = tmp_path / "run_dir"
+    run_dir.mkdir()
+    with CallStream(run_dir / "phase1A_output.txt") as stream:
+        stream.write_text("partial output")
+        stream.write_event("tool_use", id="t1", name="Grep", input={"pattern": "BASE_FEE"})
+        stream.write_event("tool_result", tool_use_id="t1", is_error=False, content="x" * 5000)
+
+    assert (run_dir / "phase1A_output.txt").read_text() == "partial output"
+
+    summary_file = tmp_path / "summary.md"
+    summary_file.touch()
+    with patch.dict(os.environ, {"GITHUB_STEP_SUMMARY": str(summary_file)}):
+        _log_phase_to_summary("locate-spec", run_dir)
+
+    content = summary_file.read_text()
+    assert "phase1A_output.events.jsonl (last 2 events)" in content
+    assert 'tool_use Grep {"pattern": "BASE_FEE"}' in content
+    assert "tool_result ok (5000 chars)" in content
+
+
+def test_event_follower_prints_new_events(tmp_path, capsys):
+    from eip_verify.llm import CallStream
+    from eip_verify.pipeline import EventFollower
+
+    run_dir = tmp_path / "phase0A_runs" / "ts"
+    run_dir.mkdir(parents=True)
+    follower = EventFollower(tmp_path)
+    with CallStream(run_dir / "phase0A_output.txt") as stream:
+        stream.write_event("assistant_text", text="first")
+        follower.poll()
+        stream.write_event("assistant_text", text="second")
+        follower.poll()
+
+    out = capsys.readouterr().out.splitlines()
+    assert out == [
+        "[phase0A_runs/ts] text first",
+        "[phase0A_runs/ts] text second",
+    ]
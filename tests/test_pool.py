@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import anyio
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock
+
+from eip_verify import agents
+from eip_verify.agents import AgentPool, PooledAgent
+from eip_verify.llm import build_claude_config
+
+
+class FakeClient:
+    def __init__(self, cwd: Path) -> None:
+        self.cwd = cwd
+        self.prompts: list[str] = []
+        self.disconnected = False
+
+    async def query(self, prompt: str) -> None:
+        self.prompts.append(prompt)
+
+    def _result(self) -> ResultMessage:
+        return ResultMessage(
+            subtype="success",
+            duration_ms=10,
+            duration_api_ms=8,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            total_cost_usd=0.25,
+            usage={"input_tokens": 10, "output_tokens": 5},
+        )
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="ok")], model="claude-sonnet-4-5")
+        yield self._result()
+
+    async def receive_messages(self):
+        yield self._result()
+
+    async def disconnect(self) -> None:
+        self.disconnected = True
+
+
+def _fake_connect(monkeypatch, clients: list[FakeClient], delay: float = 0.0) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+
+    async def connect(config, cwd):
+        await anyio.sleep(delay)
+        clients.append(FakeClient(cwd))
+        return clients[-1]
+
+    monkeypatch.setattr(agents, "connect_client", connect)
+
+
+def test_pool_prespawns_reuses_and_recycles_workers(tmp_path: Path, monkeypatch) -> None:
+    clients: list[FakeClient] = []
+    _fake_connect(monkeypatch, clients)
+    config = build_claude_config(None, 5, None)
+    pool = AgentPool(size=2, max_calls=3)
+    agent = PooledAgent(pool)
+
+    async def main() -> None:
+        async def call(index: int) -> None:
+            metadata = {"phase": "1A", "eip_number": "1559"}
+            output_path = tmp_path / f"{index}.txt"
+            await agent.arun(f"prompt {index}", output_path, tmp_path, config, metadata)
+
+        async with anyio.create_task_group() as tg:
+            for index in range(4):
+                tg.start_soon(call, index)
+        assert len(clients) == 2
+        for index in range(4, 8):
+            await call(index)
+        await agent.aclose()
+
+    anyio.run(main)
+
+    assert pool.stats.calls == 8
+    # Workers retire after 3 calls: two warm workers serve 6 calls, a third the rest.
+    assert pool.stats.spawned == 3
+    assert pool.stats.recycled == 2
+    assert all(client.disconnected for client in clients)
+    assert all(
+        prompt == "/clear" for client in clients for prompt in client.prompts[1::2]
+    )
+
+
+def test_pool_caps_workers_across_repos_and_evicts_idle_ones(
+    tmp_path: Path, monkeypatch
+) -> None:
+    clients: list[FakeClient] = []
+    _fake_connect(monkeypatch, clients)
+    config = build_claude_config(None, 5, None)
+    pool = AgentPool(size=2, max_workers=3)
+    agent = PooledAgent(pool)
+    repos = [tmp_path / name for name in ("spec", "client", "eips")]
+    for repo in repos:
+        repo.mkdir()
+
+    async def main() -> None:
+        for index, repo in enumerate(repos):
+            metadata = {"phase": "1A", "eip_number": "1559"}
+            await agent.arun("prompt", tmp_path / f"{index}.txt", repo, config, metadata)
+            assert pool.live <= 3
+        assert [client.prompts for client in clients if client.disconnected] == [[]]
+        await agent.aclose()
+
+    anyio.run(main)
+
+    # spec warms 2 and client the one free slot; eips has none left to warm, so its
+    # call evicts the least recently used idle worker: the spec worker never used.
+    assert [client.cwd.name for client in clients] == ["spec", "spec", "client", "eips"]
+    assert pool.stats.evicted == 1
+    unused = [client for client in clients if not client.prompts]
+    assert [client.cwd.name for client in unused] == ["spec"]
+    assert pool.live == 0
+
+
+def test_pool_warms_one_repo_without_blocking_another(tmp_path: Path, monkeypatch) -> None:
+    clients: list[FakeClient] = []
+    _fake_connect(monkeypatch, clients, delay=0.2)
+    config = build_claude_config(None, 5, None)
+    pool = AgentPool(size=1)
+    finished: list[str] = []
+
+    async def main() -> None:
+        async def take(repo: Path, after: float) -> None:
+            await anyio.sleep(after)
+            worker = await pool.acquire(config, repo)
+            finished.append(repo.name)
+            await pool.release(worker)
+
+        slow, fast = tmp_path / "slow", tmp_path / "fast"
+        for repo in (slow, fast):
+            repo.mkdir()
+        with anyio.fail_after(0.35):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(take, slow, 0)
+                tg.start_soon(take, fast, 0.05)
+        await pool.aclose()
+
+    anyio.run(main)
+
+    assert sorted(finished) == ["fast", "slow"]
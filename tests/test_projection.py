@@ -0,0 +1,102 @@
+import csv
+import json
+from pathlib import Path
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.projection import Projection
+from eip_verify.runner import run_phase_1a, run_phase_2a, run_phase_2b
+
+
+class ViewRecordingAgent(FakeClaudeAgent):
+    def __init__(self) -> None:
+        super().__init__()
+        self.views: list[tuple[list[str], list[dict[str, str]]]] = []
+        self.prompts: list[str] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        with Path(str(metadata["input_csv"])).open(encoding="utf-8", newline="") as handle:
+            reader = csv.DictReader(handle)
+            self.views.append((list(reader.fieldnames or []), list(reader)))
+        self.prompts.append(prompt)
+        return await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def _read_rows(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_phase_2b_reads_a_projected_truncated_view(tmp_path: Path) -> None:
+    client_repo = tmp_path / "client"
+    client_repo.mkdir()
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    run_2a = run_phase_2a(
+        parent_run=parent, client_repo=str(client_repo), llm_mode="fake", agent=FakeClaudeAgent()
+    )
+    full_input = _read_rows(run_2a / "client_obligations_index.csv")
+
+    agent = ViewRecordingAgent()
+    run_2b = run_phase_2b(
+        parent_run=run_2a,
+        client_repo=str(client_repo),
+        llm_mode="fake",
+        agent=agent,
+        project_inputs=12,
+    )
+
+    fields, rows = agent.views[0]
+    assert fields == [
+        "id",
+        "statement",
+        "client_locations",
+        "client_code_flow",
+        "client_obligation_gap",
+        "client_code_gap",
+    ]
+    assert rows[0]["statement"] == "Perfect obli [...]"
+    assert str(run_2b / "view" / "client_obligations_index.csv") in agent.prompts[0]
+
+    merged = _read_rows(run_2b / "client_obligations_index.csv")
+    assert list(merged[0]) == list(full_input[0])
+    assert [row["statement"] for row in merged] == [row["statement"] for row in full_input]
+    assert [row["code_flow"] for row in merged] == [row["code_flow"] for row in full_input]
+    assert merged[1]["client_code_gap"] == "Missing bounds check"
+    manifest = json.loads((run_2b / "run_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["project_inputs"] == 12
+
+
+def test_sharded_views_merge_only_the_filled_columns(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    agent = ViewRecordingAgent()
+
+    run_1a = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        llm_mode="fake",
+        agent=agent,
+        shard_size=2,
+        project_inputs=True,
+    )
+
+    assert [fields for fields, _ in agent.views] == [["id", "statement", "locations"]] * 2
+    assert _read_rows(run_1a / "obligations_index.csv") == _read_rows(
+        parent / "obligations_index.csv"
+    )
+
+
+def test_projection_is_off_for_unprojected_phases() -> None:
+    assert Projection.for_phase("1A", ["id", "statement"], False) is None
+    assert Projection.for_phase("0A", ["id", "statement"], True) is None
+    projection = Projection.for_phase("1B", ["id", "category", "statement", "locations"], 5)
+    assert projection.columns == ["id", "statement", "locations"]
+    merged = projection.merge(
+        [{"id": "A", "statement": "full text", "code_flow": ""}],
+        [{"id": "A", "statement": "full  [...]", "code_flow": "a -> b"}],
+    )
+    assert merged == [{"id": "A", "statement": "full text", "code_flow": "a -> b"}]
@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import anyio
+import pytest
+
+from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.llm import build_claude_config
+from eip_verify.ratelimit import (
+    BudgetExceededError,
+    RateLimitedAgent,
+    RateLimitSettings,
+    SharedRateLimiter,
+)
+from eip_verify.runner import PhaseContext, run_query
+from eip_verify.telemetry import CallTelemetry
+
+
+def test_request_bucket_is_shared_between_limiters(tmp_path: Path) -> None:
+    db = tmp_path / "limits.sqlite"
+    settings = RateLimitSettings(requests_per_minute=2)
+    first = SharedRateLimiter(db, settings)
+    second = SharedRateLimiter(db, settings)
+
+    assert first.try_acquire(0) == 0
+    assert second.try_acquire(0) == 0
+    wait = first.try_acquire(0)
+    assert 0 < wait <= 30
+
+
+def test_token_bucket_charges_actual_usage(tmp_path: Path) -> None:
+    limiter = SharedRateLimiter(
+        tmp_path / "limits.sqlite",
+        RateLimitSettings(tokens_per_minute=1000, tokens_per_call=100),
+    )
+
+    reserved = anyio.run(limiter.acquire)
+    assert reserved == 100
+    limiter.record(CallTelemetry(input_tokens=900, output_tokens=100), reserved)
+
+    assert limiter.try_acquire(100) > 0
+    assert limiter.estimate_tokens() == 1000
+    assert limiter.usage()["calls"] == 1
+
+
+class HangingAgent:
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        await anyio.sleep_forever()
+
+
+def test_cancelled_call_is_charged_its_reservation(tmp_path: Path) -> None:
+    limiter = SharedRateLimiter(
+        tmp_path / "limits.sqlite",
+        RateLimitSettings(tokens_per_minute=1000, tokens_per_call=600),
+    )
+    # An earlier call sets the batch's price: $0.01 per 1000 tokens.
+    limiter.record(CallTelemetry(input_tokens=600, total_cost_usd=0.006), 600)
+    agent = RateLimitedAgent(HangingAgent(), limiter)
+    config = build_claude_config(None, 1, None, llm_mode="fake")
+
+    async def main() -> None:
+        with anyio.move_on_after(0.05):
+            await agent.arun("hello", tmp_path / "out.txt", tmp_path, config, {"phase": "0A"})
+
+    anyio.run(main)
+    usage = limiter.usage()
+    assert usage["tokens"] == 1200 and usage["cost_usd"] == pytest.approx(0.012)
+    assert limiter.try_acquire(600) > 0
+
+
+def test_budget_stops_new_calls(tmp_path: Path) -> None:
+    limiter = SharedRateLimiter(
+        tmp_path / "limits.sqlite", RateLimitSettings(budget_usd=1.0)
+    )
+    limiter.record(CallTelemetry(total_cost_usd=1.25), 0)
+
+    agent = RateLimitedAgent(FakeClaudeAgent(), limiter)
+    config = build_claude_config(None, 1, None, llm_mode="fake")
+    with pytest.raises(BudgetExceededError):
+        run_query(
+            "hello",
+            tmp_path / "out.txt",
+            tmp_path,
+            config,
+            agent,
+            PhaseContext(phase="0A"),
+        )
+    assert not (tmp_path / "out.txt").exists()
+
+
+def test_budget_is_scoped_to_the_batch(tmp_path: Path) -> None:
+    db = tmp_path / "limits.sqlite"
+    spent = SharedRateLimiter(db, RateLimitSettings(budget_usd=1.0, batch_id="fork-prague"))
+    spent.record(CallTelemetry(total_cost_usd=1.25), 0)
+    shared = SharedRateLimiter(db, RateLimitSettings(budget_usd=1.0, batch_id="fork-prague"))
+
+    with pytest.raises(BudgetExceededError):
+        shared.try_acquire(0)
+    assert SharedRateLimiter(db, RateLimitSettings(budget_usd=1.0)).try_acquire(0) == 0
+
+
+def test_waiting_on_the_database_lock_does_not_block_the_loop(tmp_path: Path) -> None:
+    import sqlite3
+
+    db = tmp_path / "limits.sqlite"
+    limiter = SharedRateLimiter(db, RateLimitSettings(requests_per_minute=10))
+    # Another process holds the write lock for a while.
+    other = sqlite3.connect(db, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    ticks: list[int] = []
+
+    async def main() -> None:
+        async def release() -> None:
+            for tick in range(5):
+                ticks.append(tick)
+                await anyio.sleep(0.02)
+            other.execute("COMMIT")
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(release)
+            await limiter.acquire()
+            await limiter.arecord(CallTelemetry(input_tokens=10), 10)
+
+    anyio.run(main)
+    other.close()
+
+    assert ticks == [0, 1, 2, 3, 4]
+    assert limiter.usage()["calls"] == 1
@@ -0,0 +1,95 @@
+import csv
+import json
+from pathlib import Path
+
+from eip_verify.fake_agent import _write_fake_obligations_csv
+from eip_verify.replay_agent import DEFAULT_REPLAY_DIR, ReplayAgent, ReplayLibrary
+from eip_verify.runner import run_phase_1a
+
+
+EXAMPLE_RUN = (
+    Path(__file__).resolve().parents[1]
+    / "examples"
+    / "runs"
+    / "20260129_133849"
+    / "phase0A_runs"
+    / "20260129_133849"
+)
+
+
+def _read_rows(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_library_indexes_recorded_sessions(tmp_path: Path) -> None:
+    run_dir = tmp_path / "phase0A_runs" / "20260101_120000"
+    child = run_dir / "phase1A_runs" / "20260101_120130"
+    child.mkdir(parents=True)
+    (run_dir / "phase0A_output.txt").write_text("extracted", encoding="utf-8")
+    (run_dir / "obligations_index.csv").write_text(
+        "id,statement\nEIP7702-OBL-001,x\n", encoding="utf-8"
+    )
+
+    library = ReplayLibrary(tmp_path)
+    session = library.find("0a", "7702")
+
+    assert session.run_dir == run_dir
+    assert session.latency_s == 90.0
+    assert library.find("0A", "1559") == session
+
+
+def test_replay_serves_recorded_csvs_per_shard(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    source = EXAMPLE_RUN / "obligations_index.csv"
+    (parent / "obligations_index.csv").write_text(
+        source.read_text(encoding="utf-8"), encoding="utf-8"
+    )
+
+    library = ReplayLibrary(EXAMPLE_RUN.parents[1])
+    run_dir = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        llm_mode="replay",
+        agent=ReplayAgent(library),
+        shard_size=4,
+        concurrency=2,
+        record_llm_calls=True,
+    )
+
+    recorded = {
+        row["id"]: row
+        for row in _read_rows(library.find("1A", "1559").run_dir / "obligations_index.csv")
+    }
+    rows = _read_rows(run_dir / "obligations_index.csv")
+    assert [row["id"] for row in rows] == [row["id"] for row in _read_rows(source)]
+    assert all(row["locations"] == recorded[row["id"]]["locations"] for row in rows)
+    record = json.loads(
+        (run_dir / "shards" / "000" / "phase1A_output.call.json").read_text(encoding="utf-8")
+    )
+    assert record["replay"]["eip_number"] == "1559"
+
+
+def test_replay_of_another_eip_is_flagged_in_the_manifest(tmp_path: Path, capsys) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "4844")
+    library = ReplayLibrary(DEFAULT_REPLAY_DIR)
+
+    run_dir = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        llm_mode="replay",
+        agent=ReplayAgent(library),
+    )
+
+    assert "no recorded phase 1A session for EIP 4844" in capsys.readouterr().out
+    manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["replayed_from_eips"] == [library.find("1A", None).eip_number]
+    # Nothing asked for call records.
+    assert not list(run_dir.glob("*.call.json"))
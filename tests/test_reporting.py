@@ -115,3 +115,27 @@ def test_write_report_markdown(fake_run_dir):
     assert "Full CSV Output" in content
     assert "id,obligation_gap" in content  # CSV header
     assert "1,Serious Gap" in content      # CSV row
+
+
+def test_summary_includes_phase_telemetry(fake_run_dir):
+    manifest_path = fake_run_dir / "run_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["telemetry"] = {
+        "calls": 2,
+        "num_turns": 7,
+        "input_tokens": 1000,
+        "output_tokens": 200,
+        "total_cost_usd": 0.42,
+        "wall_time_s": 12.5,
+    }
+    manifest_path.write_text(json.dumps(manifest))
+
+    summary = build_summary(fake_run_dir)
+    assert summary["telemetry"]["phases"]["2B"]["calls"] == 2
+    assert summary["telemetry"]["total"]["total_cost_usd"] == 0.42
+
+    output_dir = write_report(fake_run_dir, output_dir=None, formats=["md"])
+    content = (output_dir / "summary.md").read_text()
+    assert "## Telemetry" in content
+    assert "| 2B | 2 | 7 | 1000 | 200 |" in content
+    assert "| Total | 2 | 7 |" in content
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from eip_verify.agents import RetryingAgent, RetryPolicy, TransientAgentError
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.llm import build_claude_config
+from eip_verify.runner import read_checkpoint, run_phase_1a
+
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay_s=0.0, max_delay_s=0.0)
+CONFIG = build_claude_config(None, 1, None, llm_mode="fake")
+
+
+class FlakyAgent:
+    """Fails the first ``failures`` calls, optionally only for matching CSVs."""
+
+    def __init__(self, failures: int, exc: Exception, match: str = "") -> None:
+        self.inner = FakeClaudeAgent()
+        self.failures = failures
+        self.exc = exc
+        self.match = match
+        self.calls = 0
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.calls += 1
+        if self.match in str(metadata.get("output_csv")) and self.failures > 0:
+            self.failures -= 1
+            output_csv = Path(str(metadata["output_csv"]))
+            if output_csv.exists():
+                output_csv.write_text("half written", encoding="utf-8")
+            raise self.exc
+        return await self.inner.arun(prompt, output_path, cwd, config, metadata)
+
+
+def _metadata(output_csv: Path) -> dict[str, object]:
+    return {"phase": "1A", "output_csv": str(output_csv), "eip_number": "1559"}
+
+
+def test_retrying_agent_retries_transient_errors(tmp_path: Path) -> None:
+    output_csv = tmp_path / "obligations_index.csv"
+    _write_fake_obligations_csv(output_csv, "1559")
+    seeded = output_csv.read_text(encoding="utf-8")
+    inner = FlakyAgent(2, TransientAgentError("rate_limit"))
+    agent = RetryingAgent(inner, NO_WAIT)
+
+    agent.run("prompt", tmp_path / "out.txt", tmp_path, CONFIG, _metadata(output_csv))
+
+    assert inner.calls == 3
+    assert output_csv.read_text(encoding="utf-8") == seeded
+
+
+def test_retrying_agent_fails_fast_on_permanent_errors(tmp_path: Path) -> None:
+    inner = FlakyAgent(1, ValueError("bad prompt"))
+    agent = RetryingAgent(inner, NO_WAIT)
+
+    with pytest.raises(ValueError):
+        agent.run("prompt", tmp_path / "out.txt", tmp_path, CONFIG, _metadata(tmp_path / "x.csv"))
+    assert inner.calls == 1
+
+
+def test_resume_skips_completed_shards_and_phases(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    kwargs = dict(parent_run=parent, spec_repo=str(spec_repo), llm_mode="fake", shard_size=1)
+
+    failing = FlakyAgent(1, ValueError("boom"), match="shards/001")
+    with pytest.raises(Exception):
+        run_phase_1a(agent=failing, concurrency=1, **kwargs)
+    run_dir = next((parent / "phase1A_runs").iterdir())
+    shard_dirs = sorted((run_dir / "shards").iterdir())
+    done = [read_checkpoint(shard) is not None for shard in shard_dirs]
+    assert done[0] and not done[1]
+    assert read_checkpoint(run_dir) is None
+
+    resumed = FlakyAgent(0, ValueError("unused"))
+    assert run_phase_1a(agent=resumed, resume=True, **kwargs) == run_dir
+    assert resumed.calls == done.count(False)
+    assert read_checkpoint(run_dir)["phase"] == "1A"
+
+    again = FlakyAgent(0, ValueError("unused"))
+    assert run_phase_1a(agent=again, resume=True, **kwargs) == run_dir
+    assert again.calls == 0
@@ -0,0 +1,162 @@
+import csv
+import json
+from pathlib import Path
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.routing import ModelRouting, escalation_chain, parse_models
+from eip_verify.runner import run_phase_1a, run_phase_2a, run_phase_2b, validate_phase_output
+
+
+class SizedAgent(FakeClaudeAgent):
+    """Only the "big" model fills every row's locations."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.models: list[str] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.models.append(config.model)
+        telemetry = await super().arun(prompt, output_path, cwd, config, metadata)
+        if config.model == "big":
+            output_csv = Path(str(metadata["output_csv"]))
+            with output_csv.open(encoding="utf-8", newline="") as handle:
+                reader = csv.DictReader(handle)
+                fieldnames, rows = reader.fieldnames, list(reader)
+            with output_csv.open("w", encoding="utf-8", newline="") as handle:
+                writer = csv.DictWriter(handle, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows({**row, "locations": row["locations"] or "[fork.py:L1]"} for row in rows)
+        return telemetry
+
+
+def test_model_routing_parses_phases_and_ladder() -> None:
+    routing = ModelRouting(models=parse_models("locate-spec=small, 2A=small"), escalate_to=("mid", "big"))
+
+    assert routing.model_for("1A", "default") == "small"
+    assert routing.model_for("analyze-spec", "default") == "default"
+    assert escalation_chain("small", routing.escalate_to) == ["mid", "big"]
+    assert escalation_chain("mid", routing.escalate_to) == ["big"]
+    assert escalation_chain("big", routing.escalate_to) == []
+
+
+def test_empty_rows_escalate_to_stronger_model(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    agent = SizedAgent()
+
+    run_dir = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        model="small",
+        llm_mode="fake",
+        agent=agent,
+        shard_size=1,
+        escalate_to=["mid", "big"],
+    )
+
+    # Row 003 has no locations: its shard climbs the ladder, the others stay small.
+    assert sorted(agent.models) == ["big", "mid", "small", "small", "small"]
+    manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
+    assert [(item["shard"], item["to_model"]) for item in manifest["escalations"]] == [(2, "mid"), (2, "big")]
+    assert manifest["escalations"][0]["problems"] == ["EIP1559-OBL-003: empty locations"]
+    assert manifest["telemetry"]["calls"] == 5
+    with (run_dir / "obligations_index.csv").open(encoding="utf-8", newline="") as handle:
+        assert all(row["locations"] for row in csv.DictReader(handle))
+
+
+class GarblingAgent(FakeClaudeAgent):
+    """The "small" model mangles the seeded CSV; "big" notes what it starts from."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen: list[str] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        output_csv = Path(str(metadata["output_csv"]))
+        if config.model != "big":
+            output_csv.write_text("id,locations\nEIP1559-OBL-001,\n", encoding="utf-8")
+            output_path.write_text("done", encoding="utf-8")
+            return None
+        self.seen.append(output_csv.read_text(encoding="utf-8"))
+        return await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def test_escalated_run_starts_from_the_seeded_csv(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    agent = GarblingAgent()
+
+    run_dir = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        model="small",
+        llm_mode="fake",
+        agent=agent,
+        escalate_to=["big"],
+    )
+
+    assert agent.seen == [(parent / "obligations_index.csv").read_text(encoding="utf-8")]
+    manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
+    assert [item["to_model"] for item in manifest["escalations"]] == ["big"]
+
+
+class LazyAgent(FakeClaudeAgent):
+    """Only the "big" model touches the seeded CSV; the others leave it as copied."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.models: list[str] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.models.append(config.model)
+        if config.model != "big":
+            output_path.write_text("done", encoding="utf-8")
+            return None
+        return await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def test_untouched_phase_2b_copy_escalates(tmp_path: Path) -> None:
+    client_repo = tmp_path / "client"
+    client_repo.mkdir()
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    run_2a = run_phase_2a(
+        parent_run=parent, client_repo=str(client_repo), llm_mode="fake", agent=FakeClaudeAgent()
+    )
+    input_csv = run_2a / "client_obligations_index.csv"
+    # 2A already filled client_code_flow; that alone must not pass 2B.
+    assert len(validate_phase_output("2B", input_csv, None, input_csv)) == 3
+
+    agent = LazyAgent()
+    run_2b = run_phase_2b(
+        parent_run=run_2a,
+        client_repo=str(client_repo),
+        model="small",
+        llm_mode="fake",
+        agent=agent,
+        escalate_to=["big"],
+    )
+
+    assert agent.models == ["small", "big"]
+    manifest = json.loads((run_2b / "run_manifest.json").read_text(encoding="utf-8"))
+    assert len(manifest["escalations"][0]["problems"]) == 3
+
+
+def test_phase_2b_gaps_must_change_from_the_input(tmp_path: Path) -> None:
+    input_csv = tmp_path / "input.csv"
+    output_csv = tmp_path / "output.csv"
+    header = "id,client_code_flow,client_obligation_gap,client_code_gap\n"
+    input_csv.write_text(header + "A,a -> b,,old gap\nB,a -> c,,\n", encoding="utf-8")
+    output_csv.write_text(header + "A,a -> b,,old gap\nB,a -> c,None,\n", encoding="utf-8")
+
+    assert validate_phase_output("2B", output_csv, ["A", "B"], input_csv) == [
+        "A: client_code_gap / client_obligation_gap unchanged from the input"
+    ]
+    assert validate_phase_output("2B", output_csv, ["A", "B"]) == []
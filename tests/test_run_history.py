@@ -0,0 +1,59 @@
+import json
+import os
+from pathlib import Path
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.history import LatencyHistory
+from eip_verify.run_history import load_calls, load_runs
+from eip_verify.shard_budget import ShardBudget
+from eip_verify.turn_budget import TurnBudget
+
+
+def test_recorded_runs_are_read_once_for_every_consumer(tmp_path: Path, monkeypatch) -> None:
+    import eip_verify.run_history as run_history
+    from eip_verify.runner import run_phase_1a
+
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "runs" / "phase0A"
+    parent.mkdir(parents=True)
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559", rows=4)
+    run_dir = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        llm_mode="fake",
+        agent=FakeClaudeAgent(),
+        shard_size=2,
+    )
+
+    validated: list[Path] = []
+    validate = run_history.validate_phase_output
+
+    def counting(phase, output_csv, row_ids=None):
+        validated.append(output_csv)
+        return validate(phase, output_csv, row_ids)
+
+    monkeypatch.setattr(run_history, "validate_phase_output", counting)
+    roots = [tmp_path / "runs", tmp_path / "runs" / "phase0A", tmp_path / "missing"]
+
+    calls = list(load_calls(roots))
+    TurnBudget.load(roots)
+    ShardBudget.load(roots)
+    LatencyHistory.load(roots)
+
+    assert [(call.phase, call.rows, call.shard) for call in calls] == [
+        ("1A", 2.0, 0),
+        ("1A", 2.0, 1),
+    ]
+    assert len(validated) == 2
+
+    # A rewritten manifest is read again.
+    manifest_path = run_dir / "run_manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["shards"] = manifest["shards"][:1]
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    stat = manifest_path.stat()
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert [len(run.calls) for run in load_runs(roots)] == [1]
+    assert len(validated) == 3
@@ -0,0 +1,139 @@
+from pathlib import Path
+
+import anyio
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+from eip_verify.llm import build_claude_config
+from eip_verify.sessions import SESSION_MAX_TURNS, SessionAgent
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.cost = 0.0
+        self.disconnected = False
+
+    async def query(self, prompt: str) -> None:
+        self.prompts.append(prompt)
+        if prompt == "/clear":
+            self.cost = 0.0
+        else:
+            self.cost += 0.25
+
+    def _result(self) -> ResultMessage:
+        return ResultMessage(
+            subtype="success",
+            duration_ms=10,
+            duration_api_ms=8,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            total_cost_usd=self.cost,
+            usage={"input_tokens": 10, "output_tokens": 5},
+        )
+
+    async def receive_response(self):
+        yield AssistantMessage(content=[TextBlock(text="ok")], model="claude-sonnet-4-5")
+        yield self._result()
+
+    async def receive_messages(self):
+        yield self._result()
+
+    async def disconnect(self) -> None:
+        self.disconnected = True
+
+    async def set_model(self, model) -> None:
+        self.prompts.append(f"model:{model}")
+
+
+def test_sessions_are_reused_per_eip_and_repo(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    clients: list[FakeClient] = []
+
+    async def connect(self, config, cwd):
+        clients.append(FakeClient())
+        return clients[-1]
+
+    monkeypatch.setattr(SessionAgent, "_connect", connect)
+    config = build_claude_config(None, 5, None)
+    spec_repo = tmp_path / "spec"
+    client_repo = tmp_path / "client"
+    spec_repo.mkdir()
+    client_repo.mkdir()
+
+    async def main() -> list:
+        agent = SessionAgent(reset="phase")
+        results = []
+        for phase, cwd in [("1A", spec_repo), ("1B", spec_repo), ("2A", client_repo)]:
+            metadata = {"phase": phase, "eip_number": "1559"}
+            results.append(
+                await agent.arun(f"prompt {phase}", tmp_path / f"{phase}.txt", cwd, config, metadata)
+            )
+        await agent.aclose()
+        return results
+
+    results = anyio.run(main)
+
+    assert len(clients) == 2
+    assert clients[0].prompts == ["prompt 1A", "/clear", "prompt 1B"]
+    assert [result.total_cost_usd for result in results] == [0.25, 0.25, 0.25]
+    assert all(client.disconnected for client in clients)
+    assert (tmp_path / "1B.txt").read_text(encoding="utf-8") == "ok"
+
+
+def test_sessions_switch_model_and_cap_turns_per_call(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    connected: list[tuple[FakeClient, int]] = []
+
+    class ToolLoopClient(FakeClient):
+        """Every prompt runs three tool turns before its result."""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.interrupted = 0
+
+        async def interrupt(self) -> None:
+            self.interrupted += 1
+
+        async def receive_response(self):
+            for turn in range(3):
+                yield AssistantMessage(
+                    content=[ToolUseBlock(id=str(turn), name="Read", input={})],
+                    model="claude-sonnet-4-5",
+                )
+                yield UserMessage(content=[ToolResultBlock(tool_use_id=str(turn), content="x")])
+            yield self._result()
+
+    async def connect(self, config, cwd):
+        connected.append((ToolLoopClient(), config.max_turns))
+        return connected[-1][0]
+
+    monkeypatch.setattr(SessionAgent, "_connect", connect)
+    metadata = {"phase": "1A", "eip_number": "1559"}
+
+    async def main() -> list:
+        agent = SessionAgent()
+        results = []
+        for model, max_turns in [("claude-haiku-4-5", 5), ("claude-sonnet-4-5", 2)]:
+            config = build_claude_config(model, max_turns, None)
+            results.append(
+                await agent.arun("prompt", tmp_path / f"{model}.txt", tmp_path, config, metadata)
+            )
+        await agent.aclose()
+        return results
+
+    results = anyio.run(main)
+
+    # One session: the escalated call switches model instead of starting a new process.
+    assert [max_turns for _, max_turns in connected] == [SESSION_MAX_TURNS]
+    client = connected[0][0]
+    assert client.prompts == ["prompt", "model:claude-sonnet-4-5", "prompt"]
+    assert client.interrupted == 1
+    assert [result.is_error for result in results] == [False, True]
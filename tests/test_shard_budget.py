@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.runner import plan_token_shards, run_phase_1a
+from eip_verify.shard_budget import ShardBudget, ShardSample, row_tokens, shard_size_metadata
+
+
+def _row(row_id: str, locations: str, statement: str = "x" * 40) -> dict[str, str]:
+    return {"id": row_id, "category": "core", "statement": statement, "locations": locations}
+
+
+def test_token_shards_keep_modules_together_within_budget() -> None:
+    rows = [
+        _row("A1", "gas.py:10"),
+        _row("B1", "fork.py:5"),
+        _row("A2", "gas.py:20"),
+        _row("C1", ""),
+        _row("B2", "fork.py:9, gas.py:1"),
+        _row("D1", "huge.py:1", statement="y" * 400),
+    ]
+    budget = row_tokens(rows[1]) + row_tokens(rows[4])
+
+    shards = [[row["id"] for row in shard] for shard in plan_token_shards("1B", rows, budget)]
+
+    assert shards == [["A1", "A2"], ["B1", "B2"], ["C1"], ["D1"]]
+    client_rows = [{**row, "client_locations": "core/state.go:1"} for row in rows[:3]]
+    assert len(plan_token_shards("2B", client_rows, 10_000)) == 1
+
+
+def _samples(budget: int, seconds_per_token: float, passed: tuple[bool, ...]) -> list[ShardSample]:
+    return [
+        ShardSample("1B", budget, budget, budget * seconds_per_token, ok) for ok in passed
+    ]
+
+
+def test_shard_budget_picks_the_fastest_level_that_keeps_quality() -> None:
+    budget = ShardBudget(
+        [
+            *_samples(1000, 0.010, (True, True, True)),
+            *_samples(2000, 0.006, (True, True, True)),
+            *_samples(4000, 0.004, (True, False, False)),  # fast but fails validation
+            *_samples(8000, 0.001, (True,)),  # too few samples to judge
+        ],
+        fallback=3000,
+    )
+
+    assert budget.tokens_for("1B") == 2000
+    assert budget.tokens_for("2A") == 3000
+    # The largest level tried is the fastest and never failed: try the next one.
+    assert ShardBudget(_samples(1000, 0.01, (True,) * 3)).tokens_for("1B") == 2000
+
+
+def test_auto_shards_record_budgets_and_learn_from_runs(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "runs" / "phase0A"
+    parent.mkdir(parents=True)
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559", rows=6)
+    kwargs = dict(parent_run=parent, spec_repo=str(spec_repo), llm_mode="fake")
+
+    run_dir = run_phase_1a(agent=FakeClaudeAgent(), shard_size=ShardBudget(fallback=40), **kwargs)
+
+    manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["shard_size"] == "auto"
+    assert manifest["shard_tokens"] == 40
+    assert all(0 < shard["row_tokens"] <= 40 for shard in manifest["shards"])
+    assert sum(len(shard["row_ids"]) for shard in manifest["shards"]) == 6
+
+    learned = ShardBudget.load([tmp_path / "runs"], fallback=40)
+    assert {sample.budget for sample in learned.samples} == {40}
+    # The fake agent leaves locations empty on the rows without any (grouped last).
+    assert [sample.passed for sample in learned.samples] == [True] * 4 + [False]
+    assert shard_size_metadata(3) == 3 and shard_size_metadata("auto") == "auto"
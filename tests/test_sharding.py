@@ -0,0 +1,125 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.runner import (
+    Shard,
+    merge_shard_outputs,
+    plan_shards,
+    read_checkpoint,
+    run_phase_1a,
+    run_phase_2a,
+)
+
+
+def _read_rows(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_plan_shards_splits_in_order() -> None:
+    rows = [{"id": str(idx)} for idx in range(5)]
+
+    shards = plan_shards(rows, 2)
+
+    assert [[row["id"] for row in shard] for shard in shards] == [["0", "1"], ["2", "3"], ["4"]]
+    with pytest.raises(ValueError):
+        plan_shards(rows, 0)
+
+
+def test_merge_shard_outputs_keeps_input_order(tmp_path: Path) -> None:
+    input_csv = tmp_path / "input.csv"
+    input_csv.write_text("id,statement\nA,first\nB,second\nC,third\n", encoding="utf-8")
+
+    shards = []
+    for index, (row_id, location) in enumerate([("C", "c.py:1"), ("A", "a.py:1")]):
+        shard_dir = tmp_path / f"shard{index}"
+        shard_dir.mkdir()
+        output_csv = shard_dir / "out.csv"
+        output_csv.write_text(
+            f"id,statement,locations\n{row_id},x,{location}\n", encoding="utf-8"
+        )
+        shards.append(Shard(index, [row_id], shard_dir, shard_dir / "in.csv", output_csv))
+
+    merged = tmp_path / "merged.csv"
+    merge_shard_outputs(input_csv, shards, merged)
+
+    rows = _read_rows(merged)
+    assert [row["id"] for row in rows] == ["A", "B", "C"]
+    assert [row["locations"] for row in rows] == ["a.py:1", "", "c.py:1"]
+    assert rows[1]["statement"] == "second"
+
+
+def test_sharded_phases_merge_results(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    client_repo = tmp_path / "client"
+    client_repo.mkdir()
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+
+    run_1a = run_phase_1a(
+        parent_run=parent,
+        spec_repo=str(spec_repo),
+        llm_mode="fake",
+        agent=FakeClaudeAgent(),
+        shard_size=1,
+        concurrency=3,
+    )
+    assert len(list((run_1a / "shards").iterdir())) == 3
+    assert _read_rows(run_1a / "obligations_index.csv") == _read_rows(
+        parent / "obligations_index.csv"
+    )
+
+    run_2a = run_phase_2a(
+        parent_run=run_1a,
+        client_repo=str(client_repo),
+        llm_mode="fake",
+        agent=FakeClaudeAgent(),
+        shard_size=2,
+        concurrency=2,
+    )
+    rows = _read_rows(run_2a / "client_obligations_index.csv")
+    assert [row["id"] for row in rows] == [
+        "EIP1559-OBL-001",
+        "EIP1559-OBL-002",
+        "EIP1559-OBL-003",
+    ]
+    assert rows[0]["client_locations"] == "client/file.go:50"
+    assert rows[1]["client_locations"] == "client/file.go:99"
+
+
+class BrokenShardAgent(FakeClaudeAgent):
+    """Fails the call for one obligation; the others succeed."""
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        if "EIP1559-OBL-002" in Path(str(metadata["input_csv"])).read_text(encoding="utf-8"):
+            raise ValueError("bad shard")
+        return await super().arun(prompt, output_path, cwd, config, metadata)
+
+
+def test_failed_shard_lets_the_others_checkpoint(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "phase0A"
+    parent.mkdir()
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+
+    failure = r"Phase 1A shard 001 failed \(1 of 3 shards.*bad shard"
+    with pytest.raises(RuntimeError, match=failure) as raised:
+        run_phase_1a(
+            parent_run=parent,
+            spec_repo=str(spec_repo),
+            llm_mode="fake",
+            agent=BrokenShardAgent(),
+            shard_size=1,
+            concurrency=3,
+        )
+    # The shard's own error is chained, untouched.
+    assert isinstance(raised.value.__cause__, ValueError)
+    assert str(raised.value.__cause__) == "bad shard"
+    shards = sorted((next((parent / "phase1A_runs").iterdir()) / "shards").iterdir())
+    assert [read_checkpoint(shard) is not None for shard in shards] == [True, False, True]
@@ -0,0 +1,108 @@
+import os
+import subprocess
+from pathlib import Path
+
+import anyio
+
+from eip_verify.fake_agent import FakeClaudeAgent
+from eip_verify.llm import build_claude_config
+from eip_verify.snapshots import SnapshotAgent, SnapshotManager
+
+
+class ScribblingAgent(FakeClaudeAgent):
+    """Edits, adds and deletes files in its cwd, like an agent with Write/Bash."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[tuple[Path, str]] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.calls.append((cwd, prompt))
+        assert (cwd / "gas.py").read_text(encoding="utf-8") == "GAS = 1\n"
+        (cwd / "notes.txt").write_text("scratch", encoding="utf-8")
+        with open(cwd / "gas.py", "a", encoding="utf-8") as handle:
+            handle.write("GAS = 2\n")  # an in-place edit
+        (cwd / "gas.py").unlink()
+        await anyio.sleep(0.05)
+        output_path.write_text(f"done in {cwd}", encoding="utf-8")
+        return None
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _calls(agent: SnapshotAgent, cwd: Path, run_dir: Path, count: int) -> None:
+    config = build_claude_config(None, 5, None)
+
+    async def main() -> None:
+        async with anyio.create_task_group() as tg:
+            for index in range(count):
+                output_path = run_dir / f"call{index}_output.txt"
+                prompt = f"Explore {cwd}/gas.py. Write {run_dir}/out.csv. Not {cwd.parent}-other."
+                tg.start_soon(agent.arun, prompt, output_path, cwd, config, {"phase": "1A"})
+
+    anyio.run(main)
+
+
+def test_concurrent_calls_get_isolated_reused_worktrees(tmp_path: Path) -> None:
+    repo = tmp_path / "client"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "gas.py").write_text("GAS = 1\n", encoding="utf-8")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+    run_dir = repo / "runs"  # the run dir may sit inside the repo
+    run_dir.mkdir()
+    inner = ScribblingAgent()
+    manager = SnapshotManager(tmp_path / "snapshots")
+    agent = SnapshotAgent(inner, manager)
+
+    _calls(agent, repo / "src", run_dir, 2)
+    _calls(agent, repo / "src", run_dir, 2)
+
+    views = {cwd for cwd, _ in inner.calls}
+    assert len(views) == 2 and all(view.name == "src" and repo not in view.parents for view in views)
+    assert manager.created == 2 and manager.reused == 2
+    cwd, prompt = inner.calls[-1]
+    assert prompt == f"Explore {cwd}/gas.py. Write {run_dir}/out.csv. Not {repo}-other."
+    outputs = {(run_dir / f"call{index}_output.txt").read_text(encoding="utf-8") for index in (0, 1)}
+    assert outputs == {f"done in {view}" for view in views}
+    # The live checkout is untouched.
+    assert (repo / "src" / "gas.py").exists() and not (repo / "src" / "notes.txt").exists()
+
+    anyio.run(agent.aclose)
+    assert not any(view.exists() for view in views)
+    listed = subprocess.run(
+        ["git", "-C", str(repo), "worktree", "list"], capture_output=True, text=True, check=True
+    ).stdout
+    assert len(listed.splitlines()) == 1
+
+
+def test_copies_for_directories_outside_git(tmp_path: Path) -> None:
+    tree = tmp_path / "eips"
+    tree.mkdir()
+    (tree / "gas.py").write_text("GAS = 1\n", encoding="utf-8")
+    inner = ScribblingAgent()
+    manager = SnapshotManager(tmp_path / "snapshots")
+
+    _calls(SnapshotAgent(inner, manager), tree, tmp_path, 1)
+    _calls(SnapshotAgent(inner, manager), tree, tmp_path, 1)
+
+    assert manager.created == 1 and manager.reused == 1
+    assert sorted(path.name for path in tree.iterdir()) == ["gas.py"]
+    # In-place edits never reach the source.
+    assert (tree / "gas.py").read_text(encoding="utf-8") == "GAS = 1\n"
+    # Reset on reuse: deleted files are copied back, added ones removed.
+    snapshot, view = manager.acquire(tree)
+    assert view == inner.calls[-1][0]
+    assert (view / "gas.py").read_text(encoding="utf-8") == "GAS = 1\n"
+    assert not os.path.samefile(view / "gas.py", tree / "gas.py")
+    assert not (view / "notes.txt").exists()
+    manager.release(snapshot)
+    manager.remove_all()
+    assert not view.exists()
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+
+from eip_verify.pipeline import run_pipeline
+from eip_verify.prompts import load_prompt
+from eip_verify.structured_output import (
+    StructuredOutputError,
+    merge_structured_rows,
+    parse_structured_rows,
+    strip_file_instructions,
+)
+
+
+REPLY = """I checked fork.py and transactions.py.
+
+```json
+{"rows": [
+  {"id": "EIP1559-OBL-002", "locations": ["fork.py:L10-L20", "transactions.py:calculate_intrinsic_cost"]},
+  {"id": "EIP1559-OBL-001", "locations": []}
+]}
+```
+"""
+
+
+def test_parse_structured_rows_validates_and_merges() -> None:
+    rows = [
+        {"id": "EIP1559-OBL-001", "statement": "a, with comma", "locations": "old.py:1"},
+        {"id": "EIP1559-OBL-002", "statement": "b", "locations": ""},
+        {"id": "EIP1559-OBL-003", "statement": "c", "locations": "kept.py:3"},
+    ]
+    ids = [row["id"] for row in rows]
+
+    updates = parse_structured_rows("1A", REPLY, ids)
+    merged = merge_structured_rows(rows, updates)
+
+    assert [row["id"] for row in merged] == ids
+    assert merged[0] == {"id": "EIP1559-OBL-001", "statement": "a, with comma", "locations": "[]"}
+    assert merged[1]["locations"] == "[fork.py:L10-L20, transactions.py:calculate_intrinsic_cost]"
+    assert merged[2]["locations"] == "kept.py:3"
+
+    with pytest.raises(StructuredOutputError):
+        parse_structured_rows("1A", REPLY, ["EIP1559-OBL-001"])
+    with pytest.raises(StructuredOutputError):
+        parse_structured_rows("1A", "Done, the CSV is updated.", ids)
+
+
+def test_json_prompt_drops_file_instructions() -> None:
+    prompt = strip_file_instructions(load_prompt("phase1A_locations"))
+
+    assert "Re-open" not in prompt
+    assert "csv module" not in prompt
+    assert "Output:" not in prompt
+    assert "Do not include a location unless" in prompt
+    assert "Locations format:" in prompt
+
+
+def _final_csv(run_root: Path) -> str:
+    path = next(run_root.glob("**/phase2B_runs/*/client_obligations_index.csv"))
+    return path.read_text(encoding="utf-8")
+
+
+def test_json_output_mode_matches_csv_mode(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    (spec_repo / "README.md").write_text(
+        "### Ethereum Protocol Releases\n\n| | Fork | EIPs |\n| - | - | - |\n"
+        "| 1 | London | [EIP-1559](./EIPs/eip-1559.md) |\n",
+        encoding="utf-8",
+    )
+    eip_file = tmp_path / "eip-1559.md"
+    eip_file.write_text("# EIP-1559\n", encoding="utf-8")
+    client_repo = tmp_path / "client"
+    client_repo.mkdir()
+    kwargs = dict(
+        eip="1559",
+        phases=["extract", "locate-spec", "analyze-spec", "locate-client", "analyze-client"],
+        spec_repo=str(spec_repo),
+        client_repo=str(client_repo),
+        eip_file=str(eip_file),
+        llm_mode="fake",
+    )
+
+    run_pipeline(output_dir=str(tmp_path / "csv"), **kwargs)
+    run_pipeline(output_dir=str(tmp_path / "json"), output_format="json", shard_size=2, **kwargs)
+
+    assert _final_csv(tmp_path / "json") == _final_csv(tmp_path / "csv")
+    prompt = next((tmp_path / "json").glob("**/phase2A_runs/*/shards/000/phase2A_prompt.txt"))
+    text = prompt.read_text(encoding="utf-8")
+    assert "Input rows:" in text and "Re-open" not in text
@@ -0,0 +1,80 @@
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+from eip_verify.telemetry import CallTelemetry, TelemetryRecorder, add_totals, summarize_telemetry
+
+
+def test_recorder_captures_usage_turns_and_tool_calls() -> None:
+    recorder = TelemetryRecorder(model="claude-sonnet-4-5")
+
+    recorder.observe(
+        AssistantMessage(
+            content=[ToolUseBlock(id="t1", name="Grep", input={"pattern": "BASE_FEE"})],
+            model="claude-sonnet-4-5",
+        )
+    )
+    recorder.observe(UserMessage(content=[ToolResultBlock(tool_use_id="t1", content="hit")]))
+    recorder.observe(AssistantMessage(content=[TextBlock(text="done")], model="claude-sonnet-4-5"))
+    recorder.observe(
+        ResultMessage(
+            subtype="success",
+            duration_ms=1200,
+            duration_api_ms=900,
+            is_error=False,
+            num_turns=2,
+            session_id="s",
+            total_cost_usd=0.0125,
+            usage={
+                "input_tokens": 100,
+                "output_tokens": 40,
+                "cache_creation_input_tokens": 10,
+                "cache_read_input_tokens": 500,
+            },
+        )
+    )
+    telemetry = recorder.finish()
+
+    assert telemetry.input_tokens == 100
+    assert telemetry.output_tokens == 40
+    assert telemetry.cache_read_input_tokens == 500
+    assert telemetry.total_cost_usd == 0.0125
+    assert telemetry.num_turns == 2
+    assert telemetry.duration_ms == 1200
+    assert len(telemetry.turn_wall_times_s) == 2
+    assert [call["name"] for call in telemetry.tool_calls] == ["Grep"]
+    assert CallTelemetry.from_dict(telemetry.to_dict()) == telemetry
+
+
+def test_recorder_handles_sdks_without_assistant_errors() -> None:
+    recorder = TelemetryRecorder()
+    old = AssistantMessage(content=[TextBlock(text="done")], model="claude-sonnet-4-5")
+    del old.error  # Older SDK releases have no AssistantMessage.error.
+    recorder.observe(old)
+    recorder.observe(
+        AssistantMessage(content=[], model="claude-sonnet-4-5", error="rate_limit")
+    )
+
+    assert recorder.telemetry.error == "rate_limit"
+    assert len(recorder.telemetry.turn_wall_times_s) == 2
+
+
+def test_summaries_add_across_calls_and_phases() -> None:
+    first = CallTelemetry(input_tokens=10, total_cost_usd=0.5, num_turns=3, wall_time_s=2.0)
+    second = CallTelemetry(input_tokens=5, total_cost_usd=0.25, num_turns=1, wall_time_s=4.0)
+
+    phase = summarize_telemetry([first, None, second])
+    assert phase["calls"] == 2
+    assert phase["input_tokens"] == 15
+    assert phase["num_turns"] == 4
+    assert phase["max_call_wall_time_s"] == 4.0
+
+    total = add_totals([phase, phase])
+    assert total["calls"] == 4
+    assert total["total_cost_usd"] == 1.5
+    assert total["max_call_wall_time_s"] == 4.0
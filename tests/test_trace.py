@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from claude_agent_sdk import AssistantMessage, ToolResultBlock, ToolUseBlock, UserMessage
+
+from eip_verify.trace import ToolTracer, load_trace_records, trace_path, write_trace_report
+
+
+def _session(tracer: ToolTracer, calls: list[tuple[str, str, dict]]) -> None:
+    for tool_id, name, tool_input in calls:
+        tracer.observe(
+            AssistantMessage(
+                content=[ToolUseBlock(id=tool_id, name=name, input=tool_input)],
+                model="claude-sonnet-4-5",
+            )
+        )
+        tracer.observe(
+            UserMessage(content=[ToolResultBlock(tool_use_id=tool_id, content="x" * 10)])
+        )
+
+
+def test_trace_report_ranks_hot_spots(tmp_path: Path) -> None:
+    read_fork = ("Read", {"file_path": "src/ethereum/london/fork.py"})
+    for shard in ("000", "001"):
+        shard_dir = tmp_path / "phase1A_runs" / "r" / "shards" / shard
+        shard_dir.mkdir(parents=True)
+        output_path = shard_dir / "phase1A_output.txt"
+        with ToolTracer(trace_path(output_path), {"phase": "1A", "eip_number": "1559"}) as tracer:
+            _session(
+                tracer,
+                [
+                    (f"{shard}-1", *read_fork),
+                    (f"{shard}-2", "Grep", {"pattern": "base_fee", "path": "src"}),
+                    (f"{shard}-3", *read_fork),
+                ],
+            )
+            tracer.observe(
+                AssistantMessage(
+                    content=[ToolUseBlock(id=f"{shard}-4", name="Bash", input={"command": "ls"})],
+                    model="claude-sonnet-4-5",
+                )
+            )
+
+    records = load_trace_records([tmp_path])
+    assert len(records) == 8
+    assert sum(1 for record in records if not record["finished"]) == 2
+
+    report = write_trace_report([tmp_path], None, ["json", "md"], top=5)
+
+    top_read = report["top_reads"][0]
+    assert top_read["target"] == "src/ethereum/london/fork.py"
+    assert (top_read["calls"], top_read["repeats"], top_read["sessions"]) == (4, 2, 2)
+    assert top_read["result_bytes"] == 40
+    assert report["top_searches"][0]["target"] == "base_fee in src"
+    assert report["repeated"][0]["target"] == top_read["target"]
+    assert json.loads((tmp_path / "trace_report.json").read_text())["tool_calls"] == 8
+    assert "## Most read files" in (tmp_path / "trace_report.md").read_text()
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+from eip_verify.fake_agent import FakeClaudeAgent, _write_fake_obligations_csv
+from eip_verify.runner import run_phase_1a
+from eip_verify.turn_budget import (
+    MIN_AUTO_TURNS,
+    TurnBudget,
+    TurnSample,
+    turn_budget_for,
+)
+
+
+def _sample(size: float, turns: float, passed: bool = True, max_turns: int = 20) -> TurnSample:
+    return TurnSample("1B", size, turns, max_turns, passed)
+
+
+def test_turn_budget_follows_similar_validated_calls() -> None:
+    budget = TurnBudget(
+        [
+            *(_sample(2, turns) for turns in (4, 5, 6, 6, 8)),
+            *(_sample(30, turns) for turns in (18, 20, 22)),
+            _sample(2, 12, passed=False),
+        ],
+        fallback=20,
+    )
+
+    assert budget.turns_for("1B", 2) == 10  # p90 of 4..8 is 8, plus 25% headroom
+    assert budget.turns_for("1B", 25) == 28
+    assert budget.turns_for("2A", 2) == 20
+    assert TurnBudget([_sample(1, 1)]).turns_for("1B", 1) == MIN_AUTO_TURNS
+
+
+def test_turn_budget_grows_past_starved_calls() -> None:
+    budget = TurnBudget(
+        [_sample(3, 6), _sample(3, 6), _sample(3, 10, passed=False, max_turns=10)]
+    )
+
+    assert budget.turns_for("1B", 3) == 15
+
+
+class TurnCountingAgent:
+    """Fake agent that reports ``turns`` turns and records each call's cap."""
+
+    def __init__(self, turns: int) -> None:
+        self.inner = FakeClaudeAgent()
+        self.turns = turns
+        self.caps: list[int] = []
+
+    async def arun(self, prompt, output_path, cwd, config, metadata):
+        self.caps.append(config.max_turns)
+        telemetry = await self.inner.arun(prompt, output_path, cwd, config, metadata)
+        telemetry.num_turns = self.turns
+        return telemetry
+
+
+def test_auto_max_turns_learns_from_recorded_runs(tmp_path: Path) -> None:
+    spec_repo = tmp_path / "spec"
+    (spec_repo / "src" / "ethereum" / "forks" / "london").mkdir(parents=True)
+    parent = tmp_path / "runs" / "phase0A"
+    parent.mkdir(parents=True)
+    _write_fake_obligations_csv(parent / "obligations_index.csv", "1559")
+    kwargs = dict(parent_run=parent, spec_repo=str(spec_repo), llm_mode="fake", shard_size=1)
+
+    first = TurnCountingAgent(turns=4)
+    run_phase_1a(agent=first, max_turns=20, **kwargs)
+    assert first.caps == [20] * len(first.caps)
+
+    second = TurnCountingAgent(turns=4)
+    run_dir = run_phase_1a(agent=second, max_turns=TurnBudget.load([tmp_path / "runs"]), **kwargs)
+
+    assert second.caps == [5] * len(first.caps)
+    manifest = json.loads((run_dir / "run_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["max_turns_mode"] == "auto"
+    assert {shard["max_turns"] for shard in manifest["shards"]} == {5}
+    assert turn_budget_for(20) is None